@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+"""/query-kb 端到端基准测试（FastAPI TestClient，离线）"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from fastapi.testclient import TestClient
+
+import src.api.main as api_main
+from benchmarks.bench_vectorstore import make_documents
+from benchmarks.common import latency_stats, make_queries, timer, write_results
+from benchmarks.fakes import DeterministicHashEmbeddings, FakeLLM
+from src.llm.llm_cache import get_llm_cache
+from src.llm.llm_factory import LLMFactory
+from src.utils.datasource_config import DataSourceConfig, get_datasource_manager
+from src.vectorstore.knowledge_base_manager import KnowledgeBase, KnowledgeBaseManager
+from src.vectorstore.vector_store import VectorStoreManager
+
+
+def build_kb_manager(document_count: int, vector_db_type: str = "faiss") -> KnowledgeBaseManager:
+    """
+    构建一个只包含合成知识库的知识库管理器
+
+    Args:
+        document_count: 文档数量
+        vector_db_type: 向量数据库类型
+
+    Returns:
+        知识库管理器实例
+    """
+    embeddings = DeterministicHashEmbeddings()
+    kb_manager = KnowledgeBaseManager(
+        datasource_manager=get_datasource_manager(),
+        embedding_model=embeddings,
+        vector_db_type=vector_db_type,
+        persist_directory="./data/bench"
+    )
+
+    datasource_config = DataSourceConfig(
+        name="bench_db",
+        display_name="基准测试库",
+        description="合成 schema",
+        type="mysql",
+        enabled=True,
+        connection={},
+        knowledge_base={"collection_name": "kb_bench"}
+    )
+    vectorstore_manager = VectorStoreManager(
+        vector_db_type=vector_db_type,
+        embedding_model=embeddings,
+        persist_directory=None,
+        collection_name=datasource_config.get_collection_name()
+    )
+    vectorstore_manager.create_vectorstore(make_documents(document_count))
+
+    kb = KnowledgeBase(datasource_config, vectorstore_manager, kb_manager.document_processor)
+    kb.is_initialized = True
+    kb_manager.knowledge_bases[datasource_config.name] = kb
+
+    return kb_manager
+
+
+def run(
+    document_count: int = 1000,
+    request_count: int = 200,
+    llm_latency: float = 0.0,
+    top_k: int = 5
+) -> List[Dict[str, Any]]:
+    """
+    测量 /search 和 /query-kb 的每秒请求数
+
+    Args:
+        document_count: 知识库文档数量
+        request_count: 请求次数
+        llm_latency: 假 LLM 模拟延迟（秒）
+        top_k: 返回文档数量
+
+    Returns:
+        结果列表
+    """
+    fake_llm = FakeLLM(latency=llm_latency)
+    original_create_llm = LLMFactory.create_llm
+    LLMFactory.create_llm = staticmethod(lambda *args, **kwargs: fake_llm)
+    get_llm_cache().clear()
+    api_main.kb_manager = build_kb_manager(document_count)
+
+    client = TestClient(api_main.app)
+    queries = make_queries(request_count)
+    results = []
+
+    try:
+        for endpoint in ("/search", "/query-kb"):
+            latencies = []
+            errors = 0
+            with timer() as t_total:
+                for query in queries:
+                    start = time.perf_counter()
+                    response = client.post(endpoint, json={"query": query, "top_k": top_k})
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    if response.status_code != 200:
+                        errors += 1
+
+            result = {
+                "endpoint": endpoint,
+                "documents": document_count,
+                "requests": request_count,
+                "errors": errors,
+                "requests_per_sec": round(request_count / max(t_total["seconds"], 1e-9), 2),
+                "latency": latency_stats(latencies),
+            }
+            results.append(result)
+            print(f"  {endpoint}: {result['requests_per_sec']} 请求/秒, "
+                  f"p99={result['latency']['p99_ms']}ms, 错误 {errors}")
+    finally:
+        LLMFactory.create_llm = original_create_llm
+        get_llm_cache().clear()
+        api_main.kb_manager = None
+
+    return results
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="API 端到端基准测试")
+    parser.add_argument('--documents', type=int, default=1000, help='知识库文档数量')
+    parser.add_argument('--requests', type=int, default=200, help='请求次数')
+    parser.add_argument('--llm-latency', type=float, default=0.0, help='假 LLM 模拟延迟（秒）')
+    parser.add_argument('--output', type=str, help='结果 JSON 输出路径')
+    args = parser.parse_args()
+
+    print("🌐 API 端到端")
+    results = run(args.documents, args.requests, args.llm_latency)
+    write_results("api", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
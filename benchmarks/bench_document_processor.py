@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+"""DocumentProcessor 吞吐量基准测试"""
+import argparse
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.common import make_sample_rows, make_synthetic_schema, timer, write_results
+from src.rag.document_processor import DocumentProcessor, build_sample_text, build_schema_text
+
+
+def legacy_schema_text(table_name: str, table_info: Dict[str, Any]) -> str:
+    """原先基于字符串拼接的 schema 文本构建（作为对照基线）"""
+    text = f"表名: {table_name}\n\n"
+
+    if 'comment' in table_info:
+        text += f"说明: {table_info['comment']}\n\n"
+
+    text += "字段信息:\n"
+
+    for col_name, col_info in table_info.get('columns', {}).items():
+        text += f"  - {col_name} ({col_info.get('type', '')})"
+        if col_info.get('key', ''):
+            text += f" [{col_info['key']}]"
+        if not col_info.get('nullable', False):
+            text += " [NOT NULL]"
+        if col_info.get('comment', ''):
+            text += f": {col_info['comment']}"
+        text += "\n"
+
+    return text
+
+
+def legacy_sample_text(table_name: str, rows: List[Dict[str, Any]]) -> str:
+    """原先基于字符串拼接的示例数据文本构建（作为对照基线）"""
+    text = f"表 {table_name} 的示例数据:\n\n"
+
+    for i, row in enumerate(rows, 1):
+        text += f"记录 {i}:\n"
+        for key, value in row.items():
+            text += f"  {key}: {value}\n"
+        text += "\n"
+
+    return text
+
+
+def run(table_counts: List[int], columns_per_table: int = 12, sample_rows: int = 5) -> List[Dict[str, Any]]:
+    """
+    测量 schema 文档和示例数据文档的构建吞吐量，并与字符串拼接基线对比
+
+    Args:
+        table_counts: 表数量列表
+        columns_per_table: 每个表的字段数量
+        sample_rows: 每个表的示例数据行数
+
+    Returns:
+        结果列表
+    """
+    serial_processor = DocumentProcessor(max_workers=1)
+    parallel_processor = DocumentProcessor(parallel_threshold=0)
+    rows = make_sample_rows(sample_rows)
+    results = []
+
+    for table_count in table_counts:
+        schema = make_synthetic_schema(table_count, columns_per_table)
+
+        with timer() as t_legacy:
+            legacy_texts = [legacy_schema_text(name, info) for name, info in schema.items()]
+
+        with timer() as t_builder:
+            builder_texts = [build_schema_text(name, info) for name, info in schema.items()]
+
+        with timer() as t_schema:
+            schema_docs = serial_processor.process_database_schema(schema)
+
+        with timer() as t_parallel:
+            parallel_docs = parallel_processor.process_database_schema(schema)
+
+        with timer() as t_legacy_sample:
+            legacy_sample_texts = [legacy_sample_text(name, rows) for name in schema]
+
+        with timer() as t_sample_builder:
+            for table_name in schema:
+                build_sample_text(table_name, (row.items() for row in rows))
+
+        with timer() as t_sample:
+            sample_docs = []
+            for table_name in schema:
+                sample_docs.extend(serial_processor.process_sample_data(table_name, rows))
+
+        identical = (
+            builder_texts == legacy_texts
+            and [doc.page_content for doc in schema_docs] == legacy_texts
+            and [doc.page_content for doc in parallel_docs] == legacy_texts
+            and [doc.page_content for doc in sample_docs] == legacy_sample_texts
+        )
+
+        total_chars = sum(len(doc.page_content) for doc in schema_docs + sample_docs)
+        result = {
+            "tables": table_count,
+            "columns_per_table": columns_per_table,
+            "legacy_schema_seconds": round(t_legacy["seconds"], 6),
+            "builder_schema_seconds": round(t_builder["seconds"], 6),
+            "schema_text_speedup": round(t_legacy["seconds"] / max(t_builder["seconds"], 1e-9), 2),
+            "schema_seconds": round(t_schema["seconds"], 6),
+            "schema_tables_per_sec": round(table_count / max(t_schema["seconds"], 1e-9), 1),
+            "parallel_schema_seconds": round(t_parallel["seconds"], 6),
+            "parallel_workers": parallel_processor.max_workers,
+            "legacy_sample_seconds": round(t_legacy_sample["seconds"], 6),
+            "builder_sample_seconds": round(t_sample_builder["seconds"], 6),
+            "sample_seconds": round(t_sample["seconds"], 6),
+            "sample_tables_per_sec": round(table_count / max(t_sample["seconds"], 1e-9), 1),
+            "documents": len(schema_docs) + len(sample_docs),
+            "total_chars": total_chars,
+            "identical_output": identical,
+        }
+        results.append(result)
+        print(f"  {table_count} 表: schema 文本 拼接 {result['legacy_schema_seconds']}s -> "
+              f"list-join {result['builder_schema_seconds']}s ({result['schema_text_speedup']}x), "
+              f"文档 串行 {result['schema_seconds']}s / 并行 {result['parallel_schema_seconds']}s "
+              f"({result['parallel_workers']} 进程), "
+              f"示例数据文本 {result['legacy_sample_seconds']}s -> {result['builder_sample_seconds']}s, "
+              f"输出一致: {identical}")
+
+    return results
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="DocumentProcessor 吞吐量基准测试")
+    parser.add_argument('--tables', type=int, nargs='+', default=[100, 1000, 3000], help='表数量')
+    parser.add_argument('--columns', type=int, default=200, help='每个表的字段数量')
+    parser.add_argument('--output', type=str, help='结果 JSON 输出路径')
+    args = parser.parse_args()
+
+    print("📝 DocumentProcessor 吞吐量")
+    results = run(args.tables, args.columns)
+    write_results("document_processor", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
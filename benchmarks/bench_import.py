@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+"""KnowledgeBase.initialize 导入耗时和内存基准测试（合成 SQLite 数据源）"""
+import argparse
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.common import timer, write_results
+from benchmarks.fakes import DeterministicHashEmbeddings
+from src.database.synthetic import generate_synthetic_sqlite
+from src.rag.document_processor import DocumentProcessor
+from src.utils.datasource_config import DataSourceConfig
+from src.vectorstore.import_checkpoint import ImportCheckpoint
+from src.vectorstore.knowledge_base_manager import KnowledgeBase
+from src.vectorstore.vector_store import VectorStoreManager
+
+
+def run(
+    table_counts: List[int],
+    columns_per_table: int = 20,
+    row_count: int = 20,
+    include_sample_data: bool = True,
+    vector_db_type: str = "faiss"
+) -> List[Dict[str, Any]]:
+    """
+    测量不同表规模下的知识库导入耗时和 Python 堆内存峰值
+
+    Args:
+        table_counts: 表数量列表
+        columns_per_table: 每个表的字段数量
+        row_count: 每个表的行数
+        include_sample_data: 是否导入示例数据
+        vector_db_type: 向量数据库类型
+
+    Returns:
+        结果列表
+    """
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for table_count in table_counts:
+            db_path = str(Path(tmp_dir) / f"synthetic_{table_count}.db")
+            stats = generate_synthetic_sqlite(db_path, table_count, columns_per_table, row_count)
+
+            datasource_config = DataSourceConfig(
+                name=f"synthetic_{table_count}",
+                display_name=f"合成数据库 ({table_count} 表)",
+                description="",
+                type="sqlite",
+                enabled=True,
+                connection={"database": db_path},
+                knowledge_base={"include_sample_data": include_sample_data, "sample_data_limit": 5}
+            )
+            kb = KnowledgeBase(
+                datasource_config=datasource_config,
+                vectorstore_manager=VectorStoreManager(
+                    vector_db_type=vector_db_type,
+                    embedding_model=DeterministicHashEmbeddings(),
+                    persist_directory=None,
+                    collection_name=datasource_config.get_collection_name()
+                ),
+                document_processor=DocumentProcessor()
+            )
+
+            tracemalloc.start()
+            try:
+                with timer() as t_init:
+                    kb.initialize()
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+            result = {
+                "tables": table_count,
+                "columns_per_table": columns_per_table,
+                "db_size_bytes": stats["size_bytes"],
+                "initialize_seconds": round(t_init["seconds"], 4),
+                "tables_per_sec": round(table_count / max(t_init["seconds"], 1e-9), 1),
+                "peak_python_heap_mb": round(peak / 1024 / 1024, 2),
+            }
+            results.append(result)
+
+    for result in results:
+        print(f"  {result['tables']} 表: {result['initialize_seconds']}s, "
+              f"峰值内存 {result['peak_python_heap_mb']} MB")
+
+    return results
+
+
+def run_checkpoint(
+    table_counts: List[int],
+    interval_seconds: List[float],
+    columns_per_table: int = 20
+) -> List[Dict[str, Any]]:
+    """
+    测量导入检查点提交间隔对 FAISS 持久化导入耗时的影响
+
+    每次提交都会 save_local 重写整个索引，按批提交时持久化总耗时随表数量平方增长。
+
+    Args:
+        table_counts: 表数量列表
+        interval_seconds: 检查点最短提交间隔列表（0 表示每批提交）
+        columns_per_table: 每个表的字段数量
+
+    Returns:
+        结果列表
+    """
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for table_count in table_counts:
+            db_path = str(Path(tmp_dir) / f"synthetic_{table_count}.db")
+            generate_synthetic_sqlite(db_path, table_count, columns_per_table, 0)
+
+            for seconds in interval_seconds:
+                datasource_config = DataSourceConfig(
+                    name=f"synthetic_{table_count}",
+                    display_name=f"合成数据库 ({table_count} 表)",
+                    description="",
+                    type="sqlite",
+                    enabled=True,
+                    connection={"database": db_path},
+                    knowledge_base={"include_sample_data": False}
+                )
+                run_dir = Path(tmp_dir) / f"faiss_{table_count}_{seconds}"
+                manager = VectorStoreManager(
+                    vector_db_type="faiss",
+                    embedding_model=DeterministicHashEmbeddings(),
+                    persist_directory=str(run_dir / "index"),
+                    collection_name=datasource_config.get_collection_name()
+                )
+
+                persist = manager.persist
+                persist_seconds = []
+
+                def timed_persist():
+                    with timer() as t:
+                        persist()
+                    persist_seconds.append(t["seconds"])
+
+                manager.persist = timed_persist
+                kb = KnowledgeBase(
+                    datasource_config=datasource_config,
+                    vectorstore_manager=manager,
+                    document_processor=DocumentProcessor(max_workers=1),
+                    checkpoint=ImportCheckpoint(str(run_dir / "checkpoints"), interval_seconds=seconds)
+                )
+
+                with timer() as t_init:
+                    kb.initialize()
+
+                results.append({
+                    "tables": table_count,
+                    "interval_seconds": seconds,
+                    "initialize_seconds": round(t_init["seconds"], 4),
+                    "persist_calls": len(persist_seconds),
+                    "persist_seconds": round(sum(persist_seconds), 4),
+                })
+
+    for result in results:
+        print(f"  {result['tables']} 表, 提交间隔 {result['interval_seconds']}s: "
+              f"{result['initialize_seconds']}s, 持久化 {result['persist_calls']} 次 "
+              f"共 {result['persist_seconds']}s")
+
+    return results
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="知识库导入基准测试")
+    parser.add_argument('--tables', type=int, nargs='+', default=[100, 1000, 3000], help='表数量')
+    parser.add_argument('--columns', type=int, default=20, help='每个表的字段数量')
+    parser.add_argument('--rows', type=int, default=20, help='每个表的行数')
+    parser.add_argument('--no-sample-data', action='store_true', help='不导入示例数据')
+    parser.add_argument('--checkpoint', type=float, nargs='+', metavar='SECONDS',
+                        help='改为比较 FAISS 导入检查点的最短提交间隔（秒）')
+    parser.add_argument('--output', type=str, help='结果 JSON 输出路径')
+    args = parser.parse_args()
+
+    if args.checkpoint:
+        print("📥 知识库导入（检查点提交间隔）")
+        results = run_checkpoint(args.tables, args.checkpoint, args.columns)
+        write_results("import_checkpoint", results, args.output)
+        return
+
+    print("📥 知识库导入")
+    results = run(args.tables, args.columns, args.rows, not args.no_sample_data)
+    write_results("import", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+"""Schema 结构内存基准测试 - 字典 vs TableSchema/ColumnInfo（合成 SQLite 数据源）"""
+import argparse
+import gc
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.common import timer, write_results
+from src.database.sqlite_db import COMMENTS_TABLE, SQLiteDatabase
+from src.database.synthetic import generate_synthetic_sqlite
+from src.rag.document_processor import DocumentProcessor
+
+
+def legacy_get_schema(db: SQLiteDatabase) -> Dict[str, Any]:
+    """原先每个字段一个字典的 get_schema（作为对照基线）"""
+    results = db.execute_query(
+        "SELECT name FROM sqlite_master "
+        "WHERE type = 'table' AND name NOT LIKE 'sqlite_%' AND name != :comments_table "
+        "ORDER BY name",
+        {'comments_table': COMMENTS_TABLE}
+    )
+    comments = db._load_comments()
+
+    schema = {}
+    for row in results:
+        table_name = row['name']
+        columns = {}
+        for col in db.execute_query(f'PRAGMA table_info("{table_name}")'):
+            columns[col['name']] = {
+                'type': col['type'].lower(),
+                'comment': comments.get((table_name, col['name']), ''),
+                'nullable': not col['notnull'] and not col['pk'],
+                'key': 'PRI' if col['pk'] else '',
+                'default': col['dflt_value']
+            }
+        schema[table_name] = {
+            'comment': comments.get((table_name, ''), ''),
+            'columns': columns
+        }
+
+    return schema
+
+
+def _measure(load_schema: Callable[[], Dict[str, Any]], processor: DocumentProcessor) -> Dict[str, Any]:
+    """测量获取 schema 并生成文档过程中的内存"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        with timer() as t:
+            schema = load_schema()
+            retained, _ = tracemalloc.get_traced_memory()
+            documents = processor.process_database_schema(schema)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "seconds": round(t["seconds"], 4),
+        "schema_mb": round(retained / 1024 / 1024, 2),
+        "peak_mb": round(peak / 1024 / 1024, 2),
+        "documents": len(documents),
+    }
+
+
+def run(table_counts: List[int], columns_per_table: int = 100) -> List[Dict[str, Any]]:
+    """
+    对比两种 schema 表示的内存占用
+
+    Args:
+        table_counts: 表数量列表
+        columns_per_table: 每个表的字段数量
+
+    Returns:
+        结果列表
+    """
+    processor = DocumentProcessor(max_workers=1)
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for table_count in table_counts:
+            db_path = str(Path(tmp_dir) / f"schema_{table_count}.db")
+            generate_synthetic_sqlite(db_path, table_count, columns_per_table, row_count=0)
+
+            with SQLiteDatabase({"database": db_path}) as db:
+                legacy = _measure(lambda: legacy_get_schema(db), processor)
+                compact = _measure(db.get_schema, processor)
+
+            result = {
+                "tables": table_count,
+                "columns_per_table": columns_per_table,
+                "dict": legacy,
+                "compact": compact,
+                "schema_memory_ratio": round(legacy["schema_mb"] / max(compact["schema_mb"], 1e-9), 2),
+                "peak_memory_ratio": round(legacy["peak_mb"] / max(compact["peak_mb"], 1e-9), 2),
+            }
+            results.append(result)
+            print(f"  {table_count} 表 × {columns_per_table} 字段: "
+                  f"schema {legacy['schema_mb']}MB -> {compact['schema_mb']}MB, "
+                  f"峰值 {legacy['peak_mb']}MB -> {compact['peak_mb']}MB")
+
+    return results
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="Schema 结构内存基准测试")
+    parser.add_argument('--tables', type=int, nargs='+', default=[100, 1000, 3000], help='表数量')
+    parser.add_argument('--columns', type=int, default=100, help='每个表的字段数量')
+    parser.add_argument('--output', type=str, help='结果 JSON 输出路径')
+    args = parser.parse_args()
+
+    print("🧮 Schema 结构内存")
+    results = run(args.tables, args.columns)
+    write_results("schema_memory", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
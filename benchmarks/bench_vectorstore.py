@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+"""向量数据库写入速率和检索延迟基准测试"""
+import argparse
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.common import latency_stats, make_queries, make_synthetic_schema, timer, write_results
+from benchmarks.fakes import DeterministicHashEmbeddings
+from src.rag.document_processor import DocumentProcessor
+from src.vectorstore.vector_store import VectorStoreManager
+
+
+def make_documents(count: int, seed: int = 42):
+    """生成 count 个 schema 文档"""
+    schema = make_synthetic_schema(count, columns_per_table=8, seed=seed)
+    return DocumentProcessor().process_database_schema(schema)
+
+
+def run(
+    backends: List[str],
+    sizes: List[int],
+    query_count: int = 200,
+    k: int = 5,
+    dimension: int = 256
+) -> List[Dict[str, Any]]:
+    """
+    测量 create_vectorstore / add_documents 速率和 similarity_search 延迟（含按表名预过滤）
+
+    Args:
+        backends: 向量数据库类型列表 (chroma, faiss)
+        sizes: 文档数量列表
+        query_count: 检索次数
+        k: 每次检索返回的文档数量
+        dimension: 假嵌入向量维度
+
+    Returns:
+        结果列表
+    """
+    embeddings = DeterministicHashEmbeddings(dimension=dimension)
+    queries = make_queries(query_count)
+    results = []
+
+    for size in sizes:
+        documents = make_documents(size)
+        extra_documents = make_documents(max(1, size // 10), seed=size + 1)
+
+        for backend in backends:
+            manager = VectorStoreManager(
+                vector_db_type=backend,
+                embedding_model=embeddings,
+                persist_directory=None,
+                collection_name=f"bench_{uuid.uuid4().hex[:8]}"
+            )
+
+            with timer() as t_create:
+                manager.create_vectorstore(documents)
+
+            with timer() as t_add:
+                manager.add_documents(extra_documents)
+
+            latencies = []
+            for query in queries:
+                start = time.perf_counter()
+                manager.similarity_search(query, k=k)
+                latencies.append((time.perf_counter() - start) * 1000)
+
+            # 按表名预过滤（只在 1% 的表中检索）
+            tables = [doc.metadata['table_name'] for doc in documents[:max(1, size // 100)]]
+            filtered_latencies = []
+            for query in queries:
+                start = time.perf_counter()
+                manager.similarity_search(query, k=k, metadata_filter={"table_name": tables})
+                filtered_latencies.append((time.perf_counter() - start) * 1000)
+
+            result = {
+                "backend": backend,
+                "documents": size,
+                "create_seconds": round(t_create["seconds"], 4),
+                "create_docs_per_sec": round(size / max(t_create["seconds"], 1e-9), 1),
+                "add_documents": len(extra_documents),
+                "add_docs_per_sec": round(len(extra_documents) / max(t_add["seconds"], 1e-9), 1),
+                "search": latency_stats(latencies),
+                "filtered_search": latency_stats(filtered_latencies),
+            }
+            results.append(result)
+            print(f"  {backend} @ {size}: 写入 {result['create_docs_per_sec']} 文档/秒, "
+                  f"检索 p50={result['search']['p50_ms']}ms p99={result['search']['p99_ms']}ms, "
+                  f"过滤检索 p50={result['filtered_search']['p50_ms']}ms")
+
+            manager.delete_collection()
+
+    return results
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="向量数据库基准测试")
+    parser.add_argument('--backends', nargs='+', default=['chroma', 'faiss'], help='向量数据库类型')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help='文档数量')
+    parser.add_argument('--queries', type=int, default=200, help='检索次数')
+    parser.add_argument('--output', type=str, help='结果 JSON 输出路径')
+    args = parser.parse_args()
+
+    print("🔍 向量数据库写入与检索")
+    results = run(args.backends, args.sizes, args.queries)
+    write_results("vectorstore", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""基准测试公共工具"""
+import json
+import platform
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+
+# 合成 schema 使用的词表
+_WORDS = [
+    "user", "order", "product", "payment", "invoice", "customer", "address",
+    "shipment", "inventory", "category", "review", "coupon", "refund", "session",
+    "account", "warehouse", "supplier", "price", "status", "region",
+]
+_TYPES = ["int", "bigint", "varchar", "text", "decimal", "datetime", "tinyint", "json"]
+
+
+def make_synthetic_schema(
+    table_count: int,
+    columns_per_table: int = 12,
+    seed: int = 42
+) -> Dict[str, Any]:
+    """
+    生成与 get_schema 返回结构一致的合成 schema
+
+    Args:
+        table_count: 表数量
+        columns_per_table: 每个表的字段数量
+        seed: 随机种子
+
+    Returns:
+        数据库结构信息
+    """
+    rng = random.Random(seed)
+    schema = {}
+
+    for t in range(table_count):
+        prefix = rng.choice(_WORDS)
+        table_name = f"{prefix}_{rng.choice(_WORDS)}_{t}"
+        columns = {}
+        for c in range(columns_per_table):
+            col_name = "id" if c == 0 else f"{rng.choice(_WORDS)}_{c}"
+            columns[col_name] = {
+                'type': rng.choice(_TYPES),
+                'comment': f"{prefix} {rng.choice(_WORDS)} 字段",
+                'nullable': c != 0 and rng.random() < 0.5,
+                'key': 'PRI' if c == 0 else '',
+            }
+        schema[table_name] = {
+            'comment': f"{prefix} 相关业务表",
+            'columns': columns,
+        }
+
+    return schema
+
+
+def make_sample_rows(row_count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    生成示例数据行
+
+    Args:
+        row_count: 行数
+        seed: 随机种子
+
+    Returns:
+        示例数据
+    """
+    rng = random.Random(seed)
+    return [
+        {
+            'id': i,
+            'name': f"{rng.choice(_WORDS)}_{i}",
+            'amount': round(rng.random() * 1000, 2),
+            'status': rng.choice(_WORDS),
+        }
+        for i in range(row_count)
+    ]
+
+
+def make_queries(count: int, seed: int = 7) -> List[str]:
+    """生成查询文本"""
+    rng = random.Random(seed)
+    return [f"{rng.choice(_WORDS)} 表的 {rng.choice(_WORDS)} 字段" for _ in range(count)]
+
+
+def latency_stats(samples_ms: List[float]) -> Dict[str, float]:
+    """
+    计算延迟统计
+
+    Args:
+        samples_ms: 延迟样本（毫秒）
+
+    Returns:
+        p50/p90/p99/mean/max
+    """
+    arr = np.asarray(samples_ms, dtype=np.float64)
+    return {
+        "p50_ms": round(float(np.percentile(arr, 50)), 4),
+        "p90_ms": round(float(np.percentile(arr, 90)), 4),
+        "p99_ms": round(float(np.percentile(arr, 99)), 4),
+        "mean_ms": round(float(arr.mean()), 4),
+        "max_ms": round(float(arr.max()), 4),
+        "samples": len(samples_ms),
+    }
+
+
+@contextmanager
+def timer() -> Iterator[Dict[str, float]]:
+    """计时上下文，退出后 result['seconds'] 为耗时"""
+    result = {"seconds": 0.0}
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result["seconds"] = time.perf_counter() - start
+
+
+def write_results(name: str, results: List[Dict[str, Any]], output: str = None) -> Path:
+    """
+    将结果写为 JSON 文件
+
+    Args:
+        name: 基准测试名称
+        results: 结果列表
+        output: 输出路径，默认 benchmarks/results/<name>-<时间>.json
+
+    Returns:
+        输出文件路径
+    """
+    payload = {
+        "benchmark": name,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+    if output is None:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = Path(__file__).parent / "results" / f"{name}-{stamp}.json"
+
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+
+    print(f"✓ 结果已写入: {output}")
+    return output
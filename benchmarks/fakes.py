@@ -0,0 +1,103 @@
+"""离线基准测试使用的确定性假嵌入模型、假 LLM 和假聊天模型"""
+import re
+import time
+import zlib
+from typing import Any, List, Optional
+
+import numpy as np
+from langchain.embeddings.base import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.language_models.llms import LLM
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class DeterministicHashEmbeddings(Embeddings):
+    """基于特征哈希的确定性嵌入模型 - 相同文本得到相同向量，共享词语的文本向量相近"""
+
+    def __init__(self, dimension: int = 256):
+        """
+        初始化假嵌入模型
+
+        Args:
+            dimension: 向量维度
+        """
+        self.dimension = dimension
+        self.call_count = 0
+
+    def _embed(self, text: str) -> List[float]:
+        """计算单个文本的向量"""
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for token in _TOKEN_PATTERN.findall(text.lower()):
+            h = zlib.crc32(token.encode("utf-8"))
+            vector[h % self.dimension] += 1.0 if h & 0x80000000 else -1.0
+
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """嵌入文档列表"""
+        self.call_count += 1
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        """嵌入查询文本"""
+        self.call_count += 1
+        return self._embed(text)
+
+
+class FakeLLM(LLM):
+    """返回固定格式回答的假 LLM，可模拟生成延迟"""
+
+    latency: float = 0.0
+    call_count: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _call(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[Any] = None,
+        **kwargs: Any
+    ) -> str:
+        self.call_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return f"根据提供的数据库信息（{len(prompt)} 个字符）给出的回答。"
+
+
+class FakeChatModel(BaseChatModel):
+    """返回固定格式回答的假聊天模型，记录收到的消息，可模拟生成延迟"""
+
+    latency: float = 0.0
+    call_count: int = 0
+    temperature: float = 0.0
+    last_messages: List[Any] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _generate(
+        self,
+        messages: List[Any],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[Any] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        self.call_count += 1
+        self.last_messages = list(messages)
+        if self.latency:
+            time.sleep(self.latency)
+        length = sum(len(message.content) for message in messages)
+        message = AIMessage(
+            content=f"根据提供的数据库信息（{len(messages)} 条消息，{length} 个字符）给出的回答。"
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""运行全部离线基准测试并输出一个 JSON 结果文件"""
+import argparse
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks import (
+    bench_api,
+    bench_document_processor,
+    bench_import,
+    bench_schema_memory,
+    bench_vectorstore,
+)
+from benchmarks.common import write_results
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(
+        description="离线基准测试 - 使用确定性假嵌入模型和假 LLM，无需网络和数据库",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+使用示例:
+  # 完整运行（1k/10k/100k 文档）
+  python benchmarks/run_all.py
+
+  # 快速运行
+  python benchmarks/run_all.py --quick --output bench.json
+        """
+    )
+    parser.add_argument('--quick', action='store_true', help='使用小规模数据快速运行')
+    parser.add_argument('--backends', nargs='+', default=['chroma', 'faiss'], help='向量数据库类型')
+    parser.add_argument('--output', type=str, help='结果 JSON 输出路径')
+    args = parser.parse_args()
+
+    if args.quick:
+        table_counts, sizes, queries, requests = [100, 1000], [1000], 50, 50
+        import_tables = [100]
+    else:
+        table_counts, sizes, queries, requests = [100, 1000, 3000], [1000, 10000, 100000], 200, 200
+        import_tables = [100, 1000, 3000]
+
+    results = {}
+
+    print("\n📝 DocumentProcessor 吞吐量")
+    results["document_processor"] = bench_document_processor.run(table_counts)
+
+    print("\n🔍 向量数据库写入与检索")
+    results["vectorstore"] = bench_vectorstore.run(args.backends, sizes, queries)
+
+    print("\n📥 知识库导入")
+    results["import"] = bench_import.run(import_tables)
+
+    print("\n🧮 Schema 结构内存")
+    results["schema_memory"] = bench_schema_memory.run(import_tables)
+
+    print("\n🌐 API 端到端")
+    results["api"] = bench_api.run(request_count=requests)
+
+    write_results("all", [results], args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -232,25 +232,44 @@ def example_7_batch_queries():
         "支付表",
     ]
 
-    print("批量搜索多个关键词:\n")
+    print("批量搜索多个关键词（一次请求）:\n")
 
-    for query in queries:
-        payload = {
-            "query": query,
-            "top_k": 1
-        }
+    payload = {
+        "queries": queries,
+        "top_k": 1
+    }
 
-        response = requests.post(
-            f"{BASE_URL}/search",
-            json=payload,
-            headers={"Content-Type": "application/json"}
-        )
+    response = requests.post(
+        f"{BASE_URL}/search/batch",
+        json=payload,
+        headers={"Content-Type": "application/json"}
+    )
 
-        if response.status_code == 200:
-            data = response.json()
-            print(f"✓ {query}: 找到 {data['total_results']} 个结果")
-        else:
-            print(f"❌ {query}: 查询失败")
+    if response.status_code == 200:
+        for item in response.json()["items"]:
+            if item["error"]:
+                print(f"❌ {item['query']}: {item['error']}")
+            else:
+                print(f"✓ {item['query']}: 找到 {item['total_results']} 个结果")
+    else:
+        print(f"❌ 批量搜索失败: {response.text}")
+
+    print("\n批量问答:\n")
+
+    response = requests.post(
+        f"{BASE_URL}/query-kb/batch",
+        json={"queries": [f"{query}有哪些字段？" for query in queries], "top_k": 3},
+        headers={"Content-Type": "application/json"}
+    )
+
+    if response.status_code == 200:
+        for item in response.json()["items"]:
+            if item["error"]:
+                print(f"❌ {item['query']}: {item['error']}")
+            else:
+                print(f"✓ {item['query']}: {item['answer'][:60]}")
+    else:
+        print(f"❌ 批量问答失败: {response.text}")
 
 
 def main():
@@ -110,8 +110,10 @@ def check_database_connections():
     try:
         from src.utils.datasource_config import get_datasource_manager
         from src.database.factory import DatabaseFactory
+        from src.database.schema_cache import get_schema_cache
 
         manager = get_datasource_manager()
+        schema_cache = get_schema_cache(manager)
         enabled_datasources = manager.get_enabled_datasources()
 
         if not enabled_datasources:
@@ -125,7 +127,10 @@ def check_database_connections():
             try:
                 db = DatabaseFactory.create_database(ds.type, ds.connection)
                 with db:
-                    schema = db.get_schema()
+                    if schema_cache:
+                        schema = schema_cache.get_schema(db, ds.name)
+                    else:
+                        schema = db.get_schema()
                     print(f"  ✓ 连接成功，找到 {len(schema)} 个表/集合")
                     success_count += 1
             except Exception as e:
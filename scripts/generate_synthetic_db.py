@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+"""合成数据库生成脚本 - 生成大规模 SQLite schema 用于导入压测"""
+import argparse
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.database.synthetic import generate_synthetic_sqlite
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(
+        description="合成数据库生成工具 - 生成可配置规模的 SQLite 数据库",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+使用示例:
+  # 生成 3000 张表、每表 50 个字段、100 行数据
+  python scripts/generate_synthetic_db.py --output ./data/synthetic.db --tables 3000 --columns 50
+
+  # 在 config/datasources.yaml 中配置:
+  #   type: "sqlite"
+  #   connection:
+  #     database: "./data/synthetic.db"
+        """
+    )
+
+    parser.add_argument('--output', type=str, default='./data/synthetic.db', help='数据库文件路径')
+    parser.add_argument('--tables', type=int, default=1000, help='表数量')
+    parser.add_argument('--columns', type=int, default=20, help='每个表的字段数量')
+    parser.add_argument('--rows', type=int, default=100, help='每个表的行数')
+    parser.add_argument('--no-comments', action='store_true', help='不生成表/字段注释')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子')
+
+    args = parser.parse_args()
+
+    print(f"🔧 正在生成合成数据库: {args.output}")
+    stats = generate_synthetic_sqlite(
+        args.output,
+        table_count=args.tables,
+        columns_per_table=args.columns,
+        row_count=args.rows,
+        with_comments=not args.no_comments,
+        seed=args.seed
+    )
+
+    print(f"✓ 表: {stats['tables']}  字段: {stats['columns']}  行: {stats['rows']}")
+    print(f"✓ 文件大小: {stats['size_bytes'] / 1024 / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,12 +15,13 @@ from langchain.embeddings import OpenAIEmbeddings
 from src.utils.config import settings
 
 
-def import_all_datasources(force: bool = False):
+def import_all_datasources(force: bool = False, resume: bool = False):
     """
     导入所有启用的数据源
 
     Args:
         force: 是否强制重新导入
+        resume: 是否从上次中断的检查点继续导入
     """
     print("\n" + "=" * 80)
     print("🚀 批量导入数据源到知识库")
@@ -54,7 +55,7 @@ def import_all_datasources(force: bool = False):
         # 4. 初始化所有知识库
         print("\n🔧 步骤 4: 初始化知识库")
         print("-" * 80)
-        kb_manager.initialize_all(force=force)
+        kb_manager.initialize_all(force=force, resume=resume)
 
         # 5. 显示结果
         kb_manager.list_knowledge_bases()
@@ -71,13 +72,14 @@ def import_all_datasources(force: bool = False):
         sys.exit(1)
 
 
-def import_single_datasource(datasource_name: str, force: bool = False):
+def import_single_datasource(datasource_name: str, force: bool = False, resume: bool = False):
     """
     导入单个数据源
 
     Args:
         datasource_name: 数据源名称
         force: 是否强制重新导入
+        resume: 是否从上次中断的检查点继续导入
     """
     print("\n" + "=" * 80)
     print(f"🚀 导入数据源: {datasource_name}")
@@ -115,7 +117,7 @@ def import_single_datasource(datasource_name: str, force: bool = False):
         )
 
         # 4. 初始化知识库
-        kb_manager.initialize_knowledge_base(datasource_name, force=force)
+        kb_manager.initialize_knowledge_base(datasource_name, force=force, resume=resume)
 
         print("\n" + "=" * 80)
         print(f"✅ 数据源 '{datasource_name}' 导入完成！")
@@ -155,6 +157,9 @@ def main():
   # 强制重新导入（覆盖已有数据）
   python scripts/import_datasources.py --all --force
 
+  # 上次导入中断后继续（跳过已写入向量数据库的表）
+  python scripts/import_datasources.py --all --resume
+
   # 列出所有数据源
   python scripts/import_datasources.py --list
         """
@@ -178,6 +183,12 @@ def main():
         help='强制重新导入（覆盖已有数据）'
     )
 
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='从上次中断的检查点继续导入（跳过已写入的表）'
+    )
+
     parser.add_argument(
         '--list',
         action='store_true',
@@ -190,9 +201,9 @@ def main():
     if args.list:
         list_datasources()
     elif args.all:
-        import_all_datasources(force=args.force)
+        import_all_datasources(force=args.force, resume=args.resume)
     elif args.datasource:
-        import_single_datasource(args.datasource, force=args.force)
+        import_single_datasource(args.datasource, force=args.force, resume=args.resume)
     else:
         parser.print_help()
         sys.exit(1)
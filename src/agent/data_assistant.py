@@ -4,6 +4,9 @@ from langchain.memory import ConversationBufferMemory
 from langchain.chains import ConversationChain
 from langchain.prompts import PromptTemplate
 
+from ..utils.tokenizer import count_tokens
+from ..utils.tracing import get_tracer
+
 
 class DataAssistantAgent:
     """数据助手 Agent"""
@@ -92,34 +95,62 @@ class DataAssistantAgent:
             "use_rag": use_rag,
         }
         
-        # 如果使用 RAG，先检索相关信息
-        if use_rag:
-            try:
-                rag_result = self.rag_retriever.query(user_input)
-                
-                # 将 RAG 结果整合到对话中
-                context = f"\n\n[相关数据库信息]\n{rag_result['answer']}\n"
-                enhanced_input = user_input + context
-                
-                # 使用增强后的输入进行对话
-                agent_response = self.conversation_chain.predict(input=enhanced_input)
-                
-                response["answer"] = agent_response
-                response["rag_sources"] = rag_result.get("sources", [])
-                
-            except Exception as e:
-                # RAG 失败时，使用普通对话
-                print(f"RAG 检索失败: {str(e)}，使用普通对话模式")
-                agent_response = self.conversation_chain.predict(input=user_input)
+        tracer = get_tracer()
+        
+        with tracer.span("agent.chat", use_rag=use_rag) as chat_span:
+            # 如果使用 RAG，先检索相关信息
+            if use_rag:
+                try:
+                    with tracer.span("agent.rag_query") as rag_span:
+                        rag_result = self.rag_retriever.query(user_input)
+                        rag_span.set_attribute("rag.doc_count", len(rag_result.get("sources", [])))
+                    
+                    # 将 RAG 结果整合到对话中
+                    context = f"\n\n[相关数据库信息]\n{rag_result['answer']}\n"
+                    enhanced_input = user_input + context
+                    
+                    # 使用增强后的输入进行对话
+                    agent_response = self._predict(enhanced_input)
+                    
+                    response["answer"] = agent_response
+                    response["rag_sources"] = rag_result.get("sources", [])
+                    
+                except Exception as e:
+                    # RAG 失败时，使用普通对话
+                    print(f"RAG 检索失败: {str(e)}，使用普通对话模式")
+                    chat_span.add_event("rag_fallback", {"error": str(e)})
+                    agent_response = self._predict(user_input)
+                    response["answer"] = agent_response
+                    response["error"] = f"RAG 检索失败: {str(e)}"
+            else:
+                # 普通对话
+                agent_response = self._predict(user_input)
                 response["answer"] = agent_response
-                response["error"] = f"RAG 检索失败: {str(e)}"
-        else:
-            # 普通对话
-            agent_response = self.conversation_chain.predict(input=user_input)
-            response["answer"] = agent_response
         
         return response
     
+    def _predict(self, agent_input: str) -> str:
+        """
+        调用对话链生成回答（带追踪）
+        
+        Args:
+            agent_input: 对话链输入
+            
+        Returns:
+            回答文本
+        """
+        with get_tracer().span("agent.conversation_predict") as span:
+            answer = self.conversation_chain.predict(input=agent_input)
+            
+            if span.is_recording:
+                span.set_attributes({
+                    "llm.input_tokens": count_tokens(agent_input),
+                    "llm.output_tokens": count_tokens(answer),
+                    "agent.history_messages": len(self.memory.chat_memory.messages),
+                })
+        
+        return answer
+    
     def query_database(self, query: str) -> Dict[str, Any]:
         """
         查询数据库相关信息
@@ -14,8 +14,18 @@ from src.api.models import (
     ChatRequest, ChatResponse,
     QueryRequest, QueryResponse,
     StatusResponse, HistoryResponse,
-    MessageResponse
+    MessageResponse,
+    KnowledgeBaseInfo, KnowledgeBaseListResponse,
+    SearchRequest, SearchResponse,
+    BatchSearchRequest, BatchSearchItem, BatchSearchResponse,
+    BatchQueryRequest, BatchQueryItem, BatchQueryResponse,
+    RateLimitMetricsResponse,
+    ResponseCacheMetricsResponse
 )
+from src.llm.rate_limiter import RateLimitTimeout, get_rate_limiters
+from src.llm.response_cache import get_response_cache
+from src.llm.router import ProvidersUnavailable
+from src.vectorstore.metadata_filter import normalize_filter
 
 
 # 全局实例
@@ -59,6 +69,17 @@ async def lifespan(app: FastAPI):
     yield
     
     print("👋 关闭 AI 数据助手服务...")
+    
+    # 关闭异步数据库连接池
+    try:
+        from src.database.async_sql import dispose_async_engines
+        await dispose_async_engines()
+    except ImportError:
+        pass
+
+    # 关闭 LLM 共享 HTTP 连接池
+    from src.llm.llm_cache import close_http_clients
+    await close_http_clients()
 
 
 # 创建 FastAPI 应用
@@ -139,6 +160,10 @@ async def chat(request: ChatRequest):
         )
         
         return ChatResponse(**result)
+    except RateLimitTimeout as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ProvidersUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"对话失败: {str(e)}")
 
@@ -165,6 +190,10 @@ async def query_database(request: QueryRequest):
     try:
         result = agent_instance.query_database(request.query)
         return QueryResponse(**result)
+    except RateLimitTimeout as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ProvidersUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"查询失败: {str(e)}")
 
@@ -223,6 +252,23 @@ async def clear_history():
         raise HTTPException(status_code=500, detail=f"清空历史失败: {str(e)}")
 
 
+@app.get("/metrics/rate-limits", response_model=RateLimitMetricsResponse)
+async def get_rate_limit_metrics():
+    """获取各提供商限流器的并发数、排队数和排队等待时间"""
+    return RateLimitMetricsResponse(
+        limiters={name: limiter.metrics() for name, limiter in get_rate_limiters().items()}
+    )
+
+
+@app.get("/metrics/llm-cache", response_model=ResponseCacheMetricsResponse)
+async def get_response_cache_metrics():
+    """获取 LLM 响应缓存的命中率"""
+    cache = get_response_cache()
+    if cache is None:
+        return ResponseCacheMetricsResponse(enabled=False)
+    return ResponseCacheMetricsResponse(enabled=True, metrics=cache.metrics())
+
+
 # ========== 知识库相关接口 ==========
 
 @app.get("/knowledge-bases", response_model=KnowledgeBaseListResponse)
@@ -281,7 +327,11 @@ async def search_knowledge_bases(request: SearchRequest):
         search_results = kb_manager.search(
             query=request.query,
             datasource_name=request.knowledge_base,
-            k=request.top_k
+            k=request.top_k,
+            search_type=request.search_type,
+            lambda_mult=request.mmr_lambda,
+            metadata_filter=request.filters.metadata_filter() if request.filters else None,
+            datasource_names=request.filters.datasource if request.filters else None
         )
 
         # 格式化结果
@@ -302,10 +352,161 @@ async def search_knowledge_bases(request: SearchRequest):
             results=formatted_results,
             total_results=total_count
         )
+    except RateLimitTimeout as e:
+        raise HTTPException(status_code=429, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"搜索失败: {str(e)}")
 
 
+def _validate_search_request(request):
+    """
+    检查搜索请求本身是否有效（这类错误逐个查询重试也会失败）
+
+    Args:
+        request: 搜索请求
+
+    Raises:
+        HTTPException: 知识库不存在 (404)，过滤字段不支持 (400)
+    """
+    if request.knowledge_base:
+        names = [request.knowledge_base]
+    else:
+        names = request.filters.datasource if request.filters else None
+    for name in names or []:
+        if not kb_manager.get_knowledge_base(name):
+            raise HTTPException(status_code=404, detail=f"知识库不存在: {name}")
+
+    if request.filters:
+        try:
+            normalize_filter(request.filters.metadata_filter())
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/search/batch", response_model=BatchSearchResponse)
+def batch_search_knowledge_bases(request: BatchSearchRequest):
+    """
+    批量搜索知识库（所有查询只调用一次嵌入模型，按查询矩阵检索）
+
+    检索是阻塞调用，定义为同步函数由 FastAPI 在线程池中执行，不阻塞事件循环。
+
+    Args:
+        request: 批量搜索请求
+
+    Returns:
+        与查询一一对应的搜索结果
+    """
+    global kb_manager
+
+    if kb_manager is None:
+        raise HTTPException(
+            status_code=503,
+            detail="知识库管理器未初始化"
+        )
+
+    _validate_search_request(request)
+
+    search_kwargs = dict(
+        datasource_name=request.knowledge_base,
+        k=request.top_k,
+        search_type=request.search_type,
+        lambda_mult=request.mmr_lambda,
+        metadata_filter=request.filters.metadata_filter() if request.filters else None,
+        datasource_names=request.filters.datasource if request.filters else None
+    )
+
+    try:
+        search_results = kb_manager.batch_search(request.queries, **search_kwargs)
+    except RateLimitTimeout as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except Exception as e:
+        # 批量检索失败时逐个查询重试，只有出错的查询返回错误
+        print(f"⚠️  批量搜索失败，改为逐个搜索: {str(e)}")
+        search_results = []
+        for query in request.queries:
+            try:
+                search_results.append(kb_manager.search(query, **search_kwargs))
+            except Exception as item_error:
+                search_results.append(item_error)
+
+    items = []
+    for query, result in zip(request.queries, search_results):
+        if isinstance(result, Exception):
+            items.append(BatchSearchItem(query=query, error=f"搜索失败: {str(result)}"))
+            continue
+        items.append(BatchSearchItem(
+            query=query,
+            results={
+                kb_name: [{"content": doc.page_content, "metadata": doc.metadata} for doc in docs]
+                for kb_name, docs in result.items()
+            },
+            total_results=sum(len(docs) for docs in result.values())
+        ))
+
+    return BatchSearchResponse(
+        items=items,
+        failed=sum(1 for item in items if item.error)
+    )
+
+
+def _resolve_knowledge_base(request):
+    """
+    确定问答使用的知识库（未指定时可由过滤条件中的单个数据源指定，否则使用第一个可用的知识库）
+
+    Returns:
+        (知识库名称, 知识库)
+    """
+    datasources = request.filters.datasource if request.filters else None
+    if not request.knowledge_base and datasources and len(datasources) > 1:
+        raise HTTPException(
+            status_code=400,
+            detail="知识库问答只能指定一个数据源"
+        )
+    knowledge_base = request.knowledge_base or (datasources[0] if datasources else None)
+
+    if knowledge_base:
+        kb = kb_manager.get_knowledge_base(knowledge_base)
+        if not kb:
+            raise HTTPException(
+                status_code=404,
+                detail=f"知识库不存在: {knowledge_base}"
+            )
+        return knowledge_base, kb
+
+    # 使用第一个可用的知识库
+    if not kb_manager.knowledge_bases:
+        raise HTTPException(
+            status_code=404,
+            detail="没有可用的知识库"
+        )
+    kb_name = list(kb_manager.knowledge_bases.keys())[0]
+    return kb_name, kb_manager.get_knowledge_base(kb_name)
+
+
+def _create_rag_retriever(kb, request):
+    """按请求参数创建知识库的 RAG 检索器"""
+    from src.rag.rag_retriever import RAGRetriever
+    from src.rag.reranker import get_reranker_from_config
+    from src.llm.llm_factory import get_llm_from_config
+    from src.utils.config import settings
+
+    # 获取 LLM（按配置缓存，请求之间复用实例和 HTTP 连接）
+    llm = get_llm_from_config(settings)
+
+    return RAGRetriever(
+        vectorstore_manager=kb.vectorstore_manager,
+        llm=llm,
+        top_k=request.top_k,
+        context_max_tokens=settings.rag_context_max_tokens,
+        tokenizer_model=settings.default_model_name,
+        reranker=get_reranker_from_config(settings),
+        rerank_candidates=settings.rerank_candidates,
+        search_type=request.search_type,
+        mmr_lambda=request.mmr_lambda,
+        metadata_filter=request.filters.metadata_filter() if request.filters else None
+    )
+
+
 @app.post("/query-kb", response_model=QueryResponse)
 async def query_knowledge_base(request: QueryRequest):
     """
@@ -326,42 +527,8 @@ async def query_knowledge_base(request: QueryRequest):
         )
 
     try:
-        from src.rag.rag_retriever import RAGRetriever, create_database_qa_prompt
-        from src.llm.llm_factory import LLMFactory
-        from src.utils.config import settings
-
-        # 获取知识库
-        if request.knowledge_base:
-            kb = kb_manager.get_knowledge_base(request.knowledge_base)
-            if not kb:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"知识库不存在: {request.knowledge_base}"
-                )
-            kb_name = request.knowledge_base
-        else:
-            # 使用第一个可用的知识库
-            if not kb_manager.knowledge_bases:
-                raise HTTPException(
-                    status_code=404,
-                    detail="没有可用的知识库"
-                )
-            kb_name = list(kb_manager.knowledge_bases.keys())[0]
-            kb = kb_manager.knowledge_bases[kb_name]
-
-        # 创建 LLM
-        llm = LLMFactory.create_llm(
-            provider=settings.default_llm_provider,
-            model_name=settings.default_model_name,
-            temperature=settings.default_temperature
-        )
-
-        # 创建 RAG 检索器
-        rag_retriever = RAGRetriever(
-            vectorstore_manager=kb.vectorstore_manager,
-            llm=llm,
-            top_k=request.top_k
-        )
+        kb_name, kb = _resolve_knowledge_base(request)
+        rag_retriever = _create_rag_retriever(kb, request)
 
         # 执行查询
         result = rag_retriever.query(
@@ -372,14 +539,78 @@ async def query_knowledge_base(request: QueryRequest):
         return QueryResponse(
             answer=result["answer"],
             sources=result.get("sources"),
-            knowledge_base=kb_name
+            knowledge_base=kb_name,
+            context_stats=result.get("context_stats")
         )
     except HTTPException:
         raise
+    except RateLimitTimeout as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ProvidersUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"查询失败: {str(e)}")
 
 
+@app.post("/query-kb/batch", response_model=BatchQueryResponse)
+def batch_query_knowledge_base(request: BatchQueryRequest):
+    """
+    基于知识库的批量问答（一次嵌入调用和矩阵检索，LLM 在并发上限内同时生成回答）
+
+    检索和生成都是阻塞调用，定义为同步函数由 FastAPI 在线程池中执行，不阻塞事件循环。
+
+    Args:
+        request: 批量问答请求
+
+    Returns:
+        与问题一一对应的查询结果，单个问题失败不影响其他问题
+    """
+    global kb_manager
+
+    if kb_manager is None:
+        raise HTTPException(
+            status_code=503,
+            detail="知识库管理器未初始化"
+        )
+
+    try:
+        from src.utils.config import settings
+
+        kb_name, kb = _resolve_knowledge_base(request)
+        rag_retriever = _create_rag_retriever(kb, request)
+
+        results = rag_retriever.batch_query(
+            request.queries,
+            return_sources=True,
+            max_concurrency=settings.rag_batch_max_concurrency
+        )
+
+        items = [
+            BatchQueryItem(
+                query=query,
+                answer=result.get("answer"),
+                sources=result.get("sources"),
+                context_stats=result.get("context_stats"),
+                error=f"查询失败: {result['error']}" if "error" in result else None
+            )
+            for query, result in zip(request.queries, results)
+        ]
+
+        return BatchQueryResponse(
+            items=items,
+            knowledge_base=kb_name,
+            failed=sum(1 for item in items if item.error)
+        )
+    except HTTPException:
+        raise
+    except RateLimitTimeout as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ProvidersUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"批量查询失败: {str(e)}")
+
+
 if __name__ == "__main__":
     import uvicorn
     
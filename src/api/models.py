@@ -1,5 +1,5 @@
 """API 数据模型"""
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 
 from pydantic import BaseModel, Field
 
@@ -21,11 +21,30 @@ class ChatResponse(BaseModel):
     error: Optional[str] = Field(None, description="错误信息")
 
 
+class MetadataFilter(BaseModel):
+    """元数据过滤条件（同一字段多个值为"或"，不同字段之间为"且"）"""
+    table_name: Optional[List[str]] = Field(None, description="表名")
+    type: Optional[List[str]] = Field(None, description="文档类型：schema（表结构）、data（示例数据）、profile（字段统计）")
+    source: Optional[List[str]] = Field(
+        None, description="文档来源：database_schema、sample_data、column_statistics"
+    )
+    datasource: Optional[List[str]] = Field(None, description="数据源（知识库）名称")
+
+    def metadata_filter(self) -> Dict[str, List[str]]:
+        """向量检索使用的过滤条件（不包括数据源）"""
+        return self.model_dump(exclude_none=True, exclude={"datasource"})
+
+
 class QueryRequest(BaseModel):
     """查询请求"""
     query: str = Field(..., description="查询问题", min_length=1)
     knowledge_base: Optional[str] = Field(None, description="指定知识库名称（数据源名称），不指定则搜索所有知识库")
     top_k: int = Field(5, description="返回文档数量", ge=1, le=20)
+    search_type: Literal["similarity", "mmr"] = Field(
+        "similarity", description="检索模式：similarity 按相似度，mmr 兼顾相关性和多样性"
+    )
+    mmr_lambda: float = Field(0.5, description="MMR 相关性权重，越小结果越分散", ge=0, le=1)
+    filters: Optional[MetadataFilter] = Field(None, description="元数据过滤条件，在向量检索前过滤")
 
 
 class QueryResponse(BaseModel):
@@ -33,6 +52,7 @@ class QueryResponse(BaseModel):
     answer: str = Field(..., description="查询答案")
     sources: Optional[List[Dict[str, Any]]] = Field(None, description="来源文档")
     knowledge_base: Optional[str] = Field(None, description="使用的知识库名称")
+    context_stats: Optional[Dict[str, Any]] = Field(None, description="上下文组装统计（组装前后的 token 数和节省量）")
 
 
 class StatusResponse(BaseModel):
@@ -71,14 +91,86 @@ class KnowledgeBaseListResponse(BaseModel):
     total: int = Field(..., description="总数")
 
 
+class RateLimitMetricsResponse(BaseModel):
+    """限流指标响应"""
+    limiters: Dict[str, Dict[str, Any]] = Field(..., description="限流器名称 -> 指标（排队等待时间单位为毫秒）")
+
+
+class ResponseCacheMetricsResponse(BaseModel):
+    """LLM 响应缓存指标响应"""
+    enabled: bool = Field(..., description="是否启用响应缓存")
+    metrics: Dict[str, Any] = Field(default_factory=dict, description="命中数、未命中数和命中率")
+
+
 class SearchRequest(BaseModel):
     """搜索请求"""
     query: str = Field(..., description="搜索查询", min_length=1)
     knowledge_base: Optional[str] = Field(None, description="指定知识库名称，不指定则搜索所有")
     top_k: int = Field(5, description="返回文档数量", ge=1, le=20)
+    search_type: Literal["similarity", "mmr"] = Field(
+        "similarity", description="检索模式：similarity 按相似度，mmr 兼顾相关性和多样性"
+    )
+    mmr_lambda: float = Field(0.5, description="MMR 相关性权重，越小结果越分散", ge=0, le=1)
+    filters: Optional[MetadataFilter] = Field(None, description="元数据过滤条件，在向量检索前过滤")
 
 
 class SearchResponse(BaseModel):
     """搜索响应"""
     results: Dict[str, List[Dict[str, Any]]] = Field(..., description="搜索结果，按知识库分组")
     total_results: int = Field(..., description="总结果数")
+
+
+class BatchSearchRequest(BaseModel):
+    """批量搜索请求（检索参数对所有查询生效）"""
+    queries: List[str] = Field(..., description="搜索查询列表", min_length=1, max_length=100)
+    knowledge_base: Optional[str] = Field(None, description="指定知识库名称，不指定则搜索所有")
+    top_k: int = Field(5, description="每个查询返回的文档数量", ge=1, le=20)
+    search_type: Literal["similarity", "mmr"] = Field(
+        "similarity", description="检索模式：similarity 按相似度，mmr 兼顾相关性和多样性"
+    )
+    mmr_lambda: float = Field(0.5, description="MMR 相关性权重，越小结果越分散", ge=0, le=1)
+    filters: Optional[MetadataFilter] = Field(None, description="元数据过滤条件，在向量检索前过滤")
+
+
+class BatchSearchItem(BaseModel):
+    """批量搜索中单个查询的结果"""
+    query: str = Field(..., description="搜索查询")
+    results: Dict[str, List[Dict[str, Any]]] = Field(
+        default_factory=dict, description="搜索结果，按知识库分组"
+    )
+    total_results: int = Field(0, description="结果数")
+    error: Optional[str] = Field(None, description="错误信息")
+
+
+class BatchSearchResponse(BaseModel):
+    """批量搜索响应"""
+    items: List[BatchSearchItem] = Field(..., description="与查询一一对应的结果")
+    failed: int = Field(0, description="失败的查询数")
+
+
+class BatchQueryRequest(BaseModel):
+    """批量问答请求（检索参数对所有问题生效）"""
+    queries: List[str] = Field(..., description="查询问题列表", min_length=1, max_length=50)
+    knowledge_base: Optional[str] = Field(None, description="指定知识库名称（数据源名称），不指定则使用第一个知识库")
+    top_k: int = Field(5, description="返回文档数量", ge=1, le=20)
+    search_type: Literal["similarity", "mmr"] = Field(
+        "similarity", description="检索模式：similarity 按相似度，mmr 兼顾相关性和多样性"
+    )
+    mmr_lambda: float = Field(0.5, description="MMR 相关性权重，越小结果越分散", ge=0, le=1)
+    filters: Optional[MetadataFilter] = Field(None, description="元数据过滤条件，在向量检索前过滤")
+
+
+class BatchQueryItem(BaseModel):
+    """批量问答中单个问题的结果"""
+    query: str = Field(..., description="查询问题")
+    answer: Optional[str] = Field(None, description="查询答案")
+    sources: Optional[List[Dict[str, Any]]] = Field(None, description="来源文档")
+    context_stats: Optional[Dict[str, Any]] = Field(None, description="上下文组装统计")
+    error: Optional[str] = Field(None, description="错误信息")
+
+
+class BatchQueryResponse(BaseModel):
+    """批量问答响应"""
+    items: List[BatchQueryItem] = Field(..., description="与问题一一对应的结果")
+    knowledge_base: Optional[str] = Field(None, description="使用的知识库名称")
+    failed: int = Field(0, description="失败的问题数")
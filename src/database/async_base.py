@@ -0,0 +1,135 @@
+"""异步数据库基类"""
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, List, Dict, Optional
+
+from .base import DEFAULT_FETCH_SIZE, ResultLimiter, create_limiter
+
+
+class AsyncBaseDatabase(ABC):
+    """异步数据库基类 - 与 BaseDatabase 接口一致，方法均为协程"""
+    
+    def __init__(self, connection_params: Dict[str, Any]):
+        """
+        初始化数据库连接
+        
+        Args:
+            connection_params: 数据库连接参数（与同步实现相同）
+        """
+        self.connection_params = connection_params
+    
+    @abstractmethod
+    async def connect(self) -> None:
+        """建立数据库连接（获取连接池）"""
+        pass
+    
+    @abstractmethod
+    async def disconnect(self) -> None:
+        """关闭数据库连接"""
+        pass
+    
+    @abstractmethod
+    async def execute_query(
+        self,
+        query: str,
+        params: Optional[Dict] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        执行查询
+        
+        Args:
+            query: 查询语句
+            params: 查询参数
+            
+        Returns:
+            查询结果列表
+        """
+        pass
+    
+    async def iter_query(
+        self,
+        query: str,
+        params: Optional[Dict] = None,
+        fetch_size: Optional[int] = None,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        流式执行查询，逐行返回结果
+        
+        默认实现基于 execute_query，子类应使用服务端游标覆盖。
+        
+        Args:
+            query: 查询语句
+            params: 查询参数
+            fetch_size: 每批获取的行数
+            max_rows: 最大行数
+            max_bytes: 最大字节数（估算）
+            
+        Yields:
+            查询结果行
+            
+        Raises:
+            QueryLimitExceededError: 结果超过上限
+        """
+        limiter = self._create_limiter(max_rows, max_bytes)
+        for row in await self.execute_query(query, params):
+            limiter.check_row(row)
+            yield row
+    
+    @abstractmethod
+    async def get_schema(self) -> Dict[str, Any]:
+        """
+        获取数据库 schema
+        
+        Returns:
+            数据库结构信息（与同步实现格式相同）
+        """
+        pass
+    
+    @abstractmethod
+    async def get_table_info(self, table_name: str) -> Dict[str, Any]:
+        """
+        获取表信息
+        
+        Args:
+            table_name: 表名
+            
+        Returns:
+            表结构信息
+        """
+        pass
+    
+    @abstractmethod
+    async def get_sample_data(self, table_name: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        获取表的示例数据
+        
+        Args:
+            table_name: 表名
+            limit: 返回记录数
+            
+        Returns:
+            示例数据
+        """
+        pass
+    
+    def _get_fetch_size(self, fetch_size: Optional[int]) -> int:
+        """获取流式查询批大小"""
+        return fetch_size or self.connection_params.get('fetch_size', DEFAULT_FETCH_SIZE)
+    
+    def _create_limiter(
+        self,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ) -> ResultLimiter:
+        """创建上限检查器"""
+        return create_limiter(self.connection_params, max_rows, max_bytes)
+    
+    async def __aenter__(self):
+        """异步上下文管理器入口"""
+        await self.connect()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """异步上下文管理器退出"""
+        await self.disconnect()
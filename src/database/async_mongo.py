@@ -0,0 +1,153 @@
+"""MongoDB 异步连接（motor）"""
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from .async_base import AsyncBaseDatabase
+from .mongo_schema import FieldTypeCollector, normalize_document
+
+
+class AsyncMongoDBDatabase(AsyncBaseDatabase):
+    """MongoDB 异步连接类"""
+
+    # 推断 schema 时默认采样的文档数
+    DEFAULT_SCHEMA_SAMPLE_SIZE = 100
+
+    def __init__(self, connection_params: Dict[str, Any]):
+        super().__init__(connection_params)
+        self.client = None
+        self.connection = None
+
+    async def connect(self) -> None:
+        """建立 MongoDB 连接（motor 客户端自带连接池）"""
+        try:
+            from motor.motor_asyncio import AsyncIOMotorClient
+
+            self.client = AsyncIOMotorClient(
+                self.connection_params.get('uri'),
+                maxPoolSize=self.connection_params.get('pool_size', 100)
+            )
+            self.connection = self.client[self.connection_params.get('database')]
+        except ImportError:
+            raise ImportError("请安装 motor: pip install motor")
+        except Exception as e:
+            raise ConnectionError(f"MongoDB 连接失败: {str(e)}")
+
+    async def disconnect(self) -> None:
+        """关闭 MongoDB 连接"""
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+            self.connection = None
+
+    async def _get_collection(self, collection_name: str):
+        """获取集合对象"""
+        if self.connection is None:
+            await self.connect()
+        return self.connection[collection_name]
+
+    async def _aggregate(
+        self,
+        collection_name: str,
+        params: Optional[Dict] = None,
+        fetch_size: Optional[int] = None
+    ):
+        """创建聚合游标（参数与同步实现相同）"""
+        params = params or {}
+        pipeline = list(params.get('pipeline') or [])
+        if params.get('filter'):
+            pipeline.insert(0, {'$match': params['filter']})
+
+        batch_size = params.get('batch_size') or self._get_fetch_size(fetch_size)
+        collection = await self._get_collection(collection_name)
+        return collection.aggregate(pipeline, batchSize=batch_size, allowDiskUse=True)
+
+    async def execute_query(
+        self,
+        query: str,
+        params: Optional[Dict] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        执行 MongoDB 聚合查询
+
+        Args:
+            query: 集合名
+            params: 查询参数，支持 pipeline、filter、batch_size
+
+        Returns:
+            查询结果列表
+        """
+        try:
+            cursor = await self._aggregate(query, params)
+            return [normalize_document(doc) async for doc in cursor]
+        except Exception as e:
+            raise RuntimeError(f"查询执行失败: {str(e)}")
+
+    async def iter_query(
+        self,
+        query: str,
+        params: Optional[Dict] = None,
+        fetch_size: Optional[int] = None,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        流式执行 MongoDB 聚合查询，超过上限时关闭服务端游标
+
+        Yields:
+            结果文档
+
+        Raises:
+            QueryLimitExceededError: 结果超过上限
+        """
+        cursor = await self._aggregate(query, params, fetch_size)
+        limiter = self._create_limiter(max_rows, max_bytes)
+
+        try:
+            async for doc in cursor:
+                doc = normalize_document(doc)
+                limiter.check_row(doc)
+                yield doc
+        finally:
+            await cursor.close()
+
+    async def get_schema(self) -> Dict[str, Any]:
+        """获取 MongoDB collections 信息"""
+        if self.connection is None:
+            await self.connect()
+
+        schema = {}
+        for collection_name in await self.connection.list_collection_names():
+            schema[collection_name] = await self.get_table_info(collection_name)
+
+        return schema
+
+    async def get_table_info(self, collection_name: str) -> Dict[str, Any]:
+        """获取集合信息 - $sample 采样合并字段类型，文档数使用 estimated_document_count"""
+        collection = await self._get_collection(collection_name)
+        sample_size = self.connection_params.get(
+            'schema_sample_size', self.DEFAULT_SCHEMA_SAMPLE_SIZE
+        )
+
+        collector = FieldTypeCollector()
+        async for doc in collection.aggregate([{'$sample': {'size': sample_size}}]):
+            collector.add(doc)
+
+        if not collector.sampled:
+            return collector.build(0)
+
+        return collector.build(await collection.estimated_document_count())
+
+    async def get_sample_data(self, collection_name: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        获取集合的示例数据
+
+        Args:
+            collection_name: 集合名
+            limit: 返回记录数
+
+        Returns:
+            示例数据
+        """
+        collection = await self._get_collection(collection_name)
+        cursor = collection.find().limit(limit).batch_size(limit)
+
+        return [normalize_document(doc) async for doc in cursor]
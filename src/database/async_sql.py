@@ -0,0 +1,375 @@
+"""基于 SQLAlchemy 异步引擎的 SQL 数据库连接（aiomysql / asyncpg / aiosqlite）"""
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import URL
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from .async_base import AsyncBaseDatabase
+from .base import QueryLimitExceededError
+from .schema_types import ColumnInfo, TableSchema
+from .sqlite_db import COMMENTS_TABLE
+
+# 全局引擎（连接池）缓存: (url, pool_size, max_overflow) -> AsyncEngine
+# 同一数据源的多个实例（如每个请求创建一个）共享同一个连接池
+_engines: Dict[Tuple[str, int, int], AsyncEngine] = {}
+
+
+def get_async_engine(url: URL, pool_size: int = 5, max_overflow: int = 10) -> AsyncEngine:
+    """
+    获取（或创建）共享的异步引擎
+
+    Args:
+        url: 数据库 URL
+        pool_size: 连接池大小
+        max_overflow: 连接池最大溢出连接数
+
+    Returns:
+        异步引擎
+    """
+    key = (url.render_as_string(hide_password=False), pool_size, max_overflow)
+    engine = _engines.get(key)
+
+    if engine is None:
+        kwargs = {}
+        if not url.drivername.startswith('sqlite'):
+            kwargs = {
+                'pool_size': pool_size,
+                'max_overflow': max_overflow,
+                'pool_pre_ping': True,
+                'pool_recycle': 3600,
+            }
+        engine = create_async_engine(url, **kwargs)
+        _engines[key] = engine
+
+    return engine
+
+
+async def dispose_async_engines() -> None:
+    """关闭所有共享的异步引擎（应用退出时调用）"""
+    for engine in list(_engines.values()):
+        await engine.dispose()
+    _engines.clear()
+
+
+class AsyncSQLDatabase(AsyncBaseDatabase):
+    """SQLAlchemy 异步 SQL 数据库基类，查询参数使用 :name 占位符"""
+
+    drivername = ""
+    default_port: Optional[int] = None
+
+    def __init__(self, connection_params: Dict[str, Any]):
+        super().__init__(connection_params)
+        self.engine: Optional[AsyncEngine] = None
+
+    def _build_url(self) -> URL:
+        """根据连接参数构建数据库 URL"""
+        return URL.create(
+            self.drivername,
+            username=self.connection_params.get('user'),
+            password=self.connection_params.get('password'),
+            host=self.connection_params.get('host', 'localhost'),
+            port=self.connection_params.get('port', self.default_port),
+            database=self.connection_params.get('database'),
+        )
+
+    async def connect(self) -> None:
+        """获取共享连接池"""
+        try:
+            self.engine = get_async_engine(
+                self._build_url(),
+                pool_size=self.connection_params.get('pool_size', 5),
+                max_overflow=self.connection_params.get('max_overflow', 10)
+            )
+        except Exception as e:
+            raise ConnectionError(f"{self.drivername} 连接失败: {str(e)}")
+
+    async def disconnect(self) -> None:
+        """释放引用（连接池由 dispose_async_engines 统一关闭）"""
+        self.engine = None
+
+    async def _ensure_engine(self) -> AsyncEngine:
+        if self.engine is None:
+            await self.connect()
+        return self.engine
+
+    async def execute_query(
+        self,
+        query: str,
+        params: Optional[Dict] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        执行查询
+
+        Args:
+            query: SQL 查询语句
+            params: 查询参数
+
+        Returns:
+            查询结果列表
+        """
+        engine = await self._ensure_engine()
+
+        try:
+            async with engine.connect() as conn:
+                result = await conn.execute(text(query), params or {})
+                return [dict(row) for row in result.mappings()]
+        except Exception as e:
+            raise RuntimeError(f"查询执行失败: {str(e)}")
+
+    async def iter_query(
+        self,
+        query: str,
+        params: Optional[Dict] = None,
+        fetch_size: Optional[int] = None,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        使用服务端游标流式执行查询
+
+        Args:
+            query: SQL 查询语句
+            params: 查询参数
+            fetch_size: 每批获取的行数
+            max_rows: 最大行数
+            max_bytes: 最大字节数（估算）
+
+        Yields:
+            查询结果行
+
+        Raises:
+            QueryLimitExceededError: 结果超过上限
+        """
+        engine = await self._ensure_engine()
+        fetch_size = self._get_fetch_size(fetch_size)
+        limiter = self._create_limiter(max_rows, max_bytes)
+
+        async with engine.connect() as conn:
+            try:
+                result = await conn.stream(text(query), params or {})
+                async for partition in result.mappings().partitions(fetch_size):
+                    for row in partition:
+                        row = dict(row)
+                        limiter.check_row(row)
+                        yield row
+            except QueryLimitExceededError:
+                # 丢弃该连接，避免把未读完的结果集归还到连接池
+                await conn.invalidate()
+                raise
+            except Exception as e:
+                raise RuntimeError(f"查询执行失败: {str(e)}")
+
+    def _quote(self, identifier: str) -> str:
+        """按方言转义标识符"""
+        return self.engine.dialect.identifier_preparer.quote(identifier)
+
+    async def get_sample_data(self, table_name: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        获取表的示例数据
+
+        Args:
+            table_name: 表名
+            limit: 返回记录数
+
+        Returns:
+            示例数据
+        """
+        await self._ensure_engine()
+        return await self.execute_query(
+            f"SELECT * FROM {self._quote(table_name)} LIMIT {int(limit)}"
+        )
+
+
+class AsyncMySQLDatabase(AsyncSQLDatabase):
+    """MySQL 异步连接类（aiomysql）"""
+
+    drivername = "mysql+aiomysql"
+    default_port = 3306
+
+    def _build_url(self) -> URL:
+        return super()._build_url().update_query_dict({'charset': 'utf8mb4'})
+
+    async def get_schema(self) -> Dict[str, Any]:
+        """获取数据库 schema（表和字段各一次查询）"""
+        database = self.connection_params.get('database')
+
+        tables = await self.execute_query(
+            """
+            SELECT TABLE_NAME, TABLE_COMMENT
+            FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = :schema
+            """,
+            {'schema': database}
+        )
+        columns = await self.execute_query(
+            """
+            SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE, COLUMN_COMMENT, IS_NULLABLE, COLUMN_KEY
+            FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = :schema
+            ORDER BY TABLE_NAME, ORDINAL_POSITION
+            """,
+            {'schema': database}
+        )
+
+        schema = {
+            row['TABLE_NAME']: TableSchema(comment=row['TABLE_COMMENT'])
+            for row in tables
+        }
+        for row in columns:
+            if row['TABLE_NAME'] in schema:
+                schema[row['TABLE_NAME']].columns[row['COLUMN_NAME']] = _mysql_column(row)
+
+        return schema
+
+    async def get_table_info(self, table_name: str) -> Dict[str, Any]:
+        """获取表结构信息"""
+        results = await self.execute_query(
+            """
+            SELECT COLUMN_NAME, DATA_TYPE, COLUMN_COMMENT, IS_NULLABLE, COLUMN_KEY
+            FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = :schema AND TABLE_NAME = :table_name
+            ORDER BY ORDINAL_POSITION
+            """,
+            {'schema': self.connection_params.get('database'), 'table_name': table_name}
+        )
+
+        return {row['COLUMN_NAME']: _mysql_column(row) for row in results}
+
+
+def _mysql_column(row: Dict[str, Any]) -> ColumnInfo:
+    """information_schema.COLUMNS 行 -> 字段信息"""
+    return ColumnInfo(
+        type=row['DATA_TYPE'],
+        comment=row['COLUMN_COMMENT'],
+        nullable=row['IS_NULLABLE'] == 'YES',
+        key=row['COLUMN_KEY']
+    )
+
+
+class AsyncPostgreSQLDatabase(AsyncSQLDatabase):
+    """PostgreSQL 异步连接类（asyncpg）"""
+
+    drivername = "postgresql+asyncpg"
+    default_port = 5432
+
+    async def get_schema(self) -> Dict[str, Any]:
+        """获取数据库 schema（表和字段各一次查询）"""
+        tables = await self.execute_query(
+            """
+            SELECT table_name
+            FROM information_schema.tables
+            WHERE table_schema = 'public'
+            ORDER BY table_name
+            """
+        )
+        columns = await self.execute_query(
+            """
+            SELECT table_name, column_name, data_type, is_nullable, column_default
+            FROM information_schema.columns
+            WHERE table_schema = 'public'
+            ORDER BY table_name, ordinal_position
+            """
+        )
+
+        schema = {row['table_name']: TableSchema() for row in tables}
+        for row in columns:
+            if row['table_name'] in schema:
+                schema[row['table_name']].columns[row['column_name']] = _postgres_column(row)
+
+        return schema
+
+    async def get_table_info(self, table_name: str) -> Dict[str, Any]:
+        """获取表结构信息"""
+        results = await self.execute_query(
+            """
+            SELECT column_name, data_type, is_nullable, column_default
+            FROM information_schema.columns
+            WHERE table_name = :table_name
+            ORDER BY ordinal_position
+            """,
+            {'table_name': table_name}
+        )
+
+        return {row['column_name']: _postgres_column(row) for row in results}
+
+
+def _postgres_column(row: Dict[str, Any]) -> ColumnInfo:
+    """information_schema.columns 行 -> 字段信息"""
+    return ColumnInfo(
+        type=row['data_type'],
+        nullable=row['is_nullable'] == 'YES',
+        default=row['column_default']
+    )
+
+
+class AsyncSQLiteDatabase(AsyncSQLDatabase):
+    """SQLite 异步连接类（aiosqlite）"""
+
+    drivername = "sqlite+aiosqlite"
+
+    def _build_url(self) -> URL:
+        return URL.create(
+            self.drivername, database=self.connection_params.get('database', ':memory:')
+        )
+
+    async def get_schema(self) -> Dict[str, Any]:
+        """获取数据库 schema"""
+        tables = await self.execute_query(
+            """
+            SELECT name
+            FROM sqlite_master
+            WHERE type = 'table' AND name NOT LIKE 'sqlite_%' AND name != :comments_table
+            ORDER BY name
+            """,
+            {'comments_table': COMMENTS_TABLE}
+        )
+        comments = await self._load_comments()
+
+        schema = {}
+        for row in tables:
+            table_name = row['name']
+            schema[table_name] = TableSchema(
+                comment=comments.get((table_name, ''), ''),
+                columns=await self._build_columns(table_name, comments)
+            )
+
+        return schema
+
+    async def get_table_info(self, table_name: str) -> Dict[str, Any]:
+        """获取表结构信息"""
+        return await self._build_columns(table_name, await self._load_comments())
+
+    async def _build_columns(
+        self,
+        table_name: str,
+        comments: Dict[tuple, str]
+    ) -> Dict[str, ColumnInfo]:
+        """根据 PRAGMA table_info 构建字段信息"""
+        await self._ensure_engine()
+        results = await self.execute_query(f"PRAGMA table_info({self._quote(table_name)})")
+
+        return {
+            row['name']: ColumnInfo(
+                type=row['type'].lower(),
+                comment=comments.get((table_name, row['name']), ''),
+                nullable=not row['notnull'] and not row['pk'],
+                key='PRI' if row['pk'] else '',
+                default=row['dflt_value']
+            )
+            for row in results
+        }
+
+    async def _load_comments(self) -> Dict[tuple, str]:
+        """读取注释元数据表"""
+        exists = await self.execute_query(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name",
+            {'name': COMMENTS_TABLE}
+        )
+        if not exists:
+            return {}
+
+        rows = await self.execute_query(
+            f"SELECT table_name, column_name, comment FROM {COMMENTS_TABLE}"
+        )
+        return {(row['table_name'], row['column_name']): row['comment'] for row in rows}
@@ -1,6 +1,126 @@
 """数据库基类"""
 from abc import ABC, abstractmethod
-from typing import Any, List, Dict, Optional
+from typing import Any, Iterable, Iterator, List, Dict, Optional, Tuple, TYPE_CHECKING
+
+from .sampling import SamplingOptions
+from .schema_types import TableSchema
+
+if TYPE_CHECKING:
+    from .columnar import ColumnarResult
+
+# 流式查询默认每批获取的行数
+DEFAULT_FETCH_SIZE = 1000
+
+
+class QueryLimitExceededError(RuntimeError):
+    """查询结果超过行数/字节数上限"""
+    pass
+
+
+def estimate_values_bytes(values: Iterable[Any]) -> int:
+    """
+    粗略估算一组值的字节数
+    
+    Args:
+        values: 值序列
+        
+    Returns:
+        估算字节数
+    """
+    size = 0
+    for value in values:
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            size += len(value)
+        elif value is not None:
+            size += len(str(value))
+    return size
+
+
+def estimate_row_bytes(row: Dict[str, Any]) -> int:
+    """
+    粗略估算一行结果的字节数
+    
+    Args:
+        row: 查询结果行
+        
+    Returns:
+        估算字节数
+    """
+    return sum(len(key) for key in row) + estimate_values_bytes(row.values())
+
+
+class ResultLimiter:
+    """查询结果行数/字节数上限检查器（同步和异步数据库共用）"""
+    
+    def __init__(self, max_rows: Optional[int] = None, max_bytes: Optional[int] = None):
+        """
+        初始化上限检查器
+        
+        Args:
+            max_rows: 最大行数，None 表示不限制
+            max_bytes: 最大字节数（估算），None 表示不限制
+        """
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.row_count = 0
+        self.byte_count = 0
+    
+    @property
+    def enabled(self) -> bool:
+        """是否设置了任一上限"""
+        return self.max_rows is not None or self.max_bytes is not None
+    
+    def check_row(self, row: Dict[str, Any]) -> None:
+        """
+        计入一行字典结果
+        
+        Raises:
+            QueryLimitExceededError: 结果超过上限
+        """
+        self._add(1, estimate_row_bytes(row) if self.max_bytes is not None else 0)
+    
+    def check_batch(self, batch: List[Any]) -> None:
+        """
+        计入一批元组结果
+        
+        Raises:
+            QueryLimitExceededError: 结果超过上限
+        """
+        byte_count = 0
+        if self.max_bytes is not None:
+            byte_count = sum(estimate_values_bytes(row) for row in batch)
+        self._add(len(batch), byte_count)
+    
+    def _add(self, row_count: int, byte_count: int) -> None:
+        self.row_count += row_count
+        if self.max_rows is not None and self.row_count > self.max_rows:
+            raise QueryLimitExceededError(f"查询结果超过行数上限: {self.max_rows}")
+        self.byte_count += byte_count
+        if self.max_bytes is not None and self.byte_count > self.max_bytes:
+            raise QueryLimitExceededError(f"查询结果超过大小上限: {self.max_bytes} 字节")
+
+
+def create_limiter(
+    connection_params: Dict[str, Any],
+    max_rows: Optional[int] = None,
+    max_bytes: Optional[int] = None
+) -> ResultLimiter:
+    """
+    创建上限检查器，未指定的上限读取连接参数 max_rows / max_bytes
+    
+    Args:
+        connection_params: 数据库连接参数
+        max_rows: 最大行数
+        max_bytes: 最大字节数
+        
+    Returns:
+        上限检查器
+    """
+    if max_rows is None:
+        max_rows = connection_params.get('max_rows')
+    if max_bytes is None:
+        max_bytes = connection_params.get('max_bytes')
+    return ResultLimiter(max_rows, max_bytes)
 
 
 class BaseDatabase(ABC):
@@ -15,6 +135,7 @@ class BaseDatabase(ABC):
         """
         self.connection_params = connection_params
         self.connection = None
+        self._sampling_options: Optional[SamplingOptions] = None
     
     @abstractmethod
     def connect(self) -> None:
@@ -40,6 +161,141 @@ class BaseDatabase(ABC):
         """
         pass
     
+    def iter_query(
+        self,
+        query: str,
+        params: Optional[Dict] = None,
+        fetch_size: Optional[int] = None,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        流式执行查询，逐行返回结果，内存占用与 fetch_size 成正比
+        
+        默认实现基于 execute_query，子类应使用服务端游标覆盖。
+        
+        Args:
+            query: SQL 查询语句
+            params: 查询参数
+            fetch_size: 每批获取的行数，默认读取连接参数 fetch_size
+            max_rows: 最大行数，超过时中止查询，默认读取连接参数 max_rows
+            max_bytes: 最大字节数（估算），超过时中止查询，默认读取连接参数 max_bytes
+            
+        Yields:
+            查询结果行
+            
+        Raises:
+            QueryLimitExceededError: 结果超过上限
+        """
+        rows = self.execute_query(query, params)
+        yield from self._enforce_limits(rows, max_rows, max_bytes)
+    
+    def execute_query_columnar(
+        self,
+        query: str,
+        params: Optional[Dict] = None,
+        fetch_size: Optional[int] = None,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ) -> "ColumnarResult":
+        """
+        执行查询并返回列式结果（每列一个 NumPy 数组）
+        
+        默认实现基于 iter_query，子类应直接由游标批次构建。
+        
+        Args:
+            query: SQL 查询语句
+            params: 查询参数
+            fetch_size: 每批获取的行数
+            max_rows: 最大行数
+            max_bytes: 最大字节数（估算）
+            
+        Returns:
+            列式查询结果
+            
+        Raises:
+            QueryLimitExceededError: 结果超过上限
+        """
+        from .columnar import ColumnarResult
+        
+        return ColumnarResult.from_records(
+            self.iter_query(query, params, fetch_size, max_rows, max_bytes)
+        )
+    
+    def _get_fetch_size(self, fetch_size: Optional[int]) -> int:
+        """获取流式查询批大小"""
+        return fetch_size or self.connection_params.get('fetch_size', DEFAULT_FETCH_SIZE)
+    
+    def _get_sampling_options(self) -> SamplingOptions:
+        """获取示例数据采样选项（读取连接参数 sample_*）"""
+        if self._sampling_options is None:
+            self._sampling_options = SamplingOptions.from_connection_params(self.connection_params)
+        return self._sampling_options
+    
+    def _create_limiter(
+        self,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ) -> ResultLimiter:
+        """创建上限检查器"""
+        return create_limiter(self.connection_params, max_rows, max_bytes)
+    
+    def _enforce_limits(
+        self,
+        rows: Iterable[Dict[str, Any]],
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        对结果行应用行数/字节数上限
+        
+        Args:
+            rows: 结果行
+            max_rows: 最大行数
+            max_bytes: 最大字节数
+            
+        Yields:
+            结果行
+            
+        Raises:
+            QueryLimitExceededError: 结果超过上限
+        """
+        limiter = self._create_limiter(max_rows, max_bytes)
+        
+        if not limiter.enabled:
+            yield from rows
+            return
+        
+        for row in rows:
+            limiter.check_row(row)
+            yield row
+    
+    def _enforce_batch_limits(
+        self,
+        batches: Iterable[List[Any]],
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ) -> Iterator[List[Any]]:
+        """
+        对元组批次应用行数/字节数上限（列式查询使用）
+        
+        Args:
+            batches: 行批次
+            max_rows: 最大行数
+            max_bytes: 最大字节数
+            
+        Yields:
+            行批次
+            
+        Raises:
+            QueryLimitExceededError: 结果超过上限
+        """
+        limiter = self._create_limiter(max_rows, max_bytes)
+        
+        for batch in batches:
+            limiter.check_batch(batch)
+            yield batch
+    
     @abstractmethod
     def get_schema(self) -> Dict[str, Any]:
         """
@@ -50,6 +306,17 @@ class BaseDatabase(ABC):
         """
         pass
     
+    def iter_schema(self) -> Iterator[Tuple[str, Any]]:
+        """
+        逐个表获取 schema（调用方可以边获取边处理，不必一次持有全部表结构）
+        
+        默认实现基于 get_schema，子类应覆盖为按表查询。
+        
+        Yields:
+            (表名, 表结构信息)
+        """
+        yield from self.get_schema().items()
+    
     @abstractmethod
     def get_table_info(self, table_name: str) -> Dict[str, Any]:
         """
@@ -63,6 +330,43 @@ class BaseDatabase(ABC):
         """
         pass
     
+    def get_table_versions(self) -> Optional[Dict[str, str]]:
+        """
+        获取每个表的结构版本标识（用于 schema 缓存的变更检测）
+        
+        版本标识应只需一次廉价的元数据查询即可获得，表结构变化时标识随之改变。
+        
+        Returns:
+            表名 -> 版本标识；不支持变更检测时返回 None
+        """
+        return None
+    
+    def get_table_schema(self, table_name: str) -> Dict[str, Any]:
+        """
+        获取单个表在 get_schema 结果中的条目（用于增量刷新）
+        
+        Args:
+            table_name: 表名
+            
+        Returns:
+            与 get_schema()[table_name] 格式相同的表信息
+        """
+        return TableSchema(columns=self.get_table_info(table_name))
+    
+    def get_column_statistics(self, table_name: str) -> Optional[Dict[str, Any]]:
+        """
+        从数据库统计信息目录读取字段统计（不扫描表）
+        
+        Args:
+            table_name: 表名
+            
+        Returns:
+            {'row_count': 估算行数, 'columns': {字段名: 统计}}，统计可包含 distinct、
+            null_fraction、min、max、top_values（(值, 频率) 列表）；
+            不支持或没有统计信息时返回 None
+        """
+        return None
+    
     def __enter__(self):
         """上下文管理器入口"""
         self.connect()
@@ -0,0 +1,90 @@
+"""字段统计信息解析（读取数据库自身的统计信息目录，不扫描表）"""
+import base64
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+# 每个字段保留的常见值个数
+TOP_VALUES_LIMIT = 5
+
+
+def pg_distinct_count(n_distinct: Optional[float], row_count: Optional[float]) -> Optional[float]:
+    """
+    转换 pg_stats.n_distinct
+
+    Args:
+        n_distinct: 正数为不同值个数，负数为不同值占行数的比例（取负）
+        row_count: 估算行数（pg_class.reltuples）
+
+    Returns:
+        估算的不同值个数
+    """
+    if n_distinct is None:
+        return None
+    if n_distinct >= 0:
+        return n_distinct
+    if row_count is None or row_count < 0:
+        return None
+    return -n_distinct * row_count
+
+
+def decode_mysql_histogram_value(value: Any) -> Any:
+    """解码 MySQL 直方图中的值（字符串以 base64:typeNNN:<数据> 形式存储）"""
+    if isinstance(value, str) and value.startswith("base64:"):
+        _, _, data = value.split(":", 2)
+        return base64.b64decode(data).decode('utf-8', errors='replace')
+    return value
+
+
+def parse_mysql_histogram(histogram: Any) -> Dict[str, Any]:
+    """
+    解析 information_schema.COLUMN_STATISTICS 中的直方图
+
+    Args:
+        histogram: HISTOGRAM 字段（JSON 字符串或已解析的字典）
+
+    Returns:
+        字段统计：null_fraction、min、max、distinct，singleton 直方图还包括 top_values
+    """
+    if isinstance(histogram, (str, bytes)):
+        histogram = json.loads(histogram)
+
+    buckets = histogram.get('buckets') or []
+    stats: Dict[str, Any] = {'null_fraction': histogram.get('null-values')}
+    if not buckets:
+        return stats
+
+    if histogram.get('histogram-type') == 'singleton':
+        # [值, 累计频率]
+        values = [decode_mysql_histogram_value(bucket[0]) for bucket in buckets]
+        frequencies = []
+        previous = 0.0
+        for bucket in buckets:
+            frequencies.append(bucket[1] - previous)
+            previous = bucket[1]
+
+        ranked = sorted(zip(values, frequencies), key=lambda item: item[1], reverse=True)
+        stats.update({
+            'min': values[0],
+            'max': values[-1],
+            'distinct': len(values),
+            'top_values': ranked[:TOP_VALUES_LIMIT],
+        })
+    else:
+        # equi-height: [下界, 上界, 累计频率, 不同值个数]
+        stats.update({
+            'min': decode_mysql_histogram_value(buckets[0][0]),
+            'max': decode_mysql_histogram_value(buckets[-1][1]),
+            'distinct': sum(bucket[3] for bucket in buckets),
+        })
+
+    return stats
+
+
+def top_values_from_pg(
+    values: Optional[List[Any]],
+    frequencies: Optional[List[float]]
+) -> List[Tuple[Any, float]]:
+    """组合 pg_stats 的 most_common_vals 和 most_common_freqs"""
+    if not values or not frequencies:
+        return []
+    return list(zip(values, frequencies))[:TOP_VALUES_LIMIT]
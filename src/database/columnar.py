@@ -0,0 +1,138 @@
+"""列式查询结果"""
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+
+def _to_array(values: List[Any]) -> np.ndarray:
+    """
+    将一列值转换为 NumPy 数组
+
+    只有整列类型完全一致时才使用原生 dtype（int64/float64/bool），
+    其它情况（含 None、混合类型、日期、Decimal 等）保留为 object，
+    保证转换前后每个值的字符串形式不变。
+
+    Args:
+        values: 列值
+
+    Returns:
+        NumPy 数组
+    """
+    value_types = set(map(type, values))
+
+    if value_types == {int}:
+        try:
+            return np.array(values, dtype=np.int64)
+        except OverflowError:
+            pass
+    elif value_types == {float}:
+        return np.array(values, dtype=np.float64)
+    elif value_types == {bool}:
+        return np.array(values, dtype=np.bool_)
+
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+class ColumnarResult:
+    """列式查询结果 - 每列一个数组，列名只保存一次"""
+
+    def __init__(self, columns: List[str], data: Dict[str, np.ndarray]):
+        """
+        初始化列式结果
+
+        Args:
+            columns: 列名（保持查询顺序）
+            data: 列名 -> 列数组
+        """
+        self.columns = columns
+        self.data = data
+        self._length = len(data[columns[0]]) if columns else 0
+
+    @classmethod
+    def from_batches(
+        cls,
+        columns: Sequence[str],
+        batches: Iterable[Sequence[Sequence[Any]]]
+    ) -> "ColumnarResult":
+        """
+        由游标返回的元组批次构建列式结果
+
+        Args:
+            columns: 列名
+            batches: 行批次，每行为与 columns 对应的值序列
+
+        Returns:
+            列式结果
+        """
+        columns = list(columns)
+        buffers: List[List[Any]] = [[] for _ in columns]
+
+        for batch in batches:
+            if not batch:
+                continue
+            for buffer, column_values in zip(buffers, zip(*batch)):
+                buffer.extend(column_values)
+
+        return cls(columns, {name: _to_array(buffer) for name, buffer in zip(columns, buffers)})
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "ColumnarResult":
+        """
+        由字典行构建列式结果（字段可能不一致的结果，如 MongoDB 文档）
+
+        Args:
+            records: 字典行
+
+        Returns:
+            列式结果，缺失的字段为 None
+        """
+        columns: List[str] = []
+        buffers: Dict[str, List[Any]] = {}
+        row_count = 0
+
+        for record in records:
+            for key, value in record.items():
+                if key not in buffers:
+                    columns.append(key)
+                    buffers[key] = [None] * row_count
+                buffers[key].append(value)
+            row_count += 1
+            for key in columns:
+                if len(buffers[key]) < row_count:
+                    buffers[key].append(None)
+
+        return cls(columns, {name: _to_array(buffers[name]) for name in columns})
+
+    def __len__(self) -> int:
+        return self._length
+
+    def column(self, name: str) -> np.ndarray:
+        """获取列数组"""
+        return self.data[name]
+
+    def iter_rows(self, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        按行迭代（按需构造字典，仅用于需要行视图的场景）
+
+        Args:
+            limit: 最多返回的行数
+
+        Yields:
+            行字典
+        """
+        count = self._length if limit is None else min(limit, self._length)
+        values = [self.data[name][:count].tolist() for name in self.columns]
+        for row in zip(*values):
+            yield dict(zip(self.columns, row))
+
+    def to_pandas(self):
+        """转换为 pandas DataFrame（零拷贝复用列数组）"""
+        import pandas as pd
+
+        return pd.DataFrame({name: self.data[name] for name in self.columns}, columns=self.columns)
+
+    def nbytes(self) -> int:
+        """列数组占用的字节数（object 列只计算指针）"""
+        return sum(array.nbytes for array in self.data.values())
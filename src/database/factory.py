@@ -1,8 +1,10 @@
 """数据库工厂类"""
-from typing import Dict, Any
+from typing import Dict, Any, Union
+from .async_base import AsyncBaseDatabase
 from .base import BaseDatabase
 from .mysql_db import MySQLDatabase
 from .postgres_db import PostgreSQLDatabase, MongoDBDatabase
+from .sqlite_db import SQLiteDatabase
 
 
 class DatabaseFactory:
@@ -14,7 +16,7 @@ class DatabaseFactory:
         创建数据库连接实例
         
         Args:
-            db_type: 数据库类型 (mysql, postgres, mongodb)
+            db_type: 数据库类型 (mysql, postgres, mongodb, sqlite)
             connection_params: 连接参数
             
         Returns:
@@ -28,8 +30,60 @@ class DatabaseFactory:
             return PostgreSQLDatabase(connection_params)
         elif db_type == 'mongodb':
             return MongoDBDatabase(connection_params)
+        elif db_type == 'sqlite':
+            return SQLiteDatabase(connection_params)
         else:
             raise ValueError(f"不支持的数据库类型: {db_type}")
+    
+    @staticmethod
+    def create_async_database(db_type: str, connection_params: Dict[str, Any]) -> AsyncBaseDatabase:
+        """
+        创建异步数据库连接实例（连接参数与同步实现相同）
+        
+        Args:
+            db_type: 数据库类型 (mysql, postgres, mongodb, sqlite)
+            connection_params: 连接参数
+            
+        Returns:
+            异步数据库实例
+        """
+        db_type = db_type.lower()
+        
+        if db_type == 'mysql':
+            from .async_sql import AsyncMySQLDatabase
+            return AsyncMySQLDatabase(connection_params)
+        elif db_type in ('postgres', 'postgresql'):
+            from .async_sql import AsyncPostgreSQLDatabase
+            return AsyncPostgreSQLDatabase(connection_params)
+        elif db_type == 'mongodb':
+            from .async_mongo import AsyncMongoDBDatabase
+            return AsyncMongoDBDatabase(connection_params)
+        elif db_type == 'sqlite':
+            from .async_sql import AsyncSQLiteDatabase
+            return AsyncSQLiteDatabase(connection_params)
+        else:
+            raise ValueError(f"不支持的数据库类型: {db_type}")
+    
+    @staticmethod
+    def create_from_config(
+        datasource_config,
+        async_mode: bool = False
+    ) -> Union[BaseDatabase, AsyncBaseDatabase]:
+        """
+        根据数据源配置创建同步或异步数据库实例
+        
+        Args:
+            datasource_config: 数据源配置 (DataSourceConfig)
+            async_mode: 是否创建异步实现
+            
+        Returns:
+            数据库实例
+        """
+        if async_mode:
+            return DatabaseFactory.create_async_database(
+                datasource_config.type, datasource_config.connection
+            )
+        return DatabaseFactory.create_database(datasource_config.type, datasource_config.connection)
 
 
 def get_database_from_config(config) -> BaseDatabase:
@@ -0,0 +1,63 @@
+"""MongoDB 文档处理和字段推断（同步/异步驱动共用）"""
+from typing import Any, Dict, Iterable
+
+
+def normalize_document(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """转换 ObjectId 为字符串"""
+    if '_id' in doc:
+        doc['_id'] = str(doc['_id'])
+    return doc
+
+
+class FieldTypeCollector:
+    """合并采样文档的字段类型"""
+
+    def __init__(self):
+        self.type_counts: Dict[str, Dict[str, int]] = {}
+        self.sampled = 0
+
+    def add(self, doc: Dict[str, Any]) -> None:
+        """计入一个采样文档"""
+        self.sampled += 1
+        for key, value in doc.items():
+            field_types = self.type_counts.setdefault(key, {})
+            type_name = type(value).__name__
+            field_types[type_name] = field_types.get(type_name, 0) + 1
+
+    def add_all(self, docs: Iterable[Dict[str, Any]]) -> "FieldTypeCollector":
+        """计入多个采样文档"""
+        for doc in docs:
+            self.add(doc)
+        return self
+
+    def build(self, document_count: int) -> Dict[str, Any]:
+        """
+        生成集合信息
+
+        Args:
+            document_count: 集合文档数（估算）
+
+        Returns:
+            fields（字段 -> 类型，多种类型以 | 连接）、columns（与关系型数据库一致的字段信息）
+            和 sample_count（估算文档数）
+        """
+        if not self.sampled:
+            return {'fields': {}, 'columns': {}, 'sample_count': 0}
+
+        fields = {}
+        columns = {}
+        for key, field_types in self.type_counts.items():
+            # 按出现次数排序，NoneType 只影响可空性
+            present = sum(field_types.values())
+            non_null = sorted(
+                (name for name in field_types if name != 'NoneType'),
+                key=lambda name: -field_types[name]
+            )
+            fields[key] = "|".join(non_null) or 'NoneType'
+            columns[key] = {
+                'type': fields[key],
+                'nullable': present < self.sampled or 'NoneType' in field_types,
+                'key': 'PRI' if key == '_id' else ''
+            }
+
+        return {'fields': fields, 'columns': columns, 'sample_count': document_count}
@@ -1,8 +1,23 @@
 """MySQL 数据库连接"""
-from typing import Any, List, Dict, Optional
+from typing import Any, Iterator, List, Dict, Optional, Tuple
 import pymysql
-from pymysql.cursors import DictCursor
-from .base import BaseDatabase
+from pymysql.cursors import DictCursor, SSCursor, SSDictCursor
+from .base import BaseDatabase, QueryLimitExceededError
+from .column_stats import parse_mysql_histogram
+from .columnar import ColumnarResult
+from .schema_types import ColumnInfo, TableSchema
+from .sampling import (
+    SamplingOptions,
+    dedupe_by_key,
+    find_integer_primary_key,
+    split_sample_columns,
+    truncate_row,
+)
+
+
+def _quote(identifier: str) -> str:
+    """引用 MySQL 标识符"""
+    return "`" + identifier.replace("`", "``") + "`"
 
 
 class MySQLDatabase(BaseDatabase):
@@ -52,12 +67,131 @@ class MySQLDatabase(BaseDatabase):
         except Exception as e:
             raise RuntimeError(f"查询执行失败: {str(e)}")
     
-    def get_schema(self) -> Dict[str, Any]:
+    def iter_query(
+        self,
+        query: str,
+        params: Optional[Dict] = None,
+        fetch_size: Optional[int] = None,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        使用服务端游标（SSDictCursor）流式执行 MySQL 查询
+        
+        Args:
+            query: SQL 查询语句
+            params: 查询参数
+            fetch_size: 每批获取的行数
+            max_rows: 最大行数
+            max_bytes: 最大字节数（估算）
+            
+        Yields:
+            查询结果行
+            
+        Raises:
+            QueryLimitExceededError: 结果超过上限
+        """
+        if not self.connection:
+            self.connect()
+        
+        fetch_size = self._get_fetch_size(fetch_size)
+        cursor = self.connection.cursor(SSDictCursor)
+        
+        def batches():
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                yield from rows
+        
+        aborted = False
+        try:
+            cursor.execute(query, params or {})
+            yield from self._enforce_limits(batches(), max_rows, max_bytes)
+        except QueryLimitExceededError:
+            # 关闭游标会读完剩余结果，直接断开连接让服务端中止查询
+            aborted = True
+            self._abort_connection()
+            raise
+        except Exception as e:
+            raise RuntimeError(f"查询执行失败: {str(e)}")
+        finally:
+            if not aborted:
+                cursor.close()
+    
+    def execute_query_columnar(
+        self,
+        query: str,
+        params: Optional[Dict] = None,
+        fetch_size: Optional[int] = None,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ) -> ColumnarResult:
+        """
+        执行 MySQL 查询并返回列式结果（由服务端游标的元组批次直接构建）
+        
+        Args:
+            query: SQL 查询语句
+            params: 查询参数
+            fetch_size: 每批获取的行数
+            max_rows: 最大行数
+            max_bytes: 最大字节数（估算）
+            
+        Returns:
+            列式查询结果
+            
+        Raises:
+            QueryLimitExceededError: 结果超过上限
+        """
+        if not self.connection:
+            self.connect()
+        
+        fetch_size = self._get_fetch_size(fetch_size)
+        cursor = self.connection.cursor(SSCursor)
+        
+        def batches():
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                yield rows
+        
+        try:
+            cursor.execute(query, params or {})
+            columns = [desc[0] for desc in cursor.description or ()]
+            result = ColumnarResult.from_batches(
+                columns,
+                self._enforce_batch_limits(batches(), max_rows, max_bytes)
+            )
+        except QueryLimitExceededError:
+            self._abort_connection()
+            raise
+        except Exception as e:
+            cursor.close()
+            raise RuntimeError(f"查询执行失败: {str(e)}")
+        
+        cursor.close()
+        return result
+    
+    def _abort_connection(self) -> None:
+        """强制关闭连接（下次查询时自动重连）"""
+        try:
+            self.connection.close()
+        except Exception:
+            pass
+        self.connection = None
+        print("⚠️  MySQL 流式查询已中止，连接已断开")
+    
+    def get_schema(self) -> Dict[str, TableSchema]:
         """获取数据库 schema"""
+        return dict(self.iter_schema())
+    
+    def iter_schema(self) -> Iterator[Tuple[str, TableSchema]]:
+        """逐个表获取 schema"""
         query = """
             SELECT TABLE_NAME, TABLE_COMMENT
             FROM information_schema.TABLES
-            WHERE TABLE_SCHEMA = %s
+            WHERE TABLE_SCHEMA = %(TABLE_SCHEMA)s
         """
         
         results = self.execute_query(
@@ -65,22 +199,19 @@ class MySQLDatabase(BaseDatabase):
             {'TABLE_SCHEMA': self.connection_params.get('database')}
         )
         
-        schema = {}
         for row in results:
             table_name = row['TABLE_NAME']
-            schema[table_name] = {
-                'comment': row['TABLE_COMMENT'],
-                'columns': self.get_table_info(table_name)
-            }
-        
-        return schema
+            yield table_name, TableSchema(
+                comment=row['TABLE_COMMENT'],
+                columns=self.get_table_info(table_name)
+            )
     
-    def get_table_info(self, table_name: str) -> Dict[str, Any]:
+    def get_table_info(self, table_name: str) -> Dict[str, ColumnInfo]:
         """获取表结构信息"""
         query = """
             SELECT COLUMN_NAME, DATA_TYPE, COLUMN_COMMENT, IS_NULLABLE, COLUMN_KEY
             FROM information_schema.COLUMNS
-            WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s
+            WHERE TABLE_SCHEMA = %(TABLE_SCHEMA)s AND TABLE_NAME = %(TABLE_NAME)s
             ORDER BY ORDINAL_POSITION
         """
         
@@ -94,19 +225,113 @@ class MySQLDatabase(BaseDatabase):
         
         columns = {}
         for row in results:
-            columns[row['COLUMN_NAME']] = {
-                'type': row['DATA_TYPE'],
-                'comment': row['COLUMN_COMMENT'],
-                'nullable': row['IS_NULLABLE'] == 'YES',
-                'key': row['COLUMN_KEY']
-            }
+            columns[row['COLUMN_NAME']] = ColumnInfo(
+                type=row['DATA_TYPE'],
+                comment=row['COLUMN_COMMENT'],
+                nullable=row['IS_NULLABLE'] == 'YES',
+                key=row['COLUMN_KEY']
+            )
         
         return columns
     
+    def get_table_versions(self) -> Dict[str, str]:
+        """基于 information_schema.TABLES 的 CREATE_TIME/UPDATE_TIME 生成表版本标识"""
+        query = """
+            SELECT TABLE_NAME, CREATE_TIME, UPDATE_TIME, TABLE_COMMENT
+            FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = %(schema)s
+        """
+        
+        results = self.execute_query(query, {'schema': self.connection_params.get('database')})
+        
+        return {
+            row['TABLE_NAME']: f"{row['CREATE_TIME']}|{row['UPDATE_TIME']}|{row['TABLE_COMMENT']}"
+            for row in results
+        }
+    
+    def get_table_schema(self, table_name: str) -> TableSchema:
+        """获取单个表的注释和字段信息"""
+        results = self.execute_query(
+            """
+            SELECT TABLE_COMMENT
+            FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = %(schema)s AND TABLE_NAME = %(table_name)s
+            """,
+            {'schema': self.connection_params.get('database'), 'table_name': table_name}
+        )
+        
+        return TableSchema(
+            comment=results[0]['TABLE_COMMENT'] if results else '',
+            columns=self.get_table_info(table_name)
+        )
+    
+    def get_column_statistics(self, table_name: str) -> Optional[Dict[str, Any]]:
+        """
+        读取字段统计：索引首列的基数取自 information_schema.STATISTICS，
+        空值比例、min/max 和常见值取自直方图（MySQL 8.0 ANALYZE TABLE ... UPDATE HISTOGRAM）
+        """
+        params = {'schema': self.connection_params.get('database'), 'table_name': table_name}
+        
+        tables = self.execute_query(
+            """
+            SELECT TABLE_ROWS
+            FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = %(schema)s AND TABLE_NAME = %(table_name)s
+            """,
+            params
+        )
+        if not tables:
+            return None
+        
+        columns: Dict[str, Dict[str, Any]] = {}
+        
+        cardinalities = self.execute_query(
+            """
+            SELECT COLUMN_NAME, MAX(CARDINALITY) AS CARDINALITY
+            FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = %(schema)s AND TABLE_NAME = %(table_name)s AND SEQ_IN_INDEX = 1
+            GROUP BY COLUMN_NAME
+            """,
+            params
+        )
+        for row in cardinalities:
+            if row['CARDINALITY'] is not None:
+                columns[row['COLUMN_NAME']] = {'distinct': row['CARDINALITY']}
+        
+        try:
+            histograms = self.execute_query(
+                """
+                SELECT COLUMN_NAME, HISTOGRAM
+                FROM information_schema.COLUMN_STATISTICS
+                WHERE SCHEMA_NAME = %(schema)s AND TABLE_NAME = %(table_name)s
+                """,
+                params
+            )
+        except RuntimeError:
+            # MySQL 5.7 没有直方图
+            histograms = []
+        
+        for row in histograms:
+            column_stats = columns.setdefault(row['COLUMN_NAME'], {})
+            histogram_stats = parse_mysql_histogram(row['HISTOGRAM'])
+            # 索引基数比直方图的不同值个数更准确（直方图可能经过采样）
+            if 'distinct' in column_stats:
+                histogram_stats.pop('distinct', None)
+            column_stats.update(histogram_stats)
+        
+        if not columns:
+            return None
+        
+        return {'row_count': tables[0]['TABLE_ROWS'], 'columns': columns}
+    
     def get_sample_data(self, table_name: str, limit: int = 5) -> List[Dict[str, Any]]:
         """
         获取表的示例数据
         
+        代表性采样模式下，对单列整数主键的大表在主键范围内随机选取起点，每个起点
+        通过索引读取一行；其他情况退回 LIMIT。二进制字段不返回，LOB/JSON 字段超过
+        sample_lob_max_bytes 时返回 NULL，所有长值截断到 sample_value_max_chars。
+        
         Args:
             table_name: 表名
             limit: 返回记录数
@@ -114,5 +339,79 @@ class MySQLDatabase(BaseDatabase):
         Returns:
             示例数据
         """
-        query = f"SELECT * FROM {table_name} LIMIT {limit}"
-        return self.execute_query(query)
+        options = self._get_sampling_options()
+        columns = self.get_table_info(table_name)
+        projection = self._sample_projection(columns, options)
+        
+        rows = None
+        if options.representative:
+            rows = self._sample_by_primary_key(table_name, columns, projection, limit, options)
+        if not rows:
+            query = f"SELECT {projection} FROM {_quote(table_name)} LIMIT {int(limit)}"
+            rows = self.execute_query(query)
+        
+        return [truncate_row(row, options.value_max_chars) for row in rows]
+    
+    def _sample_projection(self, columns: Dict[str, Any], options: SamplingOptions) -> str:
+        """构建示例数据的 SELECT 字段列表"""
+        expressions = []
+        for name, is_lob in split_sample_columns(columns):
+            column = _quote(name)
+            if is_lob:
+                # 多取一个字符，客户端据此判断是否需要追加截断标记
+                expressions.append(
+                    f"CASE WHEN OCTET_LENGTH({column}) <= {int(options.lob_max_bytes)} "
+                    f"THEN LEFT({column}, {int(options.value_max_chars) + 1}) END AS {column}"
+                )
+            else:
+                expressions.append(column)
+        
+        return ", ".join(expressions) or "*"
+    
+    def _sample_by_primary_key(
+        self,
+        table_name: str,
+        columns: Dict[str, Any],
+        projection: str,
+        limit: int,
+        options: SamplingOptions
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        主键范围采样
+        
+        Returns:
+            示例数据；表太小或没有单列整数主键时返回 None
+        """
+        primary_key = find_integer_primary_key(columns)
+        if primary_key is None:
+            return None
+        
+        stats = self.execute_query(
+            """
+            SELECT TABLE_ROWS
+            FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = %(schema)s AND TABLE_NAME = %(table_name)s
+            """,
+            {'schema': self.connection_params.get('database'), 'table_name': table_name}
+        )
+        if not stats or not options.should_sample(stats[0]['TABLE_ROWS'], limit):
+            return None
+        
+        table = _quote(table_name)
+        key = _quote(primary_key)
+        bounds = self.execute_query(
+            f"SELECT MIN({key}) AS min_key, MAX({key}) AS max_key FROM {table}"
+        )[0]
+        if bounds['min_key'] is None:
+            return None
+        
+        start_keys = options.pick_keys(int(bounds['min_key']), int(bounds['max_key']), limit)
+        query = " UNION ALL ".join(
+            f"(SELECT {projection} FROM {table} WHERE {key} >= %(key_{i})s ORDER BY {key} LIMIT 1)"
+            for i in range(len(start_keys))
+        )
+        rows = self.execute_query(
+            query, {f'key_{i}': start_key for i, start_key in enumerate(start_keys)}
+        )
+        
+        return dedupe_by_key(rows, primary_key)
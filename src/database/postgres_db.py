@@ -1,10 +1,28 @@
 """PostgreSQL 数据库连接"""
-from typing import Any, List, Dict, Optional
+import uuid
+from typing import Any, Iterator, List, Dict, Optional, Tuple
 
 import psycopg2
 from psycopg2.extras import RealDictCursor
 
-from .base import BaseDatabase
+from .base import BaseDatabase, QueryLimitExceededError
+from .columnar import ColumnarResult
+from .column_stats import pg_distinct_count, top_values_from_pg
+from .mongo_schema import FieldTypeCollector, normalize_document
+from .schema_types import ColumnInfo, TableSchema
+from .sampling import SAMPLE_OVERSAMPLING, SamplingOptions, split_sample_columns, truncate_row
+
+
+def _quote(identifier: str) -> str:
+    """引用 PostgreSQL 标识符"""
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _chain_batch(first_batch: List[Any], batches: Iterator[List[Any]]) -> Iterator[List[Any]]:
+    """将已取出的首个批次与剩余批次连接"""
+    if first_batch:
+        yield first_batch
+        yield from batches
 
 
 class PostgreSQLDatabase(BaseDatabase):
@@ -43,8 +61,124 @@ class PostgreSQLDatabase(BaseDatabase):
         except Exception as e:
             raise RuntimeError(f"查询执行失败: {str(e)}")
     
-    def get_schema(self) -> Dict[str, Any]:
+    def iter_query(
+        self,
+        query: str,
+        params: Optional[Dict] = None,
+        fetch_size: Optional[int] = None,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        使用命名游标（服务端游标）流式执行 PostgreSQL 查询
+        
+        Args:
+            query: SQL 查询语句
+            params: 查询参数
+            fetch_size: 每批获取的行数
+            max_rows: 最大行数
+            max_bytes: 最大字节数（估算）
+            
+        Yields:
+            查询结果行
+            
+        Raises:
+            QueryLimitExceededError: 结果超过上限
+        """
+        if not self.connection:
+            self.connect()
+        
+        fetch_size = self._get_fetch_size(fetch_size)
+        cursor = self.connection.cursor(
+            name=f"stream_{uuid.uuid4().hex}",
+            cursor_factory=RealDictCursor
+        )
+        cursor.itersize = fetch_size
+        
+        def batches():
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row)
+        
+        try:
+            cursor.execute(query, params or {})
+            yield from self._enforce_limits(batches(), max_rows, max_bytes)
+        except QueryLimitExceededError:
+            # 关闭命名游标即可让服务端停止查询
+            cursor.close()
+            self.connection.rollback()
+            raise
+        except Exception as e:
+            raise RuntimeError(f"查询执行失败: {str(e)}")
+        finally:
+            if not cursor.closed:
+                cursor.close()
+    
+    def execute_query_columnar(
+        self,
+        query: str,
+        params: Optional[Dict] = None,
+        fetch_size: Optional[int] = None,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ) -> ColumnarResult:
+        """
+        执行 PostgreSQL 查询并返回列式结果（由命名游标的元组批次直接构建）
+        
+        Args:
+            query: SQL 查询语句
+            params: 查询参数
+            fetch_size: 每批获取的行数
+            max_rows: 最大行数
+            max_bytes: 最大字节数（估算）
+            
+        Returns:
+            列式查询结果
+            
+        Raises:
+            QueryLimitExceededError: 结果超过上限
+        """
+        if not self.connection:
+            self.connect()
+        
+        fetch_size = self._get_fetch_size(fetch_size)
+        cursor = self.connection.cursor(name=f"columnar_{uuid.uuid4().hex}")
+        
+        def batches():
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                yield rows
+        
+        try:
+            cursor.execute(query, params or {})
+            # 命名游标在第一次 fetch 之后才有 description
+            first_batch = cursor.fetchmany(fetch_size)
+            columns = [desc[0] for desc in cursor.description or ()]
+            all_batches = self._enforce_batch_limits(
+                _chain_batch(first_batch, batches()), max_rows, max_bytes
+            )
+            return ColumnarResult.from_batches(columns, all_batches)
+        except QueryLimitExceededError:
+            cursor.close()
+            self.connection.rollback()
+            raise
+        except Exception as e:
+            raise RuntimeError(f"查询执行失败: {str(e)}")
+        finally:
+            if not cursor.closed:
+                cursor.close()
+    
+    def get_schema(self) -> Dict[str, TableSchema]:
         """获取数据库 schema"""
+        return dict(self.iter_schema())
+    
+    def iter_schema(self) -> Iterator[Tuple[str, TableSchema]]:
+        """逐个表获取 schema"""
         query = """
             SELECT table_name
             FROM information_schema.tables
@@ -54,16 +188,11 @@ class PostgreSQLDatabase(BaseDatabase):
         
         results = self.execute_query(query)
         
-        schema = {}
         for row in results:
             table_name = row['table_name']
-            schema[table_name] = {
-                'columns': self.get_table_info(table_name)
-            }
-        
-        return schema
+            yield table_name, TableSchema(columns=self.get_table_info(table_name))
     
-    def get_table_info(self, table_name: str) -> Dict[str, Any]:
+    def get_table_info(self, table_name: str) -> Dict[str, ColumnInfo]:
         """获取表结构信息"""
         query = """
             SELECT column_name, data_type, is_nullable, column_default
@@ -76,18 +205,83 @@ class PostgreSQLDatabase(BaseDatabase):
         
         columns = {}
         for row in results:
-            columns[row['column_name']] = {
-                'type': row['data_type'],
-                'nullable': row['is_nullable'] == 'YES',
-                'default': row['column_default']
-            }
+            columns[row['column_name']] = ColumnInfo(
+                type=row['data_type'],
+                nullable=row['is_nullable'] == 'YES',
+                default=row['column_default']
+            )
         
         return columns
 
+    def get_table_versions(self) -> Dict[str, str]:
+        """
+        基于 pg_class/pg_attribute 的字段定义哈希生成表版本标识
+
+        只包含 iter_schema 会返回的表（information_schema.tables 中可见的表，不含物化视图
+        和没有权限的表），顺序与 iter_schema 相同。
+        """
+        query = """
+            SELECT c.relname AS table_name,
+                   md5(string_agg(
+                       a.attname || ':' || a.atttypid || ':' || a.atttypmod || ':' ||
+                       a.attnotnull || ':' || a.atthasdef,
+                       ',' ORDER BY a.attnum
+                   )) AS version
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            JOIN information_schema.tables t
+                ON t.table_schema = n.nspname AND t.table_name = c.relname
+            JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+            WHERE n.nspname = 'public' AND c.relkind IN ('r', 'p', 'v', 'f')
+            GROUP BY c.relname
+            ORDER BY c.relname
+        """
+        
+        return {row['table_name']: row['version'] for row in self.execute_query(query)}
+    
+    def get_column_statistics(self, table_name: str) -> Optional[Dict[str, Any]]:
+        """从 pg_stats 读取字段统计（由 ANALYZE 维护，min/max 取自直方图边界）"""
+        query = """
+            SELECT s.attname, s.null_frac, s.n_distinct,
+                   s.most_common_vals::text::text[] AS most_common_vals,
+                   s.most_common_freqs,
+                   s.histogram_bounds::text::text[] AS histogram_bounds,
+                   c.reltuples
+            FROM pg_stats s
+            JOIN pg_namespace n ON n.nspname = s.schemaname
+            JOIN pg_class c ON c.relnamespace = n.oid AND c.relname = s.tablename
+            WHERE s.schemaname = 'public' AND s.tablename = %(table_name)s
+        """
+
+        results = self.execute_query(query, {'table_name': table_name})
+        if not results:
+            return None
+
+        row_count = results[0]['reltuples']
+        if row_count is not None and row_count < 0:
+            row_count = None
+
+        columns = {}
+        for row in results:
+            bounds = row['histogram_bounds'] or []
+            columns[row['attname']] = {
+                'distinct': pg_distinct_count(row['n_distinct'], row_count),
+                'null_fraction': row['null_frac'],
+                'min': bounds[0] if bounds else None,
+                'max': bounds[-1] if bounds else None,
+                'top_values': top_values_from_pg(row['most_common_vals'], row['most_common_freqs']),
+            }
+
+        return {'row_count': row_count, 'columns': columns}
+
     def get_sample_data(self, table_name: str, limit: int = 5) -> List[Dict[str, Any]]:
         """
         获取表的示例数据
 
+        代表性采样模式下，对大表使用 TABLESAMPLE SYSTEM 随机读取少量数据页，再从中
+        随机选取记录；其他情况退回 LIMIT。二进制字段不返回，LOB/JSON 字段超过
+        sample_lob_max_bytes 时返回 NULL，所有长值截断到 sample_value_max_chars。
+
         Args:
             table_name: 表名
             limit: 返回记录数
@@ -95,13 +289,78 @@ class PostgreSQLDatabase(BaseDatabase):
         Returns:
             示例数据
         """
-        query = f"SELECT * FROM {table_name} LIMIT {limit}"
-        return self.execute_query(query)
+        options = self._get_sampling_options()
+        projection = self._sample_projection(self.get_table_info(table_name), options)
+
+        rows = None
+        if options.representative:
+            rows = self._sample_by_tablesample(table_name, projection, limit, options)
+        if not rows:
+            query = f"SELECT {projection} FROM {_quote(table_name)} LIMIT {int(limit)}"
+            rows = self.execute_query(query)
+
+        return [truncate_row(row, options.value_max_chars) for row in rows]
+
+    def _sample_projection(self, columns: Dict[str, Any], options: SamplingOptions) -> str:
+        """构建示例数据的 SELECT 字段列表"""
+        expressions = []
+        for name, is_lob in split_sample_columns(columns):
+            column = _quote(name)
+            if is_lob:
+                # pg_column_size 读取存储大小，不需要解压 TOAST 数据；多取一个字符用于判断截断
+                expressions.append(
+                    f"CASE WHEN pg_column_size({column}) <= {int(options.lob_max_bytes)} "
+                    f"THEN LEFT({column}::text, {int(options.value_max_chars) + 1}) END AS {column}"
+                )
+            else:
+                expressions.append(column)
+
+        return ", ".join(expressions) or "*"
+
+    def _sample_by_tablesample(
+        self,
+        table_name: str,
+        projection: str,
+        limit: int,
+        options: SamplingOptions
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        TABLESAMPLE SYSTEM 采样
+
+        Returns:
+            示例数据；表太小、统计信息缺失或采样结果不足时返回 None
+        """
+        stats = self.execute_query(
+            "SELECT reltuples, relkind FROM pg_class WHERE oid = to_regclass(%(table_name)s)",
+            {'table_name': _quote(table_name)}
+        )
+        # 视图等不支持 TABLESAMPLE；从未 ANALYZE 的表 reltuples 为 -1 或 0
+        if not stats or stats[0]['relkind'] not in ('r', 'p', 'm'):
+            return None
+        estimated_rows = stats[0]['reltuples']
+        if not options.should_sample(estimated_rows, limit):
+            return None
+
+        query = (
+            f"SELECT {projection} FROM {_quote(table_name)} "
+            f"TABLESAMPLE SYSTEM (%(percent)s) LIMIT {int(limit) * SAMPLE_OVERSAMPLING * 2}"
+        )
+        rows = self.execute_query(
+            query, {'percent': options.sample_percent(estimated_rows, limit)}
+        )
+        if len(rows) < limit:
+            return None
+
+        # SYSTEM 按数据页返回整页记录，再随机选取以避免集中在同一页
+        return options.random.sample(rows, limit)
 
 
 class MongoDBDatabase(BaseDatabase):
     """MongoDB 数据库连接类"""
     
+    # 推断 schema 时默认采样的文档数
+    DEFAULT_SCHEMA_SAMPLE_SIZE = 100
+    
     def connect(self) -> None:
         """建立 MongoDB 连接"""
         try:
@@ -117,16 +376,97 @@ class MongoDBDatabase(BaseDatabase):
         """关闭 MongoDB 连接"""
         if hasattr(self, 'client') and self.client:
             self.client.close()
+            self.connection = None
             print("✓ MongoDB 连接已关闭")
     
+    def _get_collection(self, collection_name: str):
+        """获取集合对象"""
+        # pymongo 的 Database 对象不支持真值判断
+        if self.connection is None:
+            self.connect()
+        return self.connection[collection_name]
+    
+    def _aggregate(
+        self,
+        collection_name: str,
+        params: Optional[Dict] = None,
+        fetch_size: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        以流式游标执行聚合管道
+        
+        Args:
+            collection_name: 集合名
+            params: 查询参数，支持 pipeline（聚合管道）、filter（等价于 $match）、
+                batch_size（游标批大小）
+            fetch_size: 游标批大小，优先级低于 params 中的 batch_size
+            
+        Yields:
+            结果文档（ObjectId 已转换为字符串）
+        """
+        params = params or {}
+        pipeline = list(params.get('pipeline') or [])
+        if params.get('filter'):
+            pipeline.insert(0, {'$match': params['filter']})
+        
+        batch_size = params.get('batch_size') or self._get_fetch_size(fetch_size)
+        collection = self._get_collection(collection_name)
+        
+        try:
+            cursor = collection.aggregate(pipeline, batchSize=batch_size, allowDiskUse=True)
+        except Exception as e:
+            raise RuntimeError(f"查询执行失败: {str(e)}")
+        
+        with cursor:
+            for doc in cursor:
+                yield normalize_document(doc)
+    
     def execute_query(self, query: str, params: Optional[Dict] = None) -> List[Dict[str, Any]]:
-        """执行 MongoDB 查询（这里使用集合名和过滤器）"""
-        # MongoDB 查询方式不同，这里简化处理
-        return []
+        """
+        执行 MongoDB 聚合查询
+        
+        Args:
+            query: 集合名
+            params: 查询参数，支持 pipeline、filter、batch_size
+            
+        Returns:
+            查询结果列表
+        """
+        return list(self._aggregate(query, params))
+    
+    def iter_query(
+        self,
+        query: str,
+        params: Optional[Dict] = None,
+        fetch_size: Optional[int] = None,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        流式执行 MongoDB 聚合查询，超过上限时关闭服务端游标
+        
+        Args:
+            query: 集合名
+            params: 查询参数，支持 pipeline、filter、batch_size
+            fetch_size: 游标批大小
+            max_rows: 最大文档数
+            max_bytes: 最大字节数（估算）
+            
+        Yields:
+            结果文档
+            
+        Raises:
+            QueryLimitExceededError: 结果超过上限
+        """
+        documents = self._aggregate(query, params, fetch_size)
+        try:
+            yield from self._enforce_limits(documents, max_rows, max_bytes)
+        finally:
+            documents.close()
     
     def get_schema(self) -> Dict[str, Any]:
         """获取 MongoDB collections 信息"""
-        if not self.connection:
+        if self.connection is None:
             self.connect()
         
         collections = self.connection.list_collection_names()
@@ -138,18 +478,30 @@ class MongoDBDatabase(BaseDatabase):
         return schema
     
     def get_table_info(self, collection_name: str) -> Dict[str, Any]:
-        """获取集合信息（采样获取字段）"""
-        if not self.connection:
-            self.connect()
+        """
+        获取集合信息 - 用 $sample 随机采样多个文档并合并字段类型
+        
+        文档数使用 estimated_document_count（读取集合元数据，不扫描集合）。
+        
+        Args:
+            collection_name: 集合名
+            
+        Returns:
+            fields（字段 -> 类型，多种类型以 | 连接）、columns（与关系型数据库一致的字段信息）
+            和 sample_count（估算文档数）
+        """
+        collection = self._get_collection(collection_name)
+        sample_size = self.connection_params.get(
+            'schema_sample_size', self.DEFAULT_SCHEMA_SAMPLE_SIZE
+        )
         
-        collection = self.connection[collection_name]
-        sample_doc = collection.find_one()
+        sampled_docs = collection.aggregate([{'$sample': {'size': sample_size}}])
+        collector = FieldTypeCollector().add_all(sampled_docs)
         
-        if sample_doc:
-            fields = {key: type(value).__name__ for key, value in sample_doc.items()}
-            return {'fields': fields, 'sample_count': collection.count_documents({})}
+        if not collector.sampled:
+            return collector.build(0)
         
-        return {'fields': {}, 'sample_count': 0}
+        return collector.build(collection.estimated_document_count())
 
     def get_sample_data(self, collection_name: str, limit: int = 5) -> List[Dict[str, Any]]:
         """
@@ -162,17 +514,8 @@ class MongoDBDatabase(BaseDatabase):
         Returns:
             示例数据
         """
-        if not self.connection:
-            self.connect()
-
-        collection = self.connection[collection_name]
-        cursor = collection.find().limit(limit)
+        collection = self._get_collection(collection_name)
+        cursor = collection.find().limit(limit).batch_size(limit)
 
-        results = []
-        for doc in cursor:
-            # 转换 ObjectId 为字符串
-            if '_id' in doc:
-                doc['_id'] = str(doc['_id'])
-            results.append(doc)
+        return [normalize_document(doc) for doc in cursor]
 
-        return results
@@ -0,0 +1,180 @@
+"""示例数据采样（代表性采样、LOB 字段投影和长值截断）"""
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+# 采样模式：limit 为 SELECT * ... LIMIT n；representative 使用 TABLESAMPLE / 主键范围采样
+SAMPLE_MODE_LIMIT = "limit"
+SAMPLE_MODE_REPRESENTATIVE = "representative"
+
+# 估算行数低于该值时直接使用 LIMIT（小表上采样没有意义）
+DEFAULT_SAMPLE_MIN_ROWS = 1000
+# 示例值最大字符数，超过时截断
+DEFAULT_SAMPLE_VALUE_MAX_CHARS = 200
+# LOB/JSON 字段超过该字节数时不返回该值
+DEFAULT_SAMPLE_LOB_MAX_BYTES = 4096
+# TABLESAMPLE 的过采样倍数（SYSTEM 按数据页采样，返回行数波动较大）
+SAMPLE_OVERSAMPLING = 10
+
+TRUNCATION_SUFFIX = "…"
+
+# 二进制字段：不参与示例数据
+BINARY_TYPES = frozenset({
+    'blob', 'tinyblob', 'mediumblob', 'longblob', 'binary', 'varbinary', 'bytea',
+    'geometry', 'point', 'linestring', 'polygon',
+})
+# 大文本/JSON 字段：服务端按大小过滤并截断
+LOB_TYPES = frozenset({
+    'text', 'mediumtext', 'longtext', 'json', 'jsonb', 'xml',
+})
+INTEGER_TYPES = frozenset({
+    'tinyint', 'smallint', 'mediumint', 'int', 'integer', 'bigint',
+})
+
+
+class SamplingOptions:
+    """示例数据采样选项（读取数据源连接参数）"""
+
+    def __init__(
+        self,
+        mode: str = SAMPLE_MODE_REPRESENTATIVE,
+        min_rows: int = DEFAULT_SAMPLE_MIN_ROWS,
+        value_max_chars: int = DEFAULT_SAMPLE_VALUE_MAX_CHARS,
+        lob_max_bytes: int = DEFAULT_SAMPLE_LOB_MAX_BYTES,
+        seed: Optional[int] = None
+    ):
+        """
+        初始化采样选项
+
+        Args:
+            mode: 采样模式，representative 或 limit
+            min_rows: 估算行数低于该值时使用 LIMIT
+            value_max_chars: 示例值最大字符数
+            lob_max_bytes: LOB/JSON 字段最大字节数
+            seed: 随机种子（用于复现采样结果）
+        """
+        if mode not in (SAMPLE_MODE_LIMIT, SAMPLE_MODE_REPRESENTATIVE):
+            raise ValueError(f"不支持的采样模式: {mode}")
+
+        self.mode = mode
+        self.min_rows = min_rows
+        self.value_max_chars = value_max_chars
+        self.lob_max_bytes = lob_max_bytes
+        self.random = random.Random(seed)
+
+    @classmethod
+    def from_connection_params(cls, connection_params: Dict[str, Any]) -> "SamplingOptions":
+        """从连接参数 sample_mode / sample_min_rows / sample_value_max_chars /
+        sample_lob_max_bytes / sample_seed 创建采样选项"""
+        return cls(
+            mode=connection_params.get('sample_mode', SAMPLE_MODE_REPRESENTATIVE),
+            min_rows=connection_params.get('sample_min_rows', DEFAULT_SAMPLE_MIN_ROWS),
+            value_max_chars=connection_params.get(
+                'sample_value_max_chars', DEFAULT_SAMPLE_VALUE_MAX_CHARS
+            ),
+            lob_max_bytes=connection_params.get(
+                'sample_lob_max_bytes', DEFAULT_SAMPLE_LOB_MAX_BYTES
+            ),
+            seed=connection_params.get('sample_seed'),
+        )
+
+    @property
+    def representative(self) -> bool:
+        """是否使用代表性采样"""
+        return self.mode == SAMPLE_MODE_REPRESENTATIVE
+
+    def should_sample(self, estimated_rows: Optional[float], limit: int) -> bool:
+        """
+        判断是否值得采样
+
+        Args:
+            estimated_rows: 估算行数，未知时为 None
+            limit: 需要的记录数
+
+        Returns:
+            是否使用采样查询
+        """
+        if not self.representative or estimated_rows is None:
+            return False
+        return estimated_rows >= max(self.min_rows, limit)
+
+    def sample_percent(self, estimated_rows: float, limit: int) -> float:
+        """计算 TABLESAMPLE 采样百分比（带过采样）"""
+        percent = limit * SAMPLE_OVERSAMPLING * 100.0 / max(estimated_rows, 1)
+        return min(100.0, max(percent, 0.0001))
+
+    def pick_keys(self, min_key: int, max_key: int, count: int) -> List[int]:
+        """
+        在主键范围内随机选取起点
+
+        Args:
+            min_key: 最小主键
+            max_key: 最大主键
+            count: 起点数量
+
+        Returns:
+            排好序的起点列表
+        """
+        return sorted(self.random.randint(min_key, max_key) for _ in range(count))
+
+
+def split_sample_columns(columns: Dict[str, Any]) -> List[Tuple[str, bool]]:
+    """
+    确定示例数据的投影字段
+
+    Args:
+        columns: get_table_info 返回的字段信息
+
+    Returns:
+        (字段名, 是否 LOB/JSON 字段) 列表，已去除二进制字段
+    """
+    projected = []
+    for name, info in columns.items():
+        column_type = str(info.get('type', '')).lower()
+        if column_type in BINARY_TYPES:
+            continue
+        projected.append((name, column_type in LOB_TYPES))
+    return projected
+
+
+def find_integer_primary_key(columns: Dict[str, Any]) -> Optional[str]:
+    """
+    查找单列整数主键
+
+    Args:
+        columns: get_table_info 返回的字段信息
+
+    Returns:
+        主键字段名，不存在或为联合主键时返回 None
+    """
+    primary_keys = [name for name, info in columns.items() if info.get('key') == 'PRI']
+    if len(primary_keys) != 1:
+        return None
+
+    column_type = str(columns[primary_keys[0]].get('type', '')).lower()
+    return primary_keys[0] if column_type in INTEGER_TYPES else None
+
+
+def truncate_value(value: Any, max_chars: int) -> Any:
+    """截断过长的字符串/二进制值"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"<{len(value)} bytes>"
+    if isinstance(value, str) and len(value) > max_chars:
+        return value[:max_chars] + TRUNCATION_SUFFIX
+    return value
+
+
+def truncate_row(row: Dict[str, Any], max_chars: int) -> Dict[str, Any]:
+    """截断一行示例数据中的长值"""
+    return {key: truncate_value(value, max_chars) for key, value in row.items()}
+
+
+def dedupe_by_key(rows: List[Dict[str, Any]], key: str) -> List[Dict[str, Any]]:
+    """按主键去重（主键范围采样的多个起点可能落到同一行）"""
+    seen = set()
+    unique_rows = []
+    for row in rows:
+        if row[key] in seen:
+            continue
+        seen.add(row[key])
+        unique_rows.append(row)
+    return unique_rows
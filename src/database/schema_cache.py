@@ -0,0 +1,221 @@
+"""Schema 缓存 - 持久化每个数据源的 schema 快照，只重新获取发生变化的表"""
+import json
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .base import BaseDatabase
+from .schema_types import schema_from_dict, schema_to_dict
+
+
+class SchemaCache:
+    """Schema 快照缓存"""
+
+    def __init__(self, cache_dir: str = "./data/schema_cache"):
+        """
+        初始化 schema 缓存
+
+        Args:
+            cache_dir: 快照文件目录
+        """
+        self.cache_dir = Path(cache_dir)
+        self._snapshots: Dict[str, Dict[str, Any]] = {}
+        self.last_stats: Dict[str, int] = {}
+
+    def _snapshot_path(self, datasource_name: str) -> Path:
+        safe_name = re.sub(r'[^\w.-]', '_', datasource_name)
+        return self.cache_dir / f"{safe_name}.json"
+
+    def load_snapshot(self, datasource_name: str) -> Optional[Dict[str, Any]]:
+        """
+        读取快照（优先使用内存中的副本）
+
+        Args:
+            datasource_name: 数据源名称
+
+        Returns:
+            快照 {'versions', 'schema', 'excluded', 'updated_at'}，不存在时返回 None
+        """
+        if datasource_name in self._snapshots:
+            return self._snapshots[datasource_name]
+
+        path = self._snapshot_path(datasource_name)
+        if not path.exists():
+            return None
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  读取 schema 缓存失败，将重新获取: {str(e)}")
+            return None
+
+        snapshot['schema'] = schema_from_dict(snapshot.get('schema') or {})
+        self._snapshots[datasource_name] = snapshot
+        return snapshot
+
+    def save_snapshot(
+        self,
+        datasource_name: str,
+        versions: Dict[str, str],
+        schema: Dict[str, Any],
+        excluded: Optional[List[str]] = None
+    ) -> None:
+        """
+        保存快照（先写临时文件再替换，避免中断时留下损坏的快照）
+
+        Args:
+            datasource_name: 数据源名称
+            versions: 表名 -> 版本标识
+            schema: 数据库结构信息
+            excluded: 有版本但 db.iter_schema() 不返回的表名，增量更新时忽略
+        """
+        snapshot = {
+            'versions': versions,
+            'schema': schema,
+            'excluded': excluded or [],
+            'updated_at': datetime.now().isoformat(timespec='seconds'),
+        }
+
+        path = self._snapshot_path(datasource_name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(
+                {**snapshot, 'schema': schema_to_dict(schema)}, f, ensure_ascii=False, default=str
+            )
+        tmp_path.replace(path)
+
+        self._snapshots[datasource_name] = snapshot
+
+    def invalidate(self, datasource_name: str) -> None:
+        """删除数据源的快照"""
+        self._snapshots.pop(datasource_name, None)
+        path = self._snapshot_path(datasource_name)
+        if path.exists():
+            path.unlink()
+
+    def get_schema(
+        self,
+        db: BaseDatabase,
+        datasource_name: str,
+        force_refresh: bool = False
+    ) -> Dict[str, Any]:
+        """
+        获取 schema - 命中缓存时直接返回，否则只重新获取版本变化的表
+
+        Args:
+            db: 已连接的数据库实例
+            datasource_name: 数据源名称
+            force_refresh: 是否忽略缓存完整重新获取
+
+        Returns:
+            数据库结构信息（与 db.get_schema() 格式相同）
+        """
+        return dict(self.iter_schema(db, datasource_name, force_refresh))
+
+    def iter_schema(
+        self,
+        db: BaseDatabase,
+        datasource_name: str,
+        force_refresh: bool = False
+    ) -> Iterator[Tuple[str, Any]]:
+        """
+        逐个表产出 schema - 未变化的表从缓存读取，变化的表在产出时才重新获取
+
+        完整遍历后保存快照并更新 last_stats；中途停止时不更新快照。
+
+        Args:
+            db: 已连接的数据库实例
+            datasource_name: 数据源名称
+            force_refresh: 是否忽略缓存完整重新获取
+
+        Yields:
+            (表名, 表结构信息)，顺序与 db.iter_schema() 相同
+        """
+        try:
+            versions = db.get_table_versions()
+        except Exception as e:
+            print(f"⚠️  获取表版本失败，跳过 schema 缓存: {str(e)}")
+            versions = None
+
+        # 数据库不支持变更检测
+        if versions is None:
+            count = 0
+            for item in db.iter_schema():
+                count += 1
+                yield item
+            self.last_stats = {'cached': 0, 'refreshed': count, 'removed': 0}
+            return
+
+        snapshot = None if force_refresh else self.load_snapshot(datasource_name)
+
+        if not snapshot or snapshot.get('versions') is None:
+            schema = {}
+            for name, info in db.iter_schema():
+                schema[name] = info
+                yield name, info
+            # 版本查询与 schema 查询之间新建的表下次再记录版本；
+            # db.iter_schema() 不返回的表（如无权限的表）记为排除，增量更新时不再获取
+            excluded = [name for name in versions if name not in schema]
+            versions = {name: version for name, version in versions.items() if name in schema}
+            self.save_snapshot(datasource_name, versions, schema, excluded)
+            self.last_stats = {'cached': 0, 'refreshed': len(schema), 'removed': 0}
+            return
+
+        cached_versions = snapshot['versions']
+        cached_schema = snapshot['schema']
+        excluded = [name for name in snapshot.get('excluded') or [] if name in versions]
+        excluded_set = set(excluded)
+        versions = {
+            name: version for name, version in versions.items() if name not in excluded_set
+        }
+
+        changed = [
+            name for name, version in versions.items()
+            if cached_versions.get(name) != version or name not in cached_schema
+        ]
+        removed = [name for name in cached_schema if name not in versions]
+
+        if not changed and not removed:
+            yield from cached_schema.items()
+            self.last_stats = {'cached': len(cached_schema), 'refreshed': 0, 'removed': 0}
+            return
+
+        changed_set = set(changed)
+        schema = {}
+        for name in versions:
+            if name in changed_set:
+                schema[name] = db.get_table_schema(name)
+            else:
+                schema[name] = cached_schema[name]
+            yield name, schema[name]
+
+        self.save_snapshot(datasource_name, versions, schema, excluded)
+        self.last_stats = {
+            'cached': len(schema) - len(changed),
+            'refreshed': len(changed),
+            'removed': len(removed),
+        }
+
+
+def get_schema_cache(datasource_manager=None) -> Optional[SchemaCache]:
+    """
+    根据数据源配置文件中的 schema_cache 配置创建缓存
+
+    Args:
+        datasource_manager: 数据源管理器
+
+    Returns:
+        Schema 缓存实例，未启用时返回 None
+    """
+    if datasource_manager is None:
+        from ..utils.datasource_config import get_datasource_manager
+        datasource_manager = get_datasource_manager()
+
+    cache_config = datasource_manager.get_schema_cache_config()
+    if not cache_config.get('enabled', True):
+        return None
+
+    return SchemaCache(cache_config.get('directory', './data/schema_cache'))
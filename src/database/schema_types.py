@@ -0,0 +1,113 @@
+"""紧凑的 schema 结构 - 使用 __slots__ 代替每个字段一个字典
+
+TableSchema / ColumnInfo 实现只读 Mapping 接口，原先按字典读取 schema 的代码
+（table_info['columns']、col_info.get('type')、'comment' in table_info）无需修改。
+"""
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional
+
+
+def _intern(value: Any) -> Any:
+    """驻留字符串（字段类型、键类型等大量重复的短字符串共享同一对象）"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class _SlotsMapping(Mapping):
+    """基于 __slots__ 的只读 Mapping，只包含已赋值的属性"""
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self.__slots__:
+            if hasattr(self, key):
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """与 dict.get 相同（直接读取属性，不经过 __getitem__）"""
+        if key not in self.__slots__:
+            return default
+        return getattr(self, key, default)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class ColumnInfo(_SlotsMapping):
+    """字段信息（未提供的属性不占用内存，也不会出现在 Mapping 键中）"""
+
+    __slots__ = ('type', 'comment', 'nullable', 'key', 'default')
+
+    def __init__(self, **fields: Any):
+        """
+        初始化字段信息
+
+        Args:
+            **fields: type、comment、nullable、key、default 中的任意项
+        """
+        for name, value in fields.items():
+            if name not in self.__slots__:
+                raise TypeError(f"未知的字段属性: {name}")
+            if name in ('type', 'key'):
+                value = _intern(value)
+            setattr(self, name, value)
+
+
+class TableSchema(_SlotsMapping):
+    """表结构信息：表注释和字段名 -> ColumnInfo"""
+
+    __slots__ = ('comment', 'columns')
+
+    def __init__(self, columns: Optional[Dict[str, Any]] = None, **fields: Any):
+        """
+        初始化表结构信息
+
+        Args:
+            columns: 字段名 -> ColumnInfo（或字段信息字典）
+            **fields: comment（不提供时表示数据库不支持表注释）
+        """
+        for name, value in fields.items():
+            if name != 'comment':
+                raise TypeError(f"未知的表属性: {name}")
+            self.comment = value
+
+        self.columns = {
+            sys.intern(name): info if isinstance(info, ColumnInfo) else ColumnInfo(**info)
+            for name, info in (columns or {}).items()
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = dict(self.items())
+        data['columns'] = {name: info.to_dict() for name, info in self.columns.items()}
+        return data
+
+
+def schema_to_dict(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """将 schema 转换为纯字典（用于 JSON 序列化）"""
+    return {
+        table_name: info.to_dict() if isinstance(info, _SlotsMapping) else info
+        for table_name, info in schema.items()
+    }
+
+
+def schema_from_dict(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """将纯字典 schema 转换为 TableSchema（包含其他键的条目，如 MongoDB 集合信息，保持原样）"""
+    return {
+        table_name: TableSchema(**info) if set(info) <= {'comment', 'columns'} else info
+        for table_name, info in schema.items()
+    }
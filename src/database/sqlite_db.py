@@ -0,0 +1,389 @@
+"""SQLite 数据库连接"""
+import hashlib
+import sqlite3
+from collections import defaultdict
+from typing import Any, Iterator, List, Dict, Optional, Tuple, TYPE_CHECKING
+
+from .base import BaseDatabase
+from .schema_types import ColumnInfo, TableSchema
+from .sampling import (
+    SamplingOptions,
+    dedupe_by_key,
+    find_integer_primary_key,
+    split_sample_columns,
+    truncate_row,
+)
+
+if TYPE_CHECKING:
+    from .columnar import ColumnarResult
+
+# 存放表/字段注释的元数据表（SQLite 本身不支持注释）
+COMMENTS_TABLE = "_schema_comments"
+
+
+class SQLiteDatabase(BaseDatabase):
+    """SQLite 数据库连接类（主要用于本地测试和压测）"""
+    
+    def connect(self) -> None:
+        """建立 SQLite 连接"""
+        try:
+            self.connection = sqlite3.connect(
+                self.connection_params.get('database', ':memory:'),
+                check_same_thread=False
+            )
+            self.connection.row_factory = sqlite3.Row
+            print(f"✓ 成功连接到 SQLite 数据库: {self.connection_params.get('database')}")
+        except Exception as e:
+            raise ConnectionError(f"SQLite 连接失败: {str(e)}")
+    
+    def disconnect(self) -> None:
+        """关闭 SQLite 连接"""
+        if self.connection:
+            self.connection.close()
+            self.connection = None
+            print("✓ SQLite 连接已关闭")
+    
+    def execute_query(self, query: str, params: Optional[Dict] = None) -> List[Dict[str, Any]]:
+        """
+        执行 SQLite 查询
+        
+        Args:
+            query: SQL 查询语句（参数使用 :name 占位符）
+            params: 查询参数
+            
+        Returns:
+            查询结果列表
+        """
+        if not self.connection:
+            self.connect()
+        
+        try:
+            cursor = self.connection.execute(query, params or {})
+            try:
+                return [dict(row) for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+        except Exception as e:
+            raise RuntimeError(f"查询执行失败: {str(e)}")
+    
+    def iter_query(
+        self,
+        query: str,
+        params: Optional[Dict] = None,
+        fetch_size: Optional[int] = None,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        流式执行 SQLite 查询（SQLite 游标按需逐步执行）
+        
+        Args:
+            query: SQL 查询语句
+            params: 查询参数
+            fetch_size: 每批获取的行数
+            max_rows: 最大行数
+            max_bytes: 最大字节数（估算）
+            
+        Yields:
+            查询结果行
+            
+        Raises:
+            QueryLimitExceededError: 结果超过上限
+        """
+        if not self.connection:
+            self.connect()
+        
+        fetch_size = self._get_fetch_size(fetch_size)
+        try:
+            cursor = self.connection.execute(query, params or {})
+        except Exception as e:
+            raise RuntimeError(f"查询执行失败: {str(e)}")
+        
+        def batches():
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row)
+        
+        try:
+            yield from self._enforce_limits(batches(), max_rows, max_bytes)
+        finally:
+            cursor.close()
+    
+    def execute_query_columnar(
+        self,
+        query: str,
+        params: Optional[Dict] = None,
+        fetch_size: Optional[int] = None,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ) -> "ColumnarResult":
+        """
+        执行 SQLite 查询并返回列式结果（由游标批次直接构建）
+        
+        Args:
+            query: SQL 查询语句
+            params: 查询参数
+            fetch_size: 每批获取的行数
+            max_rows: 最大行数
+            max_bytes: 最大字节数（估算）
+            
+        Returns:
+            列式查询结果
+            
+        Raises:
+            QueryLimitExceededError: 结果超过上限
+        """
+        from .columnar import ColumnarResult
+        
+        if not self.connection:
+            self.connect()
+        
+        fetch_size = self._get_fetch_size(fetch_size)
+        try:
+            cursor = self.connection.execute(query, params or {})
+        except Exception as e:
+            raise RuntimeError(f"查询执行失败: {str(e)}")
+        
+        def batches():
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                yield rows
+        
+        try:
+            columns = [desc[0] for desc in cursor.description or ()]
+            return ColumnarResult.from_batches(
+                columns,
+                self._enforce_batch_limits(batches(), max_rows, max_bytes)
+            )
+        finally:
+            cursor.close()
+    
+    def get_schema(self) -> Dict[str, TableSchema]:
+        """获取数据库 schema"""
+        return dict(self.iter_schema())
+    
+    def iter_schema(self) -> Iterator[Tuple[str, TableSchema]]:
+        """逐个表获取 schema"""
+        query = """
+            SELECT name
+            FROM sqlite_master
+            WHERE type = 'table' AND name NOT LIKE 'sqlite_%' AND name != :comments_table
+            ORDER BY name
+        """
+        
+        results = self.execute_query(query, {'comments_table': COMMENTS_TABLE})
+        comments = self._load_comments()
+        
+        for row in results:
+            table_name = row['name']
+            yield table_name, TableSchema(
+                comment=comments.get((table_name, ''), ''),
+                columns=self._build_columns(table_name, comments)
+            )
+    
+    def get_table_info(self, table_name: str) -> Dict[str, ColumnInfo]:
+        """获取表结构信息"""
+        return self._build_columns(table_name, self._load_comments(table_name))
+    
+    def get_table_versions(self) -> Dict[str, str]:
+        """基于 sqlite_master 中的建表语句和注释生成表版本标识"""
+        results = self.execute_query(
+            """
+            SELECT name, sql
+            FROM sqlite_master
+            WHERE type = 'table' AND name NOT LIKE 'sqlite_%' AND name != :comments_table
+            ORDER BY name
+            """,
+            {'comments_table': COMMENTS_TABLE}
+        )
+        
+        # 一次遍历按表分组注释，避免每个表都扫描全部注释
+        comments_by_table = defaultdict(list)
+        for (table, column), comment in self._load_comments().items():
+            comments_by_table[table].append(f"{column}={comment}")
+        
+        versions = {}
+        for row in results:
+            table_comments = sorted(comments_by_table.get(row['name'], []))
+            digest = hashlib.md5(row['sql'].encode('utf-8'))
+            digest.update("\n".join(table_comments).encode('utf-8'))
+            versions[row['name']] = digest.hexdigest()
+        
+        return versions
+    
+    def get_table_schema(self, table_name: str) -> TableSchema:
+        """获取单个表的注释和字段信息"""
+        comments = self._load_comments(table_name)
+        return TableSchema(
+            comment=comments.get((table_name, ''), ''),
+            columns=self._build_columns(table_name, comments)
+        )
+    
+    def _build_columns(self, table_name: str, comments: Dict[tuple, str]) -> Dict[str, ColumnInfo]:
+        """根据 PRAGMA table_info 构建字段信息"""
+        results = self.execute_query(f'PRAGMA table_info("{table_name}")')
+        
+        columns = {}
+        for row in results:
+            columns[row['name']] = ColumnInfo(
+                type=row['type'].lower(),
+                comment=comments.get((table_name, row['name']), ''),
+                nullable=not row['notnull'] and not row['pk'],
+                key='PRI' if row['pk'] else '',
+                default=row['dflt_value']
+            )
+        
+        return columns
+    
+    def _load_comments(self, table_name: Optional[str] = None) -> Dict[tuple, str]:
+        """
+        读取注释元数据表
+        
+        Args:
+            table_name: 只读取指定表的注释，为 None 时读取全部
+            
+        Returns:
+            (表名, 字段名) -> 注释，表注释的字段名为空字符串
+        """
+        exists = self.execute_query(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name",
+            {'name': COMMENTS_TABLE}
+        )
+        if not exists:
+            return {}
+        
+        query = f"SELECT table_name, column_name, comment FROM {COMMENTS_TABLE}"
+        params = {}
+        if table_name is not None:
+            query += " WHERE table_name = :table_name"
+            params['table_name'] = table_name
+        
+        return {
+            (row['table_name'], row['column_name']): row['comment']
+            for row in self.execute_query(query, params)
+        }
+    
+    def get_column_statistics(self, table_name: str) -> Optional[Dict[str, Any]]:
+        """
+        从 sqlite_stat1（ANALYZE 生成）读取字段统计
+        
+        sqlite_stat1 只记录索引统计：索引首列的不同值个数为 总行数 / 每个值的平均行数，
+        单列整数主键的不同值个数等于总行数。
+        """
+        try:
+            results = self.execute_query(
+                "SELECT idx, stat FROM sqlite_stat1 WHERE tbl = :table_name",
+                {'table_name': table_name}
+            )
+        except RuntimeError:
+            # 从未执行过 ANALYZE
+            return None
+        
+        if not results:
+            return None
+        
+        row_count = int(results[0]['stat'].split()[0])
+        columns: Dict[str, Dict[str, Any]] = {}
+        
+        for row in results:
+            stat = row['stat'].split()
+            if row['idx'] is None or len(stat) < 2:
+                continue
+            index_info = self.execute_query(f'PRAGMA index_info("{row["idx"]}")')
+            leading = [info['name'] for info in index_info if info['seqno'] == 0]
+            if leading and leading[0]:
+                columns[leading[0]] = {'distinct': round(int(stat[0]) / max(int(stat[1]), 1))}
+        
+        primary_key = find_integer_primary_key(self.get_table_info(table_name))
+        if primary_key is not None:
+            columns[primary_key] = {'distinct': row_count, 'null_fraction': 0.0}
+        
+        return {'row_count': row_count, 'columns': columns}
+    
+    def get_sample_data(self, table_name: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        获取表的示例数据
+        
+        代表性采样模式下，对整数主键的大表在主键范围内随机选取起点读取记录；其他情况
+        退回 LIMIT。二进制字段不返回，长值截断到 sample_value_max_chars。
+        
+        Args:
+            table_name: 表名
+            limit: 返回记录数
+            
+        Returns:
+            示例数据
+        """
+        options = self._get_sampling_options()
+        columns = self.get_table_info(table_name)
+        projection = self._sample_projection(columns, options)
+        
+        rows = None
+        if options.representative:
+            rows = self._sample_by_primary_key(table_name, columns, projection, limit, options)
+        if not rows:
+            query = f'SELECT {projection} FROM "{table_name}" LIMIT {int(limit)}'
+            rows = self.execute_query(query)
+        
+        return [truncate_row(row, options.value_max_chars) for row in rows]
+    
+    def _sample_projection(self, columns: Dict[str, Any], options: SamplingOptions) -> str:
+        """构建示例数据的 SELECT 字段列表"""
+        expressions = []
+        for name, is_lob in split_sample_columns(columns):
+            if is_lob:
+                expressions.append(
+                    f'CASE WHEN length(CAST("{name}" AS BLOB)) <= {int(options.lob_max_bytes)} '
+                    f'THEN substr("{name}", 1, {int(options.value_max_chars) + 1}) END AS "{name}"'
+                )
+            else:
+                expressions.append(f'"{name}"')
+        
+        return ", ".join(expressions) or "*"
+    
+    def _sample_by_primary_key(
+        self,
+        table_name: str,
+        columns: Dict[str, Any],
+        projection: str,
+        limit: int,
+        options: SamplingOptions
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        主键范围采样（INTEGER PRIMARY KEY 即 rowid，范围查找走主键 B 树）
+        
+        Returns:
+            示例数据；表太小或没有单列整数主键时返回 None
+        """
+        primary_key = find_integer_primary_key(columns)
+        if primary_key is None:
+            return None
+        
+        bounds = self.execute_query(
+            f'SELECT MIN("{primary_key}") AS min_key, MAX("{primary_key}") AS max_key '
+            f'FROM "{table_name}"'
+        )[0]
+        if bounds['min_key'] is None:
+            return None
+        
+        # SQLite 没有行数统计信息，用主键跨度估算
+        estimated_rows = bounds['max_key'] - bounds['min_key'] + 1
+        if not options.should_sample(estimated_rows, limit):
+            return None
+        
+        start_keys = options.pick_keys(bounds['min_key'], bounds['max_key'], limit)
+        query = " UNION ALL ".join(
+            f'SELECT * FROM (SELECT {projection} FROM "{table_name}" '
+            f'WHERE "{primary_key}" >= :key_{i} ORDER BY "{primary_key}" LIMIT 1)'
+            for i in range(len(start_keys))
+        )
+        rows = self.execute_query(
+            query, {f'key_{i}': start_key for i, start_key in enumerate(start_keys)}
+        )
+        
+        return dedupe_by_key(rows, primary_key)
@@ -0,0 +1,123 @@
+"""合成数据库生成器 - 用于本地压测知识库导入"""
+import random
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict
+
+from .sqlite_db import COMMENTS_TABLE
+
+_WORDS = [
+    "user", "order", "product", "payment", "invoice", "customer", "address",
+    "shipment", "inventory", "category", "review", "coupon", "refund", "session",
+    "account", "warehouse", "supplier", "price", "status", "region", "channel",
+    "campaign", "device", "event", "member", "store", "ticket", "contract",
+]
+_COMMENT_WORDS = ["用户", "订单", "商品", "支付", "发票", "客户", "地址", "物流", "库存", "分类", "状态", "金额"]
+
+# 字段类型 -> 值生成函数
+_COLUMN_TYPES = {
+    "INTEGER": lambda rng, i: rng.randint(0, 1_000_000),
+    "TEXT": lambda rng, i: f"{rng.choice(_WORDS)}_{rng.randint(0, 9999)}",
+    "VARCHAR(64)": lambda rng, i: rng.choice(_WORDS),
+    "REAL": lambda rng, i: round(rng.random() * 10000, 2),
+    "DECIMAL(10,2)": lambda rng, i: round(rng.random() * 1000, 2),
+    "DATETIME": lambda rng, i: str(
+        datetime(2024, 1, 1) + timedelta(minutes=rng.randint(0, 525600))
+    ),
+    "TINYINT": lambda rng, i: rng.randint(0, 1),
+}
+
+
+def generate_synthetic_sqlite(
+    path: str,
+    table_count: int = 100,
+    columns_per_table: int = 10,
+    row_count: int = 100,
+    with_comments: bool = True,
+    seed: int = 42
+) -> Dict[str, Any]:
+    """
+    生成合成 SQLite 数据库
+
+    Args:
+        path: 数据库文件路径（已存在会被覆盖）
+        table_count: 表数量
+        columns_per_table: 每个表的字段数量（包含主键 id）
+        row_count: 每个表的行数
+        with_comments: 是否写入表/字段注释
+        seed: 随机种子
+
+    Returns:
+        生成统计信息
+    """
+    if columns_per_table < 1:
+        raise ValueError("columns_per_table 至少为 1")
+
+    db_path = Path(path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    if db_path.exists():
+        db_path.unlink()
+
+    rng = random.Random(seed)
+    type_names = list(_COLUMN_TYPES)
+    comment_rows = []
+    total_rows = 0
+
+    connection = sqlite3.connect(str(db_path))
+    try:
+        with connection:
+            if with_comments:
+                connection.execute(
+                    f"CREATE TABLE {COMMENTS_TABLE} "
+                    "(table_name TEXT NOT NULL, column_name TEXT NOT NULL, comment TEXT, "
+                    "PRIMARY KEY (table_name, column_name))"
+                )
+
+            for t in range(table_count):
+                table_name = f"{rng.choice(_WORDS)}_{rng.choice(_WORDS)}_{t}"
+
+                columns = [("id", "INTEGER", "PRIMARY KEY")]
+                for c in range(1, columns_per_table):
+                    constraint = "NOT NULL" if rng.random() < 0.3 else ""
+                    columns.append(
+                        (f"{rng.choice(_WORDS)}_{c}", rng.choice(type_names), constraint)
+                    )
+
+                column_sql = ", ".join(f'"{name}" {col_type} {constraint}'.strip()
+                                       for name, col_type, constraint in columns)
+                connection.execute(f'CREATE TABLE "{table_name}" ({column_sql})')
+
+                if with_comments:
+                    comment_rows.append((table_name, "", f"{rng.choice(_COMMENT_WORDS)}相关业务表"))
+                    for name, _, _ in columns:
+                        comment = f"{rng.choice(_COMMENT_WORDS)}{rng.choice(_COMMENT_WORDS)}"
+                        comment_rows.append((table_name, name, comment))
+
+                if row_count > 0:
+                    placeholders = ", ".join("?" for _ in columns)
+                    rows = [
+                        tuple([i] + [
+                            _COLUMN_TYPES[col_type](rng, i) for _, col_type, _ in columns[1:]
+                        ])
+                        for i in range(1, row_count + 1)
+                    ]
+                    connection.executemany(
+                        f'INSERT INTO "{table_name}" VALUES ({placeholders})', rows
+                    )
+                    total_rows += row_count
+
+            if comment_rows:
+                connection.executemany(
+                    f"INSERT INTO {COMMENTS_TABLE} VALUES (?, ?, ?)", comment_rows
+                )
+    finally:
+        connection.close()
+
+    return {
+        "path": str(db_path),
+        "tables": table_count,
+        "columns": table_count * columns_per_table,
+        "rows": total_rows,
+        "size_bytes": db_path.stat().st_size,
+    }
@@ -0,0 +1,242 @@
+"""LLM 实例缓存 - 按 (提供商, 模型, 温度, 最大 token 数) 复用 LLM 实例和 HTTP 连接池"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from langchain_core.language_models import BaseLLM
+
+from .llm_factory import LLMFactory
+from .rate_limiter import RateLimitCallbackHandler, get_rate_limiter
+
+# 共享 HTTP 连接池配置
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+# 缓存的 LLM 实例数上限
+DEFAULT_LLM_CACHE_SIZE = 32
+
+_http_lock = threading.Lock()
+_http_client = None
+_async_http_client = None
+
+
+def _http_limits():
+    import httpx
+
+    return httpx.Limits(
+        max_connections=DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections=DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=DEFAULT_KEEPALIVE_EXPIRY
+    )
+
+
+def get_http_client():
+    """获取共享的同步 HTTP 客户端（keep-alive 连接池，进程内复用 TCP/TLS 连接）"""
+    global _http_client
+
+    if _http_client is None or _http_client.is_closed:
+        with _http_lock:
+            if _http_client is None or _http_client.is_closed:
+                import httpx
+                _http_client = httpx.Client(limits=_http_limits())
+
+    return _http_client
+
+
+def get_async_http_client():
+    """获取共享的异步 HTTP 客户端"""
+    global _async_http_client
+
+    if _async_http_client is None or _async_http_client.is_closed:
+        with _http_lock:
+            if _async_http_client is None or _async_http_client.is_closed:
+                import httpx
+                _async_http_client = httpx.AsyncClient(limits=_http_limits())
+
+    return _async_http_client
+
+
+async def close_http_clients() -> None:
+    """关闭共享的 HTTP 客户端（应用关闭时调用）"""
+    global _http_client, _async_http_client
+
+    with _http_lock:
+        http_client, async_http_client = _http_client, _async_http_client
+        _http_client = _async_http_client = None
+
+    if http_client is not None:
+        http_client.close()
+    if async_http_client is not None:
+        await async_http_client.aclose()
+
+
+def _openai_clients(api_key: Optional[str], api_base: Optional[str]) -> Dict[str, Any]:
+    """
+    创建使用共享连接池的 OpenAI SDK 客户端
+
+    Returns:
+        ChatOpenAI 的 client/async_client 参数，缺少 API 密钥时返回空字典（由 ChatOpenAI 报错）
+    """
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        return {}
+
+    try:
+        import openai
+    except ImportError:
+        return {}
+
+    base_url = api_base or os.getenv("OPENAI_API_BASE") or None
+    return {
+        "client": openai.OpenAI(
+            api_key=api_key, base_url=base_url, http_client=get_http_client()
+        ).chat.completions,
+        "async_client": openai.AsyncOpenAI(
+            api_key=api_key, base_url=base_url, http_client=get_async_http_client()
+        ).chat.completions,
+    }
+
+
+class LLMCache:
+    """LLM 实例缓存（LRU）"""
+
+    def __init__(self, max_size: int = DEFAULT_LLM_CACHE_SIZE):
+        """
+        初始化 LLM 实例缓存
+
+        Args:
+            max_size: 最多缓存的实例数
+        """
+        self.max_size = max_size
+        self._instances: "OrderedDict[Tuple, BaseLLM]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _make_key(
+        provider: str,
+        model_name: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        api_key: Optional[str],
+        api_base: Optional[str],
+        kwargs: Dict[str, Any]
+    ) -> Optional[Tuple]:
+        """生成缓存键，参数不可哈希时返回 None（不缓存）"""
+        key = (
+            provider.lower(), model_name, float(temperature), max_tokens,
+            api_key, api_base, tuple(sorted(kwargs.items()))
+        )
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def get(
+        self,
+        provider: str = "openai",
+        model_name: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        api_key: Optional[str] = None,
+        api_base: Optional[str] = None,
+        **kwargs
+    ) -> BaseLLM:
+        """
+        获取 LLM 实例，参数相同时返回同一个实例
+
+        参数与 LLMFactory.create_llm 相同。OpenAI 实例使用共享的 keep-alive HTTP 连接池；
+        提供商配置了限流时，实例挂上限流回调。
+
+        Returns:
+            LLM 实例
+        """
+        key = self._make_key(
+            provider, model_name, temperature, max_tokens, api_key, api_base, kwargs
+        )
+
+        if key is not None:
+            with self._lock:
+                llm = self._instances.get(key)
+                if llm is not None:
+                    self._instances.move_to_end(key)
+                    self.hits += 1
+                    return llm
+
+        if provider.lower() == "openai" and not {"client", "http_client"} & set(kwargs):
+            kwargs = {**kwargs, **_openai_clients(api_key, api_base)}
+
+        llm = LLMFactory.create_llm(
+            provider=provider,
+            model_name=model_name,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            api_key=api_key,
+            api_base=api_base,
+            **kwargs
+        )
+
+        limiter = get_rate_limiter(provider)
+        if limiter:
+            llm.callbacks = list(llm.callbacks or []) + [RateLimitCallbackHandler(limiter)]
+
+        with self._lock:
+            self.misses += 1
+            if key is None:
+                return llm
+            # 并发创建时保留先放入的实例
+            llm = self._instances.setdefault(key, llm)
+            self._instances.move_to_end(key)
+            while len(self._instances) > self.max_size:
+                self._instances.popitem(last=False)
+
+        return llm
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._instances.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._instances)
+
+
+# 全局 LLM 实例缓存
+_llm_cache = LLMCache()
+
+
+def get_llm_cache() -> LLMCache:
+    """获取全局 LLM 实例缓存"""
+    return _llm_cache
+
+
+def get_cached_llm(
+    provider: str = "openai",
+    model_name: Optional[str] = None,
+    temperature: float = 0.7,
+    max_tokens: int = 2000,
+    api_key: Optional[str] = None,
+    api_base: Optional[str] = None,
+    **kwargs
+) -> BaseLLM:
+    """
+    从全局缓存获取 LLM 实例（参数与 LLMFactory.create_llm 相同）
+
+    Returns:
+        LLM 实例
+    """
+    return _llm_cache.get(
+        provider=provider,
+        model_name=model_name,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        api_key=api_key,
+        api_base=api_base,
+        **kwargs
+    )
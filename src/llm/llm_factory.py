@@ -179,7 +179,10 @@ class LLMFactory:
 
 def get_llm_from_config(config) -> BaseLLM:
     """
-    从配置创建 LLM 实例
+    从配置获取 LLM 实例（相同配置复用同一个实例和 HTTP 连接池）
+    
+    配置了两个及以上 llm_routing_providers 时返回多提供商路由 LLM；
+    default_temperature 为 0 且启用了响应缓存时，返回带响应缓存的 LLM。
     
     Args:
         config: 配置对象
@@ -187,11 +190,23 @@ def get_llm_from_config(config) -> BaseLLM:
     Returns:
         LLM 实例
     """
-    return LLMFactory.create_llm(
-        provider=config.default_llm_provider,
-        model_name=config.default_model_name,
-        temperature=config.default_temperature,
-        max_tokens=config.default_max_tokens,
-        api_key=getattr(config, f"{config.default_llm_provider}_api_key", None),
-        api_base=getattr(config, f"{config.default_llm_provider}_api_base", None),
-    )
+    from .llm_cache import get_cached_llm
+    from .response_cache import get_response_cache, with_response_cache
+    
+    if len(getattr(config, 'llm_routing_providers', None) or []) > 1:
+        from .router import get_routing_llm_from_config
+        llm = get_routing_llm_from_config(config)
+    else:
+        llm = get_cached_llm(
+            provider=config.default_llm_provider,
+            model_name=config.default_model_name,
+            temperature=config.default_temperature,
+            max_tokens=config.default_max_tokens,
+            api_key=getattr(config, f"{config.default_llm_provider}_api_key", None),
+            api_base=getattr(config, f"{config.default_llm_provider}_api_base", None),
+        )
+    
+    cache = get_response_cache()
+    if cache is None:
+        return llm
+    return with_response_cache(llm, cache, temperature=config.default_temperature)
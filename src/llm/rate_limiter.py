@@ -0,0 +1,410 @@
+"""提供商级限流 - 最大并发数 + 每分钟请求数/token 数令牌桶，按到达顺序排队"""
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+from uuid import UUID
+
+from langchain.embeddings.base import Embeddings
+from langchain_core.callbacks import BaseCallbackHandler
+
+from ..utils.tokenizer import count_tokens
+from ..utils.tracing import get_current_span
+
+# 计算排队等待时间分位数时保留的最近样本数
+QUEUE_WAIT_WINDOW = 1000
+
+# 嵌入模型使用的限流器名称
+EMBEDDING_LIMITER = "embedding"
+
+
+class RateLimitTimeout(TimeoutError):
+    """排队超时（提供商额度已用满）"""
+
+
+class TokenBucket:
+    """令牌桶（按每分钟额度匀速补充，允许透支，透支部分由后续请求等待补齐）"""
+
+    def __init__(self, per_minute: float):
+        """
+        初始化令牌桶
+
+        Args:
+            per_minute: 每分钟额度（同时也是桶容量）
+        """
+        if per_minute <= 0:
+            raise ValueError("每分钟额度必须大于 0")
+
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """获取 amount 个令牌需要等待的秒数（超过容量的请求按容量计算，避免永远等待）"""
+        self._refill(now)
+        needed = min(amount, self.capacity)
+        if self.tokens >= needed:
+            return 0.0
+        return (needed - self.tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        """扣除令牌"""
+        self._refill(time.monotonic())
+        self.tokens -= amount
+
+
+class ProviderRateLimiter:
+    """
+    单个提供商的限流器
+
+    请求按到达顺序排队（FIFO），只有队首请求在并发数和令牌桶都允许时才能开始，
+    后到的小请求不会越过等待中的大请求。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: Optional[int] = None,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        timeout: float = 30.0
+    ):
+        """
+        初始化限流器
+
+        Args:
+            name: 提供商名称
+            max_concurrency: 最大并发请求数，None 表示不限制
+            requests_per_minute: 每分钟请求数，None 表示不限制
+            tokens_per_minute: 每分钟 token 数，None 表示不限制
+            timeout: 默认排队超时时间（秒）
+        """
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+        self._condition = threading.Condition()
+        self._queue: deque = deque()
+        self._in_flight = 0
+
+        self._request_count = 0
+        self._timeout_count = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._recent_waits: deque = deque(maxlen=QUEUE_WAIT_WINDOW)
+
+    def _ready_in(self, tokens: int, now: float) -> Optional[float]:
+        """队首请求还需等待的秒数，等待并发槽位时返回 None"""
+        if self.max_concurrency and self._in_flight >= self.max_concurrency:
+            return None
+
+        wait = 0.0
+        if self._requests:
+            wait = max(wait, self._requests.wait_time(1, now))
+        if self._tokens and tokens:
+            wait = max(wait, self._tokens.wait_time(tokens, now))
+        return wait
+
+    def acquire(self, tokens: int = 0, timeout: Optional[float] = None) -> float:
+        """
+        等待直到可以发出请求
+
+        Args:
+            tokens: 预计消耗的 token 数（输入部分，输出部分在 record_tokens 中补扣）
+            timeout: 排队超时时间（秒），None 时使用默认值
+
+        Returns:
+            排队等待的秒数
+
+        Raises:
+            RateLimitTimeout: 排队超时
+        """
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        ticket = object()
+
+        with self._condition:
+            self._queue.append(ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = self._ready_in(tokens, now) if self._queue[0] is ticket else None
+                    if wait == 0.0:
+                        break
+
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self._timeout_count += 1
+                        raise RateLimitTimeout(
+                            f"{self.name} 限流排队超时（{timeout:.1f} 秒），请稍后重试"
+                        )
+                    self._condition.wait(remaining if wait is None else min(wait, remaining))
+            except BaseException:
+                self._queue.remove(ticket)
+                self._condition.notify_all()
+                raise
+
+            self._queue.popleft()
+            self._in_flight += 1
+            if self._requests:
+                self._requests.consume(1)
+            if self._tokens and tokens:
+                self._tokens.consume(tokens)
+
+            waited = time.monotonic() - start
+            self._request_count += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+            self._recent_waits.append(waited)
+
+            # 下一个请求可能也已满足条件
+            self._condition.notify_all()
+
+        get_current_span().set_attribute("ratelimit.queue_wait_ms", round(waited * 1000, 3))
+        return waited
+
+    async def acquire_async(self, tokens: int = 0, timeout: Optional[float] = None) -> float:
+        """acquire 的异步版本（在线程池中等待，不阻塞事件循环）"""
+        return await asyncio.to_thread(self.acquire, tokens, timeout)
+
+    def release(self) -> None:
+        """请求结束，释放并发槽位"""
+        with self._condition:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._condition.notify_all()
+
+    def record_tokens(self, tokens: int) -> None:
+        """补扣请求实际多消耗的 token（例如输出部分）"""
+        if not self._tokens or not tokens:
+            return
+        with self._condition:
+            self._tokens.consume(tokens)
+
+    @contextmanager
+    def limit(self, tokens: int = 0, timeout: Optional[float] = None) -> Iterator[float]:
+        """
+        限流上下文
+
+        Args:
+            tokens: 预计消耗的 token 数
+            timeout: 排队超时时间（秒）
+
+        Yields:
+            排队等待的秒数
+        """
+        waited = self.acquire(tokens, timeout)
+        try:
+            yield waited
+        finally:
+            self.release()
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        获取限流指标
+
+        Returns:
+            in_flight、queued、requests、timeouts 和排队等待时间（毫秒）统计
+        """
+        with self._condition:
+            waits = sorted(self._recent_waits)
+            count = self._request_count
+
+            def percentile(p: float) -> float:
+                if not waits:
+                    return 0.0
+                return round(waits[min(len(waits) - 1, int(p * len(waits)))] * 1000, 3)
+
+            return {
+                "in_flight": self._in_flight,
+                "queued": len(self._queue),
+                "requests": count,
+                "timeouts": self._timeout_count,
+                "queue_wait_ms": {
+                    "avg": round(self._wait_total / count * 1000, 3) if count else 0.0,
+                    "p50": percentile(0.5),
+                    "p95": percentile(0.95),
+                    "max": round(self._wait_max * 1000, 3),
+                },
+            }
+
+
+class RateLimitCallbackHandler(BaseCallbackHandler):
+    """
+    LLM 限流回调 - 请求开始前排队，结束后释放并补扣输出 token
+
+    以回调方式挂到 LLM 实例上，ChatOpenAI、Tongyi 等各类 LLM 都可以使用。
+    """
+
+    raise_error = True
+
+    def __init__(self, limiter: ProviderRateLimiter):
+        """
+        初始化限流回调
+
+        Args:
+            limiter: 提供商限流器
+        """
+        self.limiter = limiter
+        self._runs: Dict[UUID, int] = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id: UUID, texts: List[str]) -> None:
+        tokens = sum(count_tokens(text) for text in texts)
+        self.limiter.acquire(tokens)
+        with self._lock:
+            self._runs[run_id] = tokens
+
+    def _finish(self, run_id: UUID) -> Optional[int]:
+        with self._lock:
+            tokens = self._runs.pop(run_id, None)
+        if tokens is not None:
+            self.limiter.release()
+        return tokens
+
+    def on_llm_start(
+        self,
+        serialized: Dict[str, Any],
+        prompts: List[str],
+        *,
+        run_id: UUID,
+        **kwargs: Any
+    ) -> None:
+        self._start(run_id, prompts)
+
+    def on_chat_model_start(
+        self,
+        serialized: Dict[str, Any],
+        messages: List[List[Any]],
+        *,
+        run_id: UUID,
+        **kwargs: Any
+    ) -> None:
+        self._start(run_id, [
+            message.content if isinstance(message.content, str) else str(message.content)
+            for batch in messages for message in batch
+        ])
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        prompt_tokens = self._finish(run_id)
+        if prompt_tokens is None:
+            return
+
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        if usage.get("total_tokens"):
+            extra = usage["total_tokens"] - prompt_tokens
+        else:
+            extra = sum(
+                count_tokens(generation.text)
+                for generations in response.generations for generation in generations
+            )
+        self.limiter.record_tokens(max(0, extra))
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id)
+
+
+class RateLimitedEmbeddings(Embeddings):
+    """带限流的嵌入模型包装器"""
+
+    def __init__(self, embedding_model: Embeddings, limiter: ProviderRateLimiter):
+        """
+        初始化包装器
+
+        Args:
+            embedding_model: 被包装的嵌入模型
+            limiter: 限流器
+        """
+        self.embedding_model = embedding_model
+        self.limiter = limiter
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """嵌入文档列表"""
+        with self.limiter.limit(sum(count_tokens(text) for text in texts)):
+            return self.embedding_model.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        """嵌入查询文本"""
+        with self.limiter.limit(count_tokens(text)):
+            return self.embedding_model.embed_query(text)
+
+
+# 全局限流器: 名称 -> 限流器
+_rate_limiters: Optional[Dict[str, ProviderRateLimiter]] = None
+_rate_limiters_lock = threading.Lock()
+
+
+def create_rate_limiters_from_config(config) -> Dict[str, ProviderRateLimiter]:
+    """
+    从配置创建限流器
+
+    Args:
+        config: 配置对象（llm_rate_limits: 名称 -> {max_concurrency, requests_per_minute,
+            tokens_per_minute, timeout}，名称为 LLM 提供商或 embedding）
+
+    Returns:
+        名称 -> 限流器
+    """
+    default_timeout = getattr(config, 'llm_rate_limit_timeout', 30.0)
+    limiters = {}
+    for name, limits in (getattr(config, 'llm_rate_limits', None) or {}).items():
+        limiters[name.lower()] = ProviderRateLimiter(
+            name=name.lower(),
+            max_concurrency=(
+                int(limits['max_concurrency']) if limits.get('max_concurrency') else None
+            ),
+            requests_per_minute=limits.get('requests_per_minute'),
+            tokens_per_minute=limits.get('tokens_per_minute'),
+            timeout=limits.get('timeout', default_timeout)
+        )
+    return limiters
+
+
+def get_rate_limiters() -> Dict[str, ProviderRateLimiter]:
+    """获取全局限流器（首次调用时从配置创建）"""
+    global _rate_limiters
+
+    if _rate_limiters is None:
+        with _rate_limiters_lock:
+            if _rate_limiters is None:
+                try:
+                    from ..utils.config import settings
+                    _rate_limiters = create_rate_limiters_from_config(settings)
+                except Exception as e:
+                    print(f"⚠️  限流器初始化失败，限流已关闭: {str(e)}")
+                    _rate_limiters = {}
+
+    return _rate_limiters
+
+
+def get_rate_limiter(name: str) -> Optional[ProviderRateLimiter]:
+    """
+    获取提供商的限流器
+
+    Args:
+        name: LLM 提供商名称或 embedding
+
+    Returns:
+        限流器，未配置时返回 None
+    """
+    return get_rate_limiters().get(name.lower())
+
+
+def set_rate_limiters(limiters: Optional[Dict[str, ProviderRateLimiter]]) -> None:
+    """
+    替换全局限流器
+
+    Args:
+        limiters: 名称 -> 限流器，为 None 时下次调用重新从配置创建
+    """
+    global _rate_limiters
+    _rate_limiters = limiters
@@ -0,0 +1,448 @@
+"""LLM 响应缓存 - 按提示词哈希精确匹配，内存 LRU + 可选持久层（SQLite / Redis 兼容）
+
+只适用于 temperature 为 0 的 LLM（相同提示词应得到相同回答）。
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.language_models.llms import LLM
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from ..utils.tracing import get_current_span
+
+DEFAULT_MEMORY_ENTRIES = 1024
+DEFAULT_PERSISTENT_ENTRIES = 100000
+DEFAULT_TTL = 3600.0
+
+# SQLite 持久层每写入多少次检查一次条目数上限
+_PRUNE_INTERVAL = 100
+
+
+class SQLiteResponseBackend:
+    """SQLite 持久层"""
+
+    def __init__(self, path: str, max_entries: int = DEFAULT_PERSISTENT_ENTRIES):
+        """
+        初始化 SQLite 持久层
+
+        Args:
+            path: 数据库文件路径
+            max_entries: 最多保存的条目数（超出时删除最早写入的条目）
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS llm_responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_responses_created ON llm_responses (created_at)"
+            )
+
+    def get(self, key: str) -> Optional[str]:
+        """读取未过期的条目"""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, expires_at FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= time.time():
+                with self._connection:
+                    self._connection.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                return None
+            return row[0]
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        """写入条目"""
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, value, expires_at, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, now + ttl, now)
+            )
+            self._writes += 1
+            if self._writes % _PRUNE_INTERVAL == 0:
+                self._prune(now)
+
+    def _prune(self, now: float) -> None:
+        """删除过期条目和超出上限的最早条目"""
+        self._connection.execute("DELETE FROM llm_responses WHERE expires_at <= ?", (now,))
+        self._connection.execute(
+            "DELETE FROM llm_responses WHERE key IN ("
+            "SELECT key FROM llm_responses ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def clear(self) -> None:
+        """清空"""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM llm_responses")
+
+    def close(self) -> None:
+        """关闭连接"""
+        with self._lock:
+            self._connection.close()
+
+
+class RedisResponseBackend:
+    """Redis 持久层（任何提供 get/set(ex=)/scan_iter/delete 的客户端均可；条目数上限由 TTL 和服务端 maxmemory 策略控制）"""
+
+    def __init__(self, client: Any, prefix: str = "llm_cache:"):
+        """
+        初始化 Redis 持久层
+
+        Args:
+            client: Redis 客户端
+            prefix: 键前缀
+        """
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(self.prefix + key)
+        if isinstance(value, bytes):
+            value = value.decode('utf-8')
+        return value
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        self.client.set(self.prefix + key, value, ex=max(1, int(ttl)))
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+    def close(self) -> None:
+        close = getattr(self.client, 'close', None)
+        if close:
+            close()
+
+
+class ResponseCache:
+    """两级响应缓存：内存 LRU（带 TTL）+ 可选持久层"""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MEMORY_ENTRIES,
+        ttl: float = DEFAULT_TTL,
+        backend: Optional[Any] = None
+    ):
+        """
+        初始化响应缓存
+
+        Args:
+            max_entries: 内存中最多保存的条目数
+            ttl: 条目有效期（秒）
+            backend: 持久层（SQLiteResponseBackend / RedisResponseBackend），None 表示只使用内存
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.backend = backend
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(llm_string: str, prompt: str, stop: Optional[List[str]] = None) -> str:
+        """
+        生成缓存键
+
+        Args:
+            llm_string: LLM 标识（类型和模型参数）
+            prompt: 提示词
+            stop: 停止词
+
+        Returns:
+            SHA-256 十六进制摘要
+        """
+        payload = json.dumps([llm_string, prompt, stop or []], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        查找缓存
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            缓存的回答，未命中时返回 None
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.memory_hits += 1
+                    return entry[1]
+                del self._entries[key]
+
+        value = None
+        if self.backend is not None:
+            try:
+                value = self.backend.get(key)
+            except Exception as e:
+                print(f"⚠️  读取 LLM 响应缓存失败: {str(e)}")
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.persistent_hits += 1
+            self._put_memory(key, value, now)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            value: 回答
+        """
+        with self._lock:
+            self._put_memory(key, value, time.monotonic())
+
+        if self.backend is not None:
+            try:
+                self.backend.set(key, value, self.ttl)
+            except Exception as e:
+                print(f"⚠️  写入 LLM 响应缓存失败: {str(e)}")
+
+    def _put_memory(self, key: str, value: str, now: float) -> None:
+        self._entries[key] = (now + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """清空缓存和统计"""
+        with self._lock:
+            self._entries.clear()
+            self.memory_hits = self.persistent_hits = self.misses = 0
+        if self.backend is not None:
+            self.backend.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        获取命中率指标
+
+        Returns:
+            memory_hits、persistent_hits、misses、hit_rate、memory_entries
+        """
+        with self._lock:
+            hits = self.memory_hits + self.persistent_hits
+            total = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "persistent_hits": self.persistent_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / total, 4) if total else 0.0,
+                "memory_entries": len(self._entries),
+                "backend": type(self.backend).__name__ if self.backend is not None else None,
+            }
+
+
+def _llm_string(llm: Any) -> str:
+    """LLM 标识：类型 + 模型参数（不同模型或参数的回答不共享缓存）"""
+    try:
+        params = dict(llm._identifying_params)
+    except Exception:
+        params = {}
+    return json.dumps(
+        [getattr(llm, '_llm_type', type(llm).__name__), params], sort_keys=True, default=str
+    )
+
+
+def _messages_key(messages: List[BaseMessage]) -> str:
+    """聊天消息的缓存键内容（消息类型和内容）"""
+    return json.dumps(
+        [[message.type, message.content] for message in messages], ensure_ascii=False, default=str
+    )
+
+
+class CachedLLM(LLM):
+    """带响应缓存的 LLM 包装器（用于普通补全 LLM，聊天模型使用 CachedChatModel）"""
+
+    llm: Any
+    response_cache: Any
+
+    @property
+    def _llm_type(self) -> str:
+        return "cached"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"llm": _llm_string(self.llm)}
+
+    def _call(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> str:
+        key = ResponseCache.make_key(_llm_string(self.llm), prompt, stop)
+        cached = self.response_cache.get(key)
+        get_current_span().set_attribute("cache.hit", cached is not None)
+        if cached is not None:
+            return cached
+
+        text = str(self.llm.invoke(prompt, stop=stop))
+        self.response_cache.set(key, text)
+        return text
+
+
+class CachedChatModel(BaseChatModel):
+    """
+    带响应缓存的聊天模型包装器
+
+    保持聊天模型类型：问答链按模型类型选择提示词，包装成普通 LLM 会从 system + human 的
+    聊天提示词变成补全提示词。
+    """
+
+    llm: Any
+    response_cache: Any
+
+    @property
+    def _llm_type(self) -> str:
+        return "cached-chat"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"llm": _llm_string(self.llm)}
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        key = ResponseCache.make_key(_llm_string(self.llm), _messages_key(messages), stop)
+        text = self.response_cache.get(key)
+        get_current_span().set_attribute("cache.hit", text is not None)
+        if text is None:
+            text = self.llm.invoke(messages, stop=stop).content
+            self.response_cache.set(key, text)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+
+def with_response_cache(llm: Any, cache: ResponseCache, temperature: Optional[float] = None) -> Any:
+    """
+    为 temperature 为 0 的 LLM 挂上响应缓存
+
+    Args:
+        llm: LLM 实例
+        cache: 响应缓存
+        temperature: 温度，None 时读取 llm.temperature
+
+    Returns:
+        聊天模型返回 CachedChatModel，其他 LLM 返回 CachedLLM；温度不为 0 时原样返回 llm
+    """
+    if temperature is None:
+        temperature = getattr(llm, 'temperature', None)
+    if temperature is None or float(temperature) != 0.0:
+        return llm
+    if isinstance(llm, BaseChatModel):
+        return CachedChatModel(llm=llm, response_cache=cache)
+    return CachedLLM(llm=llm, response_cache=cache)
+
+
+# 全局响应缓存
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def create_response_cache_from_config(config) -> Optional[ResponseCache]:
+    """
+    从配置创建响应缓存
+
+    Args:
+        config: 配置对象（llm_response_cache_enabled、llm_response_cache_backend、
+            llm_response_cache_path、llm_response_cache_ttl、llm_response_cache_max_entries、
+            llm_response_cache_persistent_max_entries、redis_*）
+
+    Returns:
+        响应缓存，未启用时返回 None
+    """
+    if not getattr(config, 'llm_response_cache_enabled', False):
+        return None
+
+    backend_type = config.llm_response_cache_backend.lower()
+    if backend_type == "memory":
+        backend = None
+    elif backend_type == "sqlite":
+        backend = SQLiteResponseBackend(
+            config.llm_response_cache_path,
+            max_entries=getattr(
+                config, 'llm_response_cache_persistent_max_entries', DEFAULT_PERSISTENT_ENTRIES
+            )
+        )
+    elif backend_type == "redis":
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("请安装 redis: pip install redis")
+        backend = RedisResponseBackend(redis.Redis(
+            host=config.redis_host,
+            port=config.redis_port,
+            password=config.redis_password or None,
+            db=config.redis_db
+        ))
+    else:
+        raise ValueError(f"不支持的 LLM 响应缓存后端: {backend_type}")
+
+    return ResponseCache(
+        max_entries=config.llm_response_cache_max_entries,
+        ttl=config.llm_response_cache_ttl,
+        backend=backend
+    )
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """获取全局响应缓存（首次调用时从配置创建，未启用时返回 None）"""
+    global _response_cache
+
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                try:
+                    from ..utils.config import settings
+                    _response_cache = create_response_cache_from_config(settings) or False
+                except Exception as e:
+                    print(f"⚠️  LLM 响应缓存初始化失败，缓存已关闭: {str(e)}")
+                    _response_cache = False
+
+    return _response_cache or None
+
+
+def set_response_cache(cache: Optional[ResponseCache]) -> None:
+    """
+    替换全局响应缓存
+
+    Args:
+        cache: 响应缓存，为 None 时下次调用重新从配置创建
+    """
+    global _response_cache
+    _response_cache = cache
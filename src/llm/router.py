@@ -0,0 +1,372 @@
+"""多提供商路由 - 按滚动 p95 延迟选择最快的健康提供商，超过延迟预算时发出备用请求，出错时熔断"""
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.language_models.llms import LLM
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from .rate_limiter import RateLimitTimeout
+from ..utils.tracing import get_tracer
+
+# 每个提供商保留的最近延迟样本数
+LATENCY_WINDOW = 100
+
+# 样本数达到该值后才按 p95 参与排序
+MIN_LATENCY_SAMPLES = 5
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """路由请求共用的线程池（落后的请求在后台完成，只用于更新延迟统计）"""
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-route")
+
+    return _executor
+
+
+class ProvidersUnavailable(RuntimeError):
+    """所有提供商都处于熔断状态"""
+
+
+class _ProviderState:
+    """单个提供商的延迟样本和熔断状态"""
+
+    __slots__ = ('latencies', 'failures', 'open_until', 'trial')
+
+    def __init__(self):
+        self.latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self.failures = 0
+        self.open_until = 0.0
+        self.trial = False
+
+    def p95(self) -> Optional[float]:
+        if len(self.latencies) < MIN_LATENCY_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+
+class ProviderRouter:
+    """
+    提供商路由器
+
+    排序：已有足够样本的健康提供商按 p95 从低到高，其余按配置顺序排在后面。
+    熔断：连续失败 failure_threshold 次后熔断 cooldown 秒，之后放行一次试探请求（半开），
+    试探成功则恢复，失败则继续熔断。
+    """
+
+    def __init__(
+        self,
+        backends: Dict[str, Any],
+        hedge_delay: Optional[float] = 2.0,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0
+    ):
+        """
+        初始化路由器
+
+        Args:
+            backends: 提供商名称 -> LLM 实例（按优先级排列）
+            hedge_delay: 主请求超过该秒数仍未返回时发出备用请求，None 表示不发备用请求
+            failure_threshold: 连续失败多少次后熔断
+            cooldown: 熔断持续秒数
+        """
+        if not backends:
+            raise ValueError("至少需要一个提供商")
+
+        self.backends = dict(backends)
+        self.hedge_delay = hedge_delay
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._states = {name: _ProviderState() for name in self.backends}
+        self._lock = threading.Lock()
+
+    def _available(self, state: _ProviderState, now: float) -> bool:
+        if state.failures < self.failure_threshold:
+            return True
+        # 半开：熔断到期后只放行一个试探请求
+        return now >= state.open_until and not state.trial
+
+    def ranked(self) -> List[str]:
+        """
+        获取可用提供商，按优先级排列
+
+        Returns:
+            提供商名称列表（不包括熔断中的提供商）
+        """
+        now = time.monotonic()
+        with self._lock:
+            candidates = []
+            for index, name in enumerate(self.backends):
+                state = self._states[name]
+                if not self._available(state, now):
+                    continue
+                p95 = state.p95()
+                candidates.append(((0, p95, index) if p95 is not None else (1, 0.0, index), name))
+
+        return [name for _, name in sorted(candidates)]
+
+    def _claim(self, name: str) -> bool:
+        """发出请求前再次检查可用性，半开状态的提供商标记为试探中"""
+        with self._lock:
+            state = self._states[name]
+            if not self._available(state, time.monotonic()):
+                return False
+            if state.failures >= self.failure_threshold:
+                state.trial = True
+            return True
+
+    def _record(self, name: str, latency: Optional[float]) -> None:
+        """记录请求结果（latency 为 None 表示失败）"""
+        with self._lock:
+            state = self._states[name]
+            state.trial = False
+            if latency is not None:
+                state.failures = 0
+                state.latencies.append(latency)
+            else:
+                state.failures += 1
+                if state.failures >= self.failure_threshold:
+                    state.open_until = time.monotonic() + self.cooldown
+
+    def _release(self, name: str) -> None:
+        """请求没有到达提供商，释放试探标记，不记录结果"""
+        with self._lock:
+            self._states[name].trial = False
+
+    def _call(self, name: str, prompt: Any, stop: Optional[List[str]]) -> str:
+        """调用单个提供商"""
+        start = time.monotonic()
+        try:
+            result = self.backends[name].invoke(prompt, stop=stop)
+        except RateLimitTimeout:
+            # 本地限流排队超时不是提供商故障，不计入熔断
+            self._release(name)
+            raise
+        except Exception:
+            self._record(name, None)
+            raise
+        self._record(name, time.monotonic() - start)
+        # 聊天模型返回消息对象，普通 LLM 返回字符串
+        return result.content if hasattr(result, 'content') else str(result)
+
+    def invoke(self, prompt: Any, stop: Optional[List[str]] = None) -> Tuple[str, str, bool]:
+        """
+        路由请求
+
+        Args:
+            prompt: 提示词，或聊天消息列表（原样交给各提供商的 invoke）
+            stop: 停止词
+
+        Returns:
+            (回答, 返回回答的提供商, 是否发出了备用请求)
+
+        Raises:
+            ProvidersUnavailable: 所有提供商都处于熔断状态
+            最后一个提供商的异常: 所有可用提供商都失败
+        """
+        candidates = self.ranked()
+        pending: Dict[Future, str] = {}
+        errors: List[Exception] = []
+        hedged = False
+
+        def launch() -> bool:
+            while candidates:
+                name = candidates.pop(0)
+                if self._claim(name):
+                    context = contextvars.copy_context()
+                    future = _get_executor().submit(context.run, self._call, name, prompt, stop)
+                    pending[future] = name
+                    return True
+            return False
+
+        if not launch():
+            raise ProvidersUnavailable("所有 LLM 提供商都处于熔断状态，请稍后重试")
+
+        while pending:
+            timeout = self.hedge_delay if candidates and self.hedge_delay is not None else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                # 超过延迟预算，发出备用请求（原请求继续等待）
+                hedged = launch() or hedged
+                continue
+
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    return future.result(), name, hedged
+                except Exception as e:
+                    errors.append(e)
+                    print(f"⚠️  LLM 提供商 {name} 调用失败: {str(e)}")
+
+            # 出错时立即切换到下一个提供商
+            if not pending:
+                launch()
+
+        if errors:
+            raise errors[-1]
+        raise ProvidersUnavailable("所有 LLM 提供商都处于熔断状态，请稍后重试")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        获取各提供商状态
+
+        Returns:
+            提供商名称 -> {samples, p95_ms, failures, state}
+        """
+        now = time.monotonic()
+        with self._lock:
+            result = {}
+            for name, state in self._states.items():
+                p95 = state.p95()
+                if state.failures < self.failure_threshold:
+                    circuit = "closed"
+                elif now >= state.open_until:
+                    circuit = "half_open"
+                else:
+                    circuit = "open"
+                result[name] = {
+                    "samples": len(state.latencies),
+                    "p95_ms": round(p95 * 1000, 3) if p95 is not None else None,
+                    "failures": state.failures,
+                    "state": circuit,
+                }
+            return result
+
+
+def _route(router: ProviderRouter, prompt: Any, stop: Optional[List[str]]) -> str:
+    """路由请求并记录提供商和是否发出了备用请求"""
+    with get_tracer().span("llm.route") as span:
+        text, provider, hedged = router.invoke(prompt, stop=stop)
+        span.set_attributes({"llm.provider": provider, "llm.hedged": hedged})
+    return text
+
+
+class RoutingLLM(LLM):
+    """在多个提供商之间路由的 LLM（可直接用于 RetrievalQA、ConversationChain 等链）"""
+
+    router: Any
+
+    @property
+    def _llm_type(self) -> str:
+        return "routing"
+
+    def _call(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> str:
+        return _route(self.router, prompt, stop)
+
+
+class RoutingChatModel(BaseChatModel):
+    """
+    在多个聊天模型之间路由的聊天模型
+
+    消息原样交给各提供商，链仍按聊天模型选择提示词（如 RetrievalQA 的 system + human 提示词）。
+    """
+
+    router: Any
+
+    @property
+    def _llm_type(self) -> str:
+        return "routing-chat"
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        text = _route(self.router, messages, stop)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+
+def create_routing_llm(router: ProviderRouter) -> Any:
+    """
+    为路由器创建 LangChain 模型
+
+    Args:
+        router: 提供商路由器
+
+    Returns:
+        所有提供商都是聊天模型时返回 RoutingChatModel，否则返回 RoutingLLM
+    """
+    if all(isinstance(backend, BaseChatModel) for backend in router.backends.values()):
+        return RoutingChatModel(router=router)
+    return RoutingLLM(router=router)
+
+
+# 路由 LLM 缓存（延迟统计和熔断状态需要在请求之间保留）
+_routers: Dict[Tuple, Any] = {}
+_routers_lock = threading.Lock()
+
+
+def get_routing_llm_from_config(config) -> Any:
+    """
+    从配置获取路由 LLM（相同配置返回同一个实例；所有提供商都是聊天模型时为 RoutingChatModel）
+
+    Args:
+        config: 配置对象（llm_routing_providers、llm_routing_models、llm_hedge_delay、
+            llm_circuit_failure_threshold、llm_circuit_cooldown 及各提供商的 API 配置）
+
+    Returns:
+        路由 LLM
+    """
+    from .llm_cache import get_cached_llm
+
+    providers = [name.lower() for name in config.llm_routing_providers]
+    models = {
+        name.lower(): model
+        for name, model in (getattr(config, 'llm_routing_models', None) or {}).items()
+    }
+    key = (
+        tuple((name, models.get(name)) for name in providers),
+        config.default_model_name, config.default_temperature, config.default_max_tokens,
+        config.llm_hedge_delay, config.llm_circuit_failure_threshold, config.llm_circuit_cooldown,
+    )
+
+    with _routers_lock:
+        if key in _routers:
+            return _routers[key]
+
+        backends = {}
+        for name in providers:
+            # 默认提供商使用 default_model_name，其他提供商未指定模型时使用工厂默认模型
+            model_name = models.get(name) or (
+                config.default_model_name if name == config.default_llm_provider.lower() else None
+            )
+            backends[name] = get_cached_llm(
+                provider=name,
+                model_name=model_name,
+                temperature=config.default_temperature,
+                max_tokens=config.default_max_tokens,
+                api_key=getattr(config, f"{name}_api_key", None),
+                api_base=getattr(config, f"{name}_api_base", None),
+            )
+
+        router = ProviderRouter(
+            backends,
+            hedge_delay=config.llm_hedge_delay,
+            failure_threshold=config.llm_circuit_failure_threshold,
+            cooldown=config.llm_circuit_cooldown
+        )
+        llm = create_routing_llm(router)
+        _routers[key] = llm
+        return llm
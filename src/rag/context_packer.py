@@ -0,0 +1,189 @@
+"""上下文组装 - 按表去重、合并 schema/示例数据文档，并按 token 预算裁剪"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain.schema import Document
+
+from ..utils.tokenizer import count_tokens, count_tokens_batch
+
+# 默认上下文 token 预算
+DEFAULT_CONTEXT_MAX_TOKENS = 3000
+
+# 剩余预算少于该值时不再截断放入文档片段（片段太短没有意义）
+MIN_PART_TOKENS = 32
+
+# 同一个表内各类文档的排列顺序（预算不足时也按该顺序优先保留）
+_TYPE_PRIORITY = {"schema": 0, "profile": 1, "data": 2}
+
+
+def _merge_lines(texts: List[str]) -> str:
+    """合并多段文本，去掉已出现过的非空行（分块 schema 重复的表头、重叠的字段行），并压缩连续空行"""
+    seen = set()
+    lines: List[str] = []
+    for text in texts:
+        for line in text.splitlines():
+            if line.strip():
+                if line in seen:
+                    continue
+                seen.add(line)
+            elif not lines or not lines[-1].strip():
+                continue
+            lines.append(line)
+
+    while lines and not lines[-1].strip():
+        lines.pop()
+    return "\n".join(lines)
+
+
+def _truncate(text: str, max_tokens: int, model_name: Optional[str]) -> str:
+    """按行截断文本到 token 上限以内"""
+    lines = text.splitlines(keepends=True)
+    kept: List[str] = []
+    used = 0
+    for line, tokens in zip(lines, count_tokens_batch(lines, model_name)):
+        if used + tokens > max_tokens:
+            break
+        kept.append(line)
+        used += tokens
+    return "".join(kept).rstrip()
+
+
+class ContextPacker:
+    """
+    上下文组装器
+
+    1. 按 metadata['table_name'] 分组，同一个表的 schema 分块、字段统计和示例数据合并为一个文档，
+       重复的文档和重复的行只保留一份；没有表名的文档按内容去重后单独保留
+    2. 按 token 预算选择内容：先放入各表的 schema（按检索排名），再放入字段统计，最后放入示例数据，
+       放不下的片段按行截断
+    3. 统计组装前后的 token 数
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = DEFAULT_CONTEXT_MAX_TOKENS,
+        model_name: Optional[str] = None
+    ):
+        """
+        初始化上下文组装器
+
+        Args:
+            max_tokens: 上下文 token 预算
+            model_name: 计算 token 使用的模型名称
+        """
+        self.max_tokens = max_tokens
+        self.model_name = model_name
+
+    def _group(self, documents: List[Document]) -> List[Dict[str, Any]]:
+        """按表名分组（保持首次出现的顺序），组内按类型合并"""
+        groups: Dict[Any, Dict[str, Any]] = {}
+        seen_contents = set()
+
+        for index, doc in enumerate(documents):
+            if doc.page_content in seen_contents:
+                continue
+            seen_contents.add(doc.page_content)
+
+            table_name = doc.metadata.get('table_name')
+            key = ('table', table_name) if table_name else ('doc', index)
+            group = groups.setdefault(key, {
+                'table_name': table_name,
+                'metadata': dict(doc.metadata),
+                'sources': [],
+                'parts': {},
+            })
+            source = doc.metadata.get('source')
+            if source and source not in group['sources']:
+                group['sources'].append(source)
+
+            doc_type = doc.metadata.get('type') if table_name else None
+            group['parts'].setdefault(doc_type, []).append(doc)
+
+        result = []
+        for group in groups.values():
+            parts = []
+            for doc_type, docs in group['parts'].items():
+                docs = sorted(docs, key=lambda d: d.metadata.get('chunk_index', 0))
+                text = _merge_lines([doc.page_content for doc in docs])
+                if text:
+                    parts.append((_TYPE_PRIORITY.get(doc_type, 0), doc_type, text))
+            group['parts'] = sorted(parts, key=lambda part: part[0])
+            result.append(group)
+        return result
+
+    def pack(self, documents: List[Document]) -> Tuple[List[Document], Dict[str, Any]]:
+        """
+        组装上下文
+
+        Args:
+            documents: 检索得到的文档（按相关性排序）
+
+        Returns:
+            (组装后的文档列表, 统计信息)；统计信息包括 original_docs、packed_docs、
+            original_tokens、packed_tokens、saved_tokens、saved_ratio、truncated
+        """
+        original_tokens = sum(
+            count_tokens_batch([doc.page_content for doc in documents], self.model_name)
+        )
+        groups = self._group(documents)
+
+        # 按 (类型优先级, 检索排名) 分配预算
+        candidates = [
+            (priority, rank, position, text)
+            for rank, group in enumerate(groups)
+            for position, (priority, _, text) in enumerate(group['parts'])
+        ]
+        candidates.sort(key=lambda candidate: (candidate[0], candidate[1]))
+        token_counts = count_tokens_batch(
+            [candidate[3] for candidate in candidates], self.model_name
+        )
+
+        selected: Dict[Tuple[int, int], str] = {}
+        remaining = self.max_tokens
+        truncated = 0
+        for (_, rank, position, text), tokens in zip(candidates, token_counts):
+            if tokens <= remaining:
+                selected[(rank, position)] = text
+                remaining -= tokens
+            elif remaining >= MIN_PART_TOKENS:
+                text = _truncate(text, remaining, self.model_name)
+                if text:
+                    selected[(rank, position)] = text
+                    remaining -= count_tokens(text, self.model_name)
+                    truncated += 1
+
+        packed = []
+        for rank, group in enumerate(groups):
+            texts = [
+                selected[(rank, position)]
+                for position in range(len(group['parts']))
+                if (rank, position) in selected
+            ]
+            if not texts:
+                continue
+
+            metadata = group['metadata']
+            if group['table_name']:
+                metadata = {
+                    key: value for key, value in metadata.items()
+                    if key not in ('chunk_index', 'chunk_count')
+                }
+                metadata['source'] = ", ".join(group['sources'])
+                types = [doc_type for _, doc_type, _ in group['parts'] if doc_type]
+                if len(types) > 1:
+                    metadata['type'] = "table"
+            packed.append(Document(page_content="\n\n".join(texts), metadata=metadata))
+
+        packed_tokens = sum(
+            count_tokens_batch([doc.page_content for doc in packed], self.model_name)
+        )
+        saved = max(0, original_tokens - packed_tokens)
+        stats = {
+            "original_docs": len(documents),
+            "packed_docs": len(packed),
+            "original_tokens": original_tokens,
+            "packed_tokens": packed_tokens,
+            "saved_tokens": saved,
+            "saved_ratio": round(saved / original_tokens, 4) if original_tokens else 0.0,
+            "truncated": truncated,
+        }
+        return packed, stats
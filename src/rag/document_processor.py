@@ -1,22 +1,173 @@
 """文档处理模块"""
-from typing import List, Dict, Any
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import chain, islice
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple, Union
 from langchain.schema import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
+from ..database.columnar import ColumnarResult
+from ..utils.tokenizer import count_tokens, count_tokens_batch
+
+# 表数量达到该值时使用进程池构建 schema 文本
+DEFAULT_PARALLEL_THRESHOLD = 1000
+# 每个任务处理的表数量（减少进程间通信次数）
+PARALLEL_CHUNK_SIZE = 64
+
+
+def _schema_header(table_name: str, table_info: Dict[str, Any]) -> str:
+    """构建 schema 文本的表头（表名、说明），分块时在每块重复"""
+    parts = [f"表名: {table_name}\n\n"]
+    
+    if 'comment' in table_info:
+        parts.append(f"说明: {table_info['comment']}\n\n")
+    
+    parts.append("字段信息:\n")
+    
+    return "".join(parts)
+
+
+def _column_lines(table_info: Dict[str, Any]) -> List[str]:
+    """构建每个字段的文本行（每个字段一次格式化，避免逐段追加）"""
+    lines = []
+    for col_name, col_info in table_info.get('columns', {}).items():
+        col_key = col_info.get('key', '')
+        col_comment = col_info.get('comment', '')
+        lines.append(
+            f"  - {col_name} ({col_info.get('type', '')})"
+            f"{f' [{col_key}]' if col_key else ''}"
+            f"{'' if col_info.get('nullable', False) else ' [NOT NULL]'}"
+            f"{f': {col_comment}' if col_comment else ''}\n"
+        )
+    return lines
+
+
+def build_schema_text(table_name: str, table_info: Dict[str, Any]) -> str:
+    """
+    构建单个表的 schema 文本
+    
+    Args:
+        table_name: 表名
+        table_info: 表结构信息
+        
+    Returns:
+        schema 文本
+    """
+    return _schema_header(table_name, table_info) + "".join(_column_lines(table_info))
+
+
+def build_schema_chunks(
+    table_name: str,
+    table_info: Dict[str, Any],
+    max_tokens: Optional[int] = None,
+    model_name: Optional[str] = None
+) -> List[str]:
+    """
+    构建单个表的 schema 文本，超过 token 上限时按字段边界分块，每块重复表头
+    
+    Args:
+        table_name: 表名
+        table_info: 表结构信息
+        max_tokens: 每块最大 token 数，为 None 时不分块
+        model_name: 计算 token 使用的模型名称
+        
+    Returns:
+        文本块列表（未超过上限时只有一块，与 build_schema_text 一致）
+    """
+    header = _schema_header(table_name, table_info)
+    lines = _column_lines(table_info)
+    
+    if max_tokens is None:
+        return [header + "".join(lines)]
+    
+    header_tokens = count_tokens(header, model_name)
+    line_tokens = count_tokens_batch(lines, model_name)
+    
+    if header_tokens + sum(line_tokens) <= max_tokens:
+        return [header + "".join(lines)]
+    
+    chunks = []
+    current: List[str] = []
+    current_tokens = header_tokens
+    
+    for line, tokens in zip(lines, line_tokens):
+        # 单个字段超过上限时单独成块
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(header + "".join(current))
+            current = []
+            current_tokens = header_tokens
+        current.append(line)
+        current_tokens += tokens
+    
+    chunks.append(header + "".join(current))
+    
+    return chunks
+
+
+def build_sample_text(table_name: str, rows: Iterable[Iterable[Tuple[str, Any]]]) -> str:
+    """
+    构建示例数据文本
+    
+    Args:
+        table_name: 表名
+        rows: 每行为 (字段名, 值) 序列
+        
+    Returns:
+        示例数据文本
+    """
+    parts = [f"表 {table_name} 的示例数据:\n\n"]
+    
+    for i, row in enumerate(rows, 1):
+        parts.append(f"记录 {i}:\n")
+        parts.extend([f"  {key}: {value}\n" for key, value in row])
+        parts.append("\n")
+    
+    return "".join(parts)
+
+
+def _build_schema_texts(
+    items: List[Tuple[str, Dict[str, Any]]],
+    max_tokens: Optional[int] = None,
+    model_name: Optional[str] = None
+) -> List[List[str]]:
+    """批量构建 schema 文本块（进程池任务）"""
+    return [
+        build_schema_chunks(table_name, table_info, max_tokens, model_name)
+        for table_name, table_info in items
+    ]
+
 
 class DocumentProcessor:
     """文档处理器"""
     
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        max_workers: Optional[int] = None,
+        parallel_threshold: int = DEFAULT_PARALLEL_THRESHOLD,
+        schema_chunk_tokens: Optional[int] = None,
+        tokenizer_model: Optional[str] = None
+    ):
         """
         初始化文档处理器
         
         Args:
             chunk_size: 文本块大小
             chunk_overlap: 文本块重叠大小
+            max_workers: 构建 schema 文本的进程数，默认为 CPU 核数，1 表示不使用进程池
+            parallel_threshold: 表数量达到该值时使用进程池
+            schema_chunk_tokens: schema 文档每块最大 token 数，为 None 时每个表一个文档
+            tokenizer_model: 计算 token 使用的模型名称（决定 tiktoken 编码）
         """
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.schema_chunk_tokens = schema_chunk_tokens
+        self.tokenizer_model = tokenizer_model
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.parallel_threshold = parallel_threshold
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
@@ -27,66 +178,129 @@ class DocumentProcessor:
         """
         处理数据库 schema，转换为文档
         
+        设置了 schema_chunk_tokens 时，超过上限的宽表按字段边界拆分为多个文档，每个
+        文档都包含表头，metadata 中记录 chunk_index / chunk_count。
+        
         Args:
             schema: 数据库结构信息
             
         Returns:
             文档列表
         """
-        documents = []
+        return list(self.iter_database_schema(schema.items()))
+    
+    def iter_database_schema(
+        self,
+        items: Iterable[Tuple[str, Dict[str, Any]]]
+    ) -> Iterator[Document]:
+        """
+        流式处理数据库 schema，按输入顺序逐个表产出文档
         
-        for table_name, table_info in schema.items():
-            # 构建表信息文本
-            text = f"表名: {table_name}\n\n"
-            
-            if 'comment' in table_info:
-                text += f"说明: {table_info['comment']}\n\n"
-            
-            text += "字段信息:\n"
-            
-            columns = table_info.get('columns', {})
-            for col_name, col_info in columns.items():
-                col_type = col_info.get('type', '')
-                col_comment = col_info.get('comment', '')
-                col_nullable = col_info.get('nullable', False)
-                col_key = col_info.get('key', '')
-                
-                text += f"  - {col_name} ({col_type})"
-                
-                if col_key:
-                    text += f" [{col_key}]"
-                if not col_nullable:
-                    text += " [NOT NULL]"
-                if col_comment:
-                    text += f": {col_comment}"
-                
-                text += "\n"
+        先读取 parallel_threshold 个表，达到阈值时整个流改用进程池构建文本（最多同时
+        提交 2 倍进程数的任务，不会一次读入全部表），输出与串行构建完全一致。
+        
+        Args:
+            items: (表名, 表结构信息) 序列，可以是逐个表获取的迭代器
             
-            # 创建文档
-            doc = Document(
-                page_content=text,
-                metadata={
+        Yields:
+            文档
+        """
+        items = iter(items)
+        build = partial(
+            _build_schema_texts,
+            max_tokens=self.schema_chunk_tokens,
+            model_name=self.tokenizer_model
+        )
+        
+        head = list(islice(items, self.parallel_threshold))
+        if self.max_workers > 1 and head and len(head) >= self.parallel_threshold:
+            table_chunks = self._iter_schema_texts_parallel(chain(head, items), build)
+        else:
+            table_chunks = (
+                (table_name, build([(table_name, table_info)])[0])
+                for table_name, table_info in chain(head, items)
+            )
+        
+        for table_name, chunks in table_chunks:
+            for i, text in enumerate(chunks):
+                metadata = {
                     "source": "database_schema",
                     "table_name": table_name,
                     "type": "schema"
                 }
-            )
-            
-            documents.append(doc)
+                if len(chunks) > 1:
+                    metadata["chunk_index"] = i
+                    metadata["chunk_count"] = len(chunks)
+                yield Document(page_content=text, metadata=metadata)
+    
+    def _iter_schema_texts_parallel(
+        self,
+        items: Iterator[Tuple[str, Dict[str, Any]]],
+        build
+    ) -> Iterator[Tuple[str, List[str]]]:
+        """使用进程池流式构建 schema 文本块（按顺序产出 (表名, 文本块列表)）"""
+        batches = iter(lambda: list(islice(items, PARALLEL_CHUNK_SIZE)), [])
+        max_pending = self.max_workers * 2
+        pending = deque()
+        executor = None
         
-        return documents
+        try:
+            try:
+                executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            except Exception as e:
+                print(f"⚠️  创建进程池失败，改为串行构建 schema 文档: {str(e)}")
+            
+            for batch in batches:
+                if executor is not None:
+                    try:
+                        pending.append((batch, executor.submit(build, batch)))
+                        batch = None
+                    except Exception as e:
+                        # 受限环境（如不允许创建子进程）下退回串行构建
+                        print(f"⚠️  进程池构建 schema 文档失败，改为串行构建: {str(e)}")
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        executor = None
+                
+                while pending and (batch is not None or len(pending) >= max_pending):
+                    done_batch, future = pending.popleft()
+                    yield from zip(
+                        (name for name, _ in done_batch),
+                        self._future_texts(future, done_batch, build)
+                    )
+                
+                if batch is not None:
+                    yield from zip((name for name, _ in batch), build(batch))
+            
+            while pending:
+                done_batch, future = pending.popleft()
+                yield from zip(
+                    (name for name, _ in done_batch),
+                    self._future_texts(future, done_batch, build)
+                )
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+    
+    @staticmethod
+    def _future_texts(future, batch, build) -> List[List[str]]:
+        """读取进程池任务结果，子进程失败时在当前进程重新构建"""
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"⚠️  进程池构建 schema 文档失败，改为串行构建: {str(e)}")
+            return build(batch)
     
     def process_sample_data(
         self,
         table_name: str,
-        sample_data: List[Dict[str, Any]]
+        sample_data: Union[List[Dict[str, Any]], ColumnarResult]
     ) -> List[Document]:
         """
         处理示例数据
         
         Args:
             table_name: 表名
-            sample_data: 示例数据
+            sample_data: 示例数据，行字典列表或列式结果
             
         Returns:
             文档列表
@@ -94,17 +308,16 @@ class DocumentProcessor:
         if not sample_data:
             return []
         
-        # 构建示例数据文本
-        text = f"表 {table_name} 的示例数据:\n\n"
-        
-        for i, row in enumerate(sample_data, 1):
-            text += f"记录 {i}:\n"
-            for key, value in row.items():
-                text += f"  {key}: {value}\n"
-            text += "\n"
+        if isinstance(sample_data, ColumnarResult):
+            # 直接按列读取，不构造行字典
+            columns = sample_data.columns
+            column_values = [sample_data.column(name).tolist() for name in columns]
+            rows = (zip(columns, values) for values in zip(*column_values))
+        else:
+            rows = (row.items() for row in sample_data)
         
         doc = Document(
-            page_content=text,
+            page_content=build_sample_text(table_name, rows),
             metadata={
                 "source": "sample_data",
                 "table_name": table_name,
@@ -114,6 +327,58 @@ class DocumentProcessor:
         
         return [doc]
     
+    def process_column_statistics(
+        self,
+        table_name: str,
+        statistics: Optional[Dict[str, Any]]
+    ) -> List[Document]:
+        """
+        处理字段统计信息，每个表生成一个紧凑的统计文档
+        
+        Args:
+            table_name: 表名
+            statistics: get_column_statistics 返回的统计信息
+            
+        Returns:
+            文档列表
+        """
+        if not statistics or not statistics.get('columns'):
+            return []
+        
+        row_count = statistics.get('row_count')
+        lines = [f"表 {table_name} 的字段统计"]
+        if row_count is not None:
+            lines.append(f"（约 {int(row_count)} 行）")
+        lines.append(":\n")
+        
+        for col_name, col_stats in statistics['columns'].items():
+            parts = []
+            if col_stats.get('distinct') is not None:
+                parts.append(f"不同值约 {int(round(col_stats['distinct']))}")
+            if col_stats.get('null_fraction') is not None:
+                parts.append(f"空值 {col_stats['null_fraction']:.1%}")
+            if col_stats.get('min') is not None or col_stats.get('max') is not None:
+                parts.append(f"范围 [{col_stats.get('min')}, {col_stats.get('max')}]")
+            if col_stats.get('top_values'):
+                top_values = ", ".join(
+                    f"{value} ({frequency:.0%})" for value, frequency in col_stats['top_values']
+                )
+                parts.append(f"常见值 {top_values}")
+            
+            if parts:
+                lines.append(f"  - {col_name}: {'; '.join(parts)}\n")
+        
+        doc = Document(
+            page_content="".join(lines),
+            metadata={
+                "source": "column_statistics",
+                "table_name": table_name,
+                "type": "profile"
+            }
+        )
+        
+        return [doc]
+    
     def process_text_documents(self, texts: List[str]) -> List[Document]:
         """
         处理文本文档
@@ -1,9 +1,21 @@
 """RAG 检索引擎"""
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Dict, Any
 from langchain.schema import Document
 from langchain.chains import RetrievalQA
 from langchain.prompts import PromptTemplate
 
+from .context_packer import ContextPacker
+from ..vectorstore.mmr import (
+    DEFAULT_MMR_FETCH_K,
+    DEFAULT_MMR_LAMBDA,
+    SEARCH_TYPE_SIMILARITY,
+    SEARCH_TYPES,
+)
+from ..utils.tokenizer import count_tokens
+from ..utils.tracing import get_tracer
+
 
 class RAGRetriever:
     """RAG 检索引擎"""
@@ -13,7 +25,15 @@ class RAGRetriever:
         vectorstore_manager,
         llm,
         top_k: int = 5,
-        similarity_threshold: float = 0.7
+        similarity_threshold: float = 0.7,
+        context_max_tokens: Optional[int] = None,
+        tokenizer_model: Optional[str] = None,
+        reranker=None,
+        rerank_candidates: Optional[int] = None,
+        search_type: str = SEARCH_TYPE_SIMILARITY,
+        mmr_lambda: float = DEFAULT_MMR_LAMBDA,
+        mmr_fetch_k: int = DEFAULT_MMR_FETCH_K,
+        metadata_filter: Optional[Dict[str, Any]] = None
     ):
         """
         初始化 RAG 检索引擎
@@ -23,11 +43,32 @@ class RAGRetriever:
             llm: 大语言模型
             top_k: 返回文档数量
             similarity_threshold: 相似度阈值
+            context_max_tokens: 上下文 token 预算，设置后检索结果按表去重合并并裁剪到预算以内
+            tokenizer_model: 计算 token 使用的模型名称
+            reranker: 重排序器（CrossEncoderReranker），设置后先召回 rerank_candidates 个候选文档再重排序
+            rerank_candidates: 重排序候选文档数，默认为 top_k 的 4 倍
+            search_type: 检索模式，similarity 按相似度，mmr 兼顾相关性和多样性（同一个表的文档不再挤占其他表）
+            mmr_lambda: MMR 相关性权重（0-1）
+            mmr_fetch_k: MMR 候选文档数
+            metadata_filter: 元数据过滤条件（source / table_name / type），在向量检索前过滤
         """
+        if search_type not in SEARCH_TYPES:
+            raise ValueError(f"不支持的检索模式: {search_type}")
+        
         self.vectorstore_manager = vectorstore_manager
         self.llm = llm
         self.top_k = top_k
         self.similarity_threshold = similarity_threshold
+        self.context_packer = (
+            ContextPacker(max_tokens=context_max_tokens, model_name=tokenizer_model)
+            if context_max_tokens else None
+        )
+        self.reranker = reranker
+        self.rerank_candidates = max(rerank_candidates or top_k * 4, top_k)
+        self.search_type = search_type
+        self.mmr_lambda = mmr_lambda
+        self.mmr_fetch_k = mmr_fetch_k
+        self.metadata_filter = metadata_filter or None
         
         # 创建检索器
         self.retriever = self.vectorstore_manager.as_retriever(
@@ -44,14 +85,56 @@ class RAGRetriever:
         Returns:
             相关文档列表
         """
-        docs = self.vectorstore_manager.similarity_search(
-            query=query,
-            k=self.top_k,
+        docs = self._search(
+            query,
+            k=self.rerank_candidates if self.reranker else self.top_k,
             score_threshold=self.similarity_threshold
         )
         
+        if self.reranker:
+            docs = self._rerank(query, docs)
+        
         return docs
     
+    def _rerank(self, query: str, docs: List[Document]) -> List[Document]:
+        """重排序候选文档"""
+        with get_tracer().span("rag.rerank", top_k=self.top_k):
+            return self.reranker.rerank(query, docs, self.top_k)
+    
+    def _search(
+        self,
+        query: str,
+        k: int,
+        score_threshold: Optional[float] = None
+    ) -> List[Document]:
+        """按检索模式召回文档（MMR 模式不使用相似度阈值）"""
+        return self.vectorstore_manager.search(
+            query,
+            k=k,
+            search_type=self.search_type,
+            score_threshold=score_threshold,
+            fetch_k=max(self.mmr_fetch_k, k),
+            lambda_mult=self.mmr_lambda,
+            metadata_filter=self.metadata_filter
+        )
+    
+    def _uses_default_retriever(self) -> bool:
+        """是否可以直接使用向量数据库的默认检索器（相似度检索，不重排序、不过滤）"""
+        return (
+            self.reranker is None
+            and self.search_type == SEARCH_TYPE_SIMILARITY
+            and not self.metadata_filter
+        )
+    
+    def _retrieve_for_query(self, question: str) -> List[Document]:
+        """检索问答使用的文档（启用重排序时先多召回候选文档）"""
+        if self._uses_default_retriever():
+            return self.retriever.get_relevant_documents(question)
+        
+        k = self.rerank_candidates if self.reranker else self.top_k
+        candidates = self._search(question, k=k)
+        return self._rerank(question, candidates) if self.reranker else candidates
+    
     def create_qa_chain(
         self,
         chain_type: str = "stuff",
@@ -95,18 +178,134 @@ class RAGRetriever:
             return_sources: 是否返回来源文档
             
         Returns:
-            查询结果
+            查询结果（启用上下文组装时包含 context_stats）
+        """
+        with get_tracer().span("rag.query", top_k=self.top_k, search_type=self.search_type) as span:
+            # 创建默认的问答链
+            qa_chain = self.create_qa_chain()
+            
+            if self.context_packer is None and self._uses_default_retriever():
+                # 执行查询
+                result = qa_chain({"query": question})
+            else:
+                # 检索（重排序）、组装上下文后，再交给问答链生成回答
+                result = self._answer(qa_chain, question, self._retrieve_for_query(question), span)
+            
+            self._record_query_attributes(span, question, result)
+        
+        return self._format_response(result, return_sources)
+    
+    def batch_query(
+        self,
+        questions: List[str],
+        return_sources: bool = True,
+        max_concurrency: int = 4
+    ) -> List[Dict[str, Any]]:
         """
-        # 创建默认的问答链
-        qa_chain = self.create_qa_chain()
+        批量查询
         
-        # 执行查询
-        result = qa_chain({"query": question})
+        所有问题只调用一次嵌入模型、按查询矩阵一次检索，再在并发上限内同时生成回答。
+        单个问题生成失败不影响其他问题。
         
+        Args:
+            questions: 问题列表
+            return_sources: 是否返回来源文档
+            max_concurrency: 同时进行的 LLM 调用数上限
+            
+        Returns:
+            与问题一一对应的查询结果，失败的问题只包含 error
+        """
+        if not questions:
+            return []
+        
+        with get_tracer().span(
+            "rag.batch_query", top_k=self.top_k, search_type=self.search_type,
+            batch_size=len(questions)
+        ):
+            documents_per_question = self._batch_retrieve(questions)
+            qa_chain = self.create_qa_chain()
+            
+            def answer(question: str, documents: List[Document]) -> Dict[str, Any]:
+                with get_tracer().span(
+                    "rag.query", top_k=self.top_k, search_type=self.search_type
+                ) as span:
+                    result = self._answer(qa_chain, question, documents, span)
+                    self._record_query_attributes(span, question, result)
+                return self._format_response(result, return_sources)
+            
+            workers = max(1, min(max_concurrency, len(questions)))
+            with ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="rag-batch"
+            ) as executor:
+                # 每个任务复制当前上下文，生成回答的 span 挂在批量查询下
+                futures = [
+                    executor.submit(contextvars.copy_context().run, answer, question, documents)
+                    for question, documents in zip(questions, documents_per_question)
+                ]
+                responses = []
+                for future in futures:
+                    try:
+                        responses.append(future.result())
+                    except Exception as e:
+                        responses.append({"error": str(e)})
+        
+        return responses
+    
+    def _batch_retrieve(self, questions: List[str]) -> List[List[Document]]:
+        """批量检索问答使用的文档（启用重排序时先多召回候选文档）"""
+        k = self.rerank_candidates if self.reranker else self.top_k
+        candidates = self.vectorstore_manager.batch_search(
+            questions,
+            k=k,
+            search_type=self.search_type,
+            fetch_k=max(self.mmr_fetch_k, k),
+            lambda_mult=self.mmr_lambda,
+            metadata_filter=self.metadata_filter
+        )
+        if not self.reranker:
+            return candidates
+        return [self._rerank(question, docs) for question, docs in zip(questions, candidates)]
+    
+    def _answer(self, qa_chain, question: str, documents: List[Document], span) -> Dict[str, Any]:
+        """组装上下文后交给问答链生成回答"""
+        context_stats = None
+        if self.context_packer is not None:
+            documents, context_stats = self.context_packer.pack(documents)
+            span.set_attributes({
+                "rag.context_tokens_before": context_stats["original_tokens"],
+                "rag.context_tokens_saved": context_stats["saved_tokens"],
+            })
+        
+        return {
+            "result": qa_chain.combine_documents_chain.run(
+                input_documents=documents, question=question
+            ),
+            "source_documents": documents,
+            "context_stats": context_stats,
+        }
+    
+    def _record_query_attributes(self, span, question: str, result: Dict[str, Any]) -> None:
+        """记录检索文档数和 token 用量（问题、上下文和回答分别计数）"""
+        if span.is_recording:
+            source_documents = result.get("source_documents", [])
+            span.set_attributes({
+                "rag.doc_count": len(source_documents),
+                "rag.context_tokens": sum(
+                    count_tokens(doc.page_content) for doc in source_documents
+                ),
+                "rag.question_tokens": count_tokens(question),
+                "llm.output_tokens": count_tokens(result["result"]),
+            })
+    
+    def _format_response(self, result: Dict[str, Any], return_sources: bool) -> Dict[str, Any]:
+        """整理问答链的输出"""
         response = {
             "answer": result["result"],
         }
         
+        if result.get("context_stats") is not None:
+            response["context_stats"] = result["context_stats"]
+        
         if return_sources:
             response["sources"] = [
                 {
@@ -0,0 +1,222 @@
+"""交叉编码器重排序 - 多召回候选文档，用本地交叉编码器分批打分后保留前 k 个"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+
+from langchain.schema import Document
+
+from ..utils.tracing import get_current_span
+
+DEFAULT_RERANK_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+DEFAULT_RERANK_BATCH_SIZE = 32
+DEFAULT_SCORE_CACHE_SIZE = 4096
+
+# 每对 (查询, 文档) 打分耗时的指数滑动平均系数
+_LATENCY_SMOOTHING = 0.3
+# 按耗时估算连续跳过该次数后，用一小批文档重新测量耗时（估算偏高时可以恢复）
+_REPROBE_AFTER_SKIPS = 8
+_PROBE_PAIRS = 4
+
+
+def document_key(doc: Document) -> str:
+    """文档标识（来源、表名和内容的哈希，同一文档在不同查询之间保持一致）"""
+    payload = "\x00".join([
+        str(doc.metadata.get('source', '')),
+        str(doc.metadata.get('table_name', '')),
+        doc.page_content,
+    ])
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class CrossEncoderReranker:
+    """
+    交叉编码器重排序器
+
+    打分结果按 (查询, 文档标识) 缓存。设置了延迟预算时，根据历史平均每对打分耗时估算本次耗时，
+    预计超出预算则跳过重排序（保持向量召回顺序）；打分过程中超出预算时同样放弃。连续跳过
+    多次后先用一小批文档重新测量耗时，避免一次偶然的慢批次（GC 停顿等）让重排序永久关闭。
+    """
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_RERANK_MODEL,
+        batch_size: int = DEFAULT_RERANK_BATCH_SIZE,
+        latency_budget: Optional[float] = None,
+        cache_size: int = DEFAULT_SCORE_CACHE_SIZE,
+        device: Optional[str] = None,
+        model: Optional[Any] = None
+    ):
+        """
+        初始化重排序器
+
+        Args:
+            model_name: sentence-transformers 交叉编码器模型名称或本地路径
+            batch_size: 每批打分的文档数
+            latency_budget: 重排序延迟预算（秒），None 表示不限制
+            cache_size: 打分缓存条目数
+            device: 推理设备，默认 CPU
+            model: 已加载的模型（提供 predict(pairs, batch_size=...) 方法），为 None 时首次使用时加载
+        """
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.latency_budget = latency_budget
+        self.cache_size = cache_size
+        self.device = device or "cpu"
+        self._model = model
+        self._model_lock = threading.Lock()
+        self._scores: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._pair_latency: Optional[float] = None
+        self._budget_skips = 0
+
+    @property
+    def model(self) -> Any:
+        """交叉编码器模型（首次使用时加载）"""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    try:
+                        from sentence_transformers import CrossEncoder
+                    except ImportError:
+                        raise ImportError(
+                            "请安装 sentence-transformers: pip install sentence-transformers"
+                        )
+                    model = CrossEncoder(self.model_name, device=self.device)
+                    # 预热（首次推理的初始化开销不计入耗时估算）
+                    model.predict([("warmup", "warmup")], batch_size=1)
+                    self._model = model
+        return self._model
+
+    def _cached_score(self, key: Tuple[str, str]) -> Optional[float]:
+        with self._cache_lock:
+            score = self._scores.get(key)
+            if score is not None:
+                self._scores.move_to_end(key)
+            return score
+
+    def _cache_scores(self, items: List[Tuple[Tuple[str, str], float]]) -> None:
+        with self._cache_lock:
+            for key, score in items:
+                self._scores[key] = score
+                self._scores.move_to_end(key)
+            while len(self._scores) > self.cache_size:
+                self._scores.popitem(last=False)
+
+    def _record_latency(self, seconds: float, pairs: int, reset: bool = False) -> None:
+        per_pair = seconds / pairs
+        if self._pair_latency is None or reset:
+            self._pair_latency = per_pair
+        else:
+            self._pair_latency += _LATENCY_SMOOTHING * (per_pair - self._pair_latency)
+
+    def rerank(self, query: str, documents: List[Document], top_k: int) -> List[Document]:
+        """
+        重排序
+
+        Args:
+            query: 查询文本
+            documents: 候选文档（按向量相似度排序）
+            top_k: 保留的文档数
+
+        Returns:
+            得分最高的 top_k 个文档；跳过重排序时返回前 top_k 个候选文档
+        """
+        span = get_current_span()
+        start = time.monotonic()
+
+        keys = [(query, document_key(doc)) for doc in documents]
+        scores: List[Optional[float]] = [self._cached_score(key) for key in keys]
+        pending = [i for i, score in enumerate(scores) if score is None]
+        span.set_attributes({
+            "rerank.candidates": len(documents),
+            "rerank.cache_hits": len(documents) - len(pending),
+        })
+
+        if pending:
+            model = self.model
+            budget = self.latency_budget
+            batches = [
+                pending[offset:offset + self.batch_size]
+                for offset in range(0, len(pending), self.batch_size)
+            ]
+            probe = False
+            if (budget is not None and self._pair_latency is not None
+                    and self._pair_latency * len(pending) > budget):
+                self._budget_skips += 1
+                if self._budget_skips < _REPROBE_AFTER_SKIPS:
+                    span.set_attribute("rerank.skipped", "budget")
+                    return documents[:top_k]
+                # 先打分一小批，用新的测量值替换估算，再按预算决定是否继续
+                probe = True
+                self._budget_skips = 0
+                batches = [pending[:_PROBE_PAIRS]] + [
+                    pending[offset:offset + self.batch_size]
+                    for offset in range(_PROBE_PAIRS, len(pending), self.batch_size)
+                ]
+                span.set_attribute("rerank.probe", True)
+
+            for batch_index, batch in enumerate(batches):
+                if (budget is not None and not (probe and batch_index == 0)
+                        and self._pair_latency is not None
+                        and time.monotonic() - start + self._pair_latency * len(batch) > budget):
+                    self._budget_skips += 1
+                    span.set_attribute("rerank.skipped", "budget")
+                    return documents[:top_k]
+
+                batch_start = time.monotonic()
+                batch_scores = model.predict(
+                    [(query, documents[i].page_content) for i in batch],
+                    batch_size=self.batch_size
+                )
+                self._record_latency(
+                    time.monotonic() - batch_start, len(batch), reset=probe and batch_index == 0
+                )
+
+                results = [(keys[i], float(score)) for i, score in zip(batch, batch_scores)]
+                self._cache_scores(results)
+                for i, (_, score) in zip(batch, results):
+                    scores[i] = score
+
+            self._budget_skips = 0
+
+        # 得分相同时保持向量召回顺序
+        order = sorted(range(len(documents)), key=lambda i: -scores[i])
+        span.set_attribute("rerank.latency_ms", round((time.monotonic() - start) * 1000, 3))
+        return [documents[i] for i in order[:top_k]]
+
+    def clear_cache(self) -> None:
+        """清空打分缓存"""
+        with self._cache_lock:
+            self._scores.clear()
+
+
+# 重排序器缓存（模型只加载一次）
+_rerankers = {}
+_rerankers_lock = threading.Lock()
+
+
+def get_reranker_from_config(config) -> Optional[CrossEncoderReranker]:
+    """
+    从配置获取重排序器（相同配置返回同一个实例）
+
+    Args:
+        config: 配置对象（rerank_enabled、rerank_model、rerank_batch_size、rerank_latency_budget_ms）
+
+    Returns:
+        重排序器，未启用时返回 None
+    """
+    if not getattr(config, 'rerank_enabled', False):
+        return None
+
+    budget_ms = config.rerank_latency_budget_ms
+    key = (config.rerank_model, config.rerank_batch_size, budget_ms)
+    with _rerankers_lock:
+        if key not in _rerankers:
+            _rerankers[key] = CrossEncoderReranker(
+                model_name=config.rerank_model,
+                batch_size=config.rerank_batch_size,
+                latency_budget=budget_ms / 1000 if budget_ms else None
+            )
+        return _rerankers[key]
@@ -1,5 +1,5 @@
 """配置管理模块"""
-from typing import Optional
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings
 from pydantic import Field
 
@@ -19,6 +19,33 @@ class Settings(BaseSettings):
     default_temperature: float = Field(0.7, env="DEFAULT_TEMPERATURE")
     default_max_tokens: int = Field(2000, env="DEFAULT_MAX_TOKENS")
     
+    # 提供商级限流（JSON）：名称 -> {max_concurrency, requests_per_minute, tokens_per_minute, timeout}
+    # 名称为 LLM 提供商（openai、dashscope...）或 embedding
+    llm_rate_limits: Dict[str, Dict[str, float]] = Field(
+        default_factory=dict, env="LLM_RATE_LIMITS"
+    )
+    llm_rate_limit_timeout: float = Field(30.0, env="LLM_RATE_LIMIT_TIMEOUT")
+    
+    # 多提供商路由（JSON 列表，按优先级排列；配置两个及以上提供商时启用）
+    llm_routing_providers: List[str] = Field(default_factory=list, env="LLM_ROUTING_PROVIDERS")
+    llm_routing_models: Dict[str, str] = Field(default_factory=dict, env="LLM_ROUTING_MODELS")
+    llm_hedge_delay: Optional[float] = Field(2.0, env="LLM_HEDGE_DELAY")
+    llm_circuit_failure_threshold: int = Field(3, env="LLM_CIRCUIT_FAILURE_THRESHOLD")
+    llm_circuit_cooldown: float = Field(30.0, env="LLM_CIRCUIT_COOLDOWN")
+    
+    # LLM 响应缓存（仅 default_temperature 为 0 时生效）；后端: memory / sqlite / redis
+    llm_response_cache_enabled: bool = Field(True, env="LLM_RESPONSE_CACHE_ENABLED")
+    llm_response_cache_backend: str = Field("memory", env="LLM_RESPONSE_CACHE_BACKEND")
+    llm_response_cache_path: str = Field(
+        "./data/llm_response_cache.db", env="LLM_RESPONSE_CACHE_PATH"
+    )
+    llm_response_cache_ttl: float = Field(3600.0, env="LLM_RESPONSE_CACHE_TTL")
+    llm_response_cache_max_entries: int = Field(1024, env="LLM_RESPONSE_CACHE_MAX_ENTRIES")
+    # SQLite 持久层条目数上限
+    llm_response_cache_persistent_max_entries: int = Field(
+        100000, env="LLM_RESPONSE_CACHE_PERSISTENT_MAX_ENTRIES"
+    )
+    
     # ========== Embedding Settings ==========
     embedding_model: str = Field("text-embedding-ada-002", env="EMBEDDING_MODEL")
     
@@ -57,6 +84,16 @@ class Settings(BaseSettings):
     chunk_overlap: int = Field(200, env="CHUNK_OVERLAP")
     top_k_results: int = Field(5, env="TOP_K_RESULTS")
     similarity_threshold: float = Field(0.7, env="SIMILARITY_THRESHOLD")
+    # RAG 上下文 token 预算（检索结果按表去重合并后裁剪），0 表示不组装
+    rag_context_max_tokens: int = Field(3000, env="RAG_CONTEXT_MAX_TOKENS")
+    # 交叉编码器重排序（需要 sentence-transformers）：多召回 rerank_candidates 个候选文档后保留 top_k 个
+    rerank_enabled: bool = Field(False, env="RERANK_ENABLED")
+    rerank_model: str = Field("cross-encoder/ms-marco-MiniLM-L-6-v2", env="RERANK_MODEL")
+    rerank_candidates: int = Field(20, env="RERANK_CANDIDATES")
+    rerank_batch_size: int = Field(32, env="RERANK_BATCH_SIZE")
+    rerank_latency_budget_ms: float = Field(300.0, env="RERANK_LATENCY_BUDGET_MS")
+    # 批量问答同时进行的 LLM 调用数上限
+    rag_batch_max_concurrency: int = Field(4, env="RAG_BATCH_MAX_CONCURRENCY")
     
     # ========== API Settings ==========
     api_host: str = Field("0.0.0.0", env="API_HOST")
@@ -67,6 +104,16 @@ class Settings(BaseSettings):
     log_level: str = Field("INFO", env="LOG_LEVEL")
     log_file: str = Field("./logs/app.log", env="LOG_FILE")
     
+    # ========== Tracing ==========
+    tracing_enabled: bool = Field(False, env="TRACING_ENABLED")
+    tracing_exporter: str = Field("file", env="TRACING_EXPORTER")  # file, otlp
+    tracing_file: str = Field("./logs/traces.jsonl", env="TRACING_FILE")
+    tracing_otlp_endpoint: str = Field(
+        "http://localhost:4318/v1/traces", env="TRACING_OTLP_ENDPOINT"
+    )
+    tracing_batch_size: int = Field(512, env="TRACING_BATCH_SIZE")  # OTLP 每批导出的 Span 数
+    tracing_batch_interval: float = Field(5.0, env="TRACING_BATCH_INTERVAL")  # OTLP 最长导出间隔（秒）
+    
     # ========== Agent Settings ==========
     agent_name: str = Field("数据小秘书", env="AGENT_NAME")
     agent_description: str = Field(
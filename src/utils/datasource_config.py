@@ -30,6 +30,22 @@ class DataSourceConfig:
         """获取示例数据限制"""
         return self.knowledge_base.get('sample_data_limit', 5)
 
+    def should_include_column_stats(self) -> bool:
+        """是否包含字段统计信息"""
+        return self.knowledge_base.get('include_column_stats', True)
+
+    def get_column_stats_concurrency(self) -> int:
+        """获取读取字段统计信息的并发数"""
+        return self.knowledge_base.get('column_stats_concurrency', 4)
+
+    def get_import_batch_size(self) -> int:
+        """获取流式导入每批嵌入/写入的文档数"""
+        return self.knowledge_base.get('import_batch_size', 64)
+
+    def get_import_queue_size(self) -> int:
+        """获取流式导入每个阶段队列最多缓存的批次数"""
+        return self.knowledge_base.get('import_queue_size', 4)
+
     def get_include_tables(self) -> Optional[List[str]]:
         """获取要包含的表列表"""
         return self.knowledge_base.get('include_tables')
@@ -164,6 +180,14 @@ class DataSourceManager:
         """获取 RAG 配置"""
         return self.config_data.get('rag', {})
 
+    def get_schema_cache_config(self) -> Dict[str, Any]:
+        """获取 schema 缓存配置"""
+        return self.config_data.get('schema_cache', {})
+
+    def get_import_checkpoint_config(self) -> Dict[str, Any]:
+        """获取导入检查点配置"""
+        return self.config_data.get('import_checkpoint', {})
+
     def list_datasources(self) -> None:
         """打印所有数据源信息"""
         print("\n" + "=" * 80)
@@ -0,0 +1,80 @@
+"""Token 计数工具模块"""
+from functools import lru_cache
+from typing import List, Optional
+
+# 未安装 tiktoken 或模型未知时使用的编码
+DEFAULT_ENCODING = "cl100k_base"
+
+
+@lru_cache(maxsize=16)
+def get_encoding(model_name: Optional[str] = None):
+    """
+    获取（并缓存）tiktoken 编码器
+
+    Args:
+        model_name: 模型名称，为 None 时使用默认编码
+
+    Returns:
+        编码器实例，未安装 tiktoken 或编码加载失败时返回 None
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+
+    try:
+        if model_name:
+            try:
+                return tiktoken.encoding_for_model(model_name)
+            except KeyError:
+                pass
+
+        return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as e:
+        # 编码文件首次使用时需要下载，离线环境下退回按字符数估算
+        print(f"⚠️  加载 tiktoken 编码失败，按字符数估算 token: {str(e)}")
+        return None
+
+
+def _estimate_tokens(text: str) -> int:
+    """按约 4 个字符一个 token 估算（向上取整，分段估算之和不小于整体估算）"""
+    return -(-len(text) // 4)
+
+
+def count_tokens(text: str, model_name: Optional[str] = None) -> int:
+    """
+    计算文本的 token 数
+
+    Args:
+        text: 文本
+        model_name: 模型名称
+
+    Returns:
+        token 数（未安装 tiktoken 时按字符数粗略估算）
+    """
+    if not text:
+        return 0
+
+    encoding = get_encoding(model_name)
+    if encoding is None:
+        return _estimate_tokens(text)
+
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_tokens_batch(texts: List[str], model_name: Optional[str] = None) -> List[int]:
+    """
+    批量计算多段文本的 token 数
+
+    Args:
+        texts: 文本列表
+        model_name: 模型名称
+
+    Returns:
+        每段文本的 token 数
+    """
+    encoding = get_encoding(model_name)
+    if encoding is None:
+        return [_estimate_tokens(text) for text in texts]
+
+    return [len(tokens) for tokens in encoding.encode_ordinary_batch(texts)]
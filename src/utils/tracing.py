@@ -0,0 +1,516 @@
+"""请求级链路追踪模块 - 兼容 OpenTelemetry 的 Span 模型"""
+import atexit
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+# 当前活动的 Span（随请求上下文传播）
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+STATUS_UNSET = "STATUS_CODE_UNSET"
+STATUS_OK = "STATUS_CODE_OK"
+STATUS_ERROR = "STATUS_CODE_ERROR"
+
+
+class Span:
+    """单个追踪 Span"""
+
+    is_recording = True
+
+    def __init__(
+        self,
+        name: str,
+        tracer: "Tracer",
+        parent: Optional["Span"] = None,
+        attributes: Optional[Dict[str, Any]] = None
+    ):
+        """
+        初始化 Span
+
+        Args:
+            name: Span 名称
+            tracer: 所属追踪器
+            parent: 父 Span
+            attributes: 初始属性
+        """
+        self.name = name
+        self.tracer = tracer
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent.span_id if parent else None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.events: List[Dict[str, Any]] = []
+        self.status_code = STATUS_UNSET
+        self.status_message = ""
+        self.start_time_ns = time.time_ns()
+        self.end_time_ns: Optional[int] = None
+        self._token = None
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        if exc_val is not None:
+            self.record_exception(exc_val)
+        if self._token is not None:
+            _current_span.reset(self._token)
+            self._token = None
+        self.end()
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """设置属性"""
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        """批量设置属性"""
+        self.attributes.update(attributes)
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> None:
+        """添加事件"""
+        self.events.append({
+            "name": name,
+            "timeUnixNano": time.time_ns(),
+            "attributes": dict(attributes or {}),
+        })
+
+    def record_exception(self, exc: BaseException) -> None:
+        """记录异常并将状态置为错误"""
+        self.add_event("exception", {
+            "exception.type": type(exc).__name__,
+            "exception.message": str(exc),
+        })
+        self.status_code = STATUS_ERROR
+        self.status_message = str(exc)
+
+    def end(self) -> None:
+        """结束 Span 并导出"""
+        if self.end_time_ns is not None:
+            return
+        self.end_time_ns = time.time_ns()
+        if self.status_code == STATUS_UNSET:
+            self.status_code = STATUS_OK
+        self.tracer.export(self)
+
+    @property
+    def duration_ms(self) -> float:
+        """耗时（毫秒）"""
+        end = self.end_time_ns or time.time_ns()
+        return (end - self.start_time_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为 OTLP/JSON 格式的 Span"""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id or "",
+            "name": self.name,
+            "startTimeUnixNano": self.start_time_ns,
+            "endTimeUnixNano": self.end_time_ns,
+            "attributes": [
+                {"key": key, "value": _to_otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            "events": [
+                {
+                    "name": event["name"],
+                    "timeUnixNano": event["timeUnixNano"],
+                    "attributes": [
+                        {"key": key, "value": _to_otlp_value(value)}
+                        for key, value in event["attributes"].items()
+                    ],
+                }
+                for event in self.events
+            ],
+            "status": {"code": self.status_code, "message": self.status_message},
+        }
+
+
+class _NoopSpan:
+    """追踪关闭时使用的空 Span，所有操作均为空操作"""
+
+    is_recording = False
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        pass
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def _to_otlp_value(value: Any) -> Dict[str, Any]:
+    """将 Python 值转换为 OTLP AnyValue"""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_to_otlp_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+class SpanExporter:
+    """Span 导出器基类"""
+
+    def export(self, spans: List[Span]) -> None:
+        """导出 Span"""
+        raise NotImplementedError
+
+    def shutdown(self) -> None:
+        """关闭导出器"""
+        pass
+
+
+class InMemorySpanExporter(SpanExporter):
+    """内存导出器（用于测试和调试）"""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        with self._lock:
+            self.spans.extend(spans)
+
+    def clear(self) -> None:
+        """清空已导出的 Span"""
+        with self._lock:
+            self.spans.clear()
+
+
+class FileSpanExporter(SpanExporter):
+    """本地文件导出器 - 每行一个 OTLP/JSON Span（文件句柄保持打开，每次导出后刷新）"""
+
+    def __init__(self, file_path: str):
+        """
+        初始化文件导出器
+
+        Args:
+            file_path: 输出文件路径（JSON Lines）
+        """
+        self.file_path = Path(file_path)
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = None
+
+    def export(self, spans: List[Span]) -> None:
+        lines = [json.dumps(span.to_dict(), ensure_ascii=False) for span in spans]
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.file_path, 'a', encoding='utf-8')
+            self._file.write("\n".join(lines) + "\n")
+            self._file.flush()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class OTLPHttpSpanExporter(SpanExporter):
+    """OTLP/HTTP JSON 导出器 - 发送到 OTLP Collector（或兼容的替代服务）"""
+
+    def __init__(
+        self,
+        endpoint: str,
+        service_name: str = "ai-data-assistant",
+        timeout: float = 5.0
+    ):
+        """
+        初始化 OTLP 导出器
+
+        Args:
+            endpoint: Collector 地址，如 http://localhost:4318/v1/traces
+            service_name: 服务名称
+            timeout: 请求超时（秒）
+        """
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+        self._client = None
+
+    def export(self, spans: List[Span]) -> None:
+        if self._client is None:
+            import httpx
+            # 复用连接，避免每批重新建立 TCP 连接
+            self._client = httpx.Client(timeout=self.timeout)
+
+        payload = {
+            "resourceSpans": [{
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": {"stringValue": self.service_name}}
+                    ]
+                },
+                "scopeSpans": [{
+                    "scope": {"name": __name__},
+                    "spans": [span.to_dict() for span in spans],
+                }],
+            }]
+        }
+
+        try:
+            self._client.post(self.endpoint, json=payload)
+        except Exception as e:
+            print(f"⚠️  追踪数据导出失败: {str(e)}")
+
+    def shutdown(self) -> None:
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+
+class BatchSpanExporter(SpanExporter):
+    """
+    批量导出器 - 结束的 Span 先放入有界队列，由后台线程按批次大小或时间间隔交给下层导出器
+
+    请求线程只做入队，不等待网络；队列满时丢弃新 Span（与 OpenTelemetry
+    BatchSpanProcessor 行为一致）。
+    """
+
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        max_batch_size: int = 512,
+        schedule_delay: float = 5.0,
+        max_queue_size: int = 2048
+    ):
+        """
+        初始化批量导出器
+
+        Args:
+            exporter: 下层导出器
+            max_batch_size: 每次导出的最大 Span 数，队列中达到该数量时立即导出
+            schedule_delay: 两次导出之间的最长间隔（秒）
+            max_queue_size: 队列上限，超过时丢弃新 Span
+        """
+        if max_batch_size < 1 or max_queue_size < max_batch_size:
+            raise ValueError("max_batch_size 必须大于 0 且不超过 max_queue_size")
+
+        self.exporter = exporter
+        self.max_batch_size = max_batch_size
+        self.schedule_delay = schedule_delay
+        self.max_queue_size = max_queue_size
+        self.dropped = 0
+        self._queue: List[Span] = []
+        self._condition = threading.Condition()
+        self._flush_requests = 0
+        self._flushed = 0
+        self._shutdown = False
+        self._worker = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._worker.start()
+
+    def export(self, spans: List[Span]) -> None:
+        with self._condition:
+            if self._shutdown:
+                return
+            accepted = spans[:self.max_queue_size - len(self._queue)]
+            self.dropped += len(spans) - len(accepted)
+            self._queue.extend(accepted)
+            if len(self._queue) >= self.max_batch_size:
+                self._condition.notify()
+
+    def force_flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        导出队列中的全部 Span
+
+        Args:
+            timeout: 最长等待秒数，为 None 时一直等待
+
+        Returns:
+            是否在超时前导出完成
+        """
+        with self._condition:
+            if self._shutdown:
+                return True
+            self._flush_requests += 1
+            request = self._flush_requests
+            self._condition.notify()
+            return self._condition.wait_for(lambda: self._flushed >= request, timeout)
+
+    def shutdown(self) -> None:
+        """导出剩余的 Span 并停止后台线程"""
+        with self._condition:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            self._condition.notify()
+        self._worker.join()
+        self.exporter.shutdown()
+
+    def _run(self) -> None:
+        """后台线程：等待批次凑满、超时或刷新请求后导出"""
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: (
+                        self._shutdown
+                        or len(self._queue) >= self.max_batch_size
+                        or self._flush_requests > self._flushed
+                    ),
+                    self.schedule_delay
+                )
+                flush_request = self._flush_requests
+                drain = self._shutdown or flush_request > self._flushed
+                shutdown = self._shutdown
+                batches = []
+                while self._queue and (drain or not batches):
+                    batches.append(self._queue[:self.max_batch_size])
+                    del self._queue[:self.max_batch_size]
+
+            for batch in batches:
+                try:
+                    self.exporter.export(batch)
+                except Exception as e:
+                    print(f"⚠️  追踪数据导出失败: {str(e)}")
+
+            with self._condition:
+                if drain:
+                    self._flushed = flush_request
+                    self._condition.notify_all()
+            if shutdown:
+                return
+
+
+class Tracer:
+    """追踪器"""
+
+    def __init__(self, exporter: Optional[SpanExporter] = None, enabled: bool = True):
+        """
+        初始化追踪器
+
+        Args:
+            exporter: Span 导出器
+            enabled: 是否启用追踪
+        """
+        self.exporter = exporter
+        self.enabled = enabled and exporter is not None
+
+    def span(self, name: str, **attributes) -> Any:
+        """
+        创建子 Span（自动关联当前上下文中的父 Span），用于 with 语句
+
+        Args:
+            name: Span 名称
+            **attributes: 初始属性
+
+        Returns:
+            Span 实例；追踪关闭时直接返回共享的 NOOP_SPAN，几乎没有开销
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+
+        return Span(name, self, parent=_current_span.get(), attributes=attributes)
+
+    def export(self, span: Span) -> None:
+        """导出已结束的 Span"""
+        if self.exporter is None:
+            return
+        try:
+            self.exporter.export([span])
+        except Exception as e:
+            print(f"⚠️  追踪数据导出失败: {str(e)}")
+
+    def shutdown(self) -> None:
+        """导出剩余的 Span 并关闭导出器"""
+        if self.exporter is not None:
+            self.exporter.shutdown()
+
+
+def get_current_span() -> Any:
+    """获取当前活动的 Span，没有时返回 NOOP_SPAN"""
+    return _current_span.get() or NOOP_SPAN
+
+
+# 全局追踪器实例
+_tracer = None
+
+
+def create_tracer_from_config(config) -> Tracer:
+    """
+    从配置创建追踪器
+
+    Args:
+        config: 配置对象
+
+    Returns:
+        追踪器实例
+    """
+    if not getattr(config, 'tracing_enabled', False):
+        return Tracer(enabled=False)
+
+    exporter_type = config.tracing_exporter.lower()
+
+    if exporter_type == "file":
+        exporter = FileSpanExporter(config.tracing_file)
+    elif exporter_type == "otlp":
+        # 网络导出在后台线程批量进行，不阻塞请求
+        exporter = BatchSpanExporter(
+            OTLPHttpSpanExporter(config.tracing_otlp_endpoint),
+            max_batch_size=config.tracing_batch_size,
+            schedule_delay=config.tracing_batch_interval
+        )
+    else:
+        raise ValueError(f"不支持的追踪导出器: {exporter_type}")
+
+    return Tracer(exporter=exporter)
+
+
+def get_tracer() -> Tracer:
+    """
+    获取全局追踪器实例
+
+    Returns:
+        追踪器实例
+    """
+    global _tracer
+
+    if _tracer is None:
+        try:
+            from .config import settings
+            _tracer = create_tracer_from_config(settings)
+            # 进程退出前导出剩余的 Span
+            atexit.register(_tracer.shutdown)
+        except Exception as e:
+            print(f"⚠️  追踪器初始化失败，追踪已关闭: {str(e)}")
+            _tracer = Tracer(enabled=False)
+
+    return _tracer
+
+
+def set_tracer(tracer: Optional[Tracer]) -> None:
+    """
+    替换全局追踪器实例
+
+    Args:
+        tracer: 追踪器实例，为 None 时下次调用 get_tracer 重新从配置创建
+    """
+    global _tracer
+    _tracer = tracer
@@ -0,0 +1,189 @@
+"""集合别名 - 知识库重建写入带版本号的影子集合，完成后原子切换别名，旧版本随后回收"""
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+class CollectionAliasRegistry:
+    """
+    集合别名注册表（JSON 文件）
+
+    每个别名（配置中的 collection_name）记录：
+        current: 当前对外提供查询的版本
+        building: 正在构建（或上次中断）的版本
+        versions: 已完成的版本，按时间从旧到新排列
+    """
+
+    def __init__(self, registry_path: str):
+        """
+        初始化别名注册表
+
+        Args:
+            registry_path: 注册表文件路径
+        """
+        self.registry_path = Path(registry_path)
+        self._lock = threading.Lock()
+        self._data: Dict[str, Dict[str, Any]] = {}
+        self._version: Optional[tuple] = None
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """读取注册表（文件未变化时使用内存副本，其他进程切换别名后自动重新读取）"""
+        try:
+            version = self._file_version()
+        except FileNotFoundError:
+            self._data, self._version = {}, None
+            return self._data
+
+        if version != self._version:
+            try:
+                with open(self.registry_path, 'r', encoding='utf-8') as f:
+                    self._data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️  读取集合别名注册表失败: {str(e)}")
+                return self._data
+            self._version = version
+
+        return self._data
+
+    def _file_version(self) -> tuple:
+        """文件标识（每次保存都替换为新文件，inode 和修改时间至少一个会变化）"""
+        stat = self.registry_path.stat()
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _save(self, data: Dict[str, Dict[str, Any]]) -> None:
+        """保存注册表（先写临时文件再替换，读取方总是看到完整的切换前或切换后状态）"""
+        self.registry_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.registry_path.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        tmp_path.replace(self.registry_path)
+
+        self._data = data
+        self._version = self._file_version()
+
+    def _entry(self, alias: str) -> Dict[str, Any]:
+        """读取别名条目的副本"""
+        entry = self._load().get(alias) or {}
+        return {
+            'current': entry.get('current'),
+            'building': entry.get('building'),
+            'versions': list(entry.get('versions') or []),
+        }
+
+    def resolve(self, alias: str) -> Optional[str]:
+        """
+        解析别名
+
+        Args:
+            alias: 别名
+
+        Returns:
+            当前版本的集合名称，还没有版本时返回 None
+        """
+        with self._lock:
+            return self._entry(alias)['current']
+
+    def get_building(self, alias: str) -> Optional[str]:
+        """获取正在构建（或上次中断）的版本"""
+        with self._lock:
+            return self._entry(alias)['building']
+
+    def begin_build(self, alias: str) -> str:
+        """
+        创建新的构建版本
+
+        Args:
+            alias: 别名
+
+        Returns:
+            新版本的集合名称（别名__v时间戳）
+        """
+        with self._lock:
+            data = dict(self._load())
+            entry = self._entry(alias)
+
+            name = f"{alias}__v{datetime.now().strftime('%Y%m%d%H%M%S')}"
+            existing = set(entry['versions']) | {entry['building']}
+            suffix = 1
+            candidate = name
+            while candidate in existing:
+                suffix += 1
+                candidate = f"{name}_{suffix}"
+
+            entry['building'] = candidate
+            data[alias] = entry
+            self._save(data)
+            return candidate
+
+    def promote(self, alias: str, name: str) -> None:
+        """
+        将构建完成的版本切换为当前版本
+
+        Args:
+            alias: 别名
+            name: 构建完成的集合名称
+        """
+        with self._lock:
+            data = dict(self._load())
+            entry = self._entry(alias)
+
+            entry['current'] = name
+            if entry['building'] == name:
+                entry['building'] = None
+            if name not in entry['versions']:
+                entry['versions'].append(name)
+
+            data[alias] = entry
+            self._save(data)
+
+    def discard_building(self, alias: str) -> Optional[str]:
+        """
+        放弃正在构建的版本
+
+        Args:
+            alias: 别名
+
+        Returns:
+            被放弃的集合名称，没有时返回 None
+        """
+        with self._lock:
+            data = dict(self._load())
+            entry = self._entry(alias)
+            name = entry['building']
+            if name is None:
+                return None
+
+            entry['building'] = None
+            data[alias] = entry
+            self._save(data)
+            return name
+
+    def expire_versions(self, alias: str, keep: int) -> List[str]:
+        """
+        移除多余的旧版本（当前版本总是保留）
+
+        Args:
+            alias: 别名
+            keep: 保留的最新版本数（包括当前版本）
+
+        Returns:
+            被移除的集合名称列表，由调用方删除对应数据
+        """
+        with self._lock:
+            data = dict(self._load())
+            entry = self._entry(alias)
+
+            kept = entry['versions'][-max(keep, 1):]
+            if entry['current'] and entry['current'] not in kept:
+                kept.insert(0, entry['current'])
+            expired = [name for name in entry['versions'] if name not in kept]
+            if not expired:
+                return []
+
+            entry['versions'] = [name for name in entry['versions'] if name in kept]
+            data[alias] = entry
+            self._save(data)
+            return expired
@@ -0,0 +1,149 @@
+"""导入检查点 - 记录每个集合已写入向量数据库的表，导入中断后重新运行时从上次提交处继续"""
+import json
+import re
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
+
+# 文档 ID 命名空间（相同集合、来源、表和序号总是得到相同 ID，重复写入时覆盖而不是追加）
+_DOCUMENT_ID_NAMESPACE = uuid.UUID("5f1c3f8e-2a52-4c8a-9d0e-7b4c1f0a6e21")
+
+
+def document_id(collection_name: str, source: str, table_name: str, ordinal: int) -> str:
+    """
+    生成确定性的文档 ID
+
+    Args:
+        collection_name: 集合名称
+        source: 文档来源（metadata['source']）
+        table_name: 表名
+        ordinal: 该表该来源的第几个文档
+
+    Returns:
+        文档 ID
+    """
+    name = f"{collection_name}\x00{source}\x00{table_name}\x00{ordinal}"
+    return str(uuid.uuid5(_DOCUMENT_ID_NAMESPACE, name))
+
+
+class ImportCheckpoint:
+    """导入检查点存储（每个集合一个 JSON 文件）"""
+
+    def __init__(
+        self,
+        checkpoint_dir: str = "./data/import_checkpoints",
+        interval: int = 1,
+        interval_seconds: float = 30.0
+    ):
+        """
+        初始化检查点存储
+
+        每次提交都会持久化向量数据库。FAISS 的 save_local 每次重写整个索引，按批提交时
+        持久化耗时随导入规模平方增长，因此同时限制两次提交的最短间隔时间。
+
+        Args:
+            checkpoint_dir: 检查点文件目录
+            interval: 至少写入多少批文档后提交一次（持久化向量数据库并保存检查点）
+            interval_seconds: 两次提交之间的最短秒数，0 表示每 interval 批都提交
+        """
+        if interval < 1:
+            raise ValueError("interval 必须大于 0")
+        if interval_seconds < 0:
+            raise ValueError("interval_seconds 不能小于 0")
+
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.interval = interval
+        self.interval_seconds = interval_seconds
+
+    def is_due(self, batches: int, elapsed: float) -> bool:
+        """
+        判断是否应该提交
+
+        Args:
+            batches: 上次提交后写入的批次数
+            elapsed: 距上次提交的秒数
+
+        Returns:
+            批次数和间隔时间都达到要求时返回 True
+        """
+        return batches >= self.interval and elapsed >= self.interval_seconds
+
+    def _checkpoint_path(self, collection_name: str) -> Path:
+        safe_name = re.sub(r'[^\w.-]', '_', collection_name)
+        return self.checkpoint_dir / f"{safe_name}.json"
+
+    def load(self, collection_name: str) -> Dict[str, Set[str]]:
+        """
+        读取已完成的表
+
+        Args:
+            collection_name: 集合名称
+
+        Returns:
+            文档来源 -> 已写入的表名集合，没有检查点时返回空字典
+        """
+        path = self._checkpoint_path(collection_name)
+        if not path.exists():
+            return {}
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  读取导入检查点失败，将完整导入: {str(e)}")
+            return {}
+
+        return {source: set(tables) for source, tables in (data.get('completed') or {}).items()}
+
+    def save(self, collection_name: str, completed: Dict[str, Iterable[str]]) -> None:
+        """
+        保存已完成的表（先写临时文件再替换，避免中断时留下损坏的检查点）
+
+        Args:
+            collection_name: 集合名称
+            completed: 文档来源 -> 已写入的表名
+        """
+        data = {
+            'collection_name': collection_name,
+            'completed': {source: sorted(tables) for source, tables in completed.items()},
+            'updated_at': datetime.now().isoformat(timespec='seconds'),
+        }
+
+        path = self._checkpoint_path(collection_name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        tmp_path.replace(path)
+
+    def clear(self, collection_name: str) -> None:
+        """删除集合的检查点（导入完成或重新开始时调用）"""
+        path = self._checkpoint_path(collection_name)
+        if path.exists():
+            path.unlink()
+
+
+def get_import_checkpoint(datasource_manager=None) -> Optional[ImportCheckpoint]:
+    """
+    根据数据源配置文件中的 import_checkpoint 配置创建检查点存储
+
+    Args:
+        datasource_manager: 数据源管理器
+
+    Returns:
+        检查点存储实例，未启用时返回 None
+    """
+    if datasource_manager is None:
+        from ..utils.datasource_config import get_datasource_manager
+        datasource_manager = get_datasource_manager()
+
+    checkpoint_config = datasource_manager.get_import_checkpoint_config()
+    if not checkpoint_config.get('enabled', True):
+        return None
+
+    return ImportCheckpoint(
+        checkpoint_config.get('directory', './data/import_checkpoints'),
+        interval=checkpoint_config.get('interval', 1),
+        interval_seconds=checkpoint_config.get('interval_seconds', 30.0)
+    )
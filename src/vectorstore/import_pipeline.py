@@ -0,0 +1,217 @@
+"""流式导入管道 - 文档生成、嵌入、写入向量数据库三个阶段并行，阶段之间使用有界队列"""
+import queue
+import threading
+import time
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from langchain.schema import Document
+
+from .import_checkpoint import ImportCheckpoint, document_id
+from .vector_store import VectorStoreManager
+
+# 队列结束标记
+_DONE = object()
+
+
+def batched(documents: Iterable[Document], batch_size: int) -> Iterator[List[Document]]:
+    """将文档流切分为批次"""
+    iterator = iter(documents)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+class ImportPipeline:
+    """
+    流式导入管道
+
+    生成文档（introspection）在后台线程运行，嵌入在另一个后台线程运行，写入在调用线程
+    运行。队列长度有上限，内存占用只与 batch_size × queue_size 有关，与数据库规模无关。
+    """
+
+    def __init__(
+        self,
+        vectorstore_manager: VectorStoreManager,
+        batch_size: int = 64,
+        queue_size: int = 4
+    ):
+        """
+        初始化导入管道
+
+        Args:
+            vectorstore_manager: 向量数据库管理器
+            batch_size: 每批嵌入/写入的文档数
+            queue_size: 每个队列最多缓存的批次数
+        """
+        if batch_size < 1 or queue_size < 1:
+            raise ValueError("batch_size 和 queue_size 必须大于 0")
+
+        self.vectorstore_manager = vectorstore_manager
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self._stop = threading.Event()
+        self._errors: List[BaseException] = []
+
+    def run(
+        self,
+        documents: Iterable[Document],
+        checkpoint: Optional[ImportCheckpoint] = None,
+        completed: Optional[Dict[str, Set[str]]] = None
+    ) -> Dict[str, Any]:
+        """
+        运行导入管道
+
+        使用检查点时，同一个表同一来源的文档需要连续产出；写入至少 checkpoint.interval 批
+        且距上次提交至少 checkpoint.interval_seconds 秒时提交一次（持久化向量数据库后记录
+        已写完的表），全部完成后删除检查点。某个阶段出错时，
+        已计算好向量的批次仍会写入并提交。文档使用确定性 ID，恢复时重新写入上次未提交的表
+        会覆盖而不是重复。
+
+        Args:
+            documents: 文档流（通常是生成器，在后台线程中迭代）
+            checkpoint: 导入检查点存储，为 None 时不记录进度
+            completed: 上次已提交的表（来源 -> 表名集合），恢复导入时传入
+
+        Returns:
+            统计信息 {'documents', 'batches', 'commits'}
+
+        Raises:
+            任一阶段抛出的第一个异常
+        """
+        self._stop.clear()
+        self._errors = []
+
+        document_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        embedded_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+
+        producer = threading.Thread(
+            target=self._produce, args=(documents, document_queue),
+            name="import-produce", daemon=True
+        )
+        embedder = threading.Thread(
+            target=self._embed, args=(document_queue, embedded_queue),
+            name="import-embed", daemon=True
+        )
+        producer.start()
+        embedder.start()
+
+        collection_name = self.vectorstore_manager.collection_name
+        completed = {source: set(tables) for source, tables in (completed or {}).items()}
+        # 正在写入的表（其后续文档可能在下一批中）及其已写入的文档数
+        current: Optional[Tuple[str, str]] = None
+        ordinal = 0
+
+        stats = {'documents': 0, 'batches': 0, 'commits': 0}
+        # 上次提交后写入的批次数和提交时间
+        uncommitted = 0
+        last_commit = time.monotonic()
+        try:
+            while True:
+                item = self._get(embedded_queue, drain=True)
+                if item is _DONE:
+                    break
+                batch, embeddings = item
+
+                ids = None
+                if checkpoint:
+                    ids = []
+                    for doc in batch:
+                        unit = (doc.metadata.get('source', ''), doc.metadata.get('table_name', ''))
+                        if unit != current:
+                            if current:
+                                completed.setdefault(current[0], set()).add(current[1])
+                            current, ordinal = unit, 0
+                        ids.append(document_id(collection_name, unit[0], unit[1], ordinal))
+                        ordinal += 1
+
+                self.vectorstore_manager.add_embedded_documents(batch, embeddings, ids=ids)
+                stats['documents'] += len(batch)
+                stats['batches'] += 1
+                uncommitted += 1
+
+                if checkpoint and checkpoint.is_due(uncommitted, time.monotonic() - last_commit):
+                    self.vectorstore_manager.persist()
+                    checkpoint.save(collection_name, completed)
+                    stats['commits'] += 1
+                    uncommitted = 0
+                    last_commit = time.monotonic()
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            producer.join()
+            embedder.join()
+
+        if self._errors:
+            # 提交出错前已写入的批次，恢复导入时不再重复计算向量
+            if checkpoint and uncommitted:
+                self.vectorstore_manager.persist()
+                checkpoint.save(collection_name, completed)
+            raise self._errors[0]
+
+        self.vectorstore_manager.persist()
+        if checkpoint:
+            checkpoint.clear(collection_name)
+        return stats
+
+    def _produce(self, documents: Iterable[Document], output: queue.Queue) -> None:
+        """阶段 1：迭代文档流并分批"""
+        try:
+            for batch in batched(documents, self.batch_size):
+                if not self._put(output, batch):
+                    return
+            self._put(output, _DONE)
+        except BaseException as e:
+            self._fail(e)
+
+    def _embed(self, source: queue.Queue, output: queue.Queue) -> None:
+        """阶段 2：批量计算向量"""
+        embedding_model = self.vectorstore_manager.embedding_model
+        try:
+            while True:
+                batch = self._get(source)
+                if batch is _DONE:
+                    self._put(output, _DONE)
+                    return
+                embeddings = embedding_model.embed_documents([doc.page_content for doc in batch])
+                if not self._put(output, (batch, embeddings)):
+                    return
+        except BaseException as e:
+            self._fail(e)
+
+    def _fail(self, error: BaseException) -> None:
+        """记录异常并通知所有阶段停止"""
+        self._errors.append(error)
+        self._stop.set()
+
+    def _put(self, target: queue.Queue, item: Any) -> bool:
+        """放入队列（队列满时阻塞），管道停止时返回 False"""
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source: queue.Queue, drain: bool = False) -> Any:
+        """
+        从队列取出（队列空时阻塞），管道停止时返回结束标记
+
+        Args:
+            source: 队列
+            drain: 管道停止后是否继续取出队列中已有的条目
+        """
+        while not self._stop.is_set():
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        if drain:
+            try:
+                return source.get_nowait()
+            except queue.Empty:
+                pass
+        return _DONE
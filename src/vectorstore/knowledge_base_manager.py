@@ -1,15 +1,25 @@
 """知识库管理模块 - 支持多数据源的知识库管理"""
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Any
 
 from langchain.embeddings import OpenAIEmbeddings
 from langchain.embeddings.base import Embeddings
 from langchain.schema import Document
 
+from .collection_alias import CollectionAliasRegistry
+from .import_checkpoint import ImportCheckpoint, get_import_checkpoint
+from .import_pipeline import ImportPipeline
+from .metadata_filter import MetadataFilter, normalize_filter
+from .mmr import DEFAULT_MMR_LAMBDA, SEARCH_TYPE_SIMILARITY
 from .vector_store import VectorStoreManager
 from ..database.factory import DatabaseFactory
+from ..database.schema_cache import SchemaCache, get_schema_cache
 from ..rag.document_processor import DocumentProcessor
 from ..utils.datasource_config import DataSourceConfig, DataSourceManager
+from ..utils.tracing import get_tracer
 
 
 class KnowledgeBase:
@@ -19,7 +29,9 @@ class KnowledgeBase:
         self,
         datasource_config: DataSourceConfig,
         vectorstore_manager: VectorStoreManager,
-        document_processor: DocumentProcessor
+        document_processor: DocumentProcessor,
+        schema_cache: Optional[SchemaCache] = None,
+        checkpoint: Optional[ImportCheckpoint] = None
     ):
         """
         初始化知识库
@@ -28,14 +40,26 @@ class KnowledgeBase:
             datasource_config: 数据源配置
             vectorstore_manager: 向量数据库管理器
             document_processor: 文档处理器
+            schema_cache: Schema 缓存，为 None 时每次完整获取 schema
+            checkpoint: 导入检查点存储，为 None 时不记录导入进度
         """
         self.datasource_config = datasource_config
         self.vectorstore_manager = vectorstore_manager
         self.document_processor = document_processor
+        self.schema_cache = schema_cache
+        self.checkpoint = checkpoint
         self.is_initialized = False
 
-    def initialize(self) -> None:
-        """初始化知识库 - 从数据源导入数据"""
+    def initialize(self, resume: bool = False) -> None:
+        """
+        初始化知识库 - 从数据源导入数据
+
+        使用流式导入管道：获取结构/生成文档、计算向量、写入向量数据库三个阶段同时进行，
+        阶段之间的队列有上限，内存占用不随数据库规模增长。
+
+        Args:
+            resume: 是否从上次中断的检查点继续（跳过已写入的表）
+        """
         print(f"\n{'='*60}")
         print(f"🔧 初始化知识库: {self.datasource_config.display_name}")
         print(f"{'='*60}")
@@ -49,85 +73,229 @@ class KnowledgeBase:
             self.datasource_config.connection
         )
 
-        documents = []
-
-        with db:
-            # 2. 获取数据库结构
-            print("✓ 正在获取数据库结构...")
-            schema = db.get_schema()
+        pipeline = ImportPipeline(
+            self.vectorstore_manager,
+            batch_size=self.datasource_config.get_import_batch_size(),
+            queue_size=self.datasource_config.get_import_queue_size()
+        )
 
-            # 过滤表
-            filtered_schema = self._filter_tables(schema)
-            print(f"✓ 成功获取 {len(filtered_schema)} 个表的结构信息")
+        completed = self._load_checkpoint(resume)
 
-            # 3. 处理文档
-            print(f"\n📝 步骤 2: 处理数据库信息为文档")
+        with db:
+            # 2~4. 生成文档并流式写入向量数据库
+            print(f"\n🔍 步骤 2: 流式生成文档并写入向量数据库")
             print("-" * 60)
 
-            # 处理 schema
-            schema_docs = self.document_processor.process_database_schema(filtered_schema)
-            documents.extend(schema_docs)
-            print(f"✓ 生成了 {len(schema_docs)} 个 schema 文档")
-
-            # 4. 可选：添加示例数据
-            if self.datasource_config.should_include_sample_data():
-                print(f"\n📋 步骤 3: 添加示例数据")
-                print("-" * 60)
+            stats = pipeline.run(
+                self._iter_documents(db, completed),
+                checkpoint=self.checkpoint,
+                completed=completed
+            )
 
-                sample_limit = self.datasource_config.get_sample_data_limit()
-                sample_count = 0
-
-                for table_name in list(filtered_schema.keys()):
-                    try:
-                        sample_data = db.get_sample_data(table_name, limit=sample_limit)
-                        if sample_data:
-                            sample_docs = self.document_processor.process_sample_data(
-                                table_name, sample_data
-                            )
-                            documents.extend(sample_docs)
-                            sample_count += len(sample_docs)
-                    except Exception as e:
-                        print(f"⚠️  获取表 {table_name} 的示例数据失败: {str(e)}")
-
-                print(f"✓ 生成了 {sample_count} 个示例数据文档")
-
-        # 5. 创建向量数据库
-        print(f"\n🔍 步骤 4: 创建向量数据库")
-        print("-" * 60)
-
-        self.vectorstore_manager.create_vectorstore(documents)
         self.is_initialized = True
 
         print(f"\n{'='*60}")
         print(f"✅ 知识库初始化完成！")
         print(f"{'='*60}")
         print(f"数据源: {self.datasource_config.display_name}")
-        print(f"集合名称: {self.datasource_config.get_collection_name()}")
-        print(f"文档总数: {len(documents)}")
+        print(f"集合名称: {self.vectorstore_manager.collection_name}")
+        print(f"文档总数: {stats['documents']}")
         print(f"{'='*60}\n")
 
-    def _filter_tables(self, schema: Dict[str, Any]) -> Dict[str, Any]:
+    def _load_checkpoint(self, resume: bool) -> Dict[str, Set[str]]:
         """
-        根据配置过滤表
+        读取（恢复导入）或清除（重新导入）导入检查点
 
         Args:
-            schema: 完整的数据库 schema
+            resume: 是否恢复导入
 
         Returns:
-            过滤后的 schema
+            已写入的表（来源 -> 表名集合）
+        """
+        collection_name = self.vectorstore_manager.collection_name
+
+        if not self.checkpoint:
+            if resume:
+                print("⚠️  未启用导入检查点，将完整导入")
+            return {}
+
+        if not resume:
+            self.checkpoint.clear(collection_name)
+            return {}
+
+        completed = self.checkpoint.load(collection_name)
+        if not completed:
+            print("✓ 没有未完成的导入检查点，将完整导入")
+            return {}
+
+        # 继续写入上次已持久化的向量数据库
+        manager = self.vectorstore_manager
+        if manager.vectorstore is None and manager.persist_directory:
+            manager.load_vectorstore()
+
+        summary = "，".join(f"{source} {len(tables)} 个表" for source, tables in completed.items())
+        print(f"✓ 从检查点继续导入，跳过已写入的: {summary}")
+        return completed
+
+    def _iter_documents(
+        self,
+        db,
+        completed: Optional[Dict[str, Set[str]]] = None
+    ) -> Iterator[Document]:
+        """
+        逐步生成知识库文档：schema 文档、字段统计文档、示例数据文档
+
+        同一个表同一来源的文档连续产出（导入检查点按此记录进度）。
+
+        Args:
+            db: 已连接的数据库实例
+            completed: 已写入的表（来源 -> 表名集合），这些表不再生成对应文档
+
+        Yields:
+            文档
+        """
+        completed = completed or {}
+        schema_done = completed.get('database_schema', set())
+        profile_done = completed.get('column_statistics', set())
+        sample_done = completed.get('sample_data', set())
+
+        print("✓ 正在获取数据库结构...")
+        if self.schema_cache:
+            # 未变化的表从缓存逐个读取，变化的表在处理到时才重新获取
+            schema_items = self.schema_cache.iter_schema(db, self.datasource_config.name)
+        else:
+            # 逐个表获取，处理完即释放
+            schema_items = db.iter_schema()
+
+        table_names = []
+
+        def iter_pending_schema():
+            for name, info in schema_items:
+                if not self._include_table(name):
+                    continue
+                table_names.append(name)
+                if name not in schema_done:
+                    yield name, info
+
+        # 文档处理器流式消费各表，表数量达到阈值时跨批次使用进程池
+        schema_doc_count = 0
+        for doc in self.document_processor.iter_database_schema(iter_pending_schema()):
+            schema_doc_count += 1
+            yield doc
+
+        if self.schema_cache:
+            stats = self.schema_cache.last_stats
+            print(f"✓ Schema 缓存: 复用 {stats['cached']} 个表，"
+                  f"重新获取 {stats['refreshed']} 个表，移除 {stats['removed']} 个表")
+        print(f"✓ 成功获取 {len(table_names)} 个表的结构信息，生成了 {schema_doc_count} 个 schema 文档")
+
+        # 可选：字段统计信息（读取数据库统计信息目录，按表并发）
+        if self.datasource_config.should_include_column_stats():
+            profile_count = 0
+            profile_tables = [name for name in table_names if name not in profile_done]
+            for table_name, statistics in self._profile_tables(profile_tables):
+                docs = self.document_processor.process_column_statistics(table_name, statistics)
+                for doc in docs:
+                    profile_count += 1
+                    yield doc
+            print(f"✓ 生成了 {profile_count} 个字段统计文档")
+
+        # 可选：示例数据
+        if self.datasource_config.should_include_sample_data():
+            sample_limit = self.datasource_config.get_sample_data_limit()
+            sample_count = 0
+
+            for table_name in table_names:
+                if table_name in sample_done:
+                    continue
+                try:
+                    sample_data = db.get_sample_data(table_name, limit=sample_limit)
+                except Exception as e:
+                    print(f"⚠️  获取表 {table_name} 的示例数据失败: {str(e)}")
+                    continue
+                if sample_data:
+                    for doc in self.document_processor.process_sample_data(table_name, sample_data):
+                        sample_count += 1
+                        yield doc
+
+            print(f"✓ 生成了 {sample_count} 个示例数据文档")
+
+    def _profile_tables(self, table_names: List[str]) -> Iterator[Tuple[str, Any]]:
+        """
+        并发读取各表的字段统计信息（每个工作线程使用独立的数据库连接）
+
+        按完成顺序逐个产出，不在内存中汇总所有表的统计信息；遍历结束或中途停止时关闭连接。
+
+        Args:
+            table_names: 表名列表
+
+        Yields:
+            (表名, 统计信息)，没有统计信息的表不产出
+        """
+        local = threading.local()
+        connections = []
+        lock = threading.Lock()
+
+        def profile(table_name: str):
+            db = getattr(local, 'db', None)
+            if db is None:
+                db = DatabaseFactory.create_database(
+                    self.datasource_config.type,
+                    self.datasource_config.connection
+                )
+                db.connect()
+                local.db = db
+                with lock:
+                    connections.append(db)
+            return db.get_column_statistics(table_name)
+
+        concurrency = max(
+            1, min(self.datasource_config.get_column_stats_concurrency(), len(table_names))
+        )
+
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                futures = {executor.submit(profile, name): name for name in table_names}
+                try:
+                    for future in as_completed(futures):
+                        table_name = futures[future]
+                        try:
+                            statistics = future.result()
+                        except Exception as e:
+                            print(f"⚠️  获取表 {table_name} 的字段统计失败: {str(e)}")
+                            continue
+                        if statistics:
+                            yield table_name, statistics
+                finally:
+                    # 中途停止时不再读取剩余的表
+                    for future in futures:
+                        future.cancel()
+        finally:
+            for db in connections:
+                db.disconnect()
+
+    def _include_table(self, table_name: str) -> bool:
+        """
+        根据配置判断是否包含该表
+
+        Args:
+            table_name: 表名
+
+        Returns:
+            是否包含
         """
         include_tables = self.datasource_config.get_include_tables()
         exclude_tables = self.datasource_config.get_exclude_tables()
 
         if include_tables:
             # 只包含指定的表
-            return {k: v for k, v in schema.items() if k in include_tables}
+            return table_name in include_tables
         elif exclude_tables:
             # 排除指定的表
-            return {k: v for k, v in schema.items() if k not in exclude_tables}
+            return table_name not in exclude_tables
         else:
             # 包含所有表
-            return schema
+            return True
 
     def load(self) -> None:
         """加载已有的知识库"""
@@ -142,12 +310,40 @@ class KnowledgeBase:
 
         self.vectorstore_manager.add_documents(documents)
 
-    def search(self, query: str, k: int = 5) -> List[Document]:
-        """搜索知识库"""
+    def search(
+        self,
+        query: str,
+        k: int = 5,
+        search_type: str = SEARCH_TYPE_SIMILARITY,
+        lambda_mult: float = DEFAULT_MMR_LAMBDA,
+        metadata_filter: Optional[MetadataFilter] = None
+    ) -> List[Document]:
+        """搜索知识库（search_type 为 similarity 或 mmr，metadata_filter 按 source / table_name / type 预过滤）"""
         if not self.is_initialized:
             raise ValueError("知识库未初始化，请先调用 initialize() 或 load()")
 
-        return self.vectorstore_manager.similarity_search(query, k=k)
+        return self.vectorstore_manager.search(
+            query, k=k, search_type=search_type, lambda_mult=lambda_mult,
+            metadata_filter=metadata_filter
+        )
+
+    def batch_search(
+        self,
+        queries: List[str],
+        k: int = 5,
+        search_type: str = SEARCH_TYPE_SIMILARITY,
+        lambda_mult: float = DEFAULT_MMR_LAMBDA,
+        metadata_filter: Optional[MetadataFilter] = None,
+        query_vectors: Optional[List[List[float]]] = None
+    ) -> List[List[Document]]:
+        """批量搜索知识库（query_vectors 为已计算好的查询向量），返回与查询一一对应的文档列表"""
+        if not self.is_initialized:
+            raise ValueError("知识库未初始化，请先调用 initialize() 或 load()")
+
+        return self.vectorstore_manager.batch_search(
+            queries, k=k, search_type=search_type, lambda_mult=lambda_mult,
+            metadata_filter=metadata_filter, query_vectors=query_vectors
+        )
 
     def get_retriever(self, **kwargs):
         """获取检索器"""
@@ -165,7 +361,8 @@ class KnowledgeBaseManager:
         datasource_manager: DataSourceManager,
         embedding_model: Optional[Embeddings] = None,
         vector_db_type: str = "chroma",
-        persist_directory: str = "./data/chroma"
+        persist_directory: str = "./data/chroma",
+        keep_versions: int = 2
     ):
         """
         初始化知识库管理器
@@ -175,28 +372,43 @@ class KnowledgeBaseManager:
             embedding_model: 嵌入模型
             vector_db_type: 向量数据库类型
             persist_directory: 持久化目录
+            keep_versions: 每个知识库保留的集合版本数（包括当前版本）
         """
         self.datasource_manager = datasource_manager
         self.embedding_model = embedding_model or OpenAIEmbeddings()
         self.vector_db_type = vector_db_type
         self.persist_directory = Path(persist_directory)
+        self.keep_versions = keep_versions
 
         # 知识库字典: datasource_name -> KnowledgeBase
         self.knowledge_bases: Dict[str, KnowledgeBase] = {}
 
+        # 集合别名：重建写入带版本号的影子集合，完成后切换别名
+        self.alias_registry = CollectionAliasRegistry(str(self.persist_directory / "aliases.json"))
+        self._refresh_lock = threading.Lock()
+
+        # Schema 缓存
+        self.schema_cache = get_schema_cache(datasource_manager)
+
+        # 导入检查点
+        self.checkpoint = get_import_checkpoint(datasource_manager)
+
         # 文档处理器
         rag_config = datasource_manager.get_rag_config()
         self.document_processor = DocumentProcessor(
             chunk_size=rag_config.get('chunk_size', 1000),
-            chunk_overlap=rag_config.get('chunk_overlap', 200)
+            chunk_overlap=rag_config.get('chunk_overlap', 200),
+            schema_chunk_tokens=rag_config.get('schema_chunk_tokens'),
+            tokenizer_model=datasource_manager.get_embedding_config().get('model')
         )
 
-    def initialize_all(self, force: bool = False) -> None:
+    def initialize_all(self, force: bool = False, resume: bool = False) -> None:
         """
         初始化所有启用的数据源的知识库
 
         Args:
             force: 是否强制重新初始化（即使已存在）
+            resume: 是否从上次中断的检查点继续导入
         """
         print("\n" + "=" * 80)
         print("🚀 开始初始化所有知识库")
@@ -212,7 +424,7 @@ class KnowledgeBaseManager:
 
         for datasource in enabled_datasources:
             try:
-                self.initialize_knowledge_base(datasource.name, force=force)
+                self.initialize_knowledge_base(datasource.name, force=force, resume=resume)
             except Exception as e:
                 print(f"❌ 初始化知识库 {datasource.name} 失败: {str(e)}")
                 import traceback
@@ -223,13 +435,19 @@ class KnowledgeBaseManager:
         print(f"✅ 知识库初始化完成！共 {len(self.knowledge_bases)} 个知识库")
         print("=" * 80 + "\n")
 
-    def initialize_knowledge_base(self, datasource_name: str, force: bool = False) -> KnowledgeBase:
+    def initialize_knowledge_base(
+        self,
+        datasource_name: str,
+        force: bool = False,
+        resume: bool = False
+    ) -> KnowledgeBase:
         """
         初始化指定数据源的知识库
 
         Args:
             datasource_name: 数据源名称
             force: 是否强制重新初始化
+            resume: 是否从上次中断的检查点继续导入
 
         Returns:
             知识库实例
@@ -247,28 +465,131 @@ class KnowledgeBaseManager:
             print(f"⚠️  知识库 {datasource_name} 已存在，跳过初始化")
             return self.knowledge_bases[datasource_name]
 
-        # 创建向量数据库管理器
-        vectorstore_manager = VectorStoreManager(
+        # 在新版本的影子集合中构建，构建期间查询继续使用当前版本
+        # 只有记录了导入检查点时才能继续构建中断的版本：没有检查点时文档 ID 随机、
+        # 也不会跳过已导入的表，继续写入会重复导入所有文档
+        alias = datasource_config.get_collection_name()
+        collection_name = None
+        if resume and self.checkpoint:
+            collection_name = self.alias_registry.get_building(alias)
+        if collection_name is None:
+            # 先创建新版本再回收中断的版本：版本名按秒生成，先回收会在同一秒内复用刚删除的目录
+            abandoned = self.alias_registry.get_building(alias)
+            collection_name = self.alias_registry.begin_build(alias)
+            if abandoned:
+                self._remove_version(abandoned)
+        print(f"✓ 构建集合版本: {collection_name}")
+
+        # 创建知识库
+        kb = KnowledgeBase(
+            datasource_config=datasource_config,
+            vectorstore_manager=self._create_vectorstore_manager(collection_name),
+            document_processor=self.document_processor,
+            schema_cache=self.schema_cache,
+            checkpoint=self.checkpoint
+        )
+
+        # 初始化知识库（失败时别名不变，可使用 resume 继续构建该版本）
+        kb.initialize(resume=resume)
+
+        # 切换别名并替换内存中的知识库
+        self.alias_registry.promote(alias, collection_name)
+        self.knowledge_bases[datasource_name] = kb
+        print(f"✓ 集合别名已切换: {alias} -> {collection_name}")
+
+        # 回收旧版本
+        for expired in self.alias_registry.expire_versions(alias, self.keep_versions):
+            self._remove_version(expired)
+
+        return kb
+
+    def _create_vectorstore_manager(
+        self,
+        collection_name: str,
+        versioned: bool = True
+    ) -> VectorStoreManager:
+        """
+        创建向量数据库管理器
+
+        Args:
+            collection_name: 集合名称
+            versioned: 是否为带版本的集合（每个版本使用独立的持久化目录，重建时不与
+                查询争用同一个 Chroma SQLite 文件）；为 False 时使用旧的共享目录
+
+        Returns:
+            向量数据库管理器
+        """
+        persist_directory = (
+            self._version_directory(collection_name) if versioned else self.persist_directory
+        )
+        return VectorStoreManager(
             vector_db_type=self.vector_db_type,
             embedding_model=self.embedding_model,
-            persist_directory=str(self.persist_directory),
-            collection_name=datasource_config.get_collection_name()
+            persist_directory=str(persist_directory),
+            collection_name=collection_name
         )
 
-        # 创建知识库
+    def _version_directory(self, collection_name: str) -> Path:
+        """集合版本的持久化目录"""
+        return self.persist_directory / "versions" / collection_name
+
+    def _remove_version(self, collection_name: str) -> None:
+        """删除集合版本的数据和导入检查点"""
+        if self.checkpoint:
+            self.checkpoint.clear(collection_name)
+        shutil.rmtree(self._version_directory(collection_name), ignore_errors=True)
+        print(f"✓ 已回收集合版本: {collection_name}")
+
+    def _open_knowledge_base(self, datasource_config: DataSourceConfig) -> KnowledgeBase:
+        """
+        按别名的当前版本打开知识库（还没有版本时使用旧的同名集合）
+
+        Args:
+            datasource_config: 数据源配置
+
+        Returns:
+            已加载的知识库实例
+        """
+        alias = datasource_config.get_collection_name()
+        current = self.alias_registry.resolve(alias)
+        if current:
+            vectorstore_manager = self._create_vectorstore_manager(current)
+        else:
+            vectorstore_manager = self._create_vectorstore_manager(alias, versioned=False)
+
         kb = KnowledgeBase(
             datasource_config=datasource_config,
             vectorstore_manager=vectorstore_manager,
             document_processor=self.document_processor
         )
+        kb.load()
+        return kb
 
-        # 初始化知识库
-        kb.initialize()
+    def refresh_aliases(self) -> None:
+        """其他进程（如导入脚本）切换别名后，重新加载对应的知识库"""
+        for name in list(self.knowledge_bases):
+            self._refresh_alias(name)
 
-        # 保存到字典
-        self.knowledge_bases[datasource_name] = kb
+    def _refresh_alias(self, datasource_name: str) -> None:
+        """别名指向的版本变化时重新加载知识库（加载失败时继续使用原版本）"""
+        kb = self.knowledge_bases.get(datasource_name)
+        if kb is None or kb.vectorstore_manager is None:
+            return
 
-        return kb
+        current = self.alias_registry.resolve(kb.datasource_config.get_collection_name())
+        if not current or current == kb.vectorstore_manager.collection_name:
+            return
+
+        with self._refresh_lock:
+            kb = self.knowledge_bases[datasource_name]
+            if current == kb.vectorstore_manager.collection_name:
+                return
+            try:
+                self.knowledge_bases[datasource_name] = self._open_knowledge_base(
+                    kb.datasource_config
+                )
+            except Exception as e:
+                print(f"⚠️  切换知识库 {datasource_name} 到 {current} 失败: {str(e)}")
 
     def load_knowledge_base(self, datasource_name: str) -> KnowledgeBase:
         """
@@ -289,23 +610,8 @@ class KnowledgeBaseManager:
         if datasource_name in self.knowledge_bases:
             return self.knowledge_bases[datasource_name]
 
-        # 创建向量数据库管理器
-        vectorstore_manager = VectorStoreManager(
-            vector_db_type=self.vector_db_type,
-            embedding_model=self.embedding_model,
-            persist_directory=str(self.persist_directory),
-            collection_name=datasource_config.get_collection_name()
-        )
-
-        # 创建知识库
-        kb = KnowledgeBase(
-            datasource_config=datasource_config,
-            vectorstore_manager=vectorstore_manager,
-            document_processor=self.document_processor
-        )
-
-        # 加载知识库
-        kb.load()
+        # 加载别名当前指向的版本
+        kb = self._open_knowledge_base(datasource_config)
 
         # 保存到字典
         self.knowledge_bases[datasource_name] = kb
@@ -339,13 +645,18 @@ class KnowledgeBaseManager:
         Returns:
             知识库实例，如果不存在返回 None
         """
+        self._refresh_alias(datasource_name)
         return self.knowledge_bases.get(datasource_name)
 
     def search(
         self,
         query: str,
         datasource_name: Optional[str] = None,
-        k: int = 5
+        k: int = 5,
+        search_type: str = SEARCH_TYPE_SIMILARITY,
+        lambda_mult: float = DEFAULT_MMR_LAMBDA,
+        metadata_filter: Optional[MetadataFilter] = None,
+        datasource_names: Optional[List[str]] = None
     ) -> Dict[str, List[Document]]:
         """
         搜索知识库
@@ -354,27 +665,126 @@ class KnowledgeBaseManager:
             query: 查询文本
             datasource_name: 数据源名称，如果为 None 则搜索所有知识库
             k: 每个知识库返回的文档数量
+            search_type: 检索模式 (similarity, mmr)
+            lambda_mult: MMR 相关性权重
+            metadata_filter: 元数据过滤条件（source / table_name / type）
+            datasource_names: 只搜索这些数据源的知识库（datasource_name 为 None 时生效）
 
         Returns:
             搜索结果字典: datasource_name -> documents
         """
+        # 过滤字段不合法时直接报错，不在每个知识库中各失败一次
+        normalize_filter(metadata_filter)
+
         results = {}
+        tracer = get_tracer()
+
+        with tracer.span(
+            "kb.search", datasource=datasource_name or "*", k=k, search_type=search_type
+        ) as span:
+            names = [datasource_name] if datasource_name else datasource_names
+            if names:
+                # 搜索指定知识库
+                for name in names:
+                    kb = self.get_knowledge_base(name)
+                    if not kb:
+                        raise ValueError(f"知识库不存在: {name}")
+                    with tracer.span("kb.search_one", datasource=name):
+                        results[name] = kb.search(
+                            query, k=k, search_type=search_type,
+                            lambda_mult=lambda_mult, metadata_filter=metadata_filter
+                        )
+            else:
+                # 搜索所有知识库
+                self.refresh_aliases()
+                for name, kb in list(self.knowledge_bases.items()):
+                    try:
+                        with tracer.span("kb.search_one", datasource=name):
+                            results[name] = kb.search(
+                                query, k=k, search_type=search_type,
+                                lambda_mult=lambda_mult, metadata_filter=metadata_filter
+                            )
+                    except Exception as e:
+                        print(f"⚠️  搜索知识库 {name} 失败: {str(e)}")
+                        continue
+
+            if span.is_recording:
+                span.set_attributes({
+                    "kb.searched_count": len(results),
+                    "kb.doc_count": sum(len(docs) for docs in results.values()),
+                })
+
+        return results
 
-        if datasource_name:
-            # 搜索指定知识库
-            kb = self.get_knowledge_base(datasource_name)
-            if kb:
-                results[datasource_name] = kb.search(query, k=k)
+    def batch_search(
+        self,
+        queries: List[str],
+        datasource_name: Optional[str] = None,
+        k: int = 5,
+        search_type: str = SEARCH_TYPE_SIMILARITY,
+        lambda_mult: float = DEFAULT_MMR_LAMBDA,
+        metadata_filter: Optional[MetadataFilter] = None,
+        datasource_names: Optional[List[str]] = None
+    ) -> List[Dict[str, List[Document]]]:
+        """
+        批量搜索知识库：所有查询只调用一次嵌入模型，各知识库共用查询向量并按查询矩阵检索
+
+        Args:
+            queries: 查询文本列表
+            datasource_name: 数据源名称，如果为 None 则搜索所有知识库
+            k: 每个知识库每个查询返回的文档数量
+            search_type: 检索模式 (similarity, mmr)
+            lambda_mult: MMR 相关性权重
+            metadata_filter: 元数据过滤条件（source / table_name / type）
+            datasource_names: 只搜索这些数据源的知识库（datasource_name 为 None 时生效）
+
+        Returns:
+            与查询一一对应的搜索结果字典: datasource_name -> documents
+        """
+        normalize_filter(metadata_filter)
+
+        results: List[Dict[str, List[Document]]] = [{} for _ in queries]
+        tracer = get_tracer()
+
+        with tracer.span(
+            "kb.batch_search", datasource=datasource_name or "*", k=k,
+            batch_size=len(queries), search_type=search_type
+        ) as span:
+            names = [datasource_name] if datasource_name else datasource_names
+            if names:
+                knowledge_bases = []
+                for name in names:
+                    kb = self.get_knowledge_base(name)
+                    if not kb:
+                        raise ValueError(f"知识库不存在: {name}")
+                    knowledge_bases.append((name, kb))
             else:
-                raise ValueError(f"知识库不存在: {datasource_name}")
-        else:
-            # 搜索所有知识库
-            for name, kb in self.knowledge_bases.items():
-                try:
-                    results[name] = kb.search(query, k=k)
-                except Exception as e:
-                    print(f"⚠️  搜索知识库 {name} 失败: {str(e)}")
-                    continue
+                self.refresh_aliases()
+                knowledge_bases = list(self.knowledge_bases.items())
+
+            if queries and knowledge_bases:
+                # 各知识库使用同一个嵌入模型，查询向量只计算一次
+                query_vectors = knowledge_bases[0][1].vectorstore_manager.embed_queries(queries)
+
+                for name, kb in knowledge_bases:
+                    try:
+                        with tracer.span("kb.search_one", datasource=name):
+                            docs_per_query = kb.batch_search(
+                                queries, k=k, search_type=search_type, lambda_mult=lambda_mult,
+                                metadata_filter=metadata_filter, query_vectors=query_vectors
+                            )
+                    except Exception as e:
+                        if names:
+                            raise
+                        print(f"⚠️  搜索知识库 {name} 失败: {str(e)}")
+                        continue
+                    for result, docs in zip(results, docs_per_query):
+                        result[name] = docs
+
+            if span.is_recording:
+                span.set_attribute(
+                    "kb.doc_count", sum(len(docs) for result in results for docs in result.values())
+                )
 
         return results
 
@@ -424,6 +834,7 @@ def get_knowledge_base_manager(
         datasource_manager=datasource_manager,
         embedding_model=embedding_model,
         vector_db_type=vector_config.get('type', 'chroma'),
-        persist_directory=vector_config.get('persist_directory', './data/chroma')
+        persist_directory=vector_config.get('persist_directory', './data/chroma'),
+        keep_versions=vector_config.get('keep_versions', 2)
     )
 
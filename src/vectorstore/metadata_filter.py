@@ -0,0 +1,135 @@
+"""元数据过滤 - 按 source / table_name / type 预过滤，下推到 Chroma where 子句和 FAISS ID 位图"""
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+# 支持过滤的元数据字段
+FILTER_KEYS = ("source", "table_name", "type")
+
+MetadataFilter = Dict[str, Union[str, List[str]]]
+
+
+def normalize_filter(metadata_filter: Optional[MetadataFilter]) -> Dict[str, List[str]]:
+    """
+    规范化过滤条件
+
+    Args:
+        metadata_filter: 字段 -> 值或值列表（同一字段多个值为"或"，不同字段之间为"且"）
+
+    Returns:
+        字段 -> 值列表（去掉空条件）
+
+    Raises:
+        ValueError: 不支持的过滤字段
+    """
+    normalized = {}
+    for key, values in (metadata_filter or {}).items():
+        if key not in FILTER_KEYS:
+            raise ValueError(f"不支持的过滤字段: {key}（支持: {', '.join(FILTER_KEYS)}）")
+        if values is None:
+            continue
+        values = [values] if isinstance(values, str) else list(values)
+        if values:
+            normalized[key] = values
+    return normalized
+
+
+def to_chroma_where(metadata_filter: Optional[MetadataFilter]) -> Optional[Dict[str, Any]]:
+    """
+    转换为 Chroma where 子句
+
+    Returns:
+        where 子句，没有过滤条件时返回 None
+    """
+    clauses = [
+        {key: values[0]} if len(values) == 1 else {key: {"$in": values}}
+        for key, values in normalize_filter(metadata_filter).items()
+    ]
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def matches(metadata: Dict[str, Any], metadata_filter: Optional[MetadataFilter]) -> bool:
+    """判断文档元数据是否满足过滤条件"""
+    return all(
+        metadata.get(key) in values
+        for key, values in normalize_filter(metadata_filter).items()
+    )
+
+
+class MetadataIndex:
+    """
+    元数据位图索引
+
+    记录每个 (字段, 值) 对应的文档位置，过滤时按位组合出位图，不需要逐个读取文档元数据。
+    FAISS 的位置即索引内部位置；Chroma 的位置是 ids 中的下标。
+    """
+
+    def __init__(self, ids: Sequence[Any], metadatas: Iterable[Optional[Dict[str, Any]]]):
+        """
+        构建位图索引
+
+        Args:
+            ids: 文档标识，与 metadatas 一一对应
+            metadatas: 文档元数据
+        """
+        self.ids = list(ids)
+        self.positions = {doc_id: position for position, doc_id in enumerate(self.ids)}
+        values: Dict[str, Dict[Any, List[int]]] = {key: {} for key in FILTER_KEYS}
+        for position, metadata in enumerate(metadatas):
+            for key in FILTER_KEYS:
+                if metadata and key in metadata:
+                    values[key].setdefault(metadata[key], []).append(position)
+
+        self._positions = {
+            key: {
+                value: np.asarray(positions, dtype=np.int64)
+                for value, positions in by_value.items()
+            }
+            for key, by_value in values.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def mask(self, metadata_filter: Optional[MetadataFilter]) -> Optional[np.ndarray]:
+        """
+        计算过滤位图
+
+        Args:
+            metadata_filter: 过滤条件
+
+        Returns:
+            按位置排列的布尔数组，没有过滤条件时返回 None
+        """
+        conditions = normalize_filter(metadata_filter)
+        if not conditions:
+            return None
+
+        result = np.ones(len(self.ids), dtype=bool)
+        for key, values in conditions.items():
+            selected = np.zeros(len(self.ids), dtype=bool)
+            for value in values:
+                positions = self._positions[key].get(value)
+                if positions is not None:
+                    selected[positions] = True
+            result &= selected
+        return result
+
+
+def faiss_search_parameters(mask: np.ndarray) -> Any:
+    """
+    构建只搜索位图中向量的 FAISS 搜索参数（IDSelectorBitmap，其余向量不计算距离）
+
+    Args:
+        mask: 按 FAISS 内部位置排列的布尔数组
+
+    Returns:
+        (SearchParameters, 选择器和位图缓冲区)；后者需要在搜索结束前保持引用
+    """
+    import faiss
+
+    bits = np.packbits(mask, bitorder='little')
+    selector = faiss.IDSelectorBitmap(len(mask), faiss.swig_ptr(bits))
+    return faiss.SearchParameters(sel=selector), (selector, bits)
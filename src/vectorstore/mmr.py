@@ -0,0 +1,65 @@
+"""最大边际相关性（MMR）- 在候选文档中兼顾相关性和多样性"""
+from typing import List, Sequence
+
+import numpy as np
+
+# 检索模式
+SEARCH_TYPE_SIMILARITY = "similarity"
+SEARCH_TYPE_MMR = "mmr"
+SEARCH_TYPES = (SEARCH_TYPE_SIMILARITY, SEARCH_TYPE_MMR)
+
+# MMR 默认候选文档数和相关性权重
+DEFAULT_MMR_FETCH_K = 20
+DEFAULT_MMR_LAMBDA = 0.5
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """按行归一化（零向量保持为零）"""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def maximal_marginal_relevance(
+    query_vector: Sequence[float],
+    candidate_vectors: Sequence[Sequence[float]],
+    k: int = 5,
+    lambda_mult: float = DEFAULT_MMR_LAMBDA
+) -> List[int]:
+    """
+    按 MMR 选择候选文档
+
+    一次矩阵乘法算出候选文档与查询、候选文档两两之间的余弦相似度，之后每一步只更新
+    "与已选文档的最大相似度"向量，不重复计算。
+
+    Args:
+        query_vector: 查询向量
+        candidate_vectors: 候选文档向量（按相似度排序）
+        k: 选择的文档数
+        lambda_mult: 相关性权重，1 表示只看相关性，0 表示只看多样性
+
+    Returns:
+        选中的候选文档下标（按选择顺序）
+    """
+    candidates = np.asarray(candidate_vectors, dtype=np.float32)
+    if k <= 0 or candidates.size == 0:
+        return []
+
+    candidates = _normalize(candidates.reshape(len(candidates), -1))
+    relevance = candidates @ _normalize(np.asarray(query_vector, dtype=np.float32))
+    similarity = candidates @ candidates.T
+
+    first = int(np.argmax(relevance))
+    selected = [first]
+    max_similarity = similarity[first].copy()
+    chosen = np.zeros(len(candidates), dtype=bool)
+    chosen[first] = True
+
+    for _ in range(min(k, len(candidates)) - 1):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+        scores[chosen] = -np.inf
+        index = int(np.argmax(scores))
+        selected.append(index)
+        chosen[index] = True
+        np.maximum(max_similarity, similarity[index], out=max_similarity)
+
+    return selected
@@ -1,10 +1,61 @@
 """向量数据库管理"""
-from typing import List, Optional, Any
+import math
+import threading
+import uuid
+from typing import List, Optional, Any, Sequence, Tuple
+
+import numpy as np
 from langchain.vectorstores import Chroma, FAISS
 from langchain.embeddings import OpenAIEmbeddings
 from langchain.embeddings.base import Embeddings
 from langchain.schema import Document
 
+from .metadata_filter import (
+    MetadataFilter,
+    MetadataIndex,
+    faiss_search_parameters,
+    normalize_filter,
+    to_chroma_where,
+)
+from .mmr import (
+    DEFAULT_MMR_FETCH_K,
+    DEFAULT_MMR_LAMBDA,
+    SEARCH_TYPE_MMR,
+    SEARCH_TYPE_SIMILARITY,
+    maximal_marginal_relevance,
+)
+from ..llm.rate_limiter import EMBEDDING_LIMITER, RateLimitedEmbeddings, get_rate_limiter
+from ..utils.tracing import get_tracer
+
+# Chroma 过滤检索：满足条件的文档不超过该数量时直接读取它们的向量精确计算距离，
+# 否则按选择率放大召回数（再乘以该倍数，不超过上限）后用位图过滤
+CHROMA_FILTER_BRUTE_FORCE_LIMIT = 64
+CHROMA_FILTER_OVERFETCH = 2.0
+CHROMA_FILTER_MAX_OVERFETCH = 500
+
+
+class TracedEmbeddings(Embeddings):
+    """带链路追踪的嵌入模型包装器"""
+    
+    def __init__(self, embedding_model: Embeddings):
+        """
+        初始化包装器
+        
+        Args:
+            embedding_model: 被包装的嵌入模型
+        """
+        self.embedding_model = embedding_model
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """嵌入文档列表"""
+        with get_tracer().span("embedding.embed_documents", text_count=len(texts)):
+            return self.embedding_model.embed_documents(texts)
+    
+    def embed_query(self, text: str) -> List[float]:
+        """嵌入查询文本"""
+        with get_tracer().span("embedding.embed_query", text_length=len(text)):
+            return self.embedding_model.embed_query(text)
+
 
 class VectorStoreManager:
     """向量数据库管理器"""
@@ -27,9 +78,20 @@ class VectorStoreManager:
         """
         self.vector_db_type = vector_db_type.lower()
         self.embedding_model = embedding_model or OpenAIEmbeddings()
+        
+        # 配置了限流时限制嵌入调用的并发数和频率
+        limiter = get_rate_limiter(EMBEDDING_LIMITER)
+        if limiter and not isinstance(self.embedding_model, RateLimitedEmbeddings):
+            self.embedding_model = RateLimitedEmbeddings(self.embedding_model, limiter)
+        
+        # 启用追踪时记录每次嵌入调用
+        if get_tracer().enabled and not isinstance(self.embedding_model, TracedEmbeddings):
+            self.embedding_model = TracedEmbeddings(self.embedding_model)
         self.persist_directory = persist_directory
         self.collection_name = collection_name
         self.vectorstore = None
+        self._metadata_index: Optional[MetadataIndex] = None
+        self._metadata_index_lock = threading.Lock()
     
     def create_vectorstore(self, documents: List[Document]) -> Any:
         """
@@ -66,8 +128,97 @@ class VectorStoreManager:
         else:
             raise ValueError(f"不支持的向量数据库类型: {self.vector_db_type}")
         
+        self._metadata_index = None
         return self.vectorstore
     
+    def add_embedded_documents(
+        self,
+        documents: List[Document],
+        embeddings: List[List[float]],
+        ids: Optional[List[str]] = None
+    ) -> None:
+        """
+        写入已计算好向量的文档（流式导入使用，不再调用嵌入模型）
+        
+        向量数据库尚未创建时先创建（Chroma 打开持久化目录中的同名集合），写入后不立即
+        持久化，全部写完后调用 persist()。
+        
+        Args:
+            documents: 文档列表
+            embeddings: 与文档一一对应的向量
+            ids: 文档 ID，已存在的 ID 会被覆盖；为 None 时随机生成
+        """
+        if not documents:
+            return
+        
+        texts = [doc.page_content for doc in documents]
+        metadatas = [doc.metadata for doc in documents]
+        if ids is None:
+            ids = [str(uuid.uuid4()) for _ in documents]
+        # 写入后元数据位图需要重建
+        self._metadata_index = None
+        
+        if self.vector_db_type == "chroma":
+            if self.vectorstore is None:
+                self.vectorstore = Chroma(
+                    collection_name=self.collection_name,
+                    embedding_function=self.embedding_model,
+                    persist_directory=self.persist_directory
+                )
+            
+            # Chroma 不接受空 metadata，与 langchain 的 add_texts 一样分两组写入
+            with_metadata = [i for i, metadata in enumerate(metadatas) if metadata]
+            without_metadata = [i for i, metadata in enumerate(metadatas) if not metadata]
+            collection = self.vectorstore._collection
+            if with_metadata:
+                collection.upsert(
+                    ids=[ids[i] for i in with_metadata],
+                    embeddings=[embeddings[i] for i in with_metadata],
+                    metadatas=[metadatas[i] for i in with_metadata],
+                    documents=[texts[i] for i in with_metadata]
+                )
+            if without_metadata:
+                collection.upsert(
+                    ids=[ids[i] for i in without_metadata],
+                    embeddings=[embeddings[i] for i in without_metadata],
+                    documents=[texts[i] for i in without_metadata]
+                )
+        
+        elif self.vector_db_type == "faiss":
+            if self.vectorstore is None:
+                self.vectorstore = FAISS.from_embeddings(
+                    text_embeddings=list(zip(texts, embeddings)),
+                    embedding=self.embedding_model,
+                    metadatas=metadatas,
+                    ids=ids
+                )
+            else:
+                # FAISS 不支持 upsert，先删除已存在的同 ID 文档
+                existing = [
+                    doc_id for doc_id in ids
+                    if isinstance(self.vectorstore.docstore.search(doc_id), Document)
+                ]
+                if existing:
+                    self.vectorstore.delete(existing)
+                self.vectorstore.add_embeddings(
+                    list(zip(texts, embeddings)), metadatas=metadatas, ids=ids
+                )
+        
+        else:
+            raise ValueError(f"不支持的向量数据库类型: {self.vector_db_type}")
+    
+    def persist(self) -> None:
+        """持久化向量数据库（未指定持久化目录时不做任何操作）"""
+        if not self.vectorstore or not self.persist_directory:
+            return
+        
+        if self.vector_db_type == "chroma":
+            self.vectorstore.persist()
+            print(f"✓ Chroma 向量数据库已持久化到: {self.persist_directory}")
+        elif self.vector_db_type == "faiss":
+            self.vectorstore.save_local(self.persist_directory)
+            print(f"✓ FAISS 向量数据库已保存到: {self.persist_directory}")
+    
     def load_vectorstore(self) -> Any:
         """
         加载已有的向量数据库
@@ -93,6 +244,7 @@ class VectorStoreManager:
             )
             print(f"✓ 已加载 FAISS 向量数据库: {self.persist_directory}")
         
+        self._metadata_index = None
         return self.vectorstore
     
     def add_documents(self, documents: List[Document]) -> None:
@@ -106,6 +258,7 @@ class VectorStoreManager:
             raise ValueError("向量数据库未初始化，请先创建或加载")
         
         self.vectorstore.add_documents(documents)
+        self._metadata_index = None
         
         # 持久化
         if self.persist_directory:
@@ -120,7 +273,8 @@ class VectorStoreManager:
         self,
         query: str,
         k: int = 5,
-        score_threshold: Optional[float] = None
+        score_threshold: Optional[float] = None,
+        metadata_filter: Optional[MetadataFilter] = None
     ) -> List[Document]:
         """
         相似度搜索
@@ -129,6 +283,7 @@ class VectorStoreManager:
             query: 查询文本
             k: 返回文档数量
             score_threshold: 相似度阈值
+            metadata_filter: 元数据过滤条件（source / table_name / type），在向量检索前过滤
             
         Returns:
             相关文档列表
@@ -136,15 +291,467 @@ class VectorStoreManager:
         if not self.vectorstore:
             raise ValueError("向量数据库未初始化，请先创建或加载")
         
-        if score_threshold is not None:
-            # 使用相似度阈值过滤
-            docs_and_scores = self.vectorstore.similarity_search_with_score(query, k=k)
-            docs = [doc for doc, score in docs_and_scores if score >= score_threshold]
+        with get_tracer().span(
+            "vectorstore.similarity_search",
+            collection=self.collection_name,
+            k=k
+        ) as span:
+            index, mask = self._filter_mask(metadata_filter)
+            if mask is not None:
+                # 按位图只在满足条件的文档中搜索
+                span.set_attribute("vectorstore.filtered", True)
+                query_vector = self.embedding_model.embed_query(query)
+                if self.vector_db_type == "chroma":
+                    docs_and_scores, _ = self._chroma_search(
+                        query_vector, k, metadata_filter, index, mask
+                    )
+                else:
+                    docs_and_scores = [
+                        (self._faiss_document(i), score)
+                        for i, score in self._faiss_search(query_vector, k, mask)
+                    ]
+                docs = [
+                    doc for doc, score in docs_and_scores
+                    if score_threshold is None or score >= score_threshold
+                ]
+            elif score_threshold is not None:
+                # 使用相似度阈值过滤
+                docs_and_scores = self.vectorstore.similarity_search_with_score(query, k=k)
+                docs = [doc for doc, score in docs_and_scores if score >= score_threshold]
+            else:
+                docs = self.vectorstore.similarity_search(query, k=k)
+            
+            span.set_attribute("vectorstore.doc_count", len(docs))
+        
+        return docs
+    
+    def _get_metadata_index(self) -> MetadataIndex:
+        """
+        元数据位图索引（首次过滤检索时构建，写入文档后重建）
+        
+        除本实例的写入外，文档数变化时也会重建（其他进程或直接通过 Chroma 客户端写入同一
+        集合）。文档数不变的原地修改元数据检测不到，需要调用方重新加载。
+        """
+        with self._metadata_index_lock:
+            index = self._metadata_index
+            if index is None or len(index) != self._document_count():
+                index = self._metadata_index = self._build_metadata_index()
+            return index
+    
+    def _document_count(self) -> int:
+        """向量数据库中的文档数（Chroma 为一次 COUNT 查询）"""
+        if self.vector_db_type == "chroma":
+            return self.vectorstore._collection.count()
+        return self.vectorstore.index.ntotal
+    
+    def _build_metadata_index(self) -> MetadataIndex:
+        """读取全部文档元数据构建位图索引"""
+        if self.vector_db_type == "chroma":
+            result = self.vectorstore._collection.get(include=["metadatas"])
+            return MetadataIndex(result["ids"], result["metadatas"])
+        
+        docstore = self.vectorstore.docstore
+        doc_ids = self.vectorstore.index_to_docstore_id
+        positions = range(self.vectorstore.index.ntotal)
+        return MetadataIndex(
+            positions,
+            (getattr(docstore.search(doc_ids.get(i)), 'metadata', None) for i in positions)
+        )
+    
+    def _filter_mask(
+        self,
+        metadata_filter: Optional[MetadataFilter]
+    ) -> Tuple[Optional[MetadataIndex], Optional[np.ndarray]]:
+        """
+        计算过滤位图
+        
+        Returns:
+            (位图索引, 布尔数组)，没有过滤条件时返回 (None, None)
+        """
+        if not normalize_filter(metadata_filter):
+            return None, None
+        
+        index = self._get_metadata_index()
+        return index, index.mask(metadata_filter)
+    
+    def _faiss_search(
+        self,
+        query_vector: List[float],
+        k: int,
+        mask: Optional[np.ndarray] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        在 FAISS 索引中搜索
+        
+        Returns:
+            (内部位置, 距离) 列表，按距离排序
+        """
+        return self._faiss_search_batch([query_vector], k, mask)[0]
+    
+    def _faiss_search_batch(
+        self,
+        query_vectors: Sequence[Sequence[float]],
+        k: int,
+        mask: Optional[np.ndarray] = None
+    ) -> List[List[Tuple[int, float]]]:
+        """
+        用查询矩阵在 FAISS 索引中搜索（一次 index.search 完成所有查询）
+        
+        Returns:
+            每个查询的 (内部位置, 距离) 列表，按距离排序
+        """
+        vectors = np.array(query_vectors, dtype=np.float32).reshape(len(query_vectors), -1)
+        if getattr(self.vectorstore, '_normalize_L2', False):
+            import faiss
+            faiss.normalize_L2(vectors)
+        
+        index = self.vectorstore.index
+        if mask is None:
+            distances, indices = index.search(vectors, k)
         else:
-            docs = self.vectorstore.similarity_search(query, k=k)
+            allowed = int(mask.sum())
+            if not allowed:
+                return [[] for _ in range(len(vectors))]
+            params, _buffers = faiss_search_parameters(mask)
+            distances, indices = index.search(vectors, min(k, allowed), params=params)
+        
+        return [
+            [(int(i), float(d)) for i, d in zip(row_indices, row_distances) if i != -1]
+            for row_indices, row_distances in zip(indices, distances)
+        ]
+    
+    def _faiss_document(self, position: int) -> Document:
+        """按 FAISS 内部位置读取文档"""
+        return self.vectorstore.docstore.search(self.vectorstore.index_to_docstore_id[position])
+    
+    def _chroma_search(
+        self,
+        query_vector: List[float],
+        k: int,
+        metadata_filter: MetadataFilter,
+        index: MetadataIndex,
+        mask: np.ndarray,
+        with_vectors: bool = False
+    ) -> Tuple[List[Tuple[Document, float]], Optional[np.ndarray]]:
+        """
+        在 Chroma 中按过滤位图搜索
+        
+        Chroma 的 where 子句会先从 SQLite 取出全部满足条件的记录，条件越宽越慢，往往比不过滤
+        慢一到两个数量级。这里先用进程内位图：满足条件的文档少时直接读取它们的向量精确计算；
+        多时按选择率放大召回数，做一次只返回 ID 的向量检索后用位图过滤。召回不足时使用 where
+        子句（只依赖 Chroma 公开 API，结果总是准确的）。
+        
+        Returns:
+            ([(文档, 距离)], 文档向量)，with_vectors 为 False 时文档向量为 None
+        """
+        collection = self.vectorstore._collection
+        allowed = np.flatnonzero(mask)
+        k = min(k, len(allowed))
+        if k <= 0:
+            return [], np.empty((0, len(query_vector)), dtype=np.float32) if with_vectors else None
+        
+        if len(allowed) <= CHROMA_FILTER_BRUTE_FORCE_LIMIT:
+            result = collection.get(
+                ids=[index.ids[i] for i in allowed],
+                include=["embeddings", "documents", "metadatas"]
+            )
+            vectors = np.asarray(result["embeddings"], dtype=np.float32)
+            distances = self._chroma_distances(np.asarray(query_vector, dtype=np.float32), vectors)
+            order = np.argsort(distances, kind="stable")[:k]
+            docs_and_scores = [
+                (
+                    Document(
+                        page_content=result["documents"][i],
+                        metadata=result["metadatas"][i] or {}
+                    ),
+                    float(distances[i])
+                )
+                for i in order
+            ]
+            return docs_and_scores, vectors[order] if with_vectors else None
+        
+        hits: List[Tuple[str, float]] = []
+        n_results = math.ceil(k * len(index) / len(allowed) * CHROMA_FILTER_OVERFETCH)
+        if n_results <= CHROMA_FILTER_MAX_OVERFETCH:
+            result = collection.query(
+                query_embeddings=[query_vector],
+                n_results=min(n_results, len(index)),
+                include=["distances"]
+            )
+            hits = [
+                (doc_id, distance)
+                for doc_id, distance in zip(result["ids"][0], result["distances"][0])
+                if index.positions.get(doc_id) is not None and mask[index.positions[doc_id]]
+            ]
+        if len(hits) < k:
+            # 条件较窄，或满足条件的文档离查询较远，放大召回仍不够
+            result = collection.query(
+                query_embeddings=[query_vector],
+                n_results=k,
+                where=to_chroma_where(metadata_filter),
+                include=["distances"]
+            )
+            hits = list(zip(result["ids"][0], result["distances"][0]))
+        hits = hits[:k]
+        
+        include = ["documents", "metadatas"] + (["embeddings"] if with_vectors else [])
+        result = collection.get(ids=[doc_id for doc_id, _ in hits], include=include)
+        rows = {doc_id: i for i, doc_id in enumerate(result["ids"])}
+        order = [rows[doc_id] for doc_id, _ in hits]
+        docs_and_scores = [
+            (
+                Document(
+                    page_content=result["documents"][i],
+                    metadata=result["metadatas"][i] or {}
+                ),
+                float(distance)
+            )
+            for i, (_, distance) in zip(order, hits)
+        ]
+        vectors = None
+        if with_vectors:
+            vectors = np.asarray(result["embeddings"], dtype=np.float32)[order]
+        return docs_and_scores, vectors
+    
+    def _chroma_distances(self, query_vector: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+        """按集合的距离度量（hnsw:space）计算距离，与 Chroma 检索返回的距离一致"""
+        space = (self.vectorstore._collection.metadata or {}).get("hnsw:space", "l2")
+        if space == "cosine":
+            norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query_vector)
+            return 1.0 - (vectors @ query_vector) / np.where(norms == 0, 1.0, norms)
+        if space == "ip":
+            return 1.0 - vectors @ query_vector
+        return ((vectors - query_vector) ** 2).sum(axis=1)
+    
+    def _candidates_with_vectors(
+        self,
+        query_vector: List[float],
+        fetch_k: int,
+        metadata_filter: Optional[MetadataFilter] = None
+    ) -> Tuple[List[Document], np.ndarray]:
+        """按相似度召回候选文档，同时取出存储的文档向量（不重新嵌入）"""
+        index, mask = self._filter_mask(metadata_filter)
+        
+        if self.vector_db_type == "chroma":
+            if mask is not None:
+                docs_and_scores, vectors = self._chroma_search(
+                    query_vector, fetch_k, metadata_filter, index, mask, with_vectors=True
+                )
+                return [doc for doc, _ in docs_and_scores], vectors
+            
+            result = self.vectorstore._collection.query(
+                query_embeddings=[query_vector],
+                n_results=fetch_k,
+                include=["documents", "metadatas", "embeddings"]
+            )
+            docs = [
+                Document(page_content=text, metadata=metadata or {})
+                for text, metadata in zip(result["documents"][0], result["metadatas"][0])
+            ]
+            return docs, np.asarray(result["embeddings"][0], dtype=np.float32)
+        
+        if self.vector_db_type == "faiss":
+            index = self.vectorstore.index
+            positions = self._faiss_search(query_vector, fetch_k, mask)
+            indices = [i for i, _ in positions]
+            docs = [self._faiss_document(i) for i in indices]
+            if indices:
+                vectors = np.vstack([index.reconstruct(i) for i in indices])
+            else:
+                vectors = np.empty((0, index.d))
+            return docs, vectors
+        
+        raise ValueError(f"不支持的向量数据库类型: {self.vector_db_type}")
+    
+    def max_marginal_relevance_search(
+        self,
+        query: str,
+        k: int = 5,
+        fetch_k: int = DEFAULT_MMR_FETCH_K,
+        lambda_mult: float = DEFAULT_MMR_LAMBDA,
+        metadata_filter: Optional[MetadataFilter] = None
+    ) -> List[Document]:
+        """
+        最大边际相关性搜索：先按相似度召回 fetch_k 个候选文档，再在其中兼顾相关性和多样性选出 k 个
+        
+        候选文档使用向量数据库中存储的向量计算多样性，只嵌入一次查询文本。
+        
+        Args:
+            query: 查询文本
+            k: 返回文档数量
+            fetch_k: 候选文档数量
+            lambda_mult: 相关性权重（0-1），越小结果越分散
+            metadata_filter: 元数据过滤条件
+        
+        Returns:
+            相关文档列表
+        """
+        if not self.vectorstore:
+            raise ValueError("向量数据库未初始化，请先创建或加载")
+        
+        with get_tracer().span(
+            "vectorstore.mmr_search",
+            collection=self.collection_name,
+            k=k,
+            fetch_k=fetch_k
+        ) as span:
+            query_vector = self.embedding_model.embed_query(query)
+            docs = self._mmr_by_vector(query_vector, k, fetch_k, lambda_mult, metadata_filter)
+            
+            span.set_attribute("vectorstore.doc_count", len(docs))
         
         return docs
     
+    def _mmr_by_vector(
+        self,
+        query_vector: List[float],
+        k: int,
+        fetch_k: int,
+        lambda_mult: float,
+        metadata_filter: Optional[MetadataFilter] = None
+    ) -> List[Document]:
+        """按查询向量做 MMR 选择"""
+        docs, vectors = self._candidates_with_vectors(
+            query_vector, max(fetch_k, k), metadata_filter
+        )
+        selected = maximal_marginal_relevance(query_vector, vectors, k=k, lambda_mult=lambda_mult)
+        return [docs[i] for i in selected]
+    
+    def search(
+        self,
+        query: str,
+        k: int = 5,
+        search_type: str = SEARCH_TYPE_SIMILARITY,
+        score_threshold: Optional[float] = None,
+        fetch_k: int = DEFAULT_MMR_FETCH_K,
+        lambda_mult: float = DEFAULT_MMR_LAMBDA,
+        metadata_filter: Optional[MetadataFilter] = None
+    ) -> List[Document]:
+        """
+        按检索模式搜索
+        
+        Args:
+            query: 查询文本
+            k: 返回文档数量
+            search_type: 检索模式 (similarity, mmr)
+            score_threshold: 相似度阈值（仅 similarity 模式）
+            fetch_k: MMR 候选文档数量
+            lambda_mult: MMR 相关性权重
+            metadata_filter: 元数据过滤条件
+        
+        Returns:
+            相关文档列表
+        """
+        if search_type == SEARCH_TYPE_MMR:
+            return self.max_marginal_relevance_search(
+                query, k=k, fetch_k=fetch_k, lambda_mult=lambda_mult,
+                metadata_filter=metadata_filter
+            )
+        if search_type == SEARCH_TYPE_SIMILARITY:
+            return self.similarity_search(
+                query, k=k, score_threshold=score_threshold, metadata_filter=metadata_filter
+            )
+        raise ValueError(f"不支持的检索模式: {search_type}")
+    
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """
+        一次嵌入调用计算多个查询的向量（使用 embed_documents，查询和文档按同一方式嵌入）
+        
+        Args:
+            queries: 查询文本列表
+        
+        Returns:
+            与查询一一对应的向量
+        """
+        if not queries:
+            return []
+        return self.embedding_model.embed_documents(list(queries))
+    
+    def batch_search(
+        self,
+        queries: List[str],
+        k: int = 5,
+        search_type: str = SEARCH_TYPE_SIMILARITY,
+        fetch_k: int = DEFAULT_MMR_FETCH_K,
+        lambda_mult: float = DEFAULT_MMR_LAMBDA,
+        metadata_filter: Optional[MetadataFilter] = None,
+        query_vectors: Optional[List[List[float]]] = None
+    ) -> List[List[Document]]:
+        """
+        批量搜索：一次嵌入调用得到所有查询的向量，相似度模式下用查询矩阵一次检索
+        （FAISS 一次 index.search，Chroma 一次多查询 query）
+        
+        Args:
+            queries: 查询文本列表
+            k: 每个查询返回的文档数量
+            search_type: 检索模式 (similarity, mmr)
+            fetch_k: MMR 候选文档数量
+            lambda_mult: MMR 相关性权重
+            metadata_filter: 元数据过滤条件
+            query_vectors: 已计算好的查询向量（多个知识库共用一次嵌入调用），为 None 时在这里嵌入
+        
+        Returns:
+            与查询一一对应的文档列表
+        """
+        if not self.vectorstore:
+            raise ValueError("向量数据库未初始化，请先创建或加载")
+        if search_type not in (SEARCH_TYPE_SIMILARITY, SEARCH_TYPE_MMR):
+            raise ValueError(f"不支持的检索模式: {search_type}")
+        if not queries:
+            return []
+        
+        with get_tracer().span(
+            "vectorstore.batch_search",
+            collection=self.collection_name,
+            k=k,
+            batch_size=len(queries),
+            search_type=search_type
+        ) as span:
+            if query_vectors is None:
+                query_vectors = self.embed_queries(queries)
+            
+            index, mask = self._filter_mask(metadata_filter)
+            if mask is not None:
+                span.set_attribute("vectorstore.filtered", True)
+            
+            if search_type == SEARCH_TYPE_MMR:
+                results = [
+                    self._mmr_by_vector(vector, k, fetch_k, lambda_mult, metadata_filter)
+                    for vector in query_vectors
+                ]
+            elif self.vector_db_type == "faiss":
+                results = [
+                    [self._faiss_document(i) for i, _ in positions]
+                    for positions in self._faiss_search_batch(query_vectors, k, mask)
+                ]
+            elif self.vector_db_type == "chroma" and mask is not None:
+                results = [
+                    [
+                        doc for doc, _ in
+                        self._chroma_search(vector, k, metadata_filter, index, mask)[0]
+                    ]
+                    for vector in query_vectors
+                ]
+            elif self.vector_db_type == "chroma":
+                result = self.vectorstore._collection.query(
+                    query_embeddings=list(query_vectors),
+                    n_results=k,
+                    include=["documents", "metadatas"]
+                )
+                results = [
+                    [
+                        Document(page_content=text, metadata=metadata or {})
+                        for text, metadata in zip(texts, metadatas)
+                    ]
+                    for texts, metadatas in zip(result["documents"], result["metadatas"])
+                ]
+            else:
+                raise ValueError(f"不支持的向量数据库类型: {self.vector_db_type}")
+            
+            span.set_attribute("vectorstore.doc_count", sum(len(docs) for docs in results))
+        
+        return results
+    
     def as_retriever(self, **kwargs):
         """
         转换为检索器
@@ -0,0 +1,69 @@
+"""测试异步数据库实现"""
+import asyncio
+
+import pytest
+
+pytest.importorskip("sqlalchemy.ext.asyncio")
+pytest.importorskip("aiosqlite")
+
+from src.database.async_sql import AsyncSQLiteDatabase, dispose_async_engines, get_async_engine
+from src.database.base import QueryLimitExceededError
+from src.database.sqlite_db import SQLiteDatabase
+from src.database.synthetic import generate_synthetic_sqlite
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """生成小规模合成数据库"""
+    path = tmp_path / "async.db"
+    generate_synthetic_sqlite(str(path), table_count=3, columns_per_table=4, row_count=30)
+    yield str(path)
+    asyncio.run(dispose_async_engines())
+
+
+class TestAsyncSQLiteDatabase:
+    """测试 AsyncSQLiteDatabase 类"""
+
+    def test_schema_matches_sync_implementation(self, db_path):
+        """测试异步 schema 与同步实现一致"""
+        async def load():
+            async with AsyncSQLiteDatabase({'database': db_path}) as db:
+                return await db.get_schema()
+
+        with SQLiteDatabase({'database': db_path}) as db:
+            expected = db.get_schema()
+
+        assert asyncio.run(load()) == expected
+
+    def test_iter_query_with_row_cap(self, db_path):
+        """测试异步流式查询和行数上限"""
+        async def stream():
+            async with AsyncSQLiteDatabase({'database': db_path}) as db:
+                table_name = next(iter(await db.get_schema()))
+                rows = [row async for row in db.iter_query(f'SELECT * FROM "{table_name}"', fetch_size=8)]
+
+                with pytest.raises(QueryLimitExceededError):
+                    async for _ in db.iter_query(f'SELECT * FROM "{table_name}"', max_rows=5):
+                        pass
+
+                return rows
+
+        rows = asyncio.run(stream())
+        assert len(rows) == 30
+
+    def test_instances_share_engine(self, db_path):
+        """测试同一数据源的多个实例共享连接池"""
+        async def engines():
+            first = AsyncSQLiteDatabase({'database': db_path})
+            second = AsyncSQLiteDatabase({'database': db_path})
+            await first.connect()
+            await second.connect()
+            return first.engine, second.engine
+
+        first_engine, second_engine = asyncio.run(engines())
+        assert first_engine is second_engine
+        assert get_async_engine(AsyncSQLiteDatabase({'database': db_path})._build_url()) is first_engine
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,210 @@
+"""测试批量检索和批量问答"""
+import inspect
+import threading
+import time
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain.schema import Document
+
+import src.api.main as api_main
+from benchmarks.bench_api import build_kb_manager
+from benchmarks.fakes import DeterministicHashEmbeddings, FakeLLM
+from src.rag.rag_retriever import RAGRetriever
+from src.vectorstore.vector_store import VectorStoreManager
+
+
+class CountingEmbeddings(DeterministicHashEmbeddings):
+    """分别记录文档和查询的嵌入调用次数"""
+
+    def __init__(self):
+        super().__init__()
+        self.document_calls = 0
+        self.query_calls = 0
+
+    def embed_documents(self, texts):
+        self.document_calls += 1
+        return super().embed_documents(texts)
+
+    def embed_query(self, text):
+        self.query_calls += 1
+        return super().embed_query(text)
+
+
+class ConcurrencyTrackingLLM(FakeLLM):
+    """记录同时进行的调用数，问题中包含"失败"时抛出异常"""
+
+    active: int = 0
+    max_active: int = 0
+    lock: Any = None
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.lock = threading.Lock()
+
+    def _call(self, prompt, stop=None, run_manager=None, **kwargs):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            if "失败" in prompt.rsplit("问题", 1)[-1]:
+                raise RuntimeError("模拟生成失败")
+            return super()._call(prompt, stop=stop, run_manager=run_manager, **kwargs)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def make_documents():
+    """每个表一个 schema 文档和一个示例数据文档"""
+    documents = []
+    for table in ("orders", "customers", "products", "payments"):
+        documents.append(Document(
+            page_content=f"表名: {table}\n字段信息: {table}_id, {table}_name",
+            metadata={"source": "database_schema", "table_name": table, "type": "schema"}
+        ))
+        documents.append(Document(
+            page_content=f"表 {table} 的示例数据: {table}_id=1",
+            metadata={"source": "sample_data", "table_name": table, "type": "data"}
+        ))
+    return documents
+
+
+QUERIES = ["orders 订单", "customers 用户", "products 商品", "payments 支付"]
+
+
+class TestVectorStoreBatchSearch:
+    """测试 VectorStoreManager.batch_search"""
+
+    @pytest.fixture(params=["faiss", "chroma"])
+    def manager(self, request, tmp_path):
+        manager = VectorStoreManager(
+            vector_db_type=request.param,
+            embedding_model=CountingEmbeddings(),
+            persist_directory=str(tmp_path),
+            collection_name="batch_test"
+        )
+        manager.create_vectorstore(make_documents())
+        return manager
+
+    @pytest.mark.parametrize("metadata_filter", [None, {"type": "schema"}])
+    def test_matches_single_search(self, manager, metadata_filter):
+        """测试批量结果与逐个检索一致，且所有查询只调用一次嵌入模型"""
+        embeddings = manager.embedding_model
+        document_calls = embeddings.document_calls
+
+        batch = manager.batch_search(QUERIES, k=3, metadata_filter=metadata_filter)
+
+        assert embeddings.document_calls == document_calls + 1
+        assert embeddings.query_calls == 0
+        expected = [manager.similarity_search(query, k=3, metadata_filter=metadata_filter) for query in QUERIES]
+        assert [[doc.page_content for doc in docs] for docs in batch] == [
+            [doc.page_content for doc in docs] for docs in expected
+        ]
+
+    def test_mmr_and_edge_cases(self, manager):
+        """测试 MMR 模式、空查询列表和不支持的检索模式"""
+        batch = manager.batch_search(QUERIES[:2], k=2, search_type="mmr", metadata_filter={"type": "data"})
+        assert [len(docs) for docs in batch] == [2, 2]
+        assert {doc.metadata["type"] for docs in batch for doc in docs} == {"data"}
+
+        assert manager.batch_search([], k=2) == []
+        with pytest.raises(ValueError):
+            manager.batch_search(QUERIES, search_type="random")
+
+
+class TestRAGBatchQuery:
+    """测试 RAGRetriever.batch_query"""
+
+    @pytest.fixture
+    def manager(self):
+        manager = VectorStoreManager(vector_db_type="faiss", embedding_model=DeterministicHashEmbeddings())
+        manager.create_vectorstore(make_documents())
+        return manager
+
+    def test_concurrency_limit(self, manager):
+        """测试回答并发生成且不超过并发上限"""
+        llm = ConcurrencyTrackingLLM(latency=0.05)
+        retriever = RAGRetriever(manager, llm, top_k=2)
+
+        start = time.perf_counter()
+        results = retriever.batch_query(QUERIES * 2, max_concurrency=2)
+        elapsed = time.perf_counter() - start
+
+        assert len(results) == 8
+        assert all(result["answer"] and result["sources"] for result in results)
+        assert llm.call_count == 8
+        assert llm.max_active == 2
+        assert elapsed < 8 * 0.05
+
+    def test_per_item_errors(self, manager):
+        """测试单个问题失败时其他问题正常返回"""
+        retriever = RAGRetriever(manager, ConcurrencyTrackingLLM(), top_k=2, context_max_tokens=500)
+
+        results = retriever.batch_query(["orders 订单", "这个问题会失败", "customers 用户"])
+
+        assert results[1] == {"error": "模拟生成失败"}
+        assert results[0]["answer"] and results[2]["answer"]
+        assert results[0]["context_stats"]["packed_docs"] >= 1
+
+
+class TestBatchSearchEndpoint:
+    """测试 /search/batch 接口"""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        monkeypatch.setattr(api_main, "kb_manager", build_kb_manager(50))
+        return TestClient(api_main.app)
+
+    def test_batch_search(self, client):
+        """测试批量搜索返回与查询一一对应的结果"""
+        response = client.post("/search/batch", json={"queries": QUERIES[:2], "top_k": 3})
+
+        assert response.status_code == 200
+        items = response.json()["items"]
+        assert [item["query"] for item in items] == QUERIES[:2]
+        assert all(item["total_results"] == 3 and item["error"] is None for item in items)
+
+    def test_invalid_request_not_retried_per_query(self, client, monkeypatch):
+        """测试知识库不存在时返回 404，而不是逐个查询重试"""
+        calls = []
+        monkeypatch.setattr(api_main.kb_manager, "search", lambda *args, **kwargs: calls.append(args))
+
+        response = client.post("/search/batch", json={"queries": QUERIES, "knowledge_base": "missing"})
+
+        assert response.status_code == 404
+        assert "missing" in response.json()["detail"]
+        assert calls == []
+
+    def test_missing_datasource_filter(self, client):
+        """测试过滤条件中的数据源不存在时返回 404"""
+        response = client.post(
+            "/search/batch", json={"queries": QUERIES, "filters": {"datasource": ["missing"]}}
+        )
+
+        assert response.status_code == 404
+        assert "missing" in response.json()["detail"]
+
+    def test_server_value_error_falls_back_per_query(self, client, monkeypatch):
+        """测试服务端出现 ValueError 时仍逐个查询重试，而不是返回 4xx"""
+        def fail(*args, **kwargs):
+            raise ValueError("向量库状态异常")
+
+        monkeypatch.setattr(api_main.kb_manager, "batch_search", fail)
+        monkeypatch.setattr(api_main.kb_manager, "search", lambda query, **kwargs: {})
+
+        response = client.post("/search/batch", json={"queries": QUERIES[:2]})
+
+        assert response.status_code == 200
+        assert response.json()["failed"] == 0
+        assert [item["query"] for item in response.json()["items"]] == QUERIES[:2]
+
+    def test_blocking_endpoints_run_in_threadpool(self):
+        """测试批量接口为同步函数（由 FastAPI 在线程池中执行，不阻塞事件循环）"""
+        assert not inspect.iscoroutinefunction(api_main.batch_search_knowledge_bases)
+        assert not inspect.iscoroutinefunction(api_main.batch_query_knowledge_base)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,150 @@
+"""测试集合别名切换"""
+import pytest
+import yaml
+
+from benchmarks.fakes import DeterministicHashEmbeddings
+from src.database.synthetic import generate_synthetic_sqlite
+from src.utils.datasource_config import DataSourceManager
+from src.vectorstore.collection_alias import CollectionAliasRegistry
+from src.vectorstore.knowledge_base_manager import KnowledgeBase, KnowledgeBaseManager
+
+
+def make_kb_manager(tmp_path, vector_db_type="faiss", checkpoint_enabled=True):
+    """使用合成 SQLite 数据库和假嵌入模型的知识库管理器"""
+    db_path = tmp_path / "orders.db"
+    generate_synthetic_sqlite(str(db_path), table_count=3, columns_per_table=3, row_count=3)
+
+    config_path = tmp_path / "datasources.yaml"
+    with open(config_path, 'w', encoding='utf-8') as f:
+        yaml.safe_dump({
+            'datasources': [{
+                'name': 'orders',
+                'display_name': '订单库',
+                'description': '',
+                'type': 'sqlite',
+                'enabled': True,
+                'connection': {'database': str(db_path)},
+                'knowledge_base': {'collection_name': 'kb_orders', 'include_sample_data': False},
+            }],
+            'schema_cache': {'enabled': False},
+            'import_checkpoint': {'enabled': checkpoint_enabled, 'directory': str(tmp_path / "checkpoints")},
+        }, f, allow_unicode=True)
+
+    return KnowledgeBaseManager(
+        datasource_manager=DataSourceManager(str(config_path)),
+        embedding_model=DeterministicHashEmbeddings(),
+        vector_db_type=vector_db_type,
+        persist_directory=str(tmp_path / "vectors"),
+        keep_versions=2
+    )
+
+
+class TestCollectionAliasRegistry:
+    """测试 CollectionAliasRegistry 类"""
+
+    def test_promote_switches_current(self, tmp_path):
+        """测试构建中的版本在切换前不可见"""
+        registry = CollectionAliasRegistry(str(tmp_path / "aliases.json"))
+
+        name = registry.begin_build("kb_orders")
+        assert registry.resolve("kb_orders") is None
+        assert registry.get_building("kb_orders") == name
+
+        registry.promote("kb_orders", name)
+        assert registry.resolve("kb_orders") == name
+        assert registry.get_building("kb_orders") is None
+
+    def test_visible_to_other_instances(self, tmp_path):
+        """测试其他进程（实例）切换后重新读取注册表"""
+        path = str(tmp_path / "aliases.json")
+        reader = CollectionAliasRegistry(path)
+        writer = CollectionAliasRegistry(path)
+        assert reader.resolve("kb_orders") is None
+
+        writer.promote("kb_orders", "kb_orders__v1")
+
+        assert reader.resolve("kb_orders") == "kb_orders__v1"
+
+    def test_expire_versions_keeps_current(self, tmp_path):
+        """测试只回收超出保留数量的旧版本"""
+        registry = CollectionAliasRegistry(str(tmp_path / "aliases.json"))
+        for version in ("v1", "v2", "v3"):
+            registry.promote("kb_orders", version)
+
+        assert registry.expire_versions("kb_orders", keep=2) == ["v1"]
+        assert registry.expire_versions("kb_orders", keep=2) == []
+        assert registry.resolve("kb_orders") == "v3"
+
+
+class TestBlueGreenRebuild:
+    """测试 KnowledgeBaseManager 的影子集合重建"""
+
+    @pytest.fixture
+    def kb_manager(self, tmp_path):
+        """使用 FAISS 和假嵌入模型的知识库管理器"""
+        return make_kb_manager(tmp_path)
+
+    def test_rebuild_swaps_and_collects_old_versions(self, kb_manager):
+        """测试每次重建生成新版本，切换别名并只保留最近两个版本"""
+        versions = []
+        for _ in range(3):
+            kb = kb_manager.initialize_knowledge_base("orders", force=True)
+            versions.append(kb.vectorstore_manager.collection_name)
+
+        assert len(set(versions)) == 3
+        assert kb_manager.alias_registry.resolve("kb_orders") == versions[-1]
+        assert kb_manager.get_knowledge_base("orders").vectorstore_manager.collection_name == versions[-1]
+        assert not kb_manager._version_directory(versions[0]).exists()
+        assert kb_manager._version_directory(versions[1]).exists()
+
+    def test_serving_manager_follows_alias(self, kb_manager, tmp_path):
+        """测试另一个进程重建后，查询方自动加载新版本"""
+        kb_manager.initialize_knowledge_base("orders")
+
+        serving = KnowledgeBaseManager(
+            datasource_manager=kb_manager.datasource_manager,
+            embedding_model=DeterministicHashEmbeddings(),
+            vector_db_type="faiss",
+            persist_directory=str(kb_manager.persist_directory)
+        )
+        serving.load_knowledge_base("orders")
+        old_version = serving.get_knowledge_base("orders").vectorstore_manager.collection_name
+
+        new_version = kb_manager.initialize_knowledge_base("orders", force=True).vectorstore_manager.collection_name
+
+        assert new_version != old_version
+        assert serving.get_knowledge_base("orders").vectorstore_manager.collection_name == new_version
+        assert serving.search("订单", datasource_name="orders", k=2)["orders"]
+
+
+    def test_resume_without_checkpoint_starts_fresh_version(self, tmp_path, monkeypatch):
+        """测试未启用导入检查点时 resume 不继续写入中断的版本（否则文档会重复）"""
+        kb_manager = make_kb_manager(tmp_path, vector_db_type="chroma", checkpoint_enabled=False)
+        assert kb_manager.checkpoint is None
+
+        # 第一次构建写完文档后失败，版本停留在构建中
+        initialize = KnowledgeBase.initialize
+
+        def failing_initialize(kb, resume=False):
+            initialize(kb, resume=resume)
+            raise RuntimeError("模拟导入中断")
+
+        monkeypatch.setattr(KnowledgeBase, "initialize", failing_initialize)
+        with pytest.raises(RuntimeError):
+            kb_manager.initialize_knowledge_base("orders")
+        abandoned = kb_manager.alias_registry.get_building("kb_orders")
+        assert abandoned
+
+        monkeypatch.setattr(KnowledgeBase, "initialize", initialize)
+        kb = kb_manager.initialize_knowledge_base("orders", resume=True)
+
+        collection = kb.vectorstore_manager.vectorstore._collection
+        metadatas = collection.get(include=["metadatas"])["metadatas"]
+        tables = [metadata["table_name"] for metadata in metadatas if metadata["type"] == "schema"]
+        assert kb.vectorstore_manager.collection_name != abandoned
+        assert not kb_manager._version_directory(abandoned).exists()
+        assert len(tables) == len(set(tables))
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
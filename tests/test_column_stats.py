@@ -0,0 +1,123 @@
+"""测试字段统计信息"""
+import base64
+import json
+import sqlite3
+
+import pytest
+
+from src.database.column_stats import parse_mysql_histogram, pg_distinct_count
+from src.database.sqlite_db import SQLiteDatabase
+from src.database.synthetic import generate_synthetic_sqlite
+from src.rag.document_processor import DocumentProcessor
+from src.utils.datasource_config import DataSourceConfig
+from src.vectorstore.knowledge_base_manager import KnowledgeBase
+
+
+class TestStatisticsParsing:
+    """测试统计信息目录解析"""
+
+    def test_pg_distinct_count(self):
+        """测试 n_distinct 负数表示比例"""
+        assert pg_distinct_count(12, 1000) == 12
+        assert pg_distinct_count(-0.5, 1000) == 500
+        assert pg_distinct_count(-1, -1) is None
+
+    def test_singleton_histogram(self):
+        """测试 singleton 直方图解析常见值"""
+        encoded = "base64:type254:" + base64.b64encode("已支付".encode('utf-8')).decode()
+        histogram = json.dumps({
+            "histogram-type": "singleton",
+            "null-values": 0.1,
+            "buckets": [["base64:type254:YQ==", 0.2], [encoded, 0.9]],
+        })
+
+        stats = parse_mysql_histogram(histogram)
+
+        assert stats['null_fraction'] == 0.1
+        assert stats['distinct'] == 2
+        assert stats['min'] == "a"
+        assert stats['top_values'][0] == ("已支付", pytest.approx(0.7))
+
+    def test_equi_height_histogram(self):
+        """测试 equi-height 直方图解析范围"""
+        stats = parse_mysql_histogram({
+            "histogram-type": "equi-height",
+            "null-values": 0.0,
+            "buckets": [[1, 50, 0.5, 50], [51, 100, 1.0, 50]],
+        })
+
+        assert (stats['min'], stats['max'], stats['distinct']) == (1, 100, 100)
+        assert 'top_values' not in stats
+
+
+class TestColumnStatisticsStage:
+    """测试字段统计文档生成"""
+
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        """生成带索引并已 ANALYZE 的合成数据库"""
+        path = tmp_path / "stats.db"
+        generate_synthetic_sqlite(str(path), table_count=3, columns_per_table=3, row_count=200)
+
+        connection = sqlite3.connect(str(path))
+        with connection:
+            for (table_name,) in connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE '\\_%' ESCAPE '\\'"
+            ).fetchall():
+                column_name = connection.execute(f'PRAGMA table_info("{table_name}")').fetchall()[1][1]
+                connection.execute(f'CREATE INDEX "idx_{table_name}" ON "{table_name}" ("{column_name}")')
+            connection.execute("ANALYZE")
+        connection.close()
+        return str(path)
+
+    def test_sqlite_column_statistics(self, db_path):
+        """测试从 sqlite_stat1 读取统计信息"""
+        with SQLiteDatabase({'database': db_path}) as db:
+            table_name, table_info = next(iter(db.get_schema().items()))
+            statistics = db.get_column_statistics(table_name)
+
+        indexed_column = list(table_info['columns'])[1]
+        assert statistics['row_count'] == 200
+        assert statistics['columns']['id'] == {'distinct': 200, 'null_fraction': 0.0}
+        assert statistics['columns'][indexed_column]['distinct'] > 0
+
+    def test_without_analyze(self, tmp_path):
+        """测试没有统计信息时返回 None"""
+        path = str(tmp_path / "plain.db")
+        generate_synthetic_sqlite(path, table_count=1, columns_per_table=2, row_count=5)
+
+        with SQLiteDatabase({'database': path}) as db:
+            assert db.get_column_statistics(next(iter(db.get_schema()))) is None
+
+    def test_profile_documents(self, db_path):
+        """测试并发读取所有表并生成统计文档"""
+        config = DataSourceConfig(
+            name="stats_db",
+            display_name="统计库",
+            description="",
+            type="sqlite",
+            enabled=True,
+            connection={'database': db_path},
+            knowledge_base={'column_stats_concurrency': 2}
+        )
+        kb = KnowledgeBase(config, vectorstore_manager=None, document_processor=DocumentProcessor())
+
+        with SQLiteDatabase({'database': db_path}) as db:
+            table_names = list(db.get_schema())
+        items = kb._profile_tables(table_names)
+        first_name, first_statistics = next(items)
+        profiles = {first_name: first_statistics, **dict(items)}
+
+        assert sorted(profiles) == sorted(table_names)
+
+        docs = DocumentProcessor().process_column_statistics(table_names[0], profiles[table_names[0]])
+        assert len(docs) == 1
+        assert docs[0].metadata == {
+            "source": "column_statistics", "table_name": table_names[0], "type": "profile"
+        }
+        assert "约 200 行" in docs[0].page_content
+        assert "id: 不同值约 200; 空值 0.0%" in docs[0].page_content
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
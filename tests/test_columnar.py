@@ -0,0 +1,77 @@
+"""测试列式查询结果"""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.database.columnar import ColumnarResult
+from src.database.sqlite_db import SQLiteDatabase
+from src.database.synthetic import generate_synthetic_sqlite
+
+
+class TestColumnarResult:
+    """测试 ColumnarResult 类"""
+
+    def test_from_batches_infers_dtypes(self):
+        """测试按批次构建并推断列类型"""
+        result = ColumnarResult.from_batches(
+            ["id", "price", "name", "score"],
+            [[(1, 1.5, "a", 3), (2, 2.5, "b", None)], [(3, 3.5, "c", 7)]]
+        )
+
+        assert len(result) == 3
+        assert result.column("id").dtype == np.int64
+        assert result.column("price").dtype == np.float64
+        assert result.column("name").dtype == object
+        # 含 None 的整数列保持 object，避免 3 变成 3.0
+        assert result.column("score").tolist() == [3, None, 7]
+
+    def test_from_records_fills_missing_fields(self):
+        """测试字段不一致的字典行"""
+        result = ColumnarResult.from_records([{"a": 1}, {"a": 2, "b": "x"}, {"b": "y"}])
+
+        assert result.columns == ["a", "b"]
+        assert result.column("a").tolist() == [1, 2, None]
+        assert result.column("b").tolist() == [None, "x", "y"]
+
+    def test_iter_rows_round_trip(self):
+        """测试行视图与原始数据一致"""
+        rows = [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]
+        result = ColumnarResult.from_records(rows)
+
+        assert list(result.iter_rows()) == rows
+        assert list(result.iter_rows(limit=1)) == rows[:1]
+
+    def test_sqlite_columnar_matches_row_query(self, tmp_path):
+        """测试 SQLite 列式查询与行查询结果一致"""
+        path = str(tmp_path / "columnar.db")
+        generate_synthetic_sqlite(path, table_count=1, columns_per_table=5, row_count=25)
+
+        with SQLiteDatabase({'database': path}) as db:
+            table_name = next(iter(db.get_schema()))
+            query = f'SELECT * FROM "{table_name}"'
+            rows = db.execute_query(query)
+            result = db.execute_query_columnar(query, fetch_size=4)
+
+        assert len(result) == 25
+        assert list(result.iter_rows()) == rows
+
+
+class TestDocumentProcessorColumnar:
+    """测试 DocumentProcessor 接受列式结果"""
+
+    def test_process_sample_data_identical_output(self):
+        """测试列式输入与字典输入生成相同文本"""
+        pytest.importorskip("langchain")
+        from src.rag.document_processor import DocumentProcessor
+
+        rows = [{"id": 1, "amount": 9.5, "name": "a"}, {"id": 2, "amount": 3.0, "name": None}]
+        processor = DocumentProcessor()
+
+        expected = processor.process_sample_data("orders", rows)
+        actual = processor.process_sample_data("orders", ColumnarResult.from_records(rows))
+
+        assert actual[0].page_content == expected[0].page_content
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,76 @@
+"""测试上下文组装"""
+import pytest
+from langchain.schema import Document
+
+from benchmarks.common import make_sample_rows, make_synthetic_schema
+from src.rag.context_packer import ContextPacker
+from src.rag.document_processor import DocumentProcessor
+from src.utils.tokenizer import count_tokens
+
+
+class TestContextPacker:
+    """测试 ContextPacker 类"""
+
+    @pytest.fixture
+    def processor(self):
+        return DocumentProcessor(max_workers=1, schema_chunk_tokens=60)
+
+    @pytest.fixture
+    def schema(self):
+        return make_synthetic_schema(3, columns_per_table=12)
+
+    def test_merges_and_deduplicates_by_table(self, processor, schema):
+        """测试同一个表的 schema 分块、示例数据合并为一个文档，重复文档只保留一份"""
+        table = next(iter(schema))
+        chunks = processor.process_database_schema({table: schema[table]})
+        assert len(chunks) > 1
+        sample = processor.process_sample_data(table, make_sample_rows(2))[0]
+
+        documents = chunks + [sample, chunks[0], sample]
+        packed, stats = ContextPacker(max_tokens=10000).pack(documents)
+
+        assert len(packed) == 1
+        text = packed[0].page_content
+        assert text.count(f"表名: {table}") == 1
+        assert text.index("字段信息") < text.index("示例数据")
+        for column in schema[table]['columns']:
+            assert f"  - {column} (" in text
+        assert packed[0].metadata['table_name'] == table
+        assert packed[0].metadata['type'] == "table"
+        assert packed[0].metadata['source'] == "database_schema, sample_data"
+
+        assert stats["original_docs"] == len(documents)
+        assert stats["packed_docs"] == 1
+        assert stats["saved_tokens"] == stats["original_tokens"] - stats["packed_tokens"] > 0
+
+    def test_budget_prefers_schema_over_samples(self, processor, schema):
+        """测试预算不足时先保留各表 schema，再放入示例数据"""
+        documents = []
+        for table in schema:
+            documents += processor.process_sample_data(table, make_sample_rows(5))
+            documents += DocumentProcessor(max_workers=1).process_database_schema({table: schema[table]})
+
+        schema_tokens = sum(count_tokens(doc.page_content) for doc in documents if doc.metadata['type'] == "schema")
+        packed, stats = ContextPacker(max_tokens=schema_tokens + 40).pack(documents)
+
+        assert [doc.metadata['table_name'] for doc in packed] == list(schema)
+        for doc in packed:
+            assert doc.page_content.startswith(f"表名: {doc.metadata['table_name']}")
+        assert stats["truncated"] <= 1
+        assert stats["packed_tokens"] <= schema_tokens + 40 + 3 * len(packed)
+
+    def test_documents_without_table_kept(self):
+        """测试没有表名的文档按内容去重后保留"""
+        documents = [
+            Document(page_content="公司简介", metadata={"source": "text"}),
+            Document(page_content="公司简介", metadata={"source": "text"}),
+            Document(page_content="部门说明", metadata={"source": "text"}),
+        ]
+        packed, stats = ContextPacker().pack(documents)
+
+        assert [doc.page_content for doc in packed] == ["公司简介", "部门说明"]
+        assert stats["packed_docs"] == 2
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,111 @@
+"""测试文档处理器"""
+import pytest
+
+from benchmarks.bench_document_processor import legacy_sample_text, legacy_schema_text
+from benchmarks.common import make_sample_rows, make_synthetic_schema
+from src.rag.document_processor import DocumentProcessor
+from src.utils.tokenizer import count_tokens
+
+
+class TestDocumentProcessor:
+    """测试 DocumentProcessor 类"""
+
+    @pytest.fixture
+    def schema(self):
+        """合成 schema（包含无注释、无字段的表）"""
+        schema = make_synthetic_schema(20, columns_per_table=6)
+        schema["empty_table"] = {'columns': {}}
+        return schema
+
+    def test_schema_text_identical_to_concatenation(self, schema):
+        """测试 schema 文本与原字符串拼接实现逐字节一致"""
+        docs = DocumentProcessor(max_workers=1).process_database_schema(schema)
+
+        assert [doc.page_content for doc in docs] == [
+            legacy_schema_text(name, info) for name, info in schema.items()
+        ]
+        assert [doc.metadata['table_name'] for doc in docs] == list(schema)
+
+    def test_parallel_schema_matches_serial(self, schema):
+        """测试进程池构建的文档与串行构建一致且保持顺序"""
+        serial = DocumentProcessor(max_workers=1).process_database_schema(schema)
+        parallel = DocumentProcessor(max_workers=2, parallel_threshold=1).process_database_schema(schema)
+
+        assert [(d.page_content, d.metadata) for d in parallel] == \
+            [(d.page_content, d.metadata) for d in serial]
+
+    def test_streamed_parallel_schema_matches_serial(self):
+        """测试流式输入跨批次使用进程池，只在表数量达到阈值时启用，输出与串行一致"""
+        schema = make_synthetic_schema(300, columns_per_table=4)
+        serial = DocumentProcessor(max_workers=1).process_database_schema(schema)
+
+        consumed = []
+
+        def stream():
+            for item in schema.items():
+                consumed.append(item[0])
+                yield item
+
+        processor = DocumentProcessor(max_workers=2, parallel_threshold=100)
+        documents = processor.iter_database_schema(stream())
+        first = next(documents)
+        # 最多预读阈值个表和 2 倍进程数的任务，不会一次读入全部表
+        assert len(consumed) < len(schema)
+
+        parallel = [first, *documents]
+        assert [(d.page_content, d.metadata) for d in parallel] == \
+            [(d.page_content, d.metadata) for d in serial]
+
+    def test_sample_text_identical_to_concatenation(self):
+        """测试示例数据文本与原字符串拼接实现一致"""
+        rows = make_sample_rows(3)
+
+        docs = DocumentProcessor().process_sample_data("orders", rows)
+
+        assert docs[0].page_content == legacy_sample_text("orders", rows)
+
+
+class TestSchemaChunking:
+    """测试宽表按 token 分块"""
+
+    @pytest.fixture
+    def wide_schema(self):
+        """一个 200 个字段的宽表和一个窄表"""
+        schema = make_synthetic_schema(1, columns_per_table=200)
+        schema.update(make_synthetic_schema(1, columns_per_table=3, seed=1))
+        return schema
+
+    def test_wide_table_split_on_column_boundaries(self, wide_schema):
+        """测试宽表按字段边界分块，每块重复表头且不超过上限"""
+        wide_name, wide_info = next(iter(wide_schema.items()))
+        processor = DocumentProcessor(max_workers=1, schema_chunk_tokens=300)
+
+        docs = processor.process_database_schema(wide_schema)
+        wide_docs = [doc for doc in docs if doc.metadata['table_name'] == wide_name]
+
+        assert len(wide_docs) > 1
+        assert len(docs) == len(wide_docs) + 1
+        header = legacy_schema_text(wide_name, {**wide_info, 'columns': {}})
+        for i, doc in enumerate(wide_docs):
+            assert doc.page_content.startswith(header)
+            assert count_tokens(doc.page_content) <= 300
+            assert doc.metadata['chunk_index'] == i
+            assert doc.metadata['chunk_count'] == len(wide_docs)
+
+        # 去掉表头后拼接，与完整文本的字段部分一致
+        body = "".join(doc.page_content[len(header):] for doc in wide_docs)
+        assert header + body == legacy_schema_text(wide_name, wide_info)
+
+    def test_small_table_not_split(self, wide_schema):
+        """测试未超过上限的表保持单个文档"""
+        name, info = list(wide_schema.items())[1]
+
+        docs = DocumentProcessor(schema_chunk_tokens=300).process_database_schema({name: info})
+
+        assert len(docs) == 1
+        assert docs[0].page_content == legacy_schema_text(name, info)
+        assert 'chunk_index' not in docs[0].metadata
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
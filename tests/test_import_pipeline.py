@@ -0,0 +1,219 @@
+"""测试流式导入管道"""
+import pytest
+from langchain.schema import Document
+
+from benchmarks.fakes import DeterministicHashEmbeddings
+from src.database.synthetic import generate_synthetic_sqlite
+from src.rag.document_processor import DocumentProcessor
+from src.utils.datasource_config import DataSourceConfig
+from src.vectorstore.import_checkpoint import ImportCheckpoint
+from src.vectorstore.import_pipeline import ImportPipeline, batched
+from src.vectorstore.knowledge_base_manager import KnowledgeBase
+from src.vectorstore.vector_store import VectorStoreManager
+
+
+def _faiss_manager(collection_name: str = "kb_test") -> VectorStoreManager:
+    """使用假嵌入模型的内存 FAISS 管理器"""
+    return VectorStoreManager(
+        vector_db_type="faiss",
+        embedding_model=DeterministicHashEmbeddings(),
+        persist_directory=None,
+        collection_name=collection_name
+    )
+
+
+class FlakyEmbeddings(DeterministicHashEmbeddings):
+    """第 fail_on 次调用时抛出异常的假嵌入模型（模拟限流）"""
+
+    def __init__(self, fail_on: int):
+        super().__init__()
+        self.fail_on = fail_on
+        self.calls = 0
+        self.embedded_texts = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        if self.calls == self.fail_on:
+            raise RuntimeError("rate limited")
+        self.embedded_texts += len(texts)
+        return super().embed_documents(texts)
+
+
+class TestImportPipeline:
+    """测试 ImportPipeline 类"""
+
+    def test_batched(self):
+        """测试文档流分批"""
+        docs = [Document(page_content=str(i)) for i in range(5)]
+
+        assert [len(batch) for batch in batched(docs, 2)] == [2, 2, 1]
+
+    def test_writes_all_documents(self):
+        """测试所有文档按批写入且可检索"""
+        manager = _faiss_manager()
+        docs = (
+            Document(page_content=f"table_{i} order amount", metadata={'table_name': f"table_{i}"})
+            for i in range(10)
+        )
+
+        stats = ImportPipeline(manager, batch_size=3, queue_size=1).run(docs)
+
+        assert stats == {'documents': 10, 'batches': 4, 'commits': 0}
+        assert len(manager.vectorstore.index_to_docstore_id) == 10
+        results = manager.similarity_search("table_7 order amount", k=1)
+        assert results[0].metadata['table_name'] == "table_7"
+
+    def test_producer_error_propagates(self):
+        """测试文档生成阶段的异常传递给调用方"""
+        def documents():
+            yield Document(page_content="ok")
+            raise RuntimeError("introspection failed")
+
+        with pytest.raises(RuntimeError, match="introspection failed"):
+            ImportPipeline(_faiss_manager(), batch_size=1).run(documents())
+
+    @pytest.mark.parametrize("interval_seconds, commits", [(0, 4), (3600, 0)])
+    def test_checkpoint_commit_interval(self, tmp_path, interval_seconds, commits):
+        """测试检查点按批次数和最短间隔时间提交（FAISS 每次提交都重写整个索引）"""
+        manager = VectorStoreManager(
+            vector_db_type="faiss",
+            embedding_model=DeterministicHashEmbeddings(),
+            persist_directory=str(tmp_path / "index"),
+            collection_name="kb_test"
+        )
+        persisted = []
+        manager.persist = lambda: persisted.append(len(manager.vectorstore.index_to_docstore_id))
+        checkpoint = ImportCheckpoint(str(tmp_path / "checkpoints"), interval_seconds=interval_seconds)
+        docs = (
+            Document(page_content=f"table_{i}", metadata={'source': 'database_schema', 'table_name': f"table_{i}"})
+            for i in range(10)
+        )
+
+        stats = ImportPipeline(manager, batch_size=3, queue_size=1).run(docs, checkpoint=checkpoint)
+
+        assert stats['commits'] == commits
+        # 完成后总会持久化一次
+        assert len(persisted) == commits + 1 and persisted[-1] == 10
+        assert checkpoint.is_due(1, 0) is (interval_seconds == 0)
+
+    def test_invalid_sizes(self):
+        """测试批次大小必须为正数"""
+        with pytest.raises(ValueError):
+            ImportPipeline(_faiss_manager(), batch_size=0)
+
+
+class TestStreamingInitialize:
+    """测试 KnowledgeBase.initialize 使用流式导入"""
+
+    def test_initialize_synthetic_database(self, tmp_path):
+        """测试合成数据库导入后 schema 和示例数据文档均可检索"""
+        db_path = tmp_path / "stream.db"
+        generate_synthetic_sqlite(str(db_path), table_count=5, columns_per_table=4, row_count=5)
+
+        datasource_config = DataSourceConfig(
+            name="stream",
+            display_name="流式导入",
+            description="",
+            type="sqlite",
+            enabled=True,
+            connection={"database": str(db_path)},
+            knowledge_base={
+                "include_sample_data": True,
+                "sample_data_limit": 2,
+                "import_batch_size": 2,
+                "import_queue_size": 1,
+            }
+        )
+        manager = _faiss_manager(datasource_config.get_collection_name())
+        kb = KnowledgeBase(
+            datasource_config=datasource_config,
+            vectorstore_manager=manager,
+            document_processor=DocumentProcessor(max_workers=1)
+        )
+
+        kb.initialize()
+
+        assert kb.is_initialized
+        docs = manager.vectorstore.docstore._dict.values()
+        sources = [doc.metadata['source'] for doc in docs]
+        assert sources.count('database_schema') == 5
+        assert sources.count('sample_data') == 5
+
+
+class TestCheckpointedImport:
+    """测试导入检查点和恢复导入"""
+
+    @pytest.fixture
+    def datasource_config(self, tmp_path):
+        """5 个表的合成数据库，每批 2 个文档"""
+        db_path = tmp_path / "resume.db"
+        generate_synthetic_sqlite(str(db_path), table_count=5, columns_per_table=4, row_count=5)
+        return DataSourceConfig(
+            name="resume",
+            display_name="恢复导入",
+            description="",
+            type="sqlite",
+            enabled=True,
+            connection={"database": str(db_path)},
+            knowledge_base={
+                "include_sample_data": True,
+                "sample_data_limit": 2,
+                "import_batch_size": 2,
+                "import_queue_size": 1,
+            }
+        )
+
+    def test_resume_skips_committed_tables(self, tmp_path, datasource_config):
+        """测试中断后恢复只写入未提交的表，且不产生重复文档"""
+        embeddings = FlakyEmbeddings(fail_on=4)
+        manager = VectorStoreManager(
+            vector_db_type="faiss",
+            embedding_model=embeddings,
+            persist_directory=None,
+            collection_name=datasource_config.get_collection_name()
+        )
+        checkpoint = ImportCheckpoint(str(tmp_path / "checkpoints"))
+        kb = KnowledgeBase(
+            datasource_config=datasource_config,
+            vectorstore_manager=manager,
+            document_processor=DocumentProcessor(max_workers=1),
+            checkpoint=checkpoint
+        )
+        collection_name = datasource_config.get_collection_name()
+
+        with pytest.raises(RuntimeError, match="rate limited"):
+            kb.initialize()
+
+        # 前 3 批 6 个 schema 文档已写入，最后一个表可能还有后续文档，只提交前 5 个表
+        completed = checkpoint.load(collection_name)
+        assert len(completed['database_schema']) == 5
+        assert 'sample_data' not in completed
+
+        kb.initialize(resume=True)
+
+        docs = list(manager.vectorstore.docstore._dict.values())
+        assert len(docs) == 10
+        assert len(set(manager.vectorstore.index_to_docstore_id.values())) == 10
+        assert embeddings.embedded_texts == 6 + 5
+        assert checkpoint.load(collection_name) == {}
+
+    def test_fresh_import_discards_checkpoint(self, tmp_path, datasource_config):
+        """测试不使用 resume 时清除旧检查点并完整导入"""
+        checkpoint = ImportCheckpoint(str(tmp_path / "checkpoints"))
+        collection_name = datasource_config.get_collection_name()
+        checkpoint.save(collection_name, {'database_schema': ['stale_table']})
+
+        manager = _faiss_manager(collection_name)
+        KnowledgeBase(
+            datasource_config=datasource_config,
+            vectorstore_manager=manager,
+            document_processor=DocumentProcessor(max_workers=1),
+            checkpoint=checkpoint
+        ).initialize()
+
+        assert len(manager.vectorstore.index_to_docstore_id) == 10
+        assert checkpoint.load(collection_name) == {}
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
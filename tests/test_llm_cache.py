@@ -0,0 +1,74 @@
+"""测试 LLM 实例缓存"""
+import pytest
+
+from benchmarks.fakes import FakeLLM
+from src.llm.llm_cache import LLMCache, get_async_http_client, get_http_client
+from src.llm.llm_factory import LLMFactory
+
+
+class TestLLMCache:
+    """测试 LLMCache 类"""
+
+    @pytest.fixture
+    def fake_factory(self, monkeypatch):
+        """替换 LLMFactory.create_llm，记录创建次数"""
+        created = []
+
+        def create_llm(*args, **kwargs):
+            created.append(kwargs)
+            return FakeLLM()
+
+        monkeypatch.setattr(LLMFactory, "create_llm", staticmethod(create_llm))
+        return created
+
+    def test_same_key_reuses_instance(self, fake_factory):
+        """测试相同参数返回同一个实例，不同温度创建新实例"""
+        cache = LLMCache()
+
+        first = cache.get("dashscope", "qwen-turbo", temperature=0.0)
+        second = cache.get("DashScope", "qwen-turbo", temperature=0)
+        other = cache.get("dashscope", "qwen-turbo", temperature=0.7)
+
+        assert first is second
+        assert other is not first
+        assert len(fake_factory) == 2
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_lru_eviction(self, fake_factory):
+        """测试超过上限时淘汰最久未使用的实例"""
+        cache = LLMCache(max_size=2)
+        a = cache.get("dashscope", "a")
+        cache.get("dashscope", "b")
+        cache.get("dashscope", "a")
+        cache.get("dashscope", "c")
+
+        assert len(cache) == 2
+        assert cache.get("dashscope", "a") is a
+        cache.get("dashscope", "b")
+        assert len(fake_factory) == 4
+
+    def test_unhashable_kwargs_not_cached(self, fake_factory):
+        """测试参数不可哈希时每次创建新实例"""
+        cache = LLMCache()
+
+        first = cache.get("dashscope", "qwen-turbo", model_kwargs={"top_p": 0.9})
+        second = cache.get("dashscope", "qwen-turbo", model_kwargs={"top_p": 0.9})
+
+        assert first is not second
+        assert len(cache) == 0
+
+    def test_openai_instances_share_http_pool(self):
+        """测试不同 OpenAI 模型实例共享同一个 keep-alive 连接池"""
+        cache = LLMCache()
+
+        gpt35 = cache.get("openai", "gpt-3.5-turbo", api_key="sk-test")
+        gpt4 = cache.get("openai", "gpt-4", api_key="sk-test")
+
+        assert gpt35 is not gpt4
+        assert gpt35.client._client._client is get_http_client()
+        assert gpt4.client._client._client is get_http_client()
+        assert gpt4.async_client._client._client is get_async_http_client()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,140 @@
+"""测试多提供商路由"""
+import time
+
+import pytest
+from langchain.chains.question_answering.stuff_prompt import PROMPT_SELECTOR
+
+from benchmarks.fakes import FakeChatModel, FakeLLM
+from src.llm.rate_limiter import RateLimitTimeout
+from src.llm.router import (
+    ProviderRouter,
+    ProvidersUnavailable,
+    RoutingChatModel,
+    RoutingLLM,
+    create_routing_llm,
+)
+
+
+class FailingLLM(FakeLLM):
+    """总是失败的假 LLM"""
+
+    def _call(self, prompt, stop=None, run_manager=None, **kwargs):
+        self.call_count += 1
+        raise ConnectionError("provider down")
+
+
+class QueueTimeoutLLM(FakeLLM):
+    """本地限流排队超时的假 LLM"""
+
+    def _call(self, prompt, stop=None, run_manager=None, **kwargs):
+        self.call_count += 1
+        raise RateLimitTimeout("排队超时")
+
+
+class TestProviderRouter:
+    """测试 ProviderRouter 类"""
+
+    def test_prefers_lower_p95(self):
+        """测试样本足够后按 p95 选择更快的提供商"""
+        slow, fast = FakeLLM(latency=0.02), FakeLLM()
+        router = ProviderRouter({"slow": slow, "fast": fast}, hedge_delay=None)
+        assert router.ranked() == ["slow", "fast"]
+
+        for _ in range(5):
+            router._call("slow", "hi", None)
+            router._call("fast", "hi", None)
+
+        assert router.ranked() == ["fast", "slow"]
+        _, provider, hedged = router.invoke("hi")
+        assert (provider, hedged) == ("fast", False)
+
+    def test_hedges_slow_primary(self):
+        """测试主请求超过延迟预算时由备用请求返回"""
+        router = ProviderRouter(
+            {"primary": FakeLLM(latency=0.5), "backup": FakeLLM()}, hedge_delay=0.05
+        )
+
+        start = time.perf_counter()
+        _, provider, hedged = router.invoke("hi")
+
+        assert (provider, hedged) == ("backup", True)
+        assert time.perf_counter() - start < 0.4
+
+    def test_falls_back_and_opens_circuit(self):
+        """测试出错时切换到下一个提供商，连续失败后熔断"""
+        broken, backup = FailingLLM(), FakeLLM()
+        router = ProviderRouter(
+            {"broken": broken, "backup": backup}, hedge_delay=None, failure_threshold=2, cooldown=60
+        )
+
+        for _ in range(3):
+            assert router.invoke("hi")[1] == "backup"
+
+        assert broken.call_count == 2
+        assert router.ranked() == ["backup"]
+        assert router.stats()["broken"]["state"] == "open"
+
+    def test_half_open_recovers(self):
+        """测试熔断到期后试探成功即恢复"""
+        llm = FakeLLM()
+        router = ProviderRouter({"only": llm}, failure_threshold=1, cooldown=0.01)
+        router._record("only", None)
+        with pytest.raises(ProvidersUnavailable):
+            router.invoke("hi")
+
+        time.sleep(0.02)
+        assert router.stats()["only"]["state"] == "half_open"
+        assert router.invoke("hi")[1] == "only"
+        assert router.stats()["only"]["state"] == "closed"
+
+    def test_rate_limit_timeout_does_not_open_circuit(self):
+        """测试本地限流排队超时不计入熔断，原样抛出"""
+        llm = QueueTimeoutLLM()
+        router = ProviderRouter({"openai": llm}, hedge_delay=None, failure_threshold=3)
+
+        for _ in range(5):
+            with pytest.raises(RateLimitTimeout):
+                router.invoke("hi")
+
+        assert llm.call_count == 5
+        assert router.stats()["openai"] == {"samples": 0, "p95_ms": None, "failures": 0, "state": "closed"}
+
+    def test_all_failing_raises_last_error(self):
+        """测试所有提供商失败时抛出异常"""
+        router = ProviderRouter({"a": FailingLLM(), "b": FailingLLM()}, hedge_delay=None)
+
+        with pytest.raises(ConnectionError):
+            router.invoke("hi")
+
+
+class TestRoutingLLM:
+    """测试 RoutingLLM 类"""
+
+    def test_invoke(self):
+        """测试作为普通 LLM 使用"""
+        llm = RoutingLLM(router=ProviderRouter({"fake": FakeLLM()}))
+
+        assert isinstance(llm.invoke("orders 表有哪些字段"), str)
+
+    def test_chat_backends_keep_chat_semantics(self):
+        """测试提供商都是聊天模型时按聊天模型路由，问答链提示词不变，消息原样传给提供商"""
+        primary, backup = FakeChatModel(), FakeChatModel()
+        llm = create_routing_llm(ProviderRouter({"openai": primary, "anthropic": backup}, hedge_delay=None))
+
+        assert isinstance(llm, RoutingChatModel)
+        prompt = PROMPT_SELECTOR.get_prompt(llm)
+        assert prompt is PROMPT_SELECTOR.get_prompt(primary)
+
+        answer = llm.invoke(prompt.format_messages(context="orders 表", question="有哪些字段"))
+        assert answer.content.startswith("根据提供的数据库信息（2 条消息")
+        assert [message.type for message in primary.last_messages] == ["system", "human"]
+
+    def test_mixed_backends_use_completion_llm(self):
+        """测试混合普通 LLM 时退回按提示词路由"""
+        llm = create_routing_llm(ProviderRouter({"openai": FakeChatModel(), "dashscope": FakeLLM()}))
+
+        assert isinstance(llm, RoutingLLM)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
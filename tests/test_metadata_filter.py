@@ -0,0 +1,158 @@
+"""测试元数据预过滤"""
+import pytest
+from langchain.schema import Document
+
+from benchmarks.fakes import DeterministicHashEmbeddings, FakeLLM
+from src.api.models import MetadataFilter as MetadataFilterModel
+from src.rag.rag_retriever import RAGRetriever
+from src.vectorstore import vector_store
+from src.vectorstore.metadata_filter import matches, normalize_filter, to_chroma_where
+from src.vectorstore.vector_store import VectorStoreManager
+
+
+def make_documents():
+    """每个表一个 schema 文档和一个示例数据文档"""
+    documents = []
+    for table in ("orders", "customers", "products"):
+        documents.append(Document(
+            page_content=f"表名: {table}\n字段信息: id, name",
+            metadata={"source": "database_schema", "table_name": table, "type": "schema"}
+        ))
+        documents.append(Document(
+            page_content=f"表 {table} 的示例数据: id=1, name=a",
+            metadata={"source": "sample_data", "table_name": table, "type": "data"}
+        ))
+    return documents
+
+
+class TestFilterConversion:
+    """测试过滤条件转换"""
+
+    def test_chroma_where(self):
+        """测试转换为 Chroma where 子句"""
+        assert to_chroma_where(None) is None
+        assert to_chroma_where({"type": "schema"}) == {"type": "schema"}
+        assert to_chroma_where({"type": ["schema"], "table_name": ["orders", "customers"]}) == {
+            "$and": [{"type": "schema"}, {"table_name": {"$in": ["orders", "customers"]}}]
+        }
+
+    def test_normalize_and_match(self):
+        """测试规范化和匹配"""
+        assert normalize_filter({"type": "schema", "source": None, "table_name": []}) == {"type": ["schema"]}
+        assert matches({"type": "schema", "table_name": "orders"}, {"table_name": ["orders", "x"]})
+        assert not matches({"type": "data"}, {"type": "schema"})
+        with pytest.raises(ValueError):
+            normalize_filter({"owner": "me"})
+
+    def test_request_model(self):
+        """测试请求模型拆分数据源和元数据过滤条件"""
+        filters = MetadataFilterModel(type=["schema"], datasource=["sales"])
+        assert filters.metadata_filter() == {"type": ["schema"]}
+        assert filters.datasource == ["sales"]
+
+
+class TestFilteredSearch:
+    """测试向量检索的元数据预过滤"""
+
+    @pytest.fixture(params=["faiss", "chroma"])
+    def manager(self, request, tmp_path):
+        manager = VectorStoreManager(
+            vector_db_type=request.param,
+            embedding_model=DeterministicHashEmbeddings(),
+            persist_directory=str(tmp_path),
+            collection_name="filter_test"
+        )
+        manager.create_vectorstore(make_documents())
+        return manager
+
+    def test_similarity_search_filtered(self, manager):
+        """测试过滤后只返回满足条件的文档"""
+        docs = manager.similarity_search("orders 字段", k=10, metadata_filter={"type": "schema"})
+        assert len(docs) == 3
+        assert {doc.metadata["type"] for doc in docs} == {"schema"}
+
+        docs = manager.similarity_search(
+            "orders 字段", k=10, metadata_filter={"type": "schema", "table_name": ["orders", "customers"]}
+        )
+        assert sorted(doc.metadata["table_name"] for doc in docs) == ["customers", "orders"]
+
+        assert manager.similarity_search("orders", k=5, metadata_filter={"table_name": "missing"}) == []
+
+    def test_mmr_filtered(self, manager):
+        """测试 MMR 模式同样先过滤"""
+        docs = manager.search("orders", k=2, search_type="mmr", metadata_filter={"type": "data"})
+        assert len(docs) == 2
+        assert {doc.metadata["type"] for doc in docs} == {"data"}
+
+    @pytest.mark.parametrize("brute_force_limit, max_overfetch", [(0, 500), (64, 500), (0, 0)])
+    def test_chroma_matches_where_clause(self, brute_force_limit, max_overfetch, tmp_path, monkeypatch):
+        """测试 Chroma 过滤检索（精确计算、放大召回、where 子句三种路径）与 where 子句结果一致"""
+        monkeypatch.setattr(vector_store, "CHROMA_FILTER_BRUTE_FORCE_LIMIT", brute_force_limit)
+        monkeypatch.setattr(vector_store, "CHROMA_FILTER_MAX_OVERFETCH", max_overfetch)
+        manager = VectorStoreManager(
+            vector_db_type="chroma",
+            embedding_model=DeterministicHashEmbeddings(),
+            persist_directory=str(tmp_path),
+            collection_name="filter_where"
+        )
+        # 表名和重复次数组合各不相同，保证距离没有并列
+        documents = [
+            Document(
+                page_content=f"table_{i % 7} " + "amount " * (i % 9 + 1),
+                metadata={"source": "database_schema", "table_name": f"table_{i % 7}", "type": "schema"}
+            )
+            for i in range(60)
+        ]
+        manager.create_vectorstore(documents)
+
+        metadata_filter = {"table_name": ["table_1", "table_3"]}
+        docs = manager.similarity_search("table_3 amount amount", k=4, metadata_filter=metadata_filter)
+        expected = manager.vectorstore.similarity_search(
+            "table_3 amount amount", k=4, filter=to_chroma_where(metadata_filter)
+        )
+        assert [doc.page_content for doc in docs] == [doc.page_content for doc in expected]
+
+    def test_faiss_bitmap_rebuilt_after_add(self, tmp_path):
+        """测试 FAISS 新增文档后位图索引自动重建"""
+        manager = VectorStoreManager(vector_db_type="faiss", embedding_model=DeterministicHashEmbeddings())
+        manager.create_vectorstore(make_documents())
+        assert len(manager.similarity_search("x", k=10, metadata_filter={"table_name": "orders"})) == 2
+
+        manager.add_documents([Document(
+            page_content="orders 字段统计",
+            metadata={"source": "column_statistics", "table_name": "orders", "type": "profile"}
+        )])
+        assert len(manager.similarity_search("x", k=10, metadata_filter={"table_name": "orders"})) == 3
+
+    def test_chroma_bitmap_rebuilt_after_external_write(self, tmp_path):
+        """测试绕过管理器写入 Chroma 集合后，文档数变化触发位图索引重建"""
+        manager = VectorStoreManager(
+            vector_db_type="chroma",
+            embedding_model=DeterministicHashEmbeddings(),
+            persist_directory=str(tmp_path),
+            collection_name="filter_external"
+        )
+        manager.create_vectorstore(make_documents())
+        assert len(manager.similarity_search("x", k=10, metadata_filter={"table_name": "orders"})) == 2
+
+        manager.vectorstore.add_texts(
+            ["orders 字段统计"],
+            metadatas=[{"source": "column_statistics", "table_name": "orders", "type": "profile"}]
+        )
+        docs = manager.similarity_search("x", k=10, metadata_filter={"table_name": "orders"})
+        assert sorted(doc.metadata["type"] for doc in docs) == ["data", "profile", "schema"]
+
+    def test_rag_retriever_filter(self):
+        """测试 RAGRetriever 只使用满足过滤条件的文档"""
+        manager = VectorStoreManager(vector_db_type="faiss", embedding_model=DeterministicHashEmbeddings())
+        manager.create_vectorstore(make_documents())
+
+        retriever = RAGRetriever(manager, FakeLLM(), top_k=4, metadata_filter={"type": ["schema"]})
+        result = retriever.query("有哪些表")
+
+        assert result["sources"]
+        assert {source["metadata"]["type"] for source in result["sources"]} == {"schema"}
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
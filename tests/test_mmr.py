@@ -0,0 +1,100 @@
+"""测试最大边际相关性检索"""
+import numpy as np
+import pytest
+from langchain.schema import Document
+
+from benchmarks.fakes import DeterministicHashEmbeddings, FakeLLM
+from src.rag.rag_retriever import RAGRetriever
+from src.vectorstore.mmr import maximal_marginal_relevance
+from src.vectorstore.vector_store import VectorStoreManager
+
+
+class CountingEmbeddings(DeterministicHashEmbeddings):
+    """记录嵌入调用次数"""
+
+    def __init__(self):
+        super().__init__()
+        self.document_calls = 0
+        self.query_calls = 0
+
+    def embed_documents(self, texts):
+        self.document_calls += 1
+        return super().embed_documents(texts)
+
+    def embed_query(self, text):
+        self.query_calls += 1
+        return super().embed_query(text)
+
+
+def make_documents():
+    """orders 表有多个几乎相同的文档，customers 表只有一个"""
+    documents = [
+        Document(page_content=f"orders schema {i % 2}", metadata={"table_name": "orders"})
+        for i in range(6)
+    ]
+    documents.append(Document(page_content="customers schema", metadata={"table_name": "customers"}))
+    return documents
+
+
+class TestMaximalMarginalRelevance:
+    """测试 maximal_marginal_relevance 函数"""
+
+    def test_lambda_one_is_relevance_order(self):
+        """测试只看相关性时按与查询的相似度排序"""
+        query = [1.0, 0.0]
+        candidates = [[0.5, 0.5], [1.0, 0.1], [0.0, 1.0]]
+        assert maximal_marginal_relevance(query, candidates, k=3, lambda_mult=1.0) == [1, 0, 2]
+
+    def test_prefers_diverse_candidates(self):
+        """测试重复的候选文档被排到后面"""
+        query = [1.0, 0.2]
+        candidates = [[1.0, 0.2], [1.0, 0.2], [0.6, 0.8]]
+        assert maximal_marginal_relevance(query, candidates, k=2, lambda_mult=0.3) == [0, 2]
+
+    def test_edge_cases(self):
+        """测试空候选集、k 大于候选数和零向量"""
+        assert maximal_marginal_relevance([1.0, 0.0], [], k=3) == []
+        assert sorted(maximal_marginal_relevance([1.0, 0.0], [[1.0, 0.0], [0.0, 0.0]], k=5)) == [0, 1]
+        assert maximal_marginal_relevance([1.0, 0.0], np.ones((3, 2)), k=0) == []
+
+
+class TestMMRSearch:
+    """测试 VectorStoreManager 和 RAGRetriever 的 MMR 模式"""
+
+    @pytest.mark.parametrize("vector_db_type", ["faiss", "chroma"])
+    def test_uses_stored_vectors(self, vector_db_type, tmp_path):
+        """测试 MMR 使用存储的文档向量（只嵌入查询），结果覆盖更多的表"""
+        embeddings = CountingEmbeddings()
+        manager = VectorStoreManager(
+            vector_db_type=vector_db_type,
+            embedding_model=embeddings,
+            persist_directory=str(tmp_path),
+            collection_name="mmr_test"
+        )
+        manager.create_vectorstore(make_documents())
+        document_calls = embeddings.document_calls
+
+        similar = manager.search("orders schema 0", k=3)
+        diverse = manager.search("orders schema 0", k=3, search_type="mmr", lambda_mult=0.3)
+
+        assert {doc.metadata["table_name"] for doc in similar} == {"orders"}
+        assert "customers" in {doc.metadata["table_name"] for doc in diverse}
+        assert embeddings.document_calls == document_calls
+        assert embeddings.query_calls == 2
+
+    def test_rag_retriever_mmr(self):
+        """测试 RAGRetriever 按请求选择 MMR 模式"""
+        manager = VectorStoreManager(vector_db_type="faiss", embedding_model=DeterministicHashEmbeddings())
+        manager.create_vectorstore(make_documents())
+
+        retriever = RAGRetriever(manager, FakeLLM(), top_k=3, search_type="mmr", mmr_lambda=0.3)
+        result = retriever.query("orders schema 0")
+
+        assert "customers" in {source["metadata"]["table_name"] for source in result["sources"]}
+
+        with pytest.raises(ValueError):
+            RAGRetriever(manager, FakeLLM(), search_type="random")
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
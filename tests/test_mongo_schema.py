@@ -0,0 +1,155 @@
+"""测试 MongoDB 字段推断和聚合管道"""
+import pytest
+from bson import ObjectId
+
+from src.database.base import QueryLimitExceededError
+from src.database.mongo_schema import FieldTypeCollector
+from src.database.postgres_db import MongoDBDatabase
+
+
+class FakeCursor:
+    """假聚合游标，记录是否已关闭"""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.closed = False
+
+    def __iter__(self):
+        return iter(self.docs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.closed = True
+
+
+class FakeCollection:
+    """假集合：支持 $sample、$match 和 $limit，记录收到的聚合管道"""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.pipelines = []
+        self.cursors = []
+
+    def aggregate(self, pipeline, **kwargs):
+        self.pipelines.append((pipeline, kwargs))
+        docs = [dict(doc) for doc in self.docs]
+        for stage in pipeline:
+            if '$sample' in stage:
+                docs = docs[:stage['$sample']['size']]
+            elif '$match' in stage:
+                docs = [doc for doc in docs if all(doc.get(k) == v for k, v in stage['$match'].items())]
+            elif '$limit' in stage:
+                docs = docs[:stage['$limit']]
+        cursor = FakeCursor(docs)
+        self.cursors.append(cursor)
+        return cursor
+
+    def estimated_document_count(self):
+        return len(self.docs)
+
+
+def make_database(collections, **connection_params):
+    """使用假集合的 MongoDB 实例（不建立真实连接）"""
+    db = MongoDBDatabase({'uri': 'mongodb://fake', 'database': 'test', **connection_params})
+    db.connection = collections
+    return db
+
+
+class TestFieldTypeCollector:
+    """测试 FieldTypeCollector 类"""
+
+    def test_mixed_types_and_nullability(self):
+        """测试多种类型按出现次数排序，缺失或为 None 的字段可空"""
+        collector = FieldTypeCollector().add_all([
+            {'_id': 'a', 'amount': 1, 'note': None},
+            {'_id': 'b', 'amount': 2.5},
+            {'_id': 'c', 'amount': 3, 'note': 'x'},
+        ])
+
+        info = collector.build(100)
+
+        assert info['fields'] == {'_id': 'str', 'amount': 'int|float', 'note': 'str'}
+        assert info['columns']['_id'] == {'type': 'str', 'nullable': False, 'key': 'PRI'}
+        assert info['columns']['amount']['nullable'] is False
+        assert info['columns']['note']['nullable'] is True
+        assert info['sample_count'] == 100
+
+    def test_nested_documents_and_arrays(self):
+        """测试嵌套文档和数组只记录顶层类型"""
+        collector = FieldTypeCollector().add_all([
+            {'address': {'city': 'x'}, 'tags': ['a', 'b']},
+            {'address': None, 'tags': []},
+        ])
+
+        info = collector.build(2)
+
+        assert info['fields'] == {'address': 'dict', 'tags': 'list'}
+        assert 'city' not in info['columns']
+        assert info['columns']['address']['nullable'] is True
+        assert info['columns']['tags']['nullable'] is False
+
+    def test_only_null_and_empty(self):
+        """测试只有 None 的字段和空采样"""
+        assert FieldTypeCollector().add_all([{'x': None}]).build(1)['fields'] == {'x': 'NoneType'}
+        assert FieldTypeCollector().build(10) == {'fields': {}, 'columns': {}, 'sample_count': 0}
+
+
+class TestMongoDBDatabase:
+    """测试 MongoDBDatabase 的采样和聚合管道"""
+
+    @pytest.fixture
+    def orders(self):
+        docs = [
+            {'_id': ObjectId(), 'status': 'paid' if i % 2 else 'open', 'amount': i if i % 3 else float(i)}
+            for i in range(50)
+        ]
+        return FakeCollection(docs)
+
+    def test_schema_sample_size_cap(self, orders):
+        """测试按 schema_sample_size 采样，文档数使用估算值"""
+        db = make_database({'orders': orders}, schema_sample_size=10)
+
+        info = db.get_table_info('orders')
+
+        assert orders.pipelines[-1][0] == [{'$sample': {'size': 10}}]
+        assert info['sample_count'] == 50
+        assert info['fields'] == {'_id': 'ObjectId', 'status': 'str', 'amount': 'int|float'}
+
+        make_database({'orders': orders}).get_table_info('orders')
+        assert orders.pipelines[-1][0] == [{'$sample': {'size': MongoDBDatabase.DEFAULT_SCHEMA_SAMPLE_SIZE}}]
+
+    def test_empty_collection(self):
+        """测试空集合不读取文档数"""
+        info = make_database({'empty': FakeCollection([])}).get_table_info('empty')
+
+        assert info == {'fields': {}, 'columns': {}, 'sample_count': 0}
+
+    def test_pipeline_with_filter(self, orders):
+        """测试 filter 转换为管道首个 $match，批大小和 ObjectId 转换"""
+        db = make_database({'orders': orders}, fetch_size=7)
+
+        rows = db.execute_query('orders', {'filter': {'status': 'paid'}, 'pipeline': [{'$limit': 3}]})
+
+        pipeline, kwargs = orders.pipelines[-1]
+        assert pipeline == [{'$match': {'status': 'paid'}}, {'$limit': 3}]
+        assert kwargs == {'batchSize': 7, 'allowDiskUse': True}
+        assert len(rows) == 3
+        assert all(isinstance(row['_id'], str) and row['status'] == 'paid' for row in rows)
+
+        db.execute_query('orders', {'batch_size': 2})
+        assert orders.pipelines[-1] == ([], {'batchSize': 2, 'allowDiskUse': True})
+
+    def test_iter_query_limit_closes_cursor(self, orders):
+        """测试流式查询超过上限时关闭游标"""
+        db = make_database({'orders': orders})
+
+        with pytest.raises(QueryLimitExceededError):
+            list(db.iter_query('orders', max_rows=5))
+
+        assert orders.cursors[-1].closed
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,124 @@
+"""测试提供商级限流"""
+import threading
+import time
+
+import pytest
+
+from benchmarks.fakes import DeterministicHashEmbeddings, FakeLLM
+from src.llm.rate_limiter import (
+    ProviderRateLimiter, RateLimitCallbackHandler, RateLimitedEmbeddings, RateLimitTimeout,
+    create_rate_limiters_from_config
+)
+
+
+class TestProviderRateLimiter:
+    """测试 ProviderRateLimiter 类"""
+
+    def test_max_concurrency_fifo(self):
+        """测试并发数用满时按到达顺序放行"""
+        limiter = ProviderRateLimiter("openai", max_concurrency=1)
+        order = []
+
+        limiter.acquire()
+
+        def worker(i):
+            with limiter.limit():
+                order.append(i)
+
+        threads = []
+        for i in range(3):
+            thread = threading.Thread(target=worker, args=(i,))
+            thread.start()
+            threads.append(thread)
+            # 保证按顺序进入队列
+            while limiter.metrics()["queued"] < i + 1:
+                time.sleep(0.001)
+
+        limiter.release()
+        for thread in threads:
+            thread.join()
+
+        assert order == [0, 1, 2]
+        metrics = limiter.metrics()
+        assert metrics["in_flight"] == 0
+        assert metrics["requests"] == 4
+        assert metrics["queue_wait_ms"]["max"] > 0
+
+    def test_requests_per_minute(self):
+        """测试每分钟请求数用完后等待令牌补充"""
+        limiter = ProviderRateLimiter("openai", requests_per_minute=600)
+        limiter._requests.tokens = 0
+
+        waited = limiter.acquire()
+        limiter.release()
+
+        assert 0.05 < waited < 1
+
+    def test_timeout(self):
+        """测试排队超时抛出 RateLimitTimeout 并释放队列位置"""
+        limiter = ProviderRateLimiter("openai", max_concurrency=1, timeout=0.05)
+        limiter.acquire()
+
+        with pytest.raises(RateLimitTimeout):
+            limiter.acquire()
+
+        metrics = limiter.metrics()
+        assert (metrics["timeouts"], metrics["queued"]) == (1, 0)
+
+    def test_tokens_per_minute_charges_output(self):
+        """测试 token 桶扣除输入并补扣输出"""
+        limiter = ProviderRateLimiter("openai", tokens_per_minute=1000)
+
+        with limiter.limit(tokens=300):
+            limiter.record_tokens(200)
+
+        assert limiter._tokens.tokens == pytest.approx(500, abs=1)
+
+    def test_from_config(self):
+        """测试从配置创建限流器"""
+        class Config:
+            llm_rate_limits = {"OpenAI": {"max_concurrency": 4, "tokens_per_minute": 90000}}
+            llm_rate_limit_timeout = 5.0
+
+        limiters = create_rate_limiters_from_config(Config())
+
+        assert limiters["openai"].max_concurrency == 4
+        assert limiters["openai"].timeout == 5.0
+
+
+class TestRateLimitWrappers:
+    """测试 LLM 回调和嵌入模型包装器"""
+
+    def test_llm_callback(self):
+        """测试 LLM 调用经过限流器并在结束后释放"""
+        limiter = ProviderRateLimiter("fake", max_concurrency=1, tokens_per_minute=10000)
+        llm = FakeLLM(callbacks=[RateLimitCallbackHandler(limiter)])
+
+        llm.invoke("orders 表有哪些字段")
+
+        metrics = limiter.metrics()
+        assert (metrics["requests"], metrics["in_flight"]) == (1, 0)
+        assert limiter._tokens.tokens < 10000
+
+    def test_llm_callback_timeout(self):
+        """测试排队超时时 LLM 调用失败"""
+        limiter = ProviderRateLimiter("fake", max_concurrency=1, timeout=0.01)
+        limiter.acquire()
+        llm = FakeLLM(callbacks=[RateLimitCallbackHandler(limiter)])
+
+        with pytest.raises(RateLimitTimeout):
+            llm.invoke("hello")
+
+    def test_embeddings(self):
+        """测试嵌入调用经过限流器"""
+        limiter = ProviderRateLimiter("embedding", max_concurrency=2)
+        embeddings = RateLimitedEmbeddings(DeterministicHashEmbeddings(), limiter)
+
+        embeddings.embed_documents(["a", "b"])
+        embeddings.embed_query("c")
+
+        assert limiter.metrics()["requests"] == 2
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
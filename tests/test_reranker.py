@@ -0,0 +1,137 @@
+"""测试交叉编码器重排序"""
+import time
+
+import pytest
+from langchain.schema import Document
+
+from benchmarks.fakes import DeterministicHashEmbeddings, FakeLLM
+from src.rag.rag_retriever import RAGRetriever
+from src.rag.reranker import CrossEncoderReranker
+from src.vectorstore.vector_store import VectorStoreManager
+
+
+class KeywordCrossEncoder:
+    """按查询词在文档中出现次数打分的假交叉编码器"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.pairs = 0
+        self.batches = []
+
+    def predict(self, pairs, batch_size=32):
+        self.batches.append(len(pairs))
+        self.pairs += len(pairs)
+        if self.latency:
+            time.sleep(self.latency * len(pairs))
+        return [float(doc.count(query)) for query, doc in pairs]
+
+
+def make_documents(count: int):
+    return [
+        Document(
+            page_content=f"表名: table_{i}\n" + "订单 " * (i % 5),
+            metadata={"source": "database_schema", "table_name": f"table_{i}"}
+        )
+        for i in range(count)
+    ]
+
+
+class TestCrossEncoderReranker:
+    """测试 CrossEncoderReranker 类"""
+
+    def test_keeps_top_k_by_score_in_batches(self):
+        """测试分批打分并保留得分最高的文档"""
+        model = KeywordCrossEncoder()
+        reranker = CrossEncoderReranker(batch_size=4, model=model)
+
+        result = reranker.rerank("订单", make_documents(10), top_k=3)
+
+        assert [doc.metadata['table_name'] for doc in result] == ["table_4", "table_9", "table_3"]
+        assert model.batches == [4, 4, 2]
+
+    def test_score_cache(self):
+        """测试相同 (查询, 文档) 不重复打分"""
+        model = KeywordCrossEncoder()
+        reranker = CrossEncoderReranker(model=model)
+        documents = make_documents(6)
+
+        first = reranker.rerank("订单", documents, top_k=2)
+        second = reranker.rerank("订单", documents[:4] + make_documents(8)[6:], top_k=2)
+
+        assert model.pairs == 8
+        assert first[0].metadata['table_name'] == "table_4"
+        assert [doc.metadata['table_name'] for doc in second] == ["table_3", "table_2"]
+
+    def test_skips_when_over_budget(self):
+        """测试预计超过延迟预算时跳过重排序，保持召回顺序"""
+        model = KeywordCrossEncoder(latency=0.005)
+        reranker = CrossEncoderReranker(batch_size=2, latency_budget=0.02, model=model)
+
+        reranker.rerank("订单", make_documents(2), top_k=2)
+        pairs = model.pairs
+
+        documents = make_documents(20)
+        result = reranker.rerank("订单", documents, top_k=3)
+
+        assert result == documents[:3]
+        assert model.pairs == pairs
+
+    def test_recovers_after_one_slow_batch(self):
+        """测试一次慢批次后，连续跳过若干次会重新测量耗时并恢复重排序"""
+        class WarmingCrossEncoder(KeywordCrossEncoder):
+            """第一批每对 50ms，之后每对 1ms"""
+
+            def predict(self, pairs, batch_size=32):
+                self.latency = 0.05 if not self.batches else 0.001
+                return super().predict(pairs, batch_size=batch_size)
+
+        model = WarmingCrossEncoder()
+        reranker = CrossEncoderReranker(batch_size=8, latency_budget=0.3, model=model)
+
+        results = []
+        for i in range(12):
+            # 每次使用不同的文档，避免命中打分缓存
+            documents = [
+                Document(page_content=f"{doc.page_content}#{i}", metadata=doc.metadata)
+                for doc in make_documents(10)
+            ]
+            results.append(reranker.rerank("订单", documents, top_k=3))
+
+        assert len(model.batches) > 1
+        # 恢复后按得分排序
+        assert results[-1][0].metadata['table_name'] == "table_4"
+
+    def test_probe_still_slow_keeps_skipping(self):
+        """测试重新测量仍超出预算时只打分一小批，之后继续跳过"""
+        model = KeywordCrossEncoder(latency=0.005)
+        reranker = CrossEncoderReranker(batch_size=2, latency_budget=0.02, model=model)
+        reranker.rerank("订单", make_documents(2), top_k=2)
+
+        for i in range(20):
+            reranker.rerank(f"订单 {i}", make_documents(20), top_k=3)
+
+        # 每 8 次跳过才测量一次，每次只打分 4 对
+        assert model.batches[1:] == [4, 4]
+
+
+class TestRAGRetrieverRerank:
+    """测试 RAGRetriever 的重排序阶段"""
+
+    def test_query_overfetches_and_reranks(self):
+        """测试问答先召回候选文档，重排序后只把 top_k 个文档交给 LLM"""
+        manager = VectorStoreManager(vector_db_type="faiss", embedding_model=DeterministicHashEmbeddings())
+        manager.create_vectorstore(make_documents(12))
+        model = KeywordCrossEncoder()
+
+        retriever = RAGRetriever(
+            manager, FakeLLM(), top_k=2,
+            reranker=CrossEncoderReranker(model=model), rerank_candidates=12
+        )
+        result = retriever.query("订单")
+
+        assert model.pairs == 12
+        assert [source['metadata']['table_name'] for source in result['sources']] == ["table_4", "table_9"]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,187 @@
+"""测试 LLM 响应缓存"""
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from langchain.chains.question_answering.stuff_prompt import PROMPT_SELECTOR
+
+from benchmarks.fakes import FakeChatModel, FakeLLM
+from src.llm.response_cache import (
+    CachedChatModel,
+    CachedLLM,
+    RedisResponseBackend,
+    ResponseCache,
+    SQLiteResponseBackend,
+    create_response_cache_from_config,
+    with_response_cache,
+)
+from src.utils.tracing import InMemorySpanExporter, Tracer, get_tracer, set_tracer
+
+
+class FakeRedis:
+    """内存中的 Redis 客户端替身（get/set/scan_iter/delete）"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value.encode('utf-8')
+
+    def scan_iter(self, match):
+        return [key for key in self.data if key.startswith(match.rstrip('*'))]
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+class TestResponseCache:
+    """测试 ResponseCache 类"""
+
+    def test_memory_lru_and_metrics(self):
+        """测试内存 LRU 淘汰和命中率统计"""
+        cache = ResponseCache(max_entries=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        assert cache.get("a") == "1"
+        cache.set("c", "3")
+
+        assert cache.get("b") is None
+        assert cache.get("c") == "3"
+
+        metrics = cache.metrics()
+        assert metrics["memory_hits"] == 2
+        assert metrics["misses"] == 1
+        assert metrics["hit_rate"] == pytest.approx(2 / 3, abs=1e-4)
+        assert metrics["memory_entries"] == 2
+
+    def test_ttl_expiry(self):
+        """测试条目过期"""
+        cache = ResponseCache(ttl=0.01)
+        cache.set("a", "1")
+        time.sleep(0.02)
+        assert cache.get("a") is None
+
+    def test_key_depends_on_llm_and_stop(self):
+        """测试缓存键区分 LLM 标识和停止词"""
+        key = ResponseCache.make_key("llm-a", "prompt")
+        assert key == ResponseCache.make_key("llm-a", "prompt", [])
+        assert key != ResponseCache.make_key("llm-b", "prompt")
+        assert key != ResponseCache.make_key("llm-a", "prompt", ["\n"])
+
+    def test_sqlite_tier_survives_restart(self, tmp_path):
+        """测试 SQLite 持久层在新进程（新缓存实例）中命中"""
+        path = str(tmp_path / "cache.db")
+        first = ResponseCache(backend=SQLiteResponseBackend(path))
+        first.set("key", "回答")
+        first.backend.close()
+
+        second = ResponseCache(backend=SQLiteResponseBackend(path))
+        assert second.get("key") == "回答"
+        assert second.get("key") == "回答"
+        metrics = second.metrics()
+        assert metrics["persistent_hits"] == 1
+        assert metrics["memory_hits"] == 1
+
+    def test_sqlite_size_limit(self, tmp_path):
+        """测试 SQLite 持久层超出条目数上限时删除最早的条目"""
+        backend = SQLiteResponseBackend(str(tmp_path / "cache.db"), max_entries=10)
+        for i in range(100):
+            backend.set(f"k{i}", str(i), ttl=60)
+
+        count = backend._connection.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+        assert count == 10
+        assert backend.get("k99") == "99"
+        assert backend.get("k0") is None
+
+    def test_redis_tier(self):
+        """测试 Redis 兼容持久层"""
+        client = FakeRedis()
+        cache = ResponseCache(backend=RedisResponseBackend(client))
+        cache.set("key", "回答")
+
+        assert ResponseCache(backend=RedisResponseBackend(client)).get("key") == "回答"
+        cache.clear()
+        assert client.data == {}
+
+
+class TestCachedLLM:
+    """测试 CachedLLM 和挂载规则"""
+
+    def test_second_call_hits_cache(self):
+        """测试相同提示词只调用一次底层 LLM，并记录 cache.hit 属性"""
+        exporter = InMemorySpanExporter()
+        set_tracer(Tracer(exporter=exporter))
+        try:
+            fake = FakeLLM()
+            llm = CachedLLM(llm=fake, response_cache=ResponseCache())
+            for _ in range(2):
+                with get_tracer().span("query"):
+                    first = llm.invoke("同一个问题")
+
+            assert fake.call_count == 1
+            assert llm.invoke("另一个不同的问题") != first
+            assert fake.call_count == 2
+            hits = [span.attributes.get("cache.hit") for span in exporter.spans if span.name == "query"]
+            assert hits == [False, True]
+        finally:
+            set_tracer(None)
+
+    def test_attach_only_when_temperature_zero(self):
+        """测试只有 temperature 为 0 时才挂上缓存"""
+        cache = ResponseCache()
+        fake = FakeLLM()
+
+        assert isinstance(with_response_cache(fake, cache, temperature=0), CachedLLM)
+        assert with_response_cache(fake, cache, temperature=0.7) is fake
+        # 未指定温度且实例上没有 temperature 属性时不缓存
+        assert with_response_cache(fake, cache) is fake
+
+    def test_chat_model_keeps_chat_prompt(self):
+        """测试聊天模型包装后仍是聊天模型，问答链选择的提示词不变，消息原样传给底层模型"""
+        chat = FakeChatModel()
+        cached = with_response_cache(chat, ResponseCache(), temperature=0)
+
+        assert isinstance(cached, CachedChatModel)
+        assert PROMPT_SELECTOR.get_prompt(cached) is PROMPT_SELECTOR.get_prompt(chat)
+
+        messages = PROMPT_SELECTOR.get_prompt(chat).format_messages(context="orders 表", question="有哪些字段")
+        first = cached.invoke(messages)
+        second = cached.invoke(messages)
+
+        assert chat.call_count == 1
+        assert [message.type for message in chat.last_messages] == ["system", "human"]
+        assert first.content == second.content
+        cached.invoke(messages[-1:])
+        assert chat.call_count == 2
+
+    def test_create_from_config(self, tmp_path):
+        """测试从配置创建缓存"""
+        config = SimpleNamespace(
+            llm_response_cache_enabled=True,
+            llm_response_cache_backend="sqlite",
+            llm_response_cache_path=str(tmp_path / "cache.db"),
+            llm_response_cache_ttl=60,
+            llm_response_cache_max_entries=8,
+            llm_response_cache_persistent_max_entries=32,
+        )
+        cache = create_response_cache_from_config(config)
+        assert isinstance(cache.backend, SQLiteResponseBackend)
+        assert cache.max_entries == 8
+        assert cache.backend.max_entries == 32
+
+        config.llm_response_cache_enabled = False
+        assert create_response_cache_from_config(config) is None
+
+        config.llm_response_cache_enabled = True
+        config.llm_response_cache_backend = "memcached"
+        with pytest.raises(ValueError):
+            create_response_cache_from_config(config)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
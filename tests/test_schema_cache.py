@@ -0,0 +1,124 @@
+"""测试 schema 缓存"""
+import sqlite3
+
+import pytest
+
+from src.database.schema_cache import SchemaCache
+from src.database.sqlite_db import SQLiteDatabase
+from src.database.synthetic import generate_synthetic_sqlite
+
+
+class TestSchemaCache:
+    """测试 SchemaCache 类"""
+
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        """生成小规模合成数据库"""
+        path = tmp_path / "cache.db"
+        generate_synthetic_sqlite(str(path), table_count=4, columns_per_table=3, row_count=0)
+        return str(path)
+
+    def test_first_call_introspects_and_second_hits_cache(self, db_path, tmp_path):
+        """测试首次完整获取，之后命中缓存"""
+        cache = SchemaCache(str(tmp_path / "schema_cache"))
+
+        with SQLiteDatabase({'database': db_path}) as db:
+            schema = cache.get_schema(db, "test_db")
+            assert cache.last_stats == {'cached': 0, 'refreshed': 4, 'removed': 0}
+
+            assert cache.get_schema(db, "test_db") == schema
+            assert cache.last_stats == {'cached': 4, 'refreshed': 0, 'removed': 0}
+
+    def test_snapshot_persisted_across_instances(self, db_path, tmp_path):
+        """测试快照持久化到文件"""
+        cache_dir = str(tmp_path / "schema_cache")
+
+        with SQLiteDatabase({'database': db_path}) as db:
+            schema = SchemaCache(cache_dir).get_schema(db, "test_db")
+
+            cache = SchemaCache(cache_dir)
+            assert cache.get_schema(db, "test_db") == schema
+            assert cache.last_stats['refreshed'] == 0
+
+    def test_only_changed_tables_are_refreshed(self, db_path, tmp_path):
+        """测试只重新获取结构变化的表"""
+        cache = SchemaCache(str(tmp_path / "schema_cache"))
+
+        with SQLiteDatabase({'database': db_path}) as db:
+            schema = cache.get_schema(db, "test_db")
+            altered, dropped = list(schema)[:2]
+
+        connection = sqlite3.connect(db_path)
+        with connection:
+            connection.execute(f'ALTER TABLE "{altered}" ADD COLUMN extra_note TEXT')
+            connection.execute(f'DROP TABLE "{dropped}"')
+        connection.close()
+
+        with SQLiteDatabase({'database': db_path}) as db:
+            refreshed = cache.get_schema(db, "test_db")
+
+            assert cache.last_stats == {'cached': 2, 'refreshed': 1, 'removed': 1}
+            assert 'extra_note' in refreshed[altered]['columns']
+            assert dropped not in refreshed
+            assert refreshed == db.get_schema()
+
+    def test_iter_schema_streams_changed_tables(self, db_path, tmp_path):
+        """测试流式获取时变化的表在产出时才重新获取，完整遍历后保存快照"""
+        cache = SchemaCache(str(tmp_path / "schema_cache"))
+
+        with SQLiteDatabase({'database': db_path}) as db:
+            schema = cache.get_schema(db, "test_db")
+            altered = list(schema)[-1]
+
+        connection = sqlite3.connect(db_path)
+        with connection:
+            connection.execute(f'ALTER TABLE "{altered}" ADD COLUMN extra_note TEXT')
+        connection.close()
+
+        with SQLiteDatabase({'database': db_path}) as db:
+            fetched = []
+            original = db.get_table_schema
+            db.get_table_schema = lambda name: fetched.append(name) or original(name)
+
+            items = cache.iter_schema(db, "test_db")
+            first = next(items)
+            assert first[0] == list(schema)[0]
+            assert fetched == []
+
+            streamed = dict([first, *items])
+            assert fetched == [altered]
+            assert cache.last_stats == {'cached': 3, 'refreshed': 1, 'removed': 0}
+            assert streamed == db.get_schema()
+            assert cache.get_schema(db, "test_db") == streamed
+
+    def test_versions_outside_iter_schema_are_ignored(self, db_path, tmp_path):
+        """测试版本中有 db.iter_schema() 不返回的表时，不会在增量更新中获取或写入快照"""
+        cache = SchemaCache(str(tmp_path / "schema_cache"))
+
+        with SQLiteDatabase({'database': db_path}) as db:
+            original_versions = db.get_table_versions
+            db.get_table_versions = lambda: {**original_versions(), 'hidden_view': 'v1'}
+            fetched = []
+            original = db.get_table_schema
+            db.get_table_schema = lambda name: fetched.append(name) or original(name)
+
+            schema = cache.get_schema(db, "test_db")
+            assert 'hidden_view' not in schema
+            assert cache.load_snapshot("test_db")['excluded'] == ['hidden_view']
+
+            assert cache.get_schema(db, "test_db") == schema
+            assert cache.last_stats == {'cached': 4, 'refreshed': 0, 'removed': 0}
+            assert fetched == []
+
+            altered = list(schema)[0]
+            db.get_table_versions = lambda: {
+                **original_versions(), altered: 'v2', 'hidden_view': 'v1'
+            }
+            refreshed = cache.get_schema(db, "test_db")
+            assert fetched == [altered]
+            assert list(refreshed) == list(schema)
+            assert 'hidden_view' not in cache.load_snapshot("test_db")['versions']
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
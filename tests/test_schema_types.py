@@ -0,0 +1,62 @@
+"""测试紧凑 schema 结构"""
+import pickle
+
+import pytest
+
+from src.database.schema_types import ColumnInfo, TableSchema, schema_from_dict, schema_to_dict
+
+
+class TestSchemaTypes:
+    """测试 TableSchema / ColumnInfo"""
+
+    def test_column_info_behaves_like_dict(self):
+        """测试只包含已提供的属性，按字典方式读取"""
+        column = ColumnInfo(type="int", nullable=False, key="PRI")
+
+        assert dict(column) == {'type': 'int', 'nullable': False, 'key': 'PRI'}
+        assert column == {'type': 'int', 'nullable': False, 'key': 'PRI'}
+        assert column['type'] == "int"
+        assert 'comment' not in column
+        assert column.get('comment', '') == ''
+        assert column.get('items') is None
+        with pytest.raises(KeyError):
+            column['comment']
+
+    def test_compact_layout(self):
+        """测试不使用实例字典且类型字符串被驻留"""
+        type_name = "".join(["var", "char"])
+        column = ColumnInfo(type=type_name, comment="名称")
+
+        assert not hasattr(column, '__dict__')
+        assert column['type'] is ColumnInfo(type="varchar")['type']
+
+    def test_unknown_field(self):
+        """测试未知属性"""
+        with pytest.raises(TypeError):
+            ColumnInfo(size=10)
+        with pytest.raises(TypeError):
+            TableSchema(columns={}, owner="dba")
+
+    def test_table_schema_round_trip(self):
+        """测试与纯字典互相转换和序列化"""
+        schema = {
+            'orders': {
+                'comment': '订单表',
+                'columns': {'id': {'type': 'int', 'nullable': False, 'key': 'PRI'}},
+            },
+            'logs': {'columns': {'message': {'type': 'text', 'nullable': True, 'default': None}}},
+            'products': {'fields': {'_id': 'str'}, 'columns': {}, 'sample_count': 3},
+        }
+
+        compact = schema_from_dict(schema)
+
+        assert isinstance(compact['orders'], TableSchema)
+        assert isinstance(compact['orders']['columns']['id'], ColumnInfo)
+        assert 'comment' not in compact['logs']
+        assert compact['products'] is schema['products']
+        assert schema_to_dict(compact) == schema
+        assert pickle.loads(pickle.dumps(compact)) == compact
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,175 @@
+"""测试 SQLite 数据库和合成数据库生成器"""
+import sqlite3
+
+import pytest
+
+from src.database.base import QueryLimitExceededError
+from src.database.sqlite_db import SQLiteDatabase
+from src.database.synthetic import generate_synthetic_sqlite
+
+
+class TestSyntheticSQLite:
+    """测试合成 SQLite 数据库"""
+
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        """生成小规模合成数据库"""
+        path = tmp_path / "synthetic.db"
+        generate_synthetic_sqlite(str(path), table_count=5, columns_per_table=4, row_count=7)
+        return str(path)
+
+    def test_generate_stats(self, tmp_path):
+        """测试生成统计信息"""
+        stats = generate_synthetic_sqlite(
+            str(tmp_path / "stats.db"), table_count=3, columns_per_table=6, row_count=10
+        )
+
+        assert stats['tables'] == 3
+        assert stats['columns'] == 18
+        assert stats['rows'] == 30
+        assert stats['size_bytes'] > 0
+
+    def test_get_schema(self, db_path):
+        """测试获取 schema（不包含注释元数据表）"""
+        with SQLiteDatabase({'database': db_path}) as db:
+            schema = db.get_schema()
+
+        assert len(schema) == 5
+        for table_info in schema.values():
+            assert table_info['comment']
+            columns = table_info['columns']
+            assert len(columns) == 4
+            assert columns['id']['key'] == 'PRI'
+            assert columns['id']['nullable'] is False
+            assert all(col['comment'] for col in columns.values())
+
+    def test_get_sample_data(self, db_path):
+        """测试获取示例数据"""
+        with SQLiteDatabase({'database': db_path}) as db:
+            table_name = next(iter(db.get_schema()))
+            rows = db.get_sample_data(table_name, limit=3)
+
+        assert len(rows) == 3
+        assert [row['id'] for row in rows] == [1, 2, 3]
+
+    def test_without_comments(self, tmp_path):
+        """测试不生成注释时 schema 仍可读取"""
+        path = str(tmp_path / "plain.db")
+        generate_synthetic_sqlite(path, table_count=2, columns_per_table=3, row_count=0,
+                                  with_comments=False)
+
+        with SQLiteDatabase({'database': path}) as db:
+            schema = db.get_schema()
+
+        assert len(schema) == 2
+        assert all(info['comment'] == '' for info in schema.values())
+
+
+class TestStreamingQuery:
+    """测试流式查询"""
+
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        """生成单表合成数据库"""
+        path = tmp_path / "stream.db"
+        generate_synthetic_sqlite(str(path), table_count=1, columns_per_table=3, row_count=50)
+        return str(path)
+
+    def _table_name(self, db):
+        return next(iter(db.get_schema()))
+
+    def test_iter_query_streams_all_rows(self, db_path):
+        """测试流式读取全部结果"""
+        with SQLiteDatabase({'database': db_path}) as db:
+            table_name = self._table_name(db)
+            rows = list(db.iter_query(f'SELECT * FROM "{table_name}"', fetch_size=7))
+
+        assert len(rows) == 50
+        assert rows[-1]['id'] == 50
+
+    def test_iter_query_row_cap(self, db_path):
+        """测试超过行数上限时中止"""
+        with SQLiteDatabase({'database': db_path}) as db:
+            table_name = self._table_name(db)
+            seen = []
+            with pytest.raises(QueryLimitExceededError):
+                for row in db.iter_query(f'SELECT * FROM "{table_name}"', max_rows=10):
+                    seen.append(row)
+
+        assert len(seen) == 10
+
+    def test_iter_query_byte_cap_from_connection_params(self, db_path):
+        """测试连接参数中的字节数上限"""
+        with SQLiteDatabase({'database': db_path, 'max_bytes': 200}) as db:
+            table_name = self._table_name(db)
+            with pytest.raises(QueryLimitExceededError):
+                list(db.iter_query(f'SELECT * FROM "{table_name}"'))
+
+
+class TestSampling:
+    """测试示例数据采样"""
+
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        """生成单表合成数据库（超过采样阈值）"""
+        path = tmp_path / "sampling.db"
+        generate_synthetic_sqlite(str(path), table_count=1, columns_per_table=3, row_count=5000)
+        return str(path)
+
+    def _table_name(self, db):
+        return next(iter(db.get_schema()))
+
+    def test_representative_sampling_spreads_over_table(self, db_path):
+        """测试大表按主键范围随机采样"""
+        with SQLiteDatabase({'database': db_path, 'sample_seed': 7}) as db:
+            rows = db.get_sample_data(self._table_name(db), limit=5)
+
+        ids = [row['id'] for row in rows]
+        assert 0 < len(ids) <= 5
+        assert len(set(ids)) == len(ids)
+        assert ids != [1, 2, 3, 4, 5][:len(ids)]
+        assert max(ids) > 100
+
+    def test_limit_mode(self, db_path):
+        """测试 limit 模式返回前 N 行"""
+        with SQLiteDatabase({'database': db_path, 'sample_mode': 'limit'}) as db:
+            rows = db.get_sample_data(self._table_name(db), limit=3)
+
+        assert [row['id'] for row in rows] == [1, 2, 3]
+
+    def test_invalid_mode(self, db_path):
+        """测试不支持的采样模式"""
+        with SQLiteDatabase({'database': db_path, 'sample_mode': 'random'}) as db:
+            with pytest.raises(ValueError):
+                db.get_sample_data(self._table_name(db))
+
+    def test_lob_projection_and_truncation(self, tmp_path):
+        """测试二进制字段不返回、LOB 超过上限返回空、长值截断"""
+        path = str(tmp_path / "lob.db")
+        connection = sqlite3.connect(path)
+        with connection:
+            connection.execute(
+                "CREATE TABLE docs (id INTEGER PRIMARY KEY, title VARCHAR(500), "
+                "body TEXT, payload BLOB)"
+            )
+            connection.execute(
+                "INSERT INTO docs VALUES (1, ?, ?, ?)", ("t" * 300, "b" * 50, b"\x00" * 10)
+            )
+            connection.execute(
+                "INSERT INTO docs VALUES (2, 'short', ?, NULL)", ("b" * 10000,)
+            )
+        connection.close()
+
+        params = {'database': path, 'sample_value_max_chars': 20, 'sample_lob_max_bytes': 1000}
+        with SQLiteDatabase(params) as db:
+            rows = db.get_sample_data("docs", limit=5)
+
+        assert [set(row) for row in rows] == [{'id', 'title', 'body'}] * 2
+        assert rows[0]['title'] == "t" * 20 + "…"
+        assert rows[0]['body'] == "b" * 20 + "…"
+        assert rows[1]['title'] == "short"
+        assert rows[1]['body'] is None
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
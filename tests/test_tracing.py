@@ -0,0 +1,180 @@
+"""测试链路追踪模块"""
+import json
+import threading
+import time
+
+import pytest
+
+from src.utils.tracing import (
+    NOOP_SPAN,
+    STATUS_ERROR,
+    STATUS_OK,
+    BatchSpanExporter,
+    FileSpanExporter,
+    InMemorySpanExporter,
+    Tracer,
+    get_current_span,
+)
+
+
+class TestTracer:
+    """测试 Tracer 类"""
+
+    def test_disabled_tracer_returns_noop_span(self):
+        """测试关闭追踪时返回空 Span"""
+        tracer = Tracer(enabled=False)
+
+        with tracer.span("agent.chat", use_rag=True) as span:
+            span.set_attribute("rag.doc_count", 3)
+
+        assert span is NOOP_SPAN
+        assert span.is_recording is False
+
+    def test_nested_spans_share_trace(self):
+        """测试嵌套 Span 共享 trace_id 并记录父子关系"""
+        exporter = InMemorySpanExporter()
+        tracer = Tracer(exporter=exporter)
+
+        with tracer.span("agent.chat") as parent:
+            with tracer.span("rag.query") as child:
+                assert get_current_span() is child
+                child.set_attribute("rag.doc_count", 2)
+            assert get_current_span() is parent
+
+        assert get_current_span() is NOOP_SPAN
+        assert [s.name for s in exporter.spans] == ["rag.query", "agent.chat"]
+        assert child.trace_id == parent.trace_id
+        assert child.parent_span_id == parent.span_id
+        assert child.attributes["rag.doc_count"] == 2
+        assert parent.status_code == STATUS_OK
+
+    def test_exception_marks_span_as_error(self):
+        """测试异常时 Span 状态为错误"""
+        exporter = InMemorySpanExporter()
+        tracer = Tracer(exporter=exporter)
+
+        with pytest.raises(RuntimeError):
+            with tracer.span("llm.predict"):
+                raise RuntimeError("429 Too Many Requests")
+
+        span = exporter.spans[0]
+        assert span.status_code == STATUS_ERROR
+        assert span.events[0]["name"] == "exception"
+
+    def test_file_exporter_writes_otlp_json(self, tmp_path):
+        """测试文件导出器输出 OTLP/JSON 行"""
+        file_path = tmp_path / "traces.jsonl"
+        tracer = Tracer(exporter=FileSpanExporter(str(file_path)))
+
+        with tracer.span("kb.search", k=5, datasource="test_db"):
+            pass
+
+        lines = file_path.read_text(encoding="utf-8").strip().splitlines()
+        assert len(lines) == 1
+
+        record = json.loads(lines[0])
+        assert record["name"] == "kb.search"
+        assert len(record["traceId"]) == 32
+        assert {"key": "k", "value": {"intValue": "5"}} in record["attributes"]
+        assert record["endTimeUnixNano"] >= record["startTimeUnixNano"]
+
+    def test_file_exporter_keeps_handle_open(self, tmp_path):
+        """测试文件导出器复用同一个文件句柄，关闭后再导出时重新打开"""
+        file_path = tmp_path / "traces.jsonl"
+        exporter = FileSpanExporter(str(file_path))
+        tracer = Tracer(exporter=exporter)
+
+        with tracer.span("a"):
+            pass
+        handle = exporter._file
+        with tracer.span("b"):
+            pass
+
+        assert exporter._file is handle
+        assert len(file_path.read_text(encoding="utf-8").splitlines()) == 2
+
+        tracer.shutdown()
+        assert handle.closed
+        with tracer.span("c"):
+            pass
+        assert len(file_path.read_text(encoding="utf-8").splitlines()) == 3
+
+
+class SlowExporter(InMemorySpanExporter):
+    """记录每次导出的批次大小和调用线程"""
+
+    def __init__(self, delay: float = 0.0):
+        super().__init__()
+        self.delay = delay
+        self.batches = []
+        self.threads = set()
+
+    def export(self, spans):
+        time.sleep(self.delay)
+        self.batches.append(len(spans))
+        self.threads.add(threading.current_thread().name)
+        super().export(spans)
+
+
+class TestBatchSpanExporter:
+    """测试 BatchSpanExporter 类"""
+
+    def test_export_does_not_block_and_batches(self):
+        """测试请求线程只入队，后台线程按批次大小导出"""
+        inner = SlowExporter(delay=0.05)
+        exporter = BatchSpanExporter(inner, max_batch_size=4, schedule_delay=60)
+        tracer = Tracer(exporter=exporter)
+
+        start = time.perf_counter()
+        for i in range(10):
+            with tracer.span("kb.search", i=i):
+                pass
+        assert time.perf_counter() - start < 0.05
+
+        assert exporter.force_flush(timeout=5)
+        assert inner.batches == [4, 4, 2]
+        assert inner.threads == {"span-exporter"}
+        assert [span.attributes["i"] for span in inner.spans] == list(range(10))
+        exporter.shutdown()
+
+    def test_interval_flush_and_shutdown(self):
+        """测试未凑满批次时按时间间隔导出，关闭时导出剩余 Span"""
+        inner = SlowExporter()
+        exporter = BatchSpanExporter(inner, max_batch_size=100, schedule_delay=0.05)
+        tracer = Tracer(exporter=exporter)
+
+        with tracer.span("a"):
+            pass
+        deadline = time.time() + 2
+        while not inner.spans and time.time() < deadline:
+            time.sleep(0.01)
+        assert inner.batches == [1]
+
+        exporter.schedule_delay = 60
+        with tracer.span("b"):
+            pass
+        tracer.shutdown()
+        assert [span.name for span in inner.spans] == ["a", "b"]
+
+        with tracer.span("c"):
+            pass
+        assert len(inner.spans) == 2
+
+    def test_drops_when_queue_full(self):
+        """测试队列满时丢弃新 Span"""
+        inner = SlowExporter()
+        exporter = BatchSpanExporter(inner, max_batch_size=2, schedule_delay=60, max_queue_size=2)
+        # 阻止后台线程在测试期间消费队列
+        with exporter._condition:
+            tracer = Tracer(exporter=exporter)
+            for name in "abc":
+                with tracer.span(name):
+                    pass
+            assert exporter.dropped == 1
+
+        exporter.shutdown()
+        assert [span.name for span in inner.spans] == ["a", "b"]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])